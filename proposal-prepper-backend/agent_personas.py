@@ -49,14 +49,42 @@ SOP:
 Focus on technical risk and capability gaps.
 """
 
+# --- Persona Registry ---
+# SOP for each agent type; the keys are the agents the analysis graph runs
+AGENT_PERSONAS: Dict[str, str] = {
+    "far": FAR_AGENT_SOP,
+    "eo": EO_AGENT_SOP,
+    "technical": TECHNICAL_AGENT_SOP
+}
+PERSONA_TYPES = tuple(AGENT_PERSONAS)
+
+# --- Relevance Routing Vocabulary ---
+# Query terms used to pick the document chunks each agent reads
+AGENT_QUERY_TERMS: Dict[str, list] = {
+    "far": [
+        "FAR", "DFARS", "clause", "regulation", "shall", "must", "required", "certification",
+        "representation", "cost", "pricing", "price", "subcontracting", "small business",
+        "cybersecurity", "CUI", "NIST", "data rights", "intellectual property", "compliance"
+    ],
+    "eo": [
+        "executive order", "EO", "federal register", "minimum wage", "labor", "wage",
+        "environmental", "sustainability", "climate", "equity", "diversity", "artificial intelligence",
+        "AI", "cybersecurity", "supply chain", "domestic", "Buy American", "veterans", "accessibility"
+    ],
+    "technical": [
+        "technical", "approach", "solution", "architecture", "specification", "requirement",
+        "performance", "past performance", "experience", "personnel", "labor category", "staffing",
+        "qualifications", "years", "schedule", "deliverable", "management", "risk", "capability"
+    ]
+}
+
+def get_agent_query_terms(agent_type: str) -> list:
+    """Return the relevance query terms for a given agent type."""
+    return AGENT_QUERY_TERMS.get(agent_type.lower(), AGENT_QUERY_TERMS["far"])
+
 def get_persona_prompt(agent_type: str) -> str:
     """Return the specialized SOP for a given agent type."""
-    personas = {
-        "far": FAR_AGENT_SOP,
-        "eo": EO_AGENT_SOP,
-        "technical": TECHNICAL_AGENT_SOP
-    }
-    return personas.get(agent_type.lower(), FAR_AGENT_SOP)
+    return AGENT_PERSONAS.get(agent_type.lower(), FAR_AGENT_SOP)
 
 def get_unified_compliance_prompt(document_text: str, filename: str, context: str = "") -> str:
     """
@@ -75,6 +103,7 @@ Document Content:
 JSON Output Format:
 {{
     "overall_status": "pass|fail|warning",
+    "overall_score": 0-100,
     "issues": [
         {{
             "severity": "critical|warning|info",
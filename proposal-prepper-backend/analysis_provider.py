@@ -1,13 +1,18 @@
 # SPDX-License-Identifier: PolyForm-Strict-1.0.0
 # SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
 
+import asyncio
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Type
+from typing import Dict, Any, List, Optional, Type
 from enum import Enum
+from circuit_breaker import BreakerState, CircuitOpenError, get_circuit_breaker
+from finding_stream import current_sink, stream_findings, suppress_findings
 from logging_config import get_logger
 from config import get_settings
 from models import ComplianceResults
+from rule_scanner import get_rule_scanner, merge_prescan_results
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -42,6 +47,14 @@ class AnalysisProvider(ABC):
         """Analyze a document for compliance."""
         pass
 
+async def knowledge_context(document_text: str) -> str:
+    """Retrieve regulatory context for a document; empty if unavailable."""
+    try:
+        from hybrid_search import get_hybrid_searcher
+    except ImportError:
+        return ""
+    return await get_hybrid_searcher().context_for_document(document_text)
+
 class AnalysisRouter:
     """Routes analysis requests to the appropriate provider based on configuration."""
     
@@ -54,18 +67,48 @@ class AnalysisRouter:
         cls._providers[provider_type] = provider_cls
         logger.info(f"Registered analysis provider: {provider_type}")
 
+    @classmethod
+    def default_provider_type(cls) -> ProviderType:
+        """The provider selected by ANALYSIS_MODE."""
+        # Prioritize settings.analysis_mode (which checks environment ANALYSIS_MODE)
+        env_provider = settings.analysis_mode or os.getenv("ANALYSIS_MODE", ProviderType.LOCAL)
+        
+        try:
+            return ProviderType(env_provider.lower())
+        except ValueError:
+            logger.warning(f"Invalid ANALYSIS_MODE '{env_provider}', falling back to 'local'")
+            return ProviderType.LOCAL
+
+    @classmethod
+    def provider_chain(cls) -> List[ProviderType]:
+        """
+        Providers to try in order: ANALYSIS_MODE first, then the rest of
+        ``settings.analysis_provider_chain``. Unregistered providers are skipped.
+        
+        The chain is empty by default, so there is no failover (in
+        particular, a local deployment never sends documents to a cloud
+        provider) unless ANALYSIS_PROVIDER_CHAIN lists one.
+        """
+        chain = [cls.default_provider_type()]
+        for name in settings.analysis_provider_chain.split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            try:
+                provider_type = ProviderType(name)
+            except ValueError:
+                logger.warning(f"Ignoring unknown provider '{name}' in ANALYSIS_PROVIDER_CHAIN")
+                continue
+            if provider_type not in chain:
+                chain.append(provider_type)
+        # get_provider falls back to 'local' if even the default is unregistered
+        return [p for p in chain if p in cls._providers] or chain[:1]
+
     @classmethod
     def get_provider(cls, provider_type: Optional[ProviderType] = None) -> AnalysisProvider:
         """Get an instance of the requested provider, or the default from settings."""
         if provider_type is None:
-            # Prioritize settings.analysis_mode (which checks environment ANALYSIS_MODE)
-            env_provider = settings.analysis_mode or os.getenv("ANALYSIS_MODE", ProviderType.LOCAL)
-            
-            try:
-                provider_type = ProviderType(env_provider.lower())
-            except ValueError:
-                logger.warning(f"Invalid ANALYSIS_MODE '{env_provider}', falling back to 'local'")
-                provider_type = ProviderType.LOCAL
+            provider_type = cls.default_provider_type()
 
         if provider_type not in cls._instances:
             if provider_type not in cls._providers:
@@ -79,3 +122,126 @@ class AnalysisRouter:
             cls._instances[provider_type] = cls._providers[provider_type]()
             
         return cls._instances[provider_type]
+
+    async def analyze_document(
+        self,
+        document_text: str,
+        filename: str,
+        document_id: str,
+        **kwargs
+    ) -> ComplianceResults:
+        """
+        Analyze a document, running the deterministic rule pre-scan first.
+        
+        Depending on ``settings.prescan_mode`` the pre-scan is skipped
+        ("off"), used on its own without any LLM call ("only"), or its
+        findings are passed to the provider to narrow the analysis and
+        merged into the provider's results ("prefilter"). Whenever a
+        provider is called it also receives regulatory context retrieved
+        from the knowledge base as ``knowledge_context``.
+        """
+        mode = (settings.prescan_mode or "off").lower()
+        prescan = get_rule_scanner().scan(document_text, document_id) if mode != "off" else None
+        if mode == "only":
+            return prescan.to_results(document_id, kwargs.get("session_id", "prescan_session"), filename)
+        
+        kwargs.setdefault("knowledge_context", await self._knowledge_context(document_text))
+        if prescan is None:
+            return await self._analyze_with_failover(
+                document_text=document_text,
+                filename=filename,
+                document_id=document_id,
+                **kwargs
+            )
+        
+        results = await self._analyze_with_failover(
+            document_text=document_text,
+            filename=filename,
+            document_id=document_id,
+            prescan_context=prescan.prompt_context(),
+            **kwargs
+        )
+        return merge_prescan_results(results, prescan)
+
+    async def _analyze_with_failover(self, **kwargs) -> ComplianceResults:
+        """
+        Call the first provider in the chain whose circuit breaker allows it.
+        
+        Each call's outcome and duration feed that provider's breaker; on a
+        failure the next provider in the chain is tried. A half-open trial
+        call is limited to the breaker's slow-call time, and a cancelled
+        call releases its trial slot without recording an outcome.
+        
+        Findings streamed by a provider that then fails are already with
+        the client, so the providers failed over to run with streaming
+        suppressed rather than emit a second set of findings.
+        
+        Raises:
+            CircuitOpenError: If every provider's breaker is open
+            Exception: If every provider that was tried failed
+        """
+        skipped: List[str] = []
+        errors: List[str] = []
+        last_error: Optional[Exception] = None
+        retry_after: Optional[float] = None
+        parent_sink = current_sink()
+        streamed = 0
+        
+        async def counting_sink(issue: Dict[str, Any], source: str) -> None:
+            nonlocal streamed
+            streamed += 1
+            await parent_sink(issue, source)
+        
+        for provider_type in self.provider_chain():
+            breaker = get_circuit_breaker(provider_type.value)
+            if not breaker.allow_request():
+                logger.info(f"Skipping provider '{provider_type.value}': circuit breaker is {breaker.state.value}")
+                skipped.append(provider_type.value)
+                retry_after = min(breaker.retry_after, retry_after if retry_after is not None else breaker.retry_after)
+                continue
+            
+            trial = breaker.state == BreakerState.HALF_OPEN
+            started = time.monotonic()
+            try:
+                call = self.get_provider(provider_type).analyze_document(**kwargs)
+                if trial:
+                    call = asyncio.wait_for(call, timeout=breaker.slow_call_seconds)
+                if parent_sink is None:
+                    results = await call
+                elif streamed:
+                    with suppress_findings():
+                        results = await call
+                else:
+                    with stream_findings(counting_sink):
+                        results = await call
+            except asyncio.CancelledError:
+                breaker.release_trial()
+                raise
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - started)
+                logger.warning(f"Provider '{provider_type.value}' failed: {e}")
+                errors.append(f"{provider_type.value}: {e}")
+                last_error = e
+                continue
+            breaker.record_success(time.monotonic() - started)
+            
+            if skipped or errors:
+                logger.info(f"Analysis served by failover provider '{provider_type.value}'")
+                results.metadata["failover"] = {
+                    "provider": provider_type.value,
+                    "skipped_open": skipped,
+                    "failed": errors,
+                    "findings_streamed_before_failover": streamed
+                }
+            return results
+        
+        if last_error is None:
+            raise CircuitOpenError(
+                f"All analysis providers are unavailable (open circuits: {', '.join(skipped)})",
+                retry_after=retry_after or 0.0
+            )
+        raise Exception(f"All analysis providers failed: {'; '.join(errors)}") from last_error
+
+    async def _knowledge_context(self, document_text: str) -> str:
+        """Retrieve regulatory context for the document; empty if unavailable."""
+        return await knowledge_context(document_text)
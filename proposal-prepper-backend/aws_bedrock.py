@@ -8,22 +8,35 @@ This module provides the interface to AWS Bedrock for compliance analysis
 using Claude 3 Sonnet for document processing and regulatory compliance checking.
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional, List
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError, BotoCoreError
 
+from chunk_router import CHARS_PER_TOKEN
 from config import get_settings
+from prompt_prefix import PromptParts, get_prefix_cache_metrics
+from rate_limiter import AdaptiveRateLimiter
 from models import ComplianceResults, ComplianceIssue, ComplianceSummary, RegulatoryReference
-from parser_utils import parse_llm_json, map_issue_data
+from parser_utils import map_issue_data
+from structured_output import bedrock_response_content, bedrock_tool_config, validate_response
 from analysis_provider import AnalysisProvider, AnalysisRouter, ProviderType
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Error codes that mean "slow down" rather than "this request is wrong"
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+MAX_OUTPUT_TOKENS = 4000
+
 
 class BedrockClient(AnalysisProvider):
     """AWS Bedrock client for AI-powered compliance analysis."""
@@ -33,6 +46,15 @@ class BedrockClient(AnalysisProvider):
         self.model_id = settings.bedrock_model_id
         self.region = settings.aws_region
         self._client = None
+        # boto3 calls block, so they run on a bounded pool instead of the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.bedrock_max_concurrency,
+            thread_name_prefix="bedrock"
+        )
+        self.limiter = AdaptiveRateLimiter(
+            settings.bedrock_requests_per_minute,
+            settings.bedrock_tokens_per_minute
+        )
     
     def _initialize_client(self) -> None:
         """Initialize the AWS Bedrock client with proper configuration."""
@@ -53,7 +75,14 @@ class BedrockClient(AnalysisProvider):
                 })
             
             session = boto3.Session(**session_kwargs)
-            self._client = session.client('bedrock-runtime')
+            self._client = session.client(
+                'bedrock-runtime',
+                config=Config(
+                    # Throttling is retried by _invoke with adaptive client-side backoff
+                    retries={"mode": "standard", "max_attempts": 1},
+                    max_pool_connections=settings.bedrock_max_concurrency
+                )
+            )
             
             logger.info(f"Initialized Bedrock client for region {self.region}")
             
@@ -83,7 +112,8 @@ class BedrockClient(AnalysisProvider):
         self,
         document_text: str,
         filename: str,
-        document_id: str
+        document_id: str,
+        **kwargs
     ) -> ComplianceResults:
         """
         Analyze document text for compliance issues using AWS Bedrock.
@@ -92,6 +122,9 @@ class BedrockClient(AnalysisProvider):
             document_text: Extracted text from the PDF document
             filename: Original filename for context
             document_id: Unique document identifier
+            **kwargs: Optional ``session_id``, ``prescan_context`` with rule
+                pre-scan notes and ``knowledge_context`` with retrieved
+                regulatory text
             
         Returns:
             ComplianceResults with AI-generated compliance analysis
@@ -104,40 +137,39 @@ class BedrockClient(AnalysisProvider):
             if not self._client:
                 raise Exception("Bedrock client not initialized")
             
-            # Create the analysis prompt
-            prompt = self._create_compliance_prompt(document_text, filename)
-            
-            # Prepare the request payload for Claude 3 Sonnet
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 4000,
-                "temperature": 0.1,  # Low temperature for consistent analysis
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
+            prompt = self._create_compliance_prompt(
+                document_text,
+                filename,
+                kwargs.get("prescan_context", ""),
+                kwargs.get("knowledge_context", "")
+            )
+            request_body = self._request_body(prompt, settings.bedrock_prompt_caching)
             
             # Make the request to Bedrock
             logger.info(f"Sending analysis request to Bedrock for document {document_id}")
             
-            response = self._client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body),
-                contentType="application/json",
-                accept="application/json"
+            response_body = await self._invoke(
+                request_body,
+                estimated_tokens=len(prompt.text) // CHARS_PER_TOKEN + MAX_OUTPUT_TOKENS
             )
             
-            # Parse the response
-            response_body = json.loads(response['body'].read())
-            ai_response = response_body['content'][0]['text']
-            
             logger.info(f"Received analysis response from Bedrock for document {document_id}")
             
             # Parse the structured response
-            results = self._parse_ai_response(ai_response, document_id)
+            results = self.parse_response_body(response_body, document_id)
+            results.session_id = kwargs.get("session_id") or results.session_id
+            
+            usage = response_body.get("usage", {})
+            metrics = get_prefix_cache_metrics()
+            metrics.record(
+                "bedrock", prompt,
+                evaluated_tokens=usage.get("input_tokens", 0) + usage.get("cache_creation_input_tokens", 0),
+                cached_tokens=usage.get("cache_read_input_tokens", 0),
+                session_id=results.session_id or document_id
+            )
+            prompt_cache = metrics.pop_session(results.session_id or document_id)
+            if prompt_cache and prompt_cache["cached_tokens"]:
+                results.metadata["prompt_cache"] = prompt_cache
             
             return results
             
@@ -153,22 +185,134 @@ class BedrockClient(AnalysisProvider):
             logger.error(f"Unexpected error during analysis for document {document_id}: {e}")
             raise Exception(f"Analysis failed: {str(e)}")
     
-    def _create_compliance_prompt(self, document_text: str, filename: str) -> str:
+    def build_request_body(
+        self,
+        document_text: str,
+        filename: str,
+        prescan_context: str = "",
+        knowledge_context: str = "",
+        cache_prefix: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the invoke_model request body for analyzing one document.
+        
+        Batch inference uses the same body as each record's ``modelInput``.
+        ``cache_prefix`` (default: ``settings.bedrock_prompt_caching``)
+        marks the static prompt prefix for Bedrock prompt caching.
+        """
+        prompt = self._create_compliance_prompt(document_text, filename, prescan_context, knowledge_context)
+        return self._request_body(prompt, settings.bedrock_prompt_caching if cache_prefix is None else cache_prefix)
+    
+    def _request_body(self, prompt: PromptParts, cache_prefix: bool) -> Dict[str, Any]:
+        if cache_prefix:
+            # Tools and the marked block are cached; only the document block is evaluated per call
+            content: Union[str, List[Dict[str, Any]]] = [
+                {"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": prompt.suffix}
+            ]
+        else:
+            content = prompt.text
+        
+        # Prepare the request payload for Claude 3 Sonnet
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "temperature": 0.1,  # Low temperature for consistent analysis
+            "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+            # Forced tool use constrains the response to the compliance schema
+            **bedrock_tool_config()
+        }
+    
+    def parse_response_body(self, response_body: Dict[str, Any], document_id: str) -> ComplianceResults:
+        """Parse a decoded invoke_model response body into ComplianceResults."""
+        return self._parse_ai_response(bedrock_response_content(response_body), document_id)
+    
+    async def _invoke(self, request_body: Dict[str, Any], estimated_tokens: int) -> Dict[str, Any]:
+        """
+        Call invoke_model on the Bedrock thread pool within the RPM/TPM quotas.
+        
+        Each attempt first takes a request slot and ``estimated_tokens``
+        from the adaptive limiter; unused tokens are refunded from the
+        reported usage. A throttling error cuts the limiter's rate and the
+        call is retried after an exponential backoff with jitter.
+        
+        Returns:
+            The decoded response body
+        """
+        loop = asyncio.get_running_loop()
+        body = json.dumps(request_body)
+        for attempt in range(settings.bedrock_max_throttle_retries + 1):
+            await self.limiter.acquire(estimated_tokens)
+            try:
+                response_body = await loop.run_in_executor(self._executor, partial(self._invoke_sync, body))
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in THROTTLING_ERROR_CODES or attempt == settings.bedrock_max_throttle_retries:
+                    raise
+                self.limiter.on_throttle()
+                delay = min(settings.bedrock_backoff_max_seconds, settings.bedrock_backoff_base_seconds * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"Bedrock throttled ({code}); retrying in {delay:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+                continue
+            
+            self.limiter.on_success()
+            usage = response_body.get("usage", {})
+            if usage:
+                used = sum(usage.get(key, 0) for key in (
+                    "input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"
+                ))
+                self.limiter.refund(estimated_tokens - used)
+            return response_body
+    
+    def _invoke_sync(self, body: str) -> Dict[str, Any]:
+        """Blocking invoke_model call, run on the Bedrock thread pool."""
+        response = self._client.invoke_model(
+            modelId=self.model_id,
+            body=body,
+            contentType="application/json",
+            accept="application/json"
+        )
+        return json.loads(response['body'].read())
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Client-side throttling state."""
+        return {
+            "max_concurrency": settings.bedrock_max_concurrency,
+            **self.limiter.get_status()
+        }
+    
+    def _create_compliance_prompt(
+        self,
+        document_text: str,
+        filename: str,
+        prescan_context: str = "",
+        knowledge_context: str = ""
+    ) -> PromptParts:
         """
         Create a structured prompt for compliance analysis.
         
+        The instructions and output format form a prefix that is the same
+        for every document, so it can be served from Bedrock's prompt cache;
+        the document and its context follow in the suffix.
+        
         Args:
             document_text: The extracted document text
             filename: Original filename for context
+            prescan_context: Checks already settled by the rule pre-scan
+            knowledge_context: Regulatory text retrieved from the knowledge base
             
         Returns:
             Formatted prompt for AI analysis
         """
-        prompt = f"""You are an expert compliance analyst specializing in Federal Acquisition Regulation (FAR) and Defense Federal Acquisition Regulation Supplement (DFARS) requirements for government contract proposals.
-
-Please analyze the following proposal document for compliance issues and provide a structured response.
+        prefix = """You are an expert compliance analyst specializing in Federal Acquisition Regulation (FAR) and Defense Federal Acquisition Regulation Supplement (DFARS) requirements for government contract proposals.
 
-Document: {filename}
+Please analyze the proposal document that follows these instructions for compliance issues and provide a structured response.
 
 Key areas to analyze:
 1. Cost and pricing information (FAR 15.408)
@@ -179,54 +323,63 @@ Key areas to analyze:
 6. Intellectual property and data rights (DFARS 252.227)
 7. Required certifications and representations
 
-Document Text:
-{document_text[:8000]}  # Limit text to avoid token limits
-
 Please provide your analysis in the following JSON format:
 
-{{
+{
     "overall_status": "pass|fail|warning",
     "overall_score": <number between 0-100>,
     "issues": [
-        {{
+        {
             "severity": "critical|warning|info",
             "title": "Brief issue title",
             "description": "Detailed description of the compliance issue",
-            "regulation": {{
+            "regulation": {
                 "regulation": "FAR|DFARS",
                 "section": "specific section number",
                 "title": "regulation title",
                 "url": "regulation URL if available"
-            }},
+            },
             "confidence": <number between 0-1>,
             "remediation": "Suggested fix (optional)"
-        }}
+        }
     ],
-    "summary": {{
+    "summary": {
         "total_issues": <number>,
         "critical_count": <number>,
         "warning_count": <number>,
         "info_count": <number>
-    }}
-}}
+    }
+}
+
+Focus on actionable, specific compliance issues with clear regulatory references. Provide confidence scores based on the clarity of the requirement and evidence in the document.
 
-Focus on actionable, specific compliance issues with clear regulatory references. Provide confidence scores based on the clarity of the requirement and evidence in the document."""
+"""
+        # Document text is limited to avoid token limits
+        suffix = f"""Document: {filename}
+
+Regulatory Reference Context:
+{knowledge_context or "None available"}
+
+{prescan_context}
+
+Document Text:
+{document_text[:8000]}"""
         
-        return prompt
+        return PromptParts(prefix, suffix)
     
-    def _parse_ai_response(self, ai_response: str, document_id: str) -> ComplianceResults:
+    def _parse_ai_response(self, ai_response: Union[str, Dict[str, Any]], document_id: str) -> ComplianceResults:
         """
         Parse the AI response into structured ComplianceResults.
         
         Args:
-            ai_response: Raw AI response text
+            ai_response: Schema tool input, or raw AI response text
             document_id: Document identifier
             
         Returns:
             Parsed ComplianceResults object
         """
         try:
-            parsed_data = parse_llm_json(ai_response)
+            parsed_data = validate_response(ai_response, "bedrock", repair=settings.llm_json_repair)
             
             # Convert to our data models
             issues = []
@@ -0,0 +1,463 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Offline batch inference for bulk re-analysis.
+
+When a regulation revision lands, archived proposals are re-analyzed in
+bulk without going through the interactive queue:
+
+1. an analysis session is created for every document in one transaction;
+2. each document's text is extracted and turned into the same request
+   body an interactive Bedrock call would send, one JSONL record per
+   document (``{"recordId": <session_id>, "modelInput": {...}}``);
+3. the JSONL is handed to a batch executor:
+   - ``BedrockBatchExecutor`` uploads it to S3 and runs a Bedrock model
+     invocation job, the throughput-priced path used in production;
+     batches below the service's minimum job size are sent record by
+     record through on-demand ``invoke_model`` instead;
+   - ``LocalBatchExecutor`` sends the records to a local Ollama endpoint
+     with its own concurrency limit, a stand-in for development and tests;
+4. output records are parsed as they are read and written to
+   ``compliance_results`` in bulk, ``batch_inference_write_batch`` at a
+   time, with their sessions marked completed or failed.
+
+Jobs run as their own asyncio tasks with their own executors, so they
+never take slots from the concurrent processor's workers, the
+interactive Bedrock thread pool and rate limiter, or the local LLM
+endpoint pool.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import boto3
+import httpx
+
+from analysis_provider import knowledge_context
+from aws_bedrock import get_bedrock_client
+from config import get_settings
+from db_models import AnalysisStatus
+from db_operations import create_analysis_sessions, store_compliance_results_bulk, update_analysis_sessions
+from logging_config import get_logger
+from models import AnalysisStartRequest, ComplianceResults, ComplianceSummary
+from pdf_processor import get_pdf_processor
+from rule_scanner import PrescanResult, get_rule_scanner, merge_prescan_results
+from structured_output import ollama_format
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Bedrock model invocation job states after which no more output will appear
+BEDROCK_TERMINAL_STATES = {"Completed", "PartiallyCompleted", "Failed", "Stopped", "Expired"}
+
+
+@dataclass
+class BatchRecord:
+    """One document's model request in a batch."""
+    record_id: str
+    document_id: str
+    filename: str
+    model_input: Dict[str, Any]
+    prescan: Optional[PrescanResult] = None
+
+    def to_json(self) -> str:
+        return json.dumps({"recordId": self.record_id, "modelInput": self.model_input})
+
+
+def write_jsonl(records: List[BatchRecord]) -> str:
+    """Serialize records in the Bedrock batch input format."""
+    return "".join(record.to_json() + "\n" for record in records)
+
+
+class BedrockBatchExecutor:
+    """
+    Runs a batch as a Bedrock model invocation job.
+
+    Args:
+        bucket: S3 bucket for job input and output
+        role_arn: Service role Bedrock assumes to read and write the bucket
+        poll_interval: Seconds between job status checks
+        min_records: Smallest batch submitted as a job (default: ``batch_inference_min_records``)
+    """
+
+    name = "bedrock-batch"
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        role_arn: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        min_records: Optional[int] = None
+    ):
+        self.bucket = bucket or settings.batch_inference_bucket
+        self.role_arn = role_arn or settings.batch_inference_role_arn
+        self.poll_interval = poll_interval or settings.batch_inference_poll_seconds
+        self.min_records = settings.batch_inference_min_records if min_records is None else min_records
+        self.model_id = settings.bedrock_model_id
+        session_kwargs = {"region_name": settings.aws_region}
+        if settings.aws_access_key_id and settings.aws_secret_access_key:
+            session_kwargs.update({
+                "aws_access_key_id": settings.aws_access_key_id,
+                "aws_secret_access_key": settings.aws_secret_access_key
+            })
+        session = boto3.Session(**session_kwargs)
+        self._bedrock = session.client("bedrock")
+        self._s3 = session.client("s3")
+        self._runtime = session.client("bedrock-runtime")
+        # Separate from the interactive Bedrock pool: job control calls are few but slow,
+        # and on-demand records of a small batch run at most two at a time
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bedrock-batch")
+
+    async def _call(self, fn, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, **kwargs))
+
+    def _invoke(self, model_input: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._runtime.invoke_model(modelId=self.model_id, body=json.dumps(model_input))
+        return json.loads(response["body"].read())
+
+    async def _run_on_demand(self, records: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Invoke the model once per record, yielding output records as they finish."""
+        async def process(record: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                output = await self._call(self._invoke, model_input=record["modelInput"])
+            except Exception as e:
+                return {"recordId": record["recordId"], "error": {"errorMessage": str(e)}}
+            return {"recordId": record["recordId"], "modelOutput": output}
+
+        tasks = [asyncio.create_task(process(record)) for record in records]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, job_id: str, jsonl: str) -> AsyncIterator[Dict[str, Any]]:
+        """Submit the job, wait for it to finish and yield its output records."""
+        records = [json.loads(line) for line in jsonl.splitlines() if line.strip()]
+        if len(records) < self.min_records:
+            # Model invocation jobs reject inputs below the service's minimum record count
+            logger.info(f"Batch {job_id} has {len(records)} records, fewer than the Bedrock job minimum "
+                        f"of {self.min_records}; invoking the model on demand")
+            async for output in self._run_on_demand(records):
+                yield output
+            return
+        if not self.role_arn:
+            raise ValueError("BATCH_INFERENCE_ROLE_ARN is required for Bedrock batch jobs")
+        prefix = f"{settings.batch_inference_prefix}/{job_id}"
+        await self._call(self._s3.put_object, Bucket=self.bucket, Key=f"{prefix}/input.jsonl", Body=jsonl.encode("utf-8"))
+
+        response = await self._call(
+            self._bedrock.create_model_invocation_job,
+            jobName=f"reanalysis-{job_id}",
+            roleArn=self.role_arn,
+            modelId=self.model_id,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{self.bucket}/{prefix}/input.jsonl", "s3InputFormat": "JSONL"}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{self.bucket}/{prefix}/output/"}}
+        )
+        job_arn = response["jobArn"]
+        logger.info(f"Submitted Bedrock batch job {job_arn} for batch {job_id}")
+
+        while True:
+            job = await self._call(self._bedrock.get_model_invocation_job, jobIdentifier=job_arn)
+            if job["status"] in BEDROCK_TERMINAL_STATES:
+                break
+            await asyncio.sleep(self.poll_interval)
+        if job["status"] not in ("Completed", "PartiallyCompleted"):
+            raise RuntimeError(f"Bedrock batch job {job_arn} ended {job['status']}: {job.get('message', '')}")
+
+        # A listing returns at most 1000 keys per page
+        pages = self._s3.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=f"{prefix}/output/")
+        keys = await self._call(lambda: [item["Key"] for page in pages for item in page.get("Contents", [])])
+        for key in keys:
+            if not key.endswith(".jsonl.out"):
+                continue
+            obj = await self._call(self._s3.get_object, Bucket=self.bucket, Key=key)
+            lines = await self._call(lambda: obj["Body"].read().decode("utf-8").splitlines())
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalBatchExecutor:
+    """
+    Runs a batch against a local Ollama endpoint, yielding records as they finish.
+
+    Args:
+        url: Ollama base URL (default: ``batch_inference_local_url`` or ``local_llm_url``)
+        concurrency: Records in flight at once
+    """
+
+    name = "local"
+
+    def __init__(self, url: Optional[str] = None, concurrency: Optional[int] = None):
+        self.url = (url or settings.batch_inference_local_url or settings.local_llm_url).rstrip("/")
+        self.concurrency = concurrency or settings.batch_inference_local_concurrency
+        self.model = settings.local_llm_model
+
+    async def _invoke(self, client: httpx.AsyncClient, model_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one Bedrock-style request body to Ollama, returning a Bedrock-style response body."""
+        payload = {
+            "model": self.model,
+            "prompt": "\n\n".join(message["content"] for message in model_input["messages"]),
+            "stream": False,
+            "format": ollama_format(),
+            "options": {
+                "temperature": model_input.get("temperature", 0.1),
+                "num_predict": model_input.get("max_tokens", 4096)
+            }
+        }
+        response = await client.post(f"{self.url}/api/generate", json=payload, timeout=300.0)
+        response.raise_for_status()
+        return {"content": [{"type": "text", "text": response.json()["response"]}]}
+
+    async def run(self, job_id: str, jsonl: str) -> AsyncIterator[Dict[str, Any]]:
+        records = [json.loads(line) for line in jsonl.splitlines() if line.strip()]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with httpx.AsyncClient() as client:
+            async def process(record: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        output = await self._invoke(client, record["modelInput"])
+                    except Exception as e:
+                        return {"recordId": record["recordId"], "error": {"errorMessage": str(e)}}
+                    return {"recordId": record["recordId"], "modelOutput": output}
+
+            tasks = [asyncio.create_task(process(record)) for record in records]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def default_batch_executor():
+    """The executor for ``settings.batch_inference_executor`` ("auto" follows the analysis mode)."""
+    name = (settings.batch_inference_executor or "auto").lower()
+    if name == "auto":
+        name = "bedrock" if settings.analysis_mode == "aws" else "local"
+    return BedrockBatchExecutor() if name == "bedrock" else LocalBatchExecutor()
+
+
+class BatchJob:
+    """Progress of one bulk re-analysis."""
+
+    def __init__(self, documents: List[AnalysisStartRequest], executor):
+        self.job_id = str(uuid.uuid4())
+        self.documents = documents
+        self.executor = executor
+        self.status = "pending"
+        self.succeeded = 0
+        self.failed = 0
+        self.created_at = datetime.utcnow()
+        self.completed_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "executor": self.executor.name,
+            "total": len(self.documents),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "error": self.error
+        }
+
+
+def _error_results(record: BatchRecord, job: BatchJob, error: str) -> ComplianceResults:
+    return ComplianceResults(
+        id=f"error_{record.record_id}_{int(datetime.utcnow().timestamp())}",
+        session_id=record.record_id,
+        document_id=record.document_id,
+        status="fail",
+        issues=[],
+        summary=ComplianceSummary(
+            total_issues=0,
+            critical_count=0,
+            warning_count=0,
+            info_count=0,
+            overall_score=0.0
+        ),
+        generated_at=datetime.utcnow(),
+        ai_model="error",
+        processing_time=0.0,
+        metadata={
+            "error": error,
+            "analysis_failed": True,
+            "batch_job_id": job.job_id
+        }
+    )
+
+
+def _results_from_output(record: BatchRecord, output: Dict[str, Any], job: BatchJob) -> ComplianceResults:
+    """Parse one output record; raises if the model call failed or its response is unusable."""
+    if "modelOutput" not in output:
+        error = output.get("error") or {}
+        raise RuntimeError(error.get("errorMessage") or "Batch record returned no output")
+    results = get_bedrock_client().parse_response_body(output["modelOutput"], record.document_id)
+    results.session_id = record.record_id
+    if job.executor.name == LocalBatchExecutor.name:
+        results.ai_model = job.executor.model
+        results.metadata["ai_provider"] = "local_llm"
+    results.metadata.update({"batch_job_id": job.job_id, "batch_executor": job.executor.name})
+    if record.prescan is not None:
+        results = merge_prescan_results(results, record.prescan)
+    return results
+
+
+class _ResultsWriter:
+    """Buffers parsed results and writes them and their session statuses in bulk."""
+
+    def __init__(self, job: BatchJob):
+        self.job = job
+        self.written: Set[str] = set()
+        self._results: List[ComplianceResults] = []
+
+    async def add(self, results: ComplianceResults) -> None:
+        self._results.append(results)
+        if len(self._results) >= settings.batch_inference_write_batch:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._results:
+            return
+        batch, self._results = self._results, []
+        await store_compliance_results_bulk(batch)
+        completed = [r.session_id for r in batch if not r.metadata.get("analysis_failed")]
+        failed = [r.session_id for r in batch if r.metadata.get("analysis_failed")]
+        await update_analysis_sessions(completed, AnalysisStatus.COMPLETED, "Batch analysis completed")
+        await update_analysis_sessions(
+            failed, AnalysisStatus.FAILED, "Batch analysis failed",
+            error_message="Batch analysis failed; see results metadata"
+        )
+        self.written.update(r.session_id for r in batch)
+        self.job.succeeded += len(completed)
+        self.job.failed += len(failed)
+
+
+async def _prepare_records(
+    job: BatchJob,
+    session_ids: List[str],
+    writer: _ResultsWriter
+) -> List[BatchRecord]:
+    """Extract each document and build its model request; documents that fail are written as errors."""
+    semaphore = asyncio.Semaphore(settings.batch_inference_extract_concurrency)
+    bedrock = get_bedrock_client()
+    prescan_on = (settings.prescan_mode or "off").lower() != "off"
+
+    async def prepare(session_id: str, document: AnalysisStartRequest) -> Tuple[BatchRecord, Optional[str]]:
+        record = BatchRecord(session_id, document.document_id, document.filename, {})
+        async with semaphore:
+            try:
+                document_text, _ = await get_pdf_processor().extract_text_from_s3(s3_key=document.s3_key)
+                if prescan_on:
+                    record.prescan = get_rule_scanner().scan(document_text, document.document_id)
+                record.model_input = bedrock.build_request_body(
+                    document_text,
+                    document.filename,
+                    record.prescan.prompt_context() if record.prescan is not None else "",
+                    await knowledge_context(document_text),
+                    # Batch jobs are priced per token already; prompt caching does not apply
+                    cache_prefix=False
+                )
+            except Exception as e:
+                logger.warning(f"Batch {job.job_id}: could not prepare document {document.document_id}: {e}")
+                return record, str(e)
+        return record, None
+
+    prepared = await asyncio.gather(*(prepare(s, d) for s, d in zip(session_ids, job.documents)))
+    records = []
+    for record, error in prepared:
+        if error is None:
+            records.append(record)
+        else:
+            await writer.add(_error_results(record, job, error))
+    return records
+
+
+async def run_batch_job(job: BatchJob) -> BatchJob:
+    """Run every step of a batch job, recording its progress on ``job``."""
+    writer = _ResultsWriter(job)
+    session_ids: List[str] = []
+    try:
+        job.status = "preparing"
+        session_ids = await create_analysis_sessions(job.documents, {"batch_job_id": job.job_id})
+        records = await _prepare_records(job, session_ids, writer)
+
+        job.status = "running"
+        by_id = {record.record_id: record for record in records}
+        async for output in job.executor.run(job.job_id, write_jsonl(records)):
+            record = by_id.pop(output.get("recordId"), None)
+            if record is None:
+                continue
+            try:
+                results = _results_from_output(record, output, job)
+            except Exception as e:
+                results = _error_results(record, job, str(e))
+            await writer.add(results)
+
+        for record in by_id.values():
+            await writer.add(_error_results(record, job, "No output returned for record"))
+        await writer.flush()
+        job.status = "completed"
+        logger.info(f"Batch {job.job_id} completed: {job.succeeded} succeeded, {job.failed} failed")
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        logger.error(f"Batch {job.job_id} failed: {e}", exc_info=True)
+        unwritten = [session_id for session_id in session_ids if session_id not in writer.written]
+        try:
+            await update_analysis_sessions(unwritten, AnalysisStatus.FAILED, "Batch analysis failed", error_message=str(e))
+        except Exception as update_error:
+            logger.error(f"Batch {job.job_id}: failed to mark sessions failed: {update_error}")
+        job.failed += len(unwritten)
+    finally:
+        job.completed_at = datetime.utcnow()
+    return job
+
+
+# Global batch job registry, oldest first
+_jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+
+def _evict_jobs() -> None:
+    """Drop finished jobs past ``batch_inference_job_ttl_seconds``, then the oldest beyond ``batch_inference_max_jobs``."""
+    now = datetime.utcnow()
+    for job in list(_jobs.values()):
+        if job.completed_at is not None and (now - job.completed_at).total_seconds() > settings.batch_inference_job_ttl_seconds:
+            del _jobs[job.job_id]
+    # Running jobs are never dropped
+    finished = [job for job in _jobs.values() if job.completed_at is not None]
+    for job in finished[:max(0, len(_jobs) - settings.batch_inference_max_jobs)]:
+        del _jobs[job.job_id]
+
+
+def start_batch_job(documents: List[AnalysisStartRequest], executor=None) -> BatchJob:
+    """Start a bulk re-analysis of ``documents`` in the background."""
+    _evict_jobs()
+    job = BatchJob(documents, executor or default_batch_executor())
+    _jobs[job.job_id] = job
+    job._task = asyncio.create_task(run_batch_job(job))
+    return job
+
+
+def get_batch_job(job_id: str) -> Optional[BatchJob]:
+    """Get a batch job started by this process, unless it has been evicted."""
+    _evict_jobs()
+    return _jobs.get(job_id)
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Latency benchmark for IntelligenceFusion against the USAspending stand-in.
+
+Compares a sequential client (concurrency 1) with the concurrent page
+fan-out, and a cold cache with a warm one, for an incumbent search plus
+award details for every result.
+
+Usage:
+    python bench_intelligence_fusion.py --awards 500 --max-results 500 --latency 0.2 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from intelligence_fusion import IntelligenceFusion
+from usaspending_standin import USASpendingStandIn
+
+
+async def run(fusion: IntelligenceFusion, max_results: int, details: int) -> float:
+    started = time.perf_counter()
+    awards = await fusion.find_incumbents("Department of Homeland Security", "541511", max_results=max_results)
+    await fusion.get_award_details_batch(a["generated_internal_id"] for a in awards[:details])
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--awards", type=int, default=500, help="Synthetic awards served")
+    parser.add_argument("--max-results", type=int, default=500)
+    parser.add_argument("--details", type=int, default=50, help="Awards to fetch details for")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stand-in latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=50.0, help="Requests per second cap")
+    args = parser.parse_args()
+
+    with USASpendingStandIn(synthetic=args.awards, latency=args.latency) as standin:
+        for label, concurrency in (("sequential", 1), ("fan-out", args.concurrency)):
+            fusion = IntelligenceFusion(base_url=standin.url, concurrency=concurrency, rate_per_second=args.rate)
+            try:
+                cold = await run(fusion, args.max_results, args.details)
+                warm = await run(fusion, args.max_results, args.details)
+            finally:
+                await fusion.close()
+            print(
+                f"{label:>10}: cold {cold * 1000:8.1f} ms, warm {warm * 1000:6.1f} ms "
+                f"({fusion.stats.requests} requests, {fusion.stats.cache_hits} cache hits)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Micro-benchmark for extracting and parsing JSON from LLM output.
+
+Compares the previous split/find/rfind extraction with the single-pass
+scanner in parser_utils on clean, wrapped, defective and truncated
+responses, and reports how many of each the two approaches could parse.
+
+Usage:
+    python bench_json_extract.py --issues 5 20 50 --repeat 2000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Callable, Dict
+
+from parser_utils import parse_llm_json
+
+
+def legacy_parse(text: str):
+    """The former extract_json_from_text + json.loads."""
+    if "```json" in text:
+        try:
+            text = text.split("```json")[1].split("```")[0].strip()
+        except IndexError:
+            pass
+    start, end = text.find("{"), text.rfind("}") + 1
+    if start == -1 or end == 0:
+        raise ValueError("No JSON object found in text")
+    return json.loads(text[start:end])
+
+
+def responses(issue_count: int) -> Dict[str, str]:
+    issues = [
+        {
+            "severity": "warning",
+            "title": f"Finding {n} on clause {{52.204-{n}}}",
+            "description": "The proposal does not address the requirement. " * 4,
+            "regulation": {"regulation": "FAR", "section": f"15.{400 + n}", "title": "Pricing"},
+            "confidence": 0.8
+        }
+        for n in range(issue_count)
+    ]
+    body = json.dumps({"overall_status": "warning", "overall_score": 70, "issues": issues}, indent=2)
+    return {
+        "clean": body,
+        "fenced": f"```json\n{body}\n```",
+        "prose_with_braces": f"Result {{draft}}:\n{body}\nSee {{notes}}.",
+        "trailing_comma": body.replace("}\n  ]", "},\n  ]"),
+        "truncated": body[: int(len(body) * 0.8)]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LLM JSON extraction.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    candidates: Dict[str, Callable[[str], object]] = {
+        "legacy": legacy_parse,
+        "scanner": parse_llm_json,
+        "scanner+repair": lambda text: parse_llm_json(text, repair=True)
+    }
+    print(f"{'issues':>6} {'case':<18} " + " ".join(f"{name:>16}" for name in candidates))
+    for issue_count in args.issues:
+        for case, text in responses(issue_count).items():
+            cells = []
+            for function in candidates.values():
+                try:
+                    function(text)
+                except ValueError:
+                    cells.append(f"{'failed':>16}")
+                    continue
+                seconds = timeit.timeit(lambda: function(text), number=args.repeat) / args.repeat
+                cells.append(f"{seconds * 1e6:>13.1f} us")
+            print(f"{issue_count:>6} {case:<18} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.WARNING)
+    main()
@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Recall and latency benchmark for HNSW vector retrieval.
+
+Loads synthetic embeddings into a scratch table shaped like
+``obi_knowledge_chunks`` (embedding plus a source type), builds the same
+HNSW index used in production and compares approximate top-k results
+against exact (sequential scan) results.
+
+Usage:
+    python bench_vector_retrieval.py --sizes 10000 100000 1000000 --ef-search 40 100 200
+
+Requires a PostgreSQL database with the pgvector extension (DATABASE_URL).
+The scratch table is dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from config import get_settings
+
+settings = get_settings()
+
+TABLE = "obi_bench_vectors"
+SOURCE_TYPES = ["FAR", "DFARS", "EO", "NASA", "GSA"]
+
+
+def synthetic_embeddings(count: int, dim: int, rng: np.random.Generator, clusters: int = 256) -> np.ndarray:
+    """Unit vectors drawn around random centroids, like topical text embeddings."""
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, count)
+    vectors = centroids[assignment] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def load(conn: asyncpg.Connection, size: int, dim: int, rng: np.random.Generator, batch: int = 10_000) -> float:
+    """Create and fill the scratch table; returns load time in seconds."""
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, source_type text NOT NULL, embedding vector({dim}))")
+    started = time.perf_counter()
+    for offset in range(0, size, batch):
+        count = min(batch, size - offset)
+        vectors = synthetic_embeddings(count, dim, rng)
+        types = rng.integers(0, len(SOURCE_TYPES), count)
+        records = [(offset + i, SOURCE_TYPES[types[i]], vectors[i]) for i in range(count)]
+        await conn.copy_records_to_table(TABLE, records=records, columns=["id", "source_type", "embedding"])
+    return time.perf_counter() - started
+
+
+async def top_k(conn: asyncpg.Connection, query: np.ndarray, k: int, source_type: str = None) -> List[int]:
+    if source_type:
+        rows = await conn.fetch(
+            f"SELECT id FROM {TABLE} WHERE source_type = $2 ORDER BY embedding <=> $1 LIMIT {k}",
+            query, source_type
+        )
+    else:
+        rows = await conn.fetch(f"SELECT id FROM {TABLE} ORDER BY embedding <=> $1 LIMIT {k}", query)
+    return [row["id"] for row in rows]
+
+
+async def run_size(conn: asyncpg.Connection, args: argparse.Namespace, size: int) -> None:
+    rng = np.random.default_rng(args.seed)
+    load_seconds = await load(conn, size, args.dim, rng)
+
+    started = time.perf_counter()
+    await conn.execute(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'")
+    await conn.execute(
+        f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = {args.m}, ef_construction = {args.ef_construction})"
+    )
+    build_seconds = time.perf_counter() - started
+    await conn.execute(f"ANALYZE {TABLE}")
+
+    queries = synthetic_embeddings(args.queries, args.dim, rng)
+    filters = [SOURCE_TYPES[i % len(SOURCE_TYPES)] if args.filtered else None for i in range(args.queries)]
+
+    # Exact neighbours via sequential scan
+    await conn.execute("SET enable_indexscan = off")
+    truth = [set(await top_k(conn, q, args.k, f)) for q, f in zip(queries, filters)]
+    await conn.execute("SET enable_indexscan = on")
+
+    print(f"\n{size:,} vectors (dim {args.dim}): load {load_seconds:.1f}s, index build {build_seconds:.1f}s")
+    print(f"{'ef_search':>10} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8} {'qps':>8}")
+    for ef_search in args.ef_search:
+        await conn.execute(f"SET hnsw.ef_search = {ef_search}")
+        latencies, recalls = [], []
+        for query, source_type, expected in zip(queries, filters, truth):
+            started = time.perf_counter()
+            found = await top_k(conn, query, args.k, source_type)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            recalls.append(len(expected.intersection(found)) / max(len(expected), 1))
+        latencies.sort()
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        print(
+            f"{ef_search:>10} {statistics.mean(recalls):>10.3f} {statistics.median(latencies):>8.2f} "
+            f"{p95:>8.2f} {1000.0 / statistics.mean(latencies):>8.0f}"
+        )
+
+    if not args.keep:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--maintenance-work-mem", default="2GB")
+    parser.add_argument("--filtered", action="store_true", help="Filter each query by source type")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table after the run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(args.database_url)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        await register_vector(conn)
+        for size in args.sizes:
+            await run_size(conn, args, size)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,218 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Agent-specific relevance routing of document chunks.
+
+Instead of sending every specialized agent the first few thousand
+characters of a document, the document is split into page-aligned chunks
+and indexed with an in-memory BM25 index. Each agent then receives only
+the chunks that score highest for its query vocabulary (see
+``agent_personas.AGENT_QUERY_TERMS``), up to a token budget, drawn from
+anywhere in the document.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from agent_personas import get_agent_query_terms
+from config import get_settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Rough characters-per-token ratio used for budgeting prompt text
+CHARS_PER_TOKEN = 4
+
+_PAGE_SPLIT = re.compile(r"^--- Page (\d+)[^\n]*---[ \t]*$", re.MULTILINE)
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; dotted and hyphenated citations stay whole."""
+    return _TOKEN.findall(text.lower())
+
+
+@dataclass
+class Chunk:
+    """A contiguous piece of a document page."""
+    index: int
+    page: Optional[int]
+    text: str
+
+
+def split_page_chunks(document_text: str, max_chars: Optional[int] = None) -> List[Chunk]:
+    """
+    Split extracted text into chunks that never cross a page boundary.
+
+    Paragraphs are packed into chunks of at most ``max_chars`` characters;
+    longer paragraphs are split on line boundaries.
+    """
+    max_chars = max_chars or settings.agent_chunk_chars
+    parts = _PAGE_SPLIT.split(document_text)
+    pages = [(None, parts[0])] + [(int(parts[i]), parts[i + 1]) for i in range(1, len(parts), 2)]
+
+    chunks: List[Chunk] = []
+    for page, text in pages:
+        buffer = ""
+        for paragraph in _paragraphs(text, max_chars):
+            if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+                chunks.append(Chunk(len(chunks), page, buffer))
+                buffer = ""
+            buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+        if buffer:
+            chunks.append(Chunk(len(chunks), page, buffer))
+    return chunks
+
+
+def _paragraphs(text: str, max_chars: int) -> List[str]:
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind("\n", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            paragraphs.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks."""
+
+    def __init__(self, chunks: Sequence[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = list(chunks)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[tuple]] = {}
+        lengths = []
+        for chunk in self.chunks:
+            counts = Counter(tokenize(chunk.text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((chunk.index, tf))
+        self._lengths = lengths
+        self._avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        n = len(self.chunks)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def score(self, query_terms: Sequence[str]) -> List[float]:
+        """BM25 score of every chunk for the query."""
+        scores = [0.0] * len(self.chunks)
+        query = Counter(token for term in query_terms for token in tokenize(term))
+        for term, weight in query.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1.0))
+                scores[index] += weight * idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def top_chunks(self, query_terms: Sequence[str], token_budget: int, top_k: int) -> List[Chunk]:
+        """
+        Highest-scoring chunks that fit the token budget, in document order.
+
+        Falls back to the leading chunks when nothing matches the query.
+        """
+        scores = self.score(query_terms)
+        ranked = sorted(
+            (i for i, s in enumerate(scores) if s > 0),
+            key=lambda i: scores[i],
+            reverse=True
+        ) or list(range(len(self.chunks)))
+
+        budget = token_budget * CHARS_PER_TOKEN
+        selected = []
+        for index in ranked:
+            if len(selected) >= top_k:
+                break
+            # Counted as joined by route(): page label and separator included
+            size = len(_chunk_label(self.chunks[index])) + len(self.chunks[index].text) + 2
+            if size > budget:
+                continue
+            selected.append(index)
+            budget -= size
+        return [self.chunks[i] for i in sorted(selected)]
+
+
+class ChunkRouter:
+    """Builds (and caches per document) chunk indexes and routes chunks to agents."""
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        top_k: Optional[int] = None,
+        max_chunk_chars: Optional[int] = None,
+        cache_size: int = 32
+    ):
+        self.token_budget = token_budget or settings.agent_context_token_budget
+        self.top_k = top_k or settings.agent_chunk_top_k
+        self.max_chunk_chars = max_chunk_chars or settings.agent_chunk_chars
+        self.cache_size = cache_size
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+
+    def get_index(self, document_text: str) -> BM25Index:
+        """Index for a document, built once and shared by all agents."""
+        key = hashlib.sha1(document_text.encode("utf-8")).hexdigest()
+        index = self._indexes.get(key)
+        if index is None:
+            index = BM25Index(split_page_chunks(document_text, self.max_chunk_chars))
+            self._indexes[key] = index
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+        return index
+
+    def route(self, agent_type: str, document_text: str, token_budget: Optional[int] = None) -> str:
+        """
+        Text an agent should read: its most relevant chunks within the budget.
+
+        Documents that already fit the budget are returned unchanged.
+
+        Args:
+            agent_type: Agent whose query vocabulary ranks the chunks
+            document_text: Full extracted text
+            token_budget: Budget for the routed text (default: ``self.token_budget``);
+                callers adding other prompt text pass what is left of it
+        """
+        budget = self.token_budget if token_budget is None else max(0, token_budget)
+        if len(document_text) <= budget * CHARS_PER_TOKEN:
+            return document_text
+
+        index = self.get_index(document_text)
+        chunks = index.top_chunks(get_agent_query_terms(agent_type), budget, self.top_k)
+        routed = "\n\n".join(_chunk_label(chunk) + chunk.text for chunk in chunks)
+        logger.debug(
+            f"Routed {len(chunks)}/{len(index.chunks)} chunks to {agent_type} agent "
+            f"({len(routed)} of {len(document_text)} chars)"
+        )
+        return routed
+
+
+def _chunk_label(chunk: Chunk) -> str:
+    return f"[Page {chunk.page}]\n" if chunk.page is not None else ""
+
+
+# Global router instance
+_chunk_router: Optional[ChunkRouter] = None
+
+
+def get_chunk_router() -> ChunkRouter:
+    """Get the global chunk router instance."""
+    global _chunk_router
+    if _chunk_router is None:
+        _chunk_router = ChunkRouter()
+    return _chunk_router
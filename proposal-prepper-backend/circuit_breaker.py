@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Per-provider circuit breakers.
+
+A breaker watches the outcome and duration of the most recent calls to a
+provider. When the failure rate or the slow-call rate crosses its threshold
+the breaker opens and callers skip the provider (``AnalysisRouter`` fails
+over to the next one in ``settings.analysis_provider_chain``). After
+``open_seconds`` it lets a few trial calls through (half-open); if they
+succeed it closes again, otherwise it reopens. A trial slot whose outcome
+is never recorded (a cancelled call) is released with ``release_trial``,
+and one held longer than ``slow_call_seconds`` is reclaimed, so a lost
+trial cannot keep the breaker half-open.
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from config import get_settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every provider that could serve a call has an open breaker."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a sliding window of calls.
+
+    Args:
+        name: Provider name, for logs and status
+        failure_rate: Fraction of failed calls in the window that opens the breaker
+        slow_call_seconds: Calls taking longer than this count as slow
+        slow_call_rate: Fraction of slow calls in the window that opens the breaker
+        window: Number of recent calls considered
+        min_calls: Calls needed in the window before the rates are evaluated
+        open_seconds: Time the breaker stays open before allowing trial calls
+        half_open_calls: Successful trial calls needed to close the breaker
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate: Optional[float] = None,
+        window: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        half_open_calls: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate = failure_rate or settings.circuit_breaker_failure_rate
+        self.slow_call_seconds = slow_call_seconds or settings.circuit_breaker_slow_call_seconds
+        self.slow_call_rate = slow_call_rate or settings.circuit_breaker_slow_call_rate
+        self.min_calls = min_calls or settings.circuit_breaker_min_calls
+        self.open_seconds = open_seconds or settings.circuit_breaker_open_seconds
+        self.half_open_calls = half_open_calls or settings.circuit_breaker_half_open_calls
+        self._clock = clock
+        # (failed, slow) per call
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window or settings.circuit_breaker_window)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+        self._trial_started_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = BreakerState.HALF_OPEN
+            self._trials_in_flight = 0
+            self._trial_successes = 0
+            logger.info(f"Circuit breaker for {self.name} is half-open; allowing trial calls")
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open breaker allows trial calls."""
+        if self.state != BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the provider now; reserves a trial slot when half-open."""
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN:
+            if self._trials_in_flight and self._clock() - self._trial_started_at > self.slow_call_seconds:
+                # A trial that outlived the slow-call limit would reopen the breaker anyway
+                logger.warning(f"Circuit breaker for {self.name}: reclaiming {self._trials_in_flight} stale trial slot(s)")
+                self._trials_in_flight = 0
+            if self._trials_in_flight < self.half_open_calls - self._trial_successes:
+                self._trials_in_flight += 1
+                self._trial_started_at = self._clock()
+                return True
+        self.rejected += 1
+        return False
+
+    def release_trial(self) -> None:
+        """Free a trial slot reserved by ``allow_request`` for a call that ended without an outcome."""
+        if self._state == BreakerState.HALF_OPEN:
+            self._trials_in_flight = max(0, self._trials_in_flight - 1)
+
+    def record_success(self, duration: float) -> None:
+        slow = duration > self.slow_call_seconds
+        if self._state == BreakerState.HALF_OPEN:
+            self._trials_in_flight = max(0, self._trials_in_flight - 1)
+            if slow:
+                self._open(f"trial call took {duration:.1f}s")
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._close()
+            return
+        self._record(False, slow)
+
+    def record_failure(self, duration: float) -> None:
+        if self._state == BreakerState.HALF_OPEN:
+            self._trials_in_flight = max(0, self._trials_in_flight - 1)
+            self._open("trial call failed")
+            return
+        self._record(True, duration > self.slow_call_seconds)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        self._calls.append((failed, slow))
+        if self._state != BreakerState.CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures, slow_calls = self._rates()
+        if failures >= self.failure_rate:
+            self._open(f"failure rate {failures:.0%}")
+        elif slow_calls >= self.slow_call_rate:
+            self._open(f"slow call rate {slow_calls:.0%}")
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._calls:
+            return 0.0, 0.0
+        count = len(self._calls)
+        return (
+            sum(failed for failed, _ in self._calls) / count,
+            sum(slow for _, slow in self._calls) / count
+        )
+
+    def _open(self, reason: str) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = self._clock()
+        self.times_opened += 1
+        logger.warning(f"Circuit breaker for {self.name} opened ({reason}) for {self.open_seconds:.0f}s")
+
+    def _close(self) -> None:
+        self._state = BreakerState.CLOSED
+        self._calls.clear()
+        logger.info(f"Circuit breaker for {self.name} closed")
+
+    def get_status(self) -> Dict[str, Any]:
+        failures, slow_calls = self._rates()
+        return {
+            "state": self.state.value,
+            "calls_in_window": len(self._calls),
+            "failure_rate": round(failures, 3),
+            "slow_call_rate": round(slow_calls, 3),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+            "retry_after_seconds": round(self.retry_after, 1)
+        }
+
+
+# Global breaker registry, one per provider
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the breaker for a provider, creating it on first use."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
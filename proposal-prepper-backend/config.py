@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     analysis_provider: str = Field(default="local", env="ANALYSIS_PROVIDER")
     analysis_mode: str = Field(default="local", env="ANALYSIS_MODE")
     air_spec_mode: bool = Field(default=True, env="AIR_SPEC_MODE")
+    prescan_mode: str = Field(default="prefilter", env="PRESCAN_MODE")  # off | prefilter | only
     environment_provider: str = Field(default="local", env="ENVIRONMENT_PROVIDER")
     
     # AWS configuration
@@ -34,6 +35,13 @@ class Settings(BaseSettings):
     aws_access_key_id: Optional[str] = Field(default=None, env="AWS_ACCESS_KEY_ID")
     aws_secret_access_key: Optional[str] = Field(default=None, env="AWS_SECRET_ACCESS_KEY")
     bedrock_model_id: str = Field(default="anthropic.claude-3-sonnet-20240229-v1:0", env="BEDROCK_MODEL_ID")
+    bedrock_max_concurrency: int = Field(default=4, env="BEDROCK_MAX_CONCURRENCY")  # Bedrock worker threads
+    bedrock_requests_per_minute: float = Field(default=50.0, env="BEDROCK_REQUESTS_PER_MINUTE")  # Account RPM quota
+    bedrock_tokens_per_minute: float = Field(default=200000.0, env="BEDROCK_TOKENS_PER_MINUTE")  # Account TPM quota
+    bedrock_max_throttle_retries: int = Field(default=4, env="BEDROCK_MAX_THROTTLE_RETRIES")
+    bedrock_backoff_base_seconds: float = Field(default=1.0, env="BEDROCK_BACKOFF_BASE_SECONDS")
+    bedrock_backoff_max_seconds: float = Field(default=30.0, env="BEDROCK_BACKOFF_MAX_SECONDS")
+    bedrock_prompt_caching: bool = Field(default=False, env="BEDROCK_PROMPT_CACHING")  # Requires a model with prompt caching support
     
     # Local LLM configuration
     use_local_llm: bool = Field(default=False, env="USE_LOCAL_LLM")
@@ -69,15 +77,117 @@ class Settings(BaseSettings):
     # Web service configuration
     web_service_url: str = Field(default="http://web:3000", env="WEB_SERVICE_URL")
     
+    # Real-time updates (WebSocket fan-out)
+    ws_send_queue_size: int = Field(default=100, env="WS_SEND_QUEUE_SIZE")
+    ws_send_timeout_seconds: float = Field(default=5.0, env="WS_SEND_TIMEOUT_SECONDS")
+    
+    # Progress event bus (cross-replica fan-out)
+    event_bus_backend: str = Field(default="redis", env="EVENT_BUS_BACKEND")  # redis | memory
+    event_bus_channel: str = Field(default="proposal-prepper:progress", env="EVENT_BUS_CHANNEL")
+    event_bus_batch_interval_ms: int = Field(default=50, env="EVENT_BUS_BATCH_INTERVAL_MS")
+    event_bus_max_batch: int = Field(default=100, env="EVENT_BUS_MAX_BATCH")
+    event_bus_compress_min_bytes: int = Field(default=1024, env="EVENT_BUS_COMPRESS_MIN_BYTES")
+    
+    # Status polling (conditional GET, long-poll and SSE)
+    status_cache_ttl_seconds: float = Field(default=30.0, env="STATUS_CACHE_TTL_SECONDS")
+    status_cache_max_entries: int = Field(default=10000, env="STATUS_CACHE_MAX_ENTRIES")
+    status_long_poll_max_seconds: float = Field(default=30.0, env="STATUS_LONG_POLL_MAX_SECONDS")
+    status_sse_heartbeat_seconds: float = Field(default=15.0, env="STATUS_SSE_HEARTBEAT_SECONDS")
+    
     # Analysis configuration
     max_concurrent_analyses: int = Field(default=5, env="MAX_CONCURRENT_ANALYSES")
     analysis_timeout_seconds: int = Field(default=300, env="ANALYSIS_TIMEOUT_SECONDS")
+    analysis_provider_chain: str = Field(default="", env="ANALYSIS_PROVIDER_CHAIN")  # Failover order after ANALYSIS_MODE; empty disables failover
+    circuit_breaker_failure_rate: float = Field(default=0.5, env="CIRCUIT_BREAKER_FAILURE_RATE")
+    circuit_breaker_slow_call_seconds: float = Field(default=240.0, env="CIRCUIT_BREAKER_SLOW_CALL_SECONDS")
+    circuit_breaker_slow_call_rate: float = Field(default=0.8, env="CIRCUIT_BREAKER_SLOW_CALL_RATE")
+    circuit_breaker_window: int = Field(default=10, env="CIRCUIT_BREAKER_WINDOW")
+    circuit_breaker_min_calls: int = Field(default=4, env="CIRCUIT_BREAKER_MIN_CALLS")
+    circuit_breaker_open_seconds: float = Field(default=60.0, env="CIRCUIT_BREAKER_OPEN_SECONDS")
+    circuit_breaker_half_open_calls: int = Field(default=1, env="CIRCUIT_BREAKER_HALF_OPEN_CALLS")
     
     # Local LLM configuration (Air Spec)
     use_local_llm: bool = Field(default=True, env="USE_LOCAL_LLM")
     local_llm_url: str = Field(default="http://localhost:11434", env="LOCAL_LLM_URL")
     local_llm_model: str = Field(default="llama3.2", env="LOCAL_LLM_MODEL")
+    local_llm_urls: str = Field(default="", env="LOCAL_LLM_URLS")  # Comma-separated endpoint pool; LOCAL_LLM_URL when empty
+    local_llm_endpoint_concurrency: int = Field(default=2, env="LOCAL_LLM_ENDPOINT_CONCURRENCY")
+    local_llm_probe_interval_seconds: float = Field(default=15.0, env="LOCAL_LLM_PROBE_INTERVAL_SECONDS")
+    local_llm_failure_threshold: int = Field(default=3, env="LOCAL_LLM_FAILURE_THRESHOLD")
+    local_llm_sticky_sessions: int = Field(default=1000, env="LOCAL_LLM_STICKY_SESSIONS")
+    local_llm_keep_alive: str = Field(default="30m", env="LOCAL_LLM_KEEP_ALIVE")  # Ollama keep_alive sent with every request
+    local_llm_warmup_enabled: bool = Field(default=True, env="LOCAL_LLM_WARMUP_ENABLED")
+    local_llm_keepalive_refresh_seconds: float = Field(default=120.0, env="LOCAL_LLM_KEEPALIVE_REFRESH_SECONDS")
+    local_llm_cold_load_seconds: float = Field(default=1.0, env="LOCAL_LLM_COLD_LOAD_SECONDS")  # load_duration above which a request was cold
+    llm_hedging_enabled: bool = Field(default=False, env="LLM_HEDGING_ENABLED")  # Duplicate slow requests to another endpoint
+    llm_hedge_percentile: float = Field(default=95.0, env="LLM_HEDGE_PERCENTILE")
+    llm_hedge_min_samples: int = Field(default=20, env="LLM_HEDGE_MIN_SAMPLES")
+    llm_hedge_window: int = Field(default=200, env="LLM_HEDGE_WINDOW")
+    llm_hedge_min_delay_seconds: float = Field(default=2.0, env="LLM_HEDGE_MIN_DELAY_SECONDS")
     use_simulated_data: bool = Field(default=True, env="USE_SIMULATED_DATA")
+    llm_streaming_enabled: bool = Field(default=True, env="LLM_STREAMING_ENABLED")  # Stream findings as they are generated
+    llm_json_repair: bool = Field(default=True, env="LLM_JSON_REPAIR")  # Salvage complete issues from truncated output
+    llm_structured_output: bool = Field(default=True, env="LLM_STRUCTURED_OUTPUT")  # Constrain output to the compliance schema
+    
+    # Agent relevance routing (per-agent document chunks)
+    agent_context_token_budget: int = Field(default=1000, env="AGENT_CONTEXT_TOKEN_BUDGET")
+    agent_chunk_top_k: int = Field(default=8, env="AGENT_CHUNK_TOP_K")
+    agent_chunk_chars: int = Field(default=1200, env="AGENT_CHUNK_CHARS")
+    
+    # Knowledge retrieval (RAG over obi_knowledge_chunks)
+    rag_enabled: bool = Field(default=True, env="RAG_ENABLED")
+    embedding_backend: str = Field(default="ollama", env="EMBEDDING_BACKEND")  # ollama | hashing
+    embedding_model: str = Field(default="nomic-embed-text", env="EMBEDDING_MODEL")
+    embedding_batch_size: int = Field(default=32, env="EMBEDDING_BATCH_SIZE")
+    embedding_concurrency: int = Field(default=4, env="EMBEDDING_CONCURRENCY")
+    ingest_chunk_tokens: int = Field(default=400, env="INGEST_CHUNK_TOKENS")
+    ingest_insert_batch_rows: int = Field(default=1000, env="INGEST_INSERT_BATCH_ROWS")
+    regulation_ingest_workers: Optional[int] = Field(default=None, env="REGULATION_INGEST_WORKERS")  # CPU count when unset
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_memory_entries: int = Field(default=10000, env="EMBEDDING_CACHE_MEMORY_ENTRIES")
+    rag_top_k: int = Field(default=5, env="RAG_TOP_K")
+    rag_query_chars: int = Field(default=2000, env="RAG_QUERY_CHARS")
+    rag_context_max_chars: int = Field(default=3000, env="RAG_CONTEXT_MAX_CHARS")
+    rag_cache_size: int = Field(default=256, env="RAG_CACHE_SIZE")
+    hnsw_ef_search: int = Field(default=40, env="HNSW_EF_SEARCH")
+    hybrid_candidates: int = Field(default=20, env="HYBRID_CANDIDATES")
+    hybrid_rrf_k: int = Field(default=60, env="HYBRID_RRF_K")
+    
+    # Federal Register crawler
+    federal_register_api_url: str = Field(default="https://www.federalregister.gov/api/v1", env="FEDERAL_REGISTER_API_URL")
+    crawler_concurrency: int = Field(default=4, env="CRAWLER_CONCURRENCY")
+    crawler_rate_per_second: float = Field(default=2.0, env="CRAWLER_RATE_PER_SECOND")
+    crawler_page_size: int = Field(default=100, env="CRAWLER_PAGE_SIZE")
+    crawler_cache_dir: Optional[str] = Field(default=".cache/federal_register", env="CRAWLER_CACHE_DIR")
+    eo_worker_lease_seconds: int = Field(default=300, env="EO_WORKER_LEASE_SECONDS")
+    eo_worker_batch_size: int = Field(default=8, env="EO_WORKER_BATCH_SIZE")
+    eo_worker_max_attempts: int = Field(default=5, env="EO_WORKER_MAX_ATTEMPTS")
+    eo_worker_retry_base_seconds: int = Field(default=30, env="EO_WORKER_RETRY_BASE_SECONDS")
+    
+    # USAspending (intelligence fusion)
+    usaspending_api_url: str = Field(default="https://api.usaspending.gov/api/v2", env="USASPENDING_API_URL")
+    usaspending_concurrency: int = Field(default=4, env="USASPENDING_CONCURRENCY")
+    usaspending_rate_per_second: float = Field(default=5.0, env="USASPENDING_RATE_PER_SECOND")
+    usaspending_page_size: int = Field(default=100, env="USASPENDING_PAGE_SIZE")  # API maximum is 100
+    usaspending_cache_ttl_seconds: float = Field(default=3600.0, env="USASPENDING_CACHE_TTL_SECONDS")
+    usaspending_cache_max_entries: int = Field(default=1024, env="USASPENDING_CACHE_MAX_ENTRIES")
+    price_to_beat_cache_dir: str = Field(default=".cache/price_to_beat", env="PRICE_TO_BEAT_CACHE_DIR")
+    price_to_beat_cache_ttl_seconds: float = Field(default=86400.0, env="PRICE_TO_BEAT_CACHE_TTL_SECONDS")
+    price_to_beat_max_awards: int = Field(default=1000, env="PRICE_TO_BEAT_MAX_AWARDS")
+    
+    # Offline batch inference (bulk re-analysis)
+    batch_inference_executor: str = Field(default="auto", env="BATCH_INFERENCE_EXECUTOR")  # auto, bedrock or local
+    batch_inference_bucket: str = Field(default="proposal-prepper-batch", env="BATCH_INFERENCE_BUCKET")
+    batch_inference_prefix: str = Field(default="batch-inference", env="BATCH_INFERENCE_PREFIX")
+    batch_inference_role_arn: Optional[str] = Field(default=None, env="BATCH_INFERENCE_ROLE_ARN")  # Role Bedrock assumes for S3 access
+    batch_inference_poll_seconds: float = Field(default=60.0, env="BATCH_INFERENCE_POLL_SECONDS")
+    batch_inference_min_records: int = Field(default=100, env="BATCH_INFERENCE_MIN_RECORDS")  # Bedrock rejects smaller jobs; these run on demand
+    batch_inference_local_url: Optional[str] = Field(default=None, env="BATCH_INFERENCE_LOCAL_URL")  # Defaults to LOCAL_LLM_URL
+    batch_inference_local_concurrency: int = Field(default=2, env="BATCH_INFERENCE_LOCAL_CONCURRENCY")
+    batch_inference_extract_concurrency: int = Field(default=4, env="BATCH_INFERENCE_EXTRACT_CONCURRENCY")
+    batch_inference_write_batch: int = Field(default=100, env="BATCH_INFERENCE_WRITE_BATCH")  # Results per bulk insert
+    batch_inference_job_ttl_seconds: float = Field(default=86400.0, env="BATCH_INFERENCE_JOB_TTL_SECONDS")  # How long finished jobs stay queryable
+    batch_inference_max_jobs: int = Field(default=100, env="BATCH_INFERENCE_MAX_JOBS")  # Finished jobs beyond this are dropped, oldest first
     
     # Thermal Throttling (Air Spec)
     cpu_usage_threshold: float = Field(default=80.0, env="CPU_USAGE_THRESHOLD")
@@ -0,0 +1,292 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+WebSocket connection management for real-time analysis updates.
+
+Clients subscribe to topics keyed by analysis session or proposal ID and
+only receive events for those topics. Each client owns a bounded send
+queue drained by its own task, so a slow client never delays the others
+or the analysis pipeline that publishes the events. Superseded progress
+events are coalesced in the queue and clients that cannot keep up are
+evicted.
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+from config import get_settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Topic that receives every event (clients that do not subscribe explicitly)
+WILDCARD_TOPIC = "*"
+
+# Event types whose newer instances replace older, undelivered ones
+COALESCIBLE_EVENT_TYPES = {"analysis_progress", "upload_progress"}
+
+# WebSocket close code for "try again later" (server overloaded)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def session_topic(session_id: str) -> str:
+    """Topic name for events of a single analysis session."""
+    return f"session:{session_id}"
+
+
+def proposal_topic(proposal_id: str) -> str:
+    """Topic name for events of every session belonging to a proposal."""
+    return f"proposal:{proposal_id}"
+
+
+def topics_for_message(message: Dict[str, Any]) -> List[str]:
+    """Derive the topics an event is published to from its identifiers."""
+    topics = []
+    if message.get("sessionId"):
+        topics.append(session_topic(message["sessionId"]))
+    if message.get("proposalId"):
+        topics.append(proposal_topic(message["proposalId"]))
+    return topics
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Hashable]:
+    """
+    Key under which a pending event may be replaced by a newer one.
+
+    Only progress events are coalesced; completion and error events are
+    always delivered.
+    """
+    if message.get("type") in COALESCIBLE_EVENT_TYPES and message.get("sessionId"):
+        return (message["type"], message["sessionId"])
+    return None
+
+
+class SlowConsumerError(Exception):
+    """Raised when a client's send queue overflows."""
+
+
+@dataclass
+class ConnectionStats:
+    """Counters describing the fan-out behaviour of the manager."""
+    delivered: int = 0
+    coalesced: int = 0
+    evicted: int = 0
+
+
+class ClientConnection:
+    """A connected WebSocket client with its own bounded send queue."""
+
+    def __init__(self, websocket: WebSocket, max_queue_size: int, send_timeout: float):
+        self.websocket = websocket
+        self.topics: Set[str] = set()
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self._pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+        self.closed = False
+
+    @property
+    def queue_size(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a message without blocking.
+
+        Returns:
+            bool: True if the message replaced a pending (superseded) one
+
+        Raises:
+            SlowConsumerError: If the queue is full
+        """
+        key = coalesce_key(message)
+        if key is not None and key in self._pending:
+            # Replace in place so ordering relative to other events is kept
+            self._pending[key] = message
+            return True
+
+        if len(self._pending) >= self.max_queue_size:
+            raise SlowConsumerError(f"Send queue full ({self.max_queue_size} messages)")
+
+        if key is None:
+            self._sequence += 1
+            key = ("seq", self._sequence)
+        self._pending[key] = message
+        self._wakeup.set()
+        return False
+
+    def start(self, on_failure) -> None:
+        """Start the task that drains the send queue."""
+        self._sender = asyncio.create_task(self._drain(on_failure), name="websocket-sender")
+
+    async def _drain(self, on_failure) -> None:
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending and not self.closed:
+                    _, message = self._pending.popitem(last=False)
+                    await asyncio.wait_for(
+                        self.websocket.send_json(message),
+                        timeout=self.send_timeout
+                    )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"WebSocket send failed, dropping client: {e}")
+            on_failure(self, SLOW_CONSUMER_CLOSE_CODE if isinstance(e, asyncio.TimeoutError) else None)
+
+    async def close(self, code: Optional[int] = None) -> None:
+        """Stop the sender task and optionally close the socket."""
+        self.closed = True
+        self._pending.clear()
+        if self._sender and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception as e:
+                logger.debug(f"Error closing WebSocket: {e}")
+
+
+class ConnectionManager:
+    """
+    Topic-based WebSocket fan-out.
+
+    Broadcast cost is proportional to the number of subscribers of the
+    event's topics (plus wildcard subscribers), not to the total number of
+    connections, and never waits on a client's network I/O.
+    """
+
+    def __init__(self, max_queue_size: Optional[int] = None, send_timeout: Optional[float] = None):
+        self.max_queue_size = max_queue_size or settings.ws_send_queue_size
+        self.send_timeout = send_timeout or settings.ws_send_timeout_seconds
+        self._clients: Dict[WebSocket, ClientConnection] = {}
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
+        # Eviction tasks, referenced until done so they are not garbage-collected
+        self._evictions: Set[asyncio.Task] = set()
+        self.stats = ConnectionStats()
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Currently connected WebSockets."""
+        return list(self._clients.keys())
+
+    async def connect(self, websocket: WebSocket, topics: Optional[Iterable[str]] = None) -> ClientConnection:
+        """
+        Accept a WebSocket and subscribe it to the given topics.
+
+        Clients that do not name any topic receive every event, which keeps
+        the original (unfiltered) behaviour for existing frontends.
+        """
+        await websocket.accept()
+        client = ClientConnection(websocket, self.max_queue_size, self.send_timeout)
+        self._clients[websocket] = client
+        for topic in (list(topics or []) or [WILDCARD_TOPIC]):
+            self._add_subscription(client, topic)
+        client.start(self._on_client_failure)
+        logger.info(f"WebSocket client connected. Total: {len(self._clients)}")
+        return client
+
+    def subscribe(self, websocket: WebSocket, topic: str) -> None:
+        """Subscribe a connected client to a topic."""
+        client = self._clients.get(websocket)
+        if not client:
+            return
+        # An explicit subscription narrows a wildcard client
+        if WILDCARD_TOPIC in client.topics and topic != WILDCARD_TOPIC:
+            self._remove_subscription(client, WILDCARD_TOPIC)
+        self._add_subscription(client, topic)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str) -> None:
+        """Remove a client's subscription to a topic."""
+        client = self._clients.get(websocket)
+        if client:
+            self._remove_subscription(client, topic)
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        """Forget a client and stop its sender task."""
+        client = self._clients.pop(websocket, None)
+        if not client:
+            return
+        for topic in list(client.topics):
+            self._remove_subscription(client, topic)
+        client.closed = True
+        if client._sender:
+            client._sender.cancel()
+        logger.info(f"WebSocket client disconnected. Total: {len(self._clients)}")
+
+    async def broadcast(self, message: Dict[str, Any]) -> int:
+        """
+        Queue an event for every client subscribed to its topics.
+
+        Returns:
+            int: Number of clients the event was queued for
+        """
+        recipients: Set[ClientConnection] = set(self._subscribers.get(WILDCARD_TOPIC, ()))
+        for topic in topics_for_message(message):
+            recipients.update(self._subscribers.get(topic, ()))
+
+        slow_clients = []
+        for client in recipients:
+            try:
+                if client.enqueue(message):
+                    self.stats.coalesced += 1
+                self.stats.delivered += 1
+            except SlowConsumerError as e:
+                logger.warning(f"Evicting slow WebSocket consumer: {e}")
+                slow_clients.append(client)
+
+        for client in slow_clients:
+            await self._evict(client, SLOW_CONSUMER_CLOSE_CODE)
+
+        return len(recipients) - len(slow_clients)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Connection and fan-out statistics for health reporting."""
+        return {
+            "connections": len(self._clients),
+            "topics": len(self._subscribers),
+            "delivered": self.stats.delivered,
+            "coalesced": self.stats.coalesced,
+            "evicted": self.stats.evicted,
+            "max_queue_depth": max((c.queue_size for c in self._clients.values()), default=0)
+        }
+
+    def _add_subscription(self, client: ClientConnection, topic: str) -> None:
+        client.topics.add(topic)
+        self._subscribers.setdefault(topic, set()).add(client)
+
+    def _remove_subscription(self, client: ClientConnection, topic: str) -> None:
+        client.topics.discard(topic)
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def _on_client_failure(self, client: ClientConnection, code: Optional[int]) -> None:
+        """Called from a sender task when delivery to its client fails."""
+        task = asyncio.create_task(self._evict(client, code))
+        self._evictions.add(task)
+        task.add_done_callback(self._eviction_done)
+
+    def _eviction_done(self, task: asyncio.Task) -> None:
+        self._evictions.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to evict WebSocket client: {task.exception()}")
+
+    async def _evict(self, client: ClientConnection, code: Optional[int]) -> None:
+        if self._clients.get(client.websocket) is not client:
+            return
+        self.stats.evicted += 1
+        self.disconnect(client.websocket)
+        await client.close(code)
@@ -114,7 +114,7 @@ async def init_database():
         # Import models to ensure they're registered with Base
         from db_models import AnalysisSessionDB, ComplianceResultsDB, ComplianceIssueDB
         try:
-            from obi_models import KnowledgeSource, KnowledgeChunk, EOCrawlStatus
+            from obi_models import KnowledgeSource, KnowledgeChunk, EOCrawlStatus, EmbeddingCacheEntry
             logger.info("Sovereign OBI models loaded")
         except ImportError:
             logger.info("Initializing without Sovereign OBI models (Local-only)")
@@ -136,6 +136,18 @@ async def init_database():
         logger.info("Creating database tables...")
         Base.metadata.create_all(bind=sync_engine)
         
+        # Ensure the search indexes exist on knowledge chunks created before they were added
+        try:
+            from obi_models import ensure_search_indexes
+            with sync_engine.connect() as conn:
+                ensure_search_indexes(conn)
+                conn.commit()
+                logger.info("Verified knowledge chunk search indexes")
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not ensure knowledge chunk search indexes: {e}")
+        
         # Test async connection
         async with get_async_session() as session:
             await session.execute(text("SELECT 1"))
@@ -8,6 +8,7 @@ This module provides high-level database operations for analysis sessions,
 compliance results, and document metadata with proper error handling and retry logic.
 """
 
+import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy import select, update, delete, func, and_, or_
@@ -24,6 +25,7 @@ from models import (
     ComplianceSummary, RegulatoryReference, DocumentLocation
 )
 from logging_config import get_logger
+from status_notifier import get_status_notifier
 
 logger = get_logger(__name__)
 
@@ -78,7 +80,8 @@ class AnalysisSessionOperations:
                     progress=0.0,
                     current_step="Initializing analysis",
                     started_at=datetime.utcnow(),
-                    estimated_completion=datetime.utcnow() + timedelta(minutes=5)
+                    estimated_completion=datetime.utcnow() + timedelta(minutes=5),
+                    session_metadata={"proposal_id": request.proposal_id} if request.proposal_id else {}
                 )
                 
                 session.add(db_session)
@@ -90,6 +93,51 @@ class AnalysisSessionOperations:
         
         return await retry_db_operation(_create_operation)
     
+    @staticmethod
+    async def create_sessions_bulk(
+        requests: List[AnalysisStartRequest],
+        metadata: Dict[str, Any] = None
+    ) -> List[str]:
+        """
+        Create analysis sessions for many documents in one transaction.
+        
+        Args:
+            requests: One analysis request per document
+            metadata: Metadata stored on every session (e.g. the batch job ID)
+            
+        Returns:
+            List[str]: Session IDs, in the order of ``requests``
+        """
+        async def _create_operation():
+            async with get_async_session() as session:
+                now = datetime.utcnow()
+                db_sessions = [
+                    AnalysisSessionDB(
+                        document_id=request.document_id,
+                        filename=request.filename,
+                        s3_key=request.s3_key,
+                        analysis_type=request.analysis_type,
+                        priority=request.priority,
+                        callback_url=request.callback_url,
+                        status=AnalysisStatus.QUEUED,
+                        progress=0.0,
+                        current_step="Queued for batch analysis",
+                        started_at=now,
+                        session_metadata={
+                            **({"proposal_id": request.proposal_id} if request.proposal_id else {}),
+                            **(metadata or {})
+                        }
+                    )
+                    for request in requests
+                ]
+                session.add_all(db_sessions)
+                await session.flush()  # Get the IDs
+                
+                logger.info(f"Created {len(db_sessions)} analysis sessions")
+                return [db_session.id for db_session in db_sessions]
+        
+        return await retry_db_operation(_create_operation)
+    
     @staticmethod
     async def get_session(session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -187,7 +235,61 @@ class AnalysisSessionOperations:
                 
                 return updated
         
-        return await retry_db_operation(_update_operation)
+        updated = await retry_db_operation(_update_operation)
+        if updated:
+            # Wake long-poll and SSE clients waiting on this session
+            get_status_notifier().invalidate(session_id)
+        return updated
+    
+    @staticmethod
+    async def update_sessions_status_bulk(
+        session_ids: List[str],
+        status: AnalysisStatus,
+        current_step: str,
+        error_message: str = None
+    ) -> int:
+        """
+        Set the same status on many sessions in one statement.
+        
+        Args:
+            session_ids: Sessions to update
+            status: New status
+            current_step: Description of current step
+            error_message: Error message if failed
+            
+        Returns:
+            int: Number of sessions updated
+        """
+        if not session_ids:
+            return 0
+        
+        async def _update_operation():
+            async with get_async_session() as session:
+                now = datetime.utcnow()
+                update_values = {
+                    "status": status,
+                    "current_step": current_step,
+                    "updated_at": now
+                }
+                if status in [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED]:
+                    update_values["progress"] = 100.0 if status == AnalysisStatus.COMPLETED else 0.0
+                    update_values["completed_at"] = now
+                if error_message is not None:
+                    update_values["error_message"] = error_message
+                
+                result = await session.execute(
+                    update(AnalysisSessionDB)
+                    .where(AnalysisSessionDB.id.in_(session_ids))
+                    .values(**update_values)
+                )
+                logger.info(f"Updated {result.rowcount} analysis sessions to {status.value}")
+                return result.rowcount
+        
+        updated = await retry_db_operation(_update_operation)
+        notifier = get_status_notifier()
+        for session_id in session_ids:
+            notifier.invalidate(session_id)
+        return updated
     
     @staticmethod
     async def get_sessions_by_document(document_id: str) -> List[Dict[str, Any]]:
@@ -244,6 +346,55 @@ class AnalysisSessionOperations:
 class ComplianceResultsOperations:
     """Database operations for compliance results."""
     
+    @staticmethod
+    def _add_results(session, results: ComplianceResults) -> str:
+        """Add a results record and its issues to ``session``; returns the results ID."""
+        # The ID is assigned here rather than on flush, so many results can be
+        # added and inserted together when the transaction commits
+        results_id = str(uuid.uuid4())
+        
+        # Create compliance results record
+        db_results = ComplianceResultsDB(
+            id=results_id,
+            session_id=results.session_id,
+            document_id=results.document_id,
+            status=ComplianceStatus(results.status),
+            ai_model=results.ai_model,
+            processing_time=results.processing_time,
+            total_issues=results.summary.total_issues,
+            critical_count=results.summary.critical_count,
+            warning_count=results.summary.warning_count,
+            info_count=results.summary.info_count,
+            overall_score=results.summary.overall_score,
+            pass_threshold=results.summary.pass_threshold,
+            results_metadata=serialize_for_jsonb(results.metadata),
+            generated_at=results.generated_at
+        )
+        
+        session.add(db_results)
+        
+        # Store individual issues
+        for issue in results.issues:
+            db_issue = ComplianceIssueDB(
+                results_id=results_id,
+                severity=IssueSeverity(issue.severity),
+                title=issue.title,
+                description=issue.description,
+                remediation=issue.remediation,
+                confidence=issue.confidence,
+                regulation_name=issue.regulation.regulation,
+                regulation_section=issue.regulation.section,
+                regulation_title=issue.regulation.title,
+                regulation_url=issue.regulation.url,
+                location_page=issue.location.page if issue.location else None,
+                location_section=issue.location.section if issue.location else None,
+                location_line=issue.location.line if issue.location else None,
+                location_context=issue.location.context if issue.location else None
+            )
+            session.add(db_issue)
+        
+        return results_id
+    
     @staticmethod
     async def store_results(results: ComplianceResults) -> str:
         """
@@ -257,53 +408,37 @@ class ComplianceResultsOperations:
         """
         async def _store_operation():
             async with get_async_session() as session:
-                # Create compliance results record
-                db_results = ComplianceResultsDB(
-                    session_id=results.session_id,
-                    document_id=results.document_id,
-                    status=ComplianceStatus(results.status),
-                    ai_model=results.ai_model,
-                    processing_time=results.processing_time,
-                    total_issues=results.summary.total_issues,
-                    critical_count=results.summary.critical_count,
-                    warning_count=results.summary.warning_count,
-                    info_count=results.summary.info_count,
-                    overall_score=results.summary.overall_score,
-                    pass_threshold=results.summary.pass_threshold,
-                    results_metadata=serialize_for_jsonb(results.metadata),
-                    generated_at=results.generated_at
-                )
-                
-                session.add(db_results)
-                await session.flush()  # Get the ID
-                
-                results_id = db_results.id
-                
-                # Store individual issues
-                for issue in results.issues:
-                    db_issue = ComplianceIssueDB(
-                        results_id=results_id,
-                        severity=IssueSeverity(issue.severity),
-                        title=issue.title,
-                        description=issue.description,
-                        remediation=issue.remediation,
-                        confidence=issue.confidence,
-                        regulation_name=issue.regulation.regulation,
-                        regulation_section=issue.regulation.section,
-                        regulation_title=issue.regulation.title,
-                        regulation_url=issue.regulation.url,
-                        location_page=issue.location.page if issue.location else None,
-                        location_section=issue.location.section if issue.location else None,
-                        location_line=issue.location.line if issue.location else None,
-                        location_context=issue.location.context if issue.location else None
-                    )
-                    session.add(db_issue)
-                
+                results_id = ComplianceResultsOperations._add_results(session, results)
                 logger.info(f"Stored compliance results {results_id} for session {results.session_id}")
                 return results_id
         
         return await retry_db_operation(_store_operation)
     
+    @staticmethod
+    async def store_results_bulk(results_list: List[ComplianceResults]) -> List[str]:
+        """
+        Store many compliance results in one transaction.
+        
+        Args:
+            results_list: Results to store, each for its own session
+            
+        Returns:
+            List[str]: IDs of the stored results
+        """
+        if not results_list:
+            return []
+        
+        async def _store_operation():
+            async with get_async_session() as session:
+                results_ids = [
+                    ComplianceResultsOperations._add_results(session, results)
+                    for results in results_list
+                ]
+                logger.info(f"Stored {len(results_ids)} compliance results")
+                return results_ids
+        
+        return await retry_db_operation(_store_operation)
+    
     @staticmethod
     async def get_results_by_session(session_id: str) -> Optional[ComplianceResults]:
         """
@@ -609,4 +744,29 @@ async def store_compliance_results(results: ComplianceResults) -> str:
 
 async def get_compliance_results(session_id: str) -> Optional[ComplianceResults]:
     """Get compliance results by session ID."""
-    return await ComplianceResultsOperations.get_results_by_session(session_id)
\ No newline at end of file
+    return await ComplianceResultsOperations.get_results_by_session(session_id)
+
+
+async def create_analysis_sessions(
+    requests: List[AnalysisStartRequest],
+    metadata: Dict[str, Any] = None
+) -> List[str]:
+    """Create analysis sessions for many documents at once."""
+    return await AnalysisSessionOperations.create_sessions_bulk(requests, metadata)
+
+
+async def store_compliance_results_bulk(results_list: List[ComplianceResults]) -> List[str]:
+    """Store many compliance results at once."""
+    return await ComplianceResultsOperations.store_results_bulk(results_list)
+
+
+async def update_analysis_sessions(
+    session_ids: List[str],
+    status: AnalysisStatus,
+    current_step: str,
+    error_message: str = None
+) -> int:
+    """Set the same status on many analysis sessions."""
+    return await AnalysisSessionOperations.update_sessions_status_bulk(
+        session_ids, status, current_step, error_message
+    )
\ No newline at end of file
@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Content-addressed embedding cache.
+
+Embeddings are keyed on ``(sha256(text), model, dim)`` and looked up in an
+in-process LRU first, then in the ``obi_embedding_cache`` table, before the
+underlying embedder is called. Re-ingesting a mostly unchanged corpus and
+repeated retrieval queries therefore only embed text that has never been
+seen before. Cache failures never fail an embedding request; they only
+cost a cache miss.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from config import get_settings
+from database import get_async_session
+from embedding_pipeline import Embedder
+from logging_config import get_logger
+from obi_models import EmbeddingCacheEntry
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+CacheKey = Tuple[str, str, int]
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of the text to embed."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for the embedding cache."""
+    memory_hits: int = 0
+    db_hits: int = 0
+    misses: int = 0
+    errors: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.db_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.db_hits) / self.lookups if self.lookups else 0.0
+
+
+class CachedEmbedder(Embedder):
+    """Embedder wrapper that consults the memory and database caches first."""
+
+    def __init__(self, embedder: Embedder, memory_entries: Optional[int] = None, persist: bool = True):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.memory_entries = memory_entries or settings.embedding_cache_memory_entries
+        self.persist = persist
+        self._memory: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self.stats = CacheStats()
+
+    def get_name(self) -> str:
+        return self.embedder.get_name()
+
+    def _key(self, text: str) -> CacheKey:
+        return content_hash(text), self.get_name(), self.dim
+
+    def _remember(self, key: CacheKey, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        found: Dict[CacheKey, List[float]] = {}
+
+        for key in set(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[key] = vector
+        self.stats.memory_hits += sum(1 for key in keys if key in found)
+
+        missing = {key for key in keys if key not in found}
+        if missing and self.persist:
+            stored = await self._load(missing)
+            self.stats.db_hits += sum(1 for key in keys if key in stored)
+            for key, vector in stored.items():
+                self._remember(key, vector)
+            found.update(stored)
+
+        # Embed each distinct new text once
+        pending = OrderedDict((key, text) for key, text in zip(keys, texts) if key not in found)
+        self.stats.misses += sum(1 for key in keys if key not in found)
+        if pending:
+            vectors = await self.embedder.embed(list(pending.values()))
+            computed = dict(zip(pending.keys(), vectors))
+            for key, vector in computed.items():
+                self._remember(key, vector)
+            found.update(computed)
+            if self.persist:
+                await self._store(computed)
+
+        return [found[key] for key in keys]
+
+    async def _load(self, keys) -> Dict[CacheKey, List[float]]:
+        hashes = [key[0] for key in keys]
+        try:
+            async with get_async_session() as session:
+                rows = (await session.execute(
+                    select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding).where(
+                        EmbeddingCacheEntry.content_hash.in_(hashes),
+                        EmbeddingCacheEntry.model == self.get_name(),
+                        EmbeddingCacheEntry.dim == self.dim
+                    )
+                )).all()
+            return {(row.content_hash, self.get_name(), self.dim): [float(v) for v in row.embedding] for row in rows}
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    async def _store(self, computed: Dict[CacheKey, List[float]]) -> None:
+        rows = [
+            {"content_hash": key[0], "model": key[1], "dim": key[2], "embedding": vector}
+            for key, vector in computed.items()
+        ]
+        try:
+            async with get_async_session() as session:
+                await session.execute(
+                    insert(EmbeddingCacheEntry).values(rows).on_conflict_do_nothing(
+                        index_elements=["content_hash", "model", "dim"]
+                    )
+                )
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def get_status(self) -> Dict[str, float]:
+        """Hit-rate metrics for health reporting."""
+        return {
+            "model": self.get_name(),
+            "memory_entries": len(self._memory),
+            "memory_hits": self.stats.memory_hits,
+            "db_hits": self.stats.db_hits,
+            "misses": self.stats.misses,
+            "errors": self.stats.errors,
+            "hit_rate": round(self.stats.hit_rate, 4)
+        }
@@ -0,0 +1,336 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Batched embedding pipeline for the OBI knowledge base.
+
+Chunk texts are embedded in batches by a pluggable local embedder, with a
+bounded number of batches in flight, and the vectors are written back to
+``obi_knowledge_chunks.embedding`` with bulk UPDATEs. Two embedders are
+provided:
+- OllamaEmbedder: a local Ollama embeddings endpoint
+- HashingEmbedder: a deterministic hashing vectorizer for offline use
+
+Run ``python embedding_pipeline.py backfill`` to embed existing chunks.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from sqlalchemy import select, update
+
+from config import get_settings
+from database import get_async_session
+from logging_config import get_logger
+from obi_models import KnowledgeChunk, KnowledgeSource
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Dimension of the KnowledgeChunk.embedding column
+EMBEDDING_DIM = 1536
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def fit_dimension(vector: Sequence[float], dim: int = EMBEDDING_DIM) -> List[float]:
+    """Zero-pad or truncate an embedding to the column dimension."""
+    values = [float(v) for v in list(vector)[:dim]]
+    if len(values) < dim:
+        values.extend([0.0] * (dim - len(values)))
+    return values
+
+
+class Embedder(ABC):
+    """Abstract base class for text embedders."""
+
+    dim: int = EMBEDDING_DIM
+
+    @abstractmethod
+    def get_name(self) -> str:
+        """Identifier of the embedding model."""
+        pass
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, returning one ``dim``-sized vector per text."""
+        pass
+
+
+class OllamaEmbedder(Embedder):
+    """Embedder backed by a local Ollama server."""
+
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None, timeout: float = 60.0):
+        self.base_url = (base_url or settings.local_llm_url).rstrip("/")
+        self.model = model or settings.embedding_model
+        self.timeout = timeout
+        self._batch_endpoint = True
+
+    def get_name(self) -> str:
+        return f"ollama/{self.model}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            if self._batch_endpoint:
+                response = await client.post(
+                    f"{self.base_url}/api/embed",
+                    json={"model": self.model, "input": texts}
+                )
+                if not self._endpoint_missing(response):
+                    response.raise_for_status()
+                    return [fit_dimension(v, self.dim) for v in response.json()["embeddings"]]
+                # Older Ollama releases only offer the single-text endpoint
+                logger.info("Ollama /api/embed not available, using /api/embeddings")
+                self._batch_endpoint = False
+
+            vectors = []
+            for text in texts:
+                response = await client.post(
+                    f"{self.base_url}/api/embeddings",
+                    json={"model": self.model, "prompt": text}
+                )
+                response.raise_for_status()
+                vectors.append(fit_dimension(response.json()["embedding"], self.dim))
+            return vectors
+
+    @staticmethod
+    def _endpoint_missing(response: httpx.Response) -> bool:
+        """
+        Tell an unknown route apart from other 404s.
+
+        Ollama answers an unknown route with a plain-text "404 page not found",
+        while a missing model on a known route is a JSON ``{"error": ...}`` body
+        that must be surfaced rather than retried on the legacy endpoint.
+        """
+        if response.status_code != 404:
+            return False
+        try:
+            body = response.json()
+        except ValueError:
+            return True
+        return not (isinstance(body, dict) and body.get("error"))
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic hashing vectorizer (offline stand-in for a neural model).
+
+    Word unigrams and bigrams are hashed into ``dim`` signed buckets with
+    sublinear term frequency, then L2-normalized, so cosine similarity
+    reflects lexical overlap.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def get_name(self) -> str:
+        return f"hashing-{self.dim}"
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed_one(self, text: str) -> List[float]:
+        tokens = _TOKEN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts = {}
+        for feature in features:
+            counts[feature] = counts.get(feature, 0) + 1
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in counts.items():
+            index, sign = self._bucket(feature)
+            vector[index] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm).tolist() if norm else vector.tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+
+@dataclass
+class PipelineStats:
+    """Throughput counters for an embedding run."""
+    chunks: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+class EmbeddingPipeline:
+    """Embeds knowledge chunks in bounded-concurrency batches and stores the vectors."""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.embedder = embedder or get_embedder()
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.concurrency = concurrency or settings.embedding_concurrency
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        async with self._semaphore:
+            return await self.embedder.embed(texts)
+
+    async def embed_chunks(self, chunks: Sequence[Tuple[str, str]], stats: Optional[PipelineStats] = None) -> PipelineStats:
+        """
+        Embed ``(chunk_id, content)`` pairs and write the vectors back.
+
+        Batches that fail to embed are skipped (their chunks keep a NULL
+        embedding and are picked up by the next backfill).
+        """
+        stats = stats or PipelineStats()
+        started = time.perf_counter()
+        batches = [chunks[i:i + self.batch_size] for i in range(0, len(chunks), self.batch_size)]
+        results = await asyncio.gather(
+            *(self._embed_batch([content for _, content in batch]) for batch in batches),
+            return_exceptions=True
+        )
+
+        rows = []
+        for batch, vectors in zip(batches, results):
+            if isinstance(vectors, Exception):
+                logger.warning(f"Embedding batch of {len(batch)} chunks failed: {vectors}")
+                stats.failed_batches += 1
+                continue
+            rows.extend({"id": chunk_id, "embedding": vector} for (chunk_id, _), vector in zip(batch, vectors))
+            stats.batches += 1
+
+        if rows:
+            async with get_async_session() as session:
+                # ORM bulk UPDATE by primary key (executemany)
+                await session.execute(update(KnowledgeChunk), rows)
+            # Cached retrieval results may now be missing the new vectors
+            from hybrid_search import get_hybrid_searcher
+            get_hybrid_searcher().invalidate()
+        stats.chunks += len(rows)
+        stats.seconds += time.perf_counter() - started
+        return stats
+
+    async def backfill(
+        self,
+        source_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None
+    ) -> PipelineStats:
+        """
+        Embed every chunk that has no embedding yet.
+
+        Args:
+            source_type: Only chunks from sources of this type
+            limit: Maximum number of chunks to embed
+            page_size: Chunks read per round trip (defaults to batch size x concurrency)
+
+        Returns:
+            PipelineStats for the run
+        """
+        page_size = page_size or self.batch_size * self.concurrency
+        stats = PipelineStats()
+        started = time.perf_counter()
+        last_id = ""
+        while limit is None or stats.chunks < limit:
+            size = page_size if limit is None else min(page_size, limit - stats.chunks)
+            stmt = (
+                select(KnowledgeChunk.id, KnowledgeChunk.content)
+                .where(KnowledgeChunk.embedding.is_(None), KnowledgeChunk.id > last_id)
+                .order_by(KnowledgeChunk.id)
+                .limit(size)
+            )
+            if source_type:
+                stmt = stmt.join(KnowledgeSource).where(KnowledgeSource.source_type == source_type)
+            async with get_async_session() as session:
+                page = [(row.id, row.content) for row in (await session.execute(stmt)).all()]
+            if not page:
+                break
+
+            await self.embed_chunks(page, stats)
+            stats.seconds = time.perf_counter() - started
+            last_id = page[-1][0]
+            logger.info(
+                f"Embedded {stats.chunks} chunks ({stats.chunks_per_second:.1f} chunks/s, "
+                f"{stats.failed_batches} failed batches)"
+            )
+        return stats
+
+
+# Global embedder and pipeline instances
+_embedder: Optional[Embedder] = None
+_embedding_pipeline: Optional[EmbeddingPipeline] = None
+
+
+def get_embedder(backend: Optional[str] = None) -> Embedder:
+    """
+    Get the embedder configured by ``settings.embedding_backend``.
+    
+    The configured embedder is shared process-wide (so ingestion and query
+    embedding share one cache); passing ``backend`` creates a new instance.
+    Embedders are wrapped in the content-addressed embedding cache unless
+    ``settings.embedding_cache_enabled`` is off.
+    """
+    global _embedder
+    if backend is None and _embedder is not None:
+        return _embedder
+
+    name = (backend or settings.embedding_backend).lower()
+    embedder: Embedder = HashingEmbedder() if name == "hashing" else OllamaEmbedder()
+    if settings.embedding_cache_enabled:
+        from embedding_cache import CachedEmbedder
+        embedder = CachedEmbedder(embedder)
+
+    if backend is None:
+        _embedder = embedder
+    return embedder
+
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    """Get the global embedding pipeline instance."""
+    global _embedding_pipeline
+    if _embedding_pipeline is None:
+        _embedding_pipeline = EmbeddingPipeline()
+    return _embedding_pipeline
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed knowledge chunks that have no embedding yet.")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--source-type", help="Only embed chunks from sources of this type (e.g. FAR, EO)")
+    parser.add_argument("--limit", type=int, help="Maximum number of chunks to embed")
+    parser.add_argument("--backend", choices=["ollama", "hashing"], help="Override EMBEDDING_BACKEND")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--concurrency", type=int)
+    args = parser.parse_args()
+
+    from database import create_database_engines
+    create_database_engines()
+
+    pipeline = EmbeddingPipeline(
+        embedder=get_embedder(args.backend),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency
+    )
+    stats = await pipeline.backfill(source_type=args.source_type, limit=args.limit)
+    print(
+        f"Embedded {stats.chunks} chunks with {pipeline.embedder.get_name()} in {stats.seconds:.1f}s "
+        f"({stats.chunks_per_second:.1f} chunks/s, {stats.failed_batches} failed batches)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
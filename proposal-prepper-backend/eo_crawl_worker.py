@@ -0,0 +1,333 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Resumable, lease-based worker for the Executive Order crawl.
+
+Each EO advances through ``EOCrawlState``:
+
+    discovered --download--> downloaded --index--> indexed
+         \\______________________\\______(too many errors)--> failed
+
+Downloading stores the raw text in the EO bucket (``settings.s3_eo_bucket``)
+so indexing can be retried or re-run without refetching, and every
+transition is checkpointed in ``obi_eo_crawl_status``. Workers claim a
+batch of rows with ``FOR UPDATE SKIP LOCKED`` and a time-limited lease, so
+several workers can run side by side without duplicating work and the EOs
+of a crashed worker are picked up from their last checkpoint once its
+lease expires. Checkpoints only apply while the worker still holds the
+lease. Errors are retried with exponential backoff.
+
+Run ``python eo_crawl_worker.py --discover`` to discover new EOs and work
+through the queue.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import boto3
+from sqlalchemy import case, func, or_, select, update
+
+from config import get_settings
+from database import get_async_session
+from local_eo_crawler import EOCrawler
+from logging_config import get_logger
+from obi_models import EOCrawlState, EOCrawlStatus
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# States a worker can advance from
+_ACTIVE_STATES = [EOCrawlState.DISCOVERED.value, EOCrawlState.DOWNLOADED.value]
+
+_CLAIM_COLUMNS = (
+    EOCrawlStatus.id,
+    EOCrawlStatus.eo_number,
+    EOCrawlStatus.document_number,
+    EOCrawlStatus.status,
+    EOCrawlStatus.title,
+    EOCrawlStatus.publication_date,
+    EOCrawlStatus.federal_register_url,
+    EOCrawlStatus.raw_text_url,
+    EOCrawlStatus.raw_text_key,
+    EOCrawlStatus.attempts
+)
+
+
+def raw_text_key(document_number: str) -> str:
+    """Object key of an EO's raw text in the EO bucket."""
+    return f"raw-text/{document_number}.txt"
+
+
+def _create_s3_client():
+    s3_config = {'region_name': settings.aws_region}
+    if settings.s3_endpoint_url:
+        s3_config['endpoint_url'] = settings.s3_endpoint_url
+    if settings.s3_access_key and settings.s3_secret_key:
+        s3_config.update({
+            'aws_access_key_id': settings.s3_access_key,
+            'aws_secret_access_key': settings.s3_secret_key
+        })
+    return boto3.client('s3', **s3_config)
+
+
+@dataclass
+class CrawlClaim:
+    """A leased crawl status row."""
+    id: str
+    eo_number: str
+    document_number: Optional[str]
+    status: str
+    title: str
+    publication_date: Optional[datetime]
+    federal_register_url: Optional[str]
+    raw_text_url: Optional[str]
+    raw_text_key: Optional[str]
+    attempts: int
+
+
+@dataclass
+class WorkerStats:
+    """Counters for a worker run."""
+    claimed: int = 0
+    downloaded: int = 0
+    indexed: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost_leases: int = 0
+
+
+class EOCrawlWorker:
+    """Advances leased EOs through the crawl states."""
+
+    def __init__(
+        self,
+        crawler: Optional[EOCrawler] = None,
+        s3_client=None,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.crawler = crawler or EOCrawler()
+        self.s3 = s3_client if s3_client is not None else _create_s3_client()
+        self.bucket = settings.s3_eo_bucket
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds or settings.eo_worker_lease_seconds
+        self.batch_size = batch_size or settings.eo_worker_batch_size
+        self.max_attempts = max_attempts or settings.eo_worker_max_attempts
+        self.stats = WorkerStats()
+
+    def _lease_expiry(self):
+        return func.now() + timedelta(seconds=self.lease_seconds)
+
+    def claim_statement(self, limit: int):
+        """UPDATE ... RETURNING that leases up to ``limit`` claimable rows."""
+        claimable = (
+            select(EOCrawlStatus.id)
+            .where(
+                EOCrawlStatus.status.in_(_ACTIVE_STATES),
+                or_(EOCrawlStatus.lease_expires_at.is_(None), EOCrawlStatus.lease_expires_at < func.now()),
+                or_(EOCrawlStatus.next_attempt_at.is_(None), EOCrawlStatus.next_attempt_at <= func.now())
+            )
+            .order_by(EOCrawlStatus.publication_date.desc().nulls_last())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            update(EOCrawlStatus)
+            .where(EOCrawlStatus.id.in_(claimable.scalar_subquery()))
+            .values(
+                lease_owner=self.worker_id,
+                lease_expires_at=self._lease_expiry(),
+                attempts=EOCrawlStatus.attempts + 1,
+                last_crawl_attempt=func.now()
+            )
+            .returning(*_CLAIM_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim(self, limit: Optional[int] = None) -> List[CrawlClaim]:
+        """Lease a batch of EOs that are due for work."""
+        async with get_async_session() as session:
+            rows = (await session.execute(self.claim_statement(limit or self.batch_size))).all()
+        claims = [CrawlClaim(**row._asdict()) for row in rows]
+        self.stats.claimed += len(claims)
+        return claims
+
+    async def _checkpoint(self, claim: CrawlClaim, **values: Any) -> bool:
+        """Update a claimed row if this worker still holds its lease."""
+        stmt = (
+            update(EOCrawlStatus)
+            .where(EOCrawlStatus.id == claim.id, EOCrawlStatus.lease_owner == self.worker_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        async with get_async_session() as session:
+            result = await session.execute(stmt)
+        if result.rowcount != 1:
+            logger.warning(f"Lost the lease on EO {claim.eo_number}; leaving it to another worker")
+            self.stats.lost_leases += 1
+            return False
+        return True
+
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+    def _read_object(self, key: str) -> str:
+        return self.s3.get_object(Bucket=self.bucket, Key=key)['Body'].read().decode("utf-8")
+
+    async def download(self, claim: CrawlClaim) -> str:
+        """Store the EO's raw text in the EO bucket; returns its object key."""
+        if not claim.document_number:
+            raise ValueError(f"EO {claim.eo_number} has no Federal Register document number")
+        key = raw_text_key(claim.document_number)
+        # A previous attempt may have uploaded the text before failing to checkpoint
+        if await asyncio.to_thread(self._object_exists, key):
+            return key
+
+        hint = {"raw_text_url": claim.raw_text_url} if claim.raw_text_url else None
+        doc_data = await self.crawler.fetch_eo_content(claim.document_number, hint)
+        if not doc_data or not doc_data.get("raw_text"):
+            raise RuntimeError(f"No raw text available for document {claim.document_number}")
+        await asyncio.to_thread(
+            self.s3.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=doc_data["raw_text"].encode("utf-8"),
+            ContentType="text/plain; charset=utf-8"
+        )
+        return key
+
+    async def index(self, claim: CrawlClaim) -> None:
+        """Chunk and ingest the stored raw text (marks the EO indexed)."""
+        raw_text = await asyncio.to_thread(self._read_object, claim.raw_text_key)
+        if not raw_text.strip():
+            raise ValueError(f"Stored raw text for EO {claim.eo_number} is empty")
+        await self.crawler.ingest_eo({
+            "executive_order_number": claim.eo_number,
+            "document_number": claim.document_number,
+            "title": claim.title,
+            "publication_date": claim.publication_date.date().isoformat() if claim.publication_date else None,
+            "html_url": claim.federal_register_url,
+            "raw_text": raw_text
+        })
+
+    async def process(self, claim: CrawlClaim) -> None:
+        """Advance a claimed EO as far as it will go, checkpointing each step."""
+        try:
+            if claim.status == EOCrawlState.DISCOVERED.value:
+                key = await self.download(claim)
+                if not await self._checkpoint(
+                    claim,
+                    status=EOCrawlState.DOWNLOADED.value,
+                    raw_text_key=key,
+                    attempts=0,
+                    error_message=None,
+                    lease_expires_at=self._lease_expiry()
+                ):
+                    return
+                claim.status, claim.raw_text_key = EOCrawlState.DOWNLOADED.value, key
+                self.stats.downloaded += 1
+
+            if claim.status == EOCrawlState.DOWNLOADED.value:
+                # Renewing the lease doubles as a check that it is still ours
+                if not await self._checkpoint(claim, lease_expires_at=self._lease_expiry()):
+                    return
+                await self.index(claim)
+                self.stats.indexed += 1
+        except Exception as e:
+            await self._record_failure(claim, e)
+
+    async def _record_failure(self, claim: CrawlClaim, error: Exception) -> None:
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        message = f"{type(error).__name__}: {error}"[:2000]
+        values: Dict[str, Any] = {"error_message": message, "lease_owner": None, "lease_expires_at": None}
+        if claim.attempts >= self.max_attempts:
+            logger.error(f"Giving up on EO {claim.eo_number} after {claim.attempts} attempts: {message}")
+            values["status"] = EOCrawlState.FAILED.value
+            self.stats.failed += 1
+        else:
+            delay = min(settings.eo_worker_retry_base_seconds * 2 ** (claim.attempts - 1), 3600)
+            logger.warning(f"EO {claim.eo_number} failed in state {claim.status}, retrying in {delay}s: {message}")
+            values["next_attempt_at"] = func.now() + timedelta(seconds=delay)
+            self.stats.retried += 1
+        await self._checkpoint(claim, **values)
+
+    async def run_once(self) -> int:
+        """Claim and process one batch; returns the number of EOs claimed."""
+        claims = await self.claim()
+        await asyncio.gather(*(self.process(claim) for claim in claims))
+        return len(claims)
+
+    async def run(self, follow: bool = False, poll_seconds: float = 30.0) -> WorkerStats:
+        """
+        Work through the queue.
+
+        Args:
+            follow: Keep polling for new work instead of stopping when idle
+            poll_seconds: Idle wait between polls in follow mode
+        """
+        while True:
+            if await self.run_once() == 0:
+                if not follow:
+                    return self.stats
+                await asyncio.sleep(poll_seconds)
+
+    async def retry_failed(self) -> int:
+        """Return failed EOs to their last checkpoint; returns the number requeued."""
+        stmt = (
+            update(EOCrawlStatus)
+            .where(EOCrawlStatus.status == EOCrawlState.FAILED.value)
+            .values(
+                status=case(
+                    (EOCrawlStatus.raw_text_key.isnot(None), EOCrawlState.DOWNLOADED.value),
+                    else_=EOCrawlState.DISCOVERED.value
+                ),
+                attempts=0,
+                next_attempt_at=None,
+                error_message=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with get_async_session() as session:
+            return (await session.execute(stmt)).rowcount
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Advance Executive Orders through the crawl states.")
+    parser.add_argument("--discover", action="store_true", help="Discover new EOs before working the queue")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue failed EOs first")
+    parser.add_argument("--follow", action="store_true", help="Keep polling for work")
+    args = parser.parse_args()
+
+    from database import create_database_engines
+    create_database_engines()
+
+    worker = EOCrawlWorker()
+    try:
+        if args.retry_failed:
+            logger.info(f"Requeued {await worker.retry_failed()} failed EOs")
+        if args.discover:
+            await worker.crawler.discover_since(await worker.crawler.last_seen_publication_date())
+        stats = await worker.run(follow=args.follow)
+        print(
+            f"Claimed {stats.claimed} EOs: {stats.downloaded} downloaded, {stats.indexed} indexed, "
+            f"{stats.retried} retrying, {stats.failed} failed, {stats.lost_leases} leases lost"
+        )
+    finally:
+        await worker.crawler.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,282 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Progress event bus for the real-time update channel.
+
+Analysis progress is published to the bus instead of directly to the
+local WebSocket manager, so that clients connected to any API replica
+receive events for jobs running on any other replica or worker process.
+
+Two backends are provided:
+- InProcessEventBus: delivers events to the local process only
+- RedisEventBus: delivers locally and fans out to other replicas over
+  Redis pub/sub, batching and compressing messages on the wire
+"""
+
+import asyncio
+import json
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import get_settings
+from connection_manager import coalesce_key
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Wire format markers for batched payloads
+_PLAIN_MARKER = b"j"
+_COMPRESSED_MARKER = b"z"
+
+
+def encode_batch(origin: str, events: List[Dict[str, Any]], compress_min_bytes: int) -> bytes:
+    """Serialize a batch of events, compressing it when it is large enough."""
+    body = json.dumps({"origin": origin, "events": events}, default=str, separators=(",", ":")).encode("utf-8")
+    if len(body) >= compress_min_bytes:
+        return _COMPRESSED_MARKER + zlib.compress(body)
+    return _PLAIN_MARKER + body
+
+
+def decode_batch(payload: bytes) -> Dict[str, Any]:
+    """Inverse of encode_batch."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    marker, body = payload[:1], payload[1:]
+    if marker == _COMPRESSED_MARKER:
+        body = zlib.decompress(body)
+    elif marker != _PLAIN_MARKER:
+        raise ValueError(f"Unknown event batch marker: {marker!r}")
+    return json.loads(body)
+
+
+class EventBus(ABC):
+    """Abstract base class for progress event buses."""
+
+    def __init__(self):
+        self._deliver: Optional[EventHandler] = None
+
+    async def start(self, deliver: EventHandler) -> None:
+        """Start the bus; ``deliver`` is invoked for every event seen by this process."""
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        """Stop the bus and release resources."""
+        self._deliver = None
+
+    @abstractmethod
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """Publish an event to every replica."""
+        pass
+
+    @abstractmethod
+    def get_status(self) -> Dict[str, Any]:
+        """Backend statistics for health reporting."""
+        pass
+
+    async def _deliver_locally(self, message: Dict[str, Any]) -> None:
+        if self._deliver is None:
+            return
+        try:
+            await self._deliver(message)
+        except Exception as e:
+            logger.warning(f"Failed to deliver event locally: {e}")
+
+
+class InProcessEventBus(EventBus):
+    """Event bus that only delivers to the current process."""
+
+    def __init__(self):
+        super().__init__()
+        self.published = 0
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        self.published += 1
+        await self._deliver_locally(message)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"backend": "memory", "published": self.published}
+
+
+class RedisEventBus(EventBus):
+    """
+    Event bus backed by Redis pub/sub.
+
+    Events are delivered to the local process immediately. For other
+    replicas they are buffered for up to ``batch_interval`` seconds (or
+    ``max_batch`` events), superseded progress events in the buffer are
+    coalesced, and the batch is published as a single, optionally
+    zlib-compressed, message.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        channel: Optional[str] = None,
+        batch_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        compress_min_bytes: Optional[int] = None
+    ):
+        super().__init__()
+        self._redis = redis_client
+        self.channel = channel or settings.event_bus_channel
+        self.batch_interval = batch_interval if batch_interval is not None else settings.event_bus_batch_interval_ms / 1000.0
+        self.max_batch = max_batch or settings.event_bus_max_batch
+        self.compress_min_bytes = compress_min_bytes if compress_min_bytes is not None else settings.event_bus_compress_min_bytes
+        self.origin = uuid.uuid4().hex
+
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._sequence = 0
+        self._flush_now = asyncio.Event()
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Metrics
+        self.published = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+        self.received = 0
+
+    async def start(self, deliver: EventHandler) -> None:
+        await super().start(deliver)
+        if self._redis is None:
+            import redis.asyncio as redis_asyncio
+            self._redis = redis_asyncio.from_url(settings.redis_url, socket_connect_timeout=2.0)
+            await self._redis.ping()
+
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._tasks = [
+            asyncio.create_task(self._flush_loop(), name="event-bus-flush"),
+            asyncio.create_task(self._receive_loop(), name="event-bus-receive")
+        ]
+        logger.info(f"Redis event bus started on channel '{self.channel}' (origin {self.origin[:8]})")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self._flush()
+        except Exception as e:
+            logger.warning(f"Failed to flush event bus on shutdown: {e}")
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing event bus subscription: {e}")
+            self._pubsub = None
+        await super().stop()
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        self.published += 1
+        await self._deliver_locally(message)
+
+        key = coalesce_key(message)
+        if key is None:
+            self._sequence += 1
+            key = ("seq", self._sequence)
+        self._pending[key] = message
+        if len(self._pending) >= self.max_batch:
+            self._flush_now.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "channel": self.channel,
+            "published": self.published,
+            "batches_sent": self.batches_sent,
+            "bytes_sent": self.bytes_sent,
+            "received": self.received
+        }
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        events = list(self._pending.values())
+        self._pending = {}
+        payload = encode_batch(self.origin, events, self.compress_min_bytes)
+        await self._redis.publish(self.channel, payload)
+        self.batches_sent += 1
+        self.bytes_sent += len(payload)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to publish event batch: {e}")
+
+    async def _receive_loop(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                batch = decode_batch(message["data"])
+                if batch.get("origin") == self.origin:
+                    continue  # Already delivered locally
+                for event in batch.get("events", []):
+                    self.received += 1
+                    await self._deliver_locally(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to process event batch: {e}")
+                await asyncio.sleep(1.0)
+
+
+# Global event bus instance
+_event_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """Get the global event bus instance for the configured backend."""
+    global _event_bus
+    if _event_bus is None:
+        if settings.event_bus_backend == "redis":
+            _event_bus = RedisEventBus()
+        else:
+            _event_bus = InProcessEventBus()
+    return _event_bus
+
+
+async def start_event_bus(deliver: EventHandler) -> EventBus:
+    """
+    Start the global event bus, falling back to in-process delivery if
+    the configured backend is unreachable.
+    """
+    global _event_bus
+    bus = get_event_bus()
+    try:
+        await bus.start(deliver)
+    except Exception as e:
+        logger.warning(f"Event bus backend unavailable, using in-process delivery: {e}")
+        _event_bus = InProcessEventBus()
+        await _event_bus.start(deliver)
+    return _event_bus
+
+
+async def stop_event_bus() -> None:
+    """Stop the global event bus."""
+    if _event_bus is not None:
+        await _event_bus.stop()
+
+
+async def publish_event(message: Dict[str, Any]) -> None:
+    """Publish a progress event through the global event bus."""
+    await get_event_bus().publish(message)
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Delivery of compliance findings while an analysis is still generating.
+
+Providers stream LLM output through ``IncrementalIssueParser`` and call
+``emit_finding`` for every issue as soon as it is complete. The analysis
+task installs a sink with ``stream_findings``; the sink lives in a context
+variable, so it reaches provider code (including LangGraph nodes) without
+changing any provider signatures, and concurrent analyses never see each
+other's findings.
+
+Time to first finding is tracked per analysis and summarized in
+``get_finding_stream_metrics().get_status()``.
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FindingSink = Callable[[Dict[str, Any], str], Awaitable[None]]
+
+_finding_sink: ContextVar[Optional[FindingSink]] = ContextVar("finding_sink", default=None)
+
+
+@contextmanager
+def stream_findings(sink: FindingSink) -> Iterator[None]:
+    """Send findings emitted in this context (and tasks it starts) to ``sink``."""
+    token = _finding_sink.set(sink)
+    try:
+        yield
+    finally:
+        _finding_sink.reset(token)
+
+
+@contextmanager
+def suppress_findings() -> Iterator[None]:
+    """Drop findings emitted in this context instead of sending them to the installed sink."""
+    token = _finding_sink.set(None)
+    try:
+        yield
+    finally:
+        _finding_sink.reset(token)
+
+
+def is_streaming() -> bool:
+    """Whether a finding sink is installed in the current context."""
+    return _finding_sink.get() is not None
+
+
+def current_sink() -> Optional[FindingSink]:
+    """The finding sink of the current context, if any."""
+    return _finding_sink.get()
+
+
+async def emit_finding(issue: Dict[str, Any], source: str) -> None:
+    """
+    Deliver a completed issue to the current sink, if any.
+
+    Sink errors are logged and swallowed: a failed progress push must not
+    fail the analysis.
+    """
+    sink = _finding_sink.get()
+    if sink is None:
+        return
+    try:
+        await sink(issue, source)
+    except Exception as e:
+        logger.warning(f"Failed to deliver streamed finding from {source}: {e}")
+
+
+class FindingTimer:
+    """Times one analysis: start to first finding and the number of findings streamed."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.first_finding_seconds: Optional[float] = None
+        self.findings = 0
+
+    def record(self) -> float:
+        """Count a finding; returns seconds since the start."""
+        elapsed = self._clock() - self.started
+        if self.first_finding_seconds is None:
+            self.first_finding_seconds = elapsed
+        self.findings += 1
+        return elapsed
+
+
+class FindingStreamMetrics:
+    """Rolling time-to-first-finding statistics across analyses."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.analyses = 0
+        self.findings = 0
+        self.without_findings = 0
+
+    def observe(self, timer: FindingTimer) -> None:
+        self.analyses += 1
+        self.findings += timer.findings
+        if timer.first_finding_seconds is None:
+            self.without_findings += 1
+        else:
+            self._samples.append(timer.first_finding_seconds)
+
+    def get_status(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000.0, 1)
+
+        return {
+            "analyses": self.analyses,
+            "streamed_findings": self.findings,
+            "analyses_without_findings": self.without_findings,
+            "time_to_first_finding_p50_ms": percentile(0.5),
+            "time_to_first_finding_p95_ms": percentile(0.95)
+        }
+
+
+# Global metrics instance
+_metrics = None
+
+
+def get_finding_stream_metrics() -> FindingStreamMetrics:
+    """Get the global finding stream metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = FindingStreamMetrics()
+    return _metrics
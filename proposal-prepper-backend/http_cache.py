@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+On-disk cache for conditional HTTP GET requests.
+
+Responses are stored with their ``ETag`` and ``Last-Modified`` validators;
+later requests for the same URL send ``If-None-Match`` /
+``If-Modified-Since`` and a ``304 Not Modified`` is answered from disk, so
+re-crawling unchanged documents costs a round trip but no transfer.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FetchResult:
+    """Body of a (possibly cached) GET response."""
+    url: str
+    status_code: int
+    content: bytes
+    not_modified: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class DiskHTTPCache:
+    """Conditional GET cache keyed by the full request URL."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _read(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            meta["content"] = body_path.read_bytes()
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, url: str, response: httpx.Response) -> None:
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified")
+        }
+        # Write to temporary files first so readers never see a partial entry
+        for path, data in ((body_path, response.content), (meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]] = None) -> FetchResult:
+        """
+        GET a URL, revalidating any cached copy.
+
+        Raises:
+            httpx.HTTPStatusError: For error responses
+        """
+        # Passing params=None to httpx.URL would drop an existing query string
+        full_url = str(httpx.URL(url, params=params) if params else httpx.URL(url))
+        cached = await asyncio.to_thread(self._read, full_url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = await client.get(full_url, headers=headers)
+        if response.status_code == 304 and cached:
+            return FetchResult(full_url, 304, cached["content"], not_modified=True)
+        response.raise_for_status()
+        if response.headers.get("etag") or response.headers.get("last-modified"):
+            await asyncio.to_thread(self._write, full_url, response)
+        return FetchResult(full_url, response.status_code, response.content)
@@ -0,0 +1,327 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Hybrid lexical + vector search over the OBI knowledge base.
+
+Regulatory lookups hinge on exact citations ("DFARS 252.204-7012") that
+vector similarity handles poorly, so a search combines three signals:
+- exact citations, looked up directly on the ``reference_id`` index
+- full-text matches from the ``to_tsvector`` GIN index on chunk content
+- cosine similarity from the HNSW embedding index (via KnowledgeRetriever)
+
+Lexical and vector candidates are retrieved concurrently and merged with
+reciprocal-rank fusion. A query that is nothing but a citation is answered
+from the reference index alone.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from config import get_settings
+from database import get_async_session
+from knowledge_retrieval import RetrievedChunk, format_context, get_knowledge_retriever
+from logging_config import get_logger
+from obi_models import FTS_CONFIG, KnowledgeChunk, KnowledgeSource, chunk_search_vector
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+
+# Citations look like "FAR 15.408", "DFARS 252.204-7012", "EO 14028" or a bare "52.219-9"
+_CITATION = re.compile(
+    r"\b(?P<reg>FAR|DFARS)[ \t]+(?:(?:Part|Subpart|clause)[ \t]+)?(?P<section>\d{1,3}(?:\.\d{1,4})?(?:-\d{1,4})?)\b"
+    r"|\b(?:EO|E\.O\.|Executive[ \t]+Order)[ \t]+(?:No\.[ \t]*)?(?P<eo>\d{5})\b"
+    r"|(?<![\w.])(?P<bare>\d{1,3}\.\d{3,4}(?:-\d{1,4})?)(?![\w.])",
+    re.IGNORECASE
+)
+
+# Terms passed to to_tsquery; the character set excludes tsquery operators
+_TERM = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+_MAX_REFERENCES = 16
+_MAX_TERMS = 32
+
+
+def citation_references(text: str, limit: int = _MAX_REFERENCES) -> List[str]:
+    """
+    ``reference_id`` values for the citations in a text, in order of appearance.
+
+    Bare section numbers expand to their DFARS (2xx parts) or FAR form as well
+    as the number itself.
+    """
+    references: List[str] = []
+    for match in _CITATION.finditer(text):
+        if match.group("reg"):
+            candidates = [f"{match.group('reg').upper()} {match.group('section')}"]
+        elif match.group("eo"):
+            candidates = [f"EO {match.group('eo')}"]
+        else:
+            section = match.group("bare")
+            regulation = "DFARS" if re.match(r"2\d\d\.", section) else "FAR"
+            candidates = [f"{regulation} {section}", section]
+        for reference in candidates:
+            if reference not in references:
+                references.append(reference)
+        if len(references) >= limit:
+            break
+    return references[:limit]
+
+
+def is_citation_query(query: str) -> bool:
+    """Whether a query consists of a single citation."""
+    return _CITATION.fullmatch(query.strip()) is not None
+
+
+def lexical_query(text: str, max_terms: int = _MAX_TERMS) -> str:
+    """
+    Build an OR ``to_tsquery`` expression from the distinct terms of a text.
+
+    ts_rank_cd still favours chunks matching more of the terms, and OR
+    semantics keep long (document-sized) queries from matching nothing.
+    """
+    terms: List[str] = []
+    for term in _TERM.findall(text.lower()):
+        if len(term) > 1 and term not in terms:
+            terms.append(term)
+            if len(terms) >= max_terms:
+                break
+    return " | ".join(terms)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[RetrievedChunk]], k: int = RRF_K) -> List[RetrievedChunk]:
+    """
+    Merge ranked result lists by reciprocal rank: score = sum(1 / (k + rank)).
+
+    Each chunk is returned once (as first seen), carrying its fused score;
+    ties are broken by id so the order is stable.
+    """
+    scores: Dict[str, float] = {}
+    chunks: Dict[str, RetrievedChunk] = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            scores[chunk.id] = scores.get(chunk.id, 0.0) + 1.0 / (k + rank)
+            chunks.setdefault(chunk.id, chunk)
+    fused = [replace(chunk, score=scores[chunk_id]) for chunk_id, chunk in chunks.items()]
+    return sorted(fused, key=lambda chunk: (-chunk.score, chunk.id))
+
+
+_COLUMNS = (
+    KnowledgeChunk.id,
+    KnowledgeChunk.reference_id,
+    KnowledgeChunk.title,
+    KnowledgeChunk.content,
+    KnowledgeSource.source_type,
+    KnowledgeSource.name
+)
+
+
+def _to_chunk(row, similarity: float = 0.0, score: float = 0.0) -> RetrievedChunk:
+    return RetrievedChunk(
+        id=row.id,
+        reference_id=row.reference_id,
+        title=row.title,
+        content=row.content,
+        source_type=row.source_type,
+        source_name=row.name,
+        similarity=similarity,
+        score=score
+    )
+
+
+class HybridSearcher:
+    """Citation, full-text and vector search over knowledge chunks, fused by RRF."""
+
+    def __init__(
+        self,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.candidates = candidates or settings.hybrid_candidates
+        self.rrf_k = rrf_k or settings.hybrid_rrf_k
+        self.cache_size = cache_size or settings.rag_cache_size
+        self._cache: "OrderedDict[Tuple, List[RetrievedChunk]]" = OrderedDict()
+        self._latencies_ms: deque = deque(maxlen=512)
+        self.cache_hits = 0
+        self.fast_path_hits = 0
+
+    async def exact(
+        self,
+        references: Sequence[str],
+        k: int,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """Chunks whose ``reference_id`` is one of the given citations."""
+        if not references:
+            return []
+        stmt = (
+            select(*_COLUMNS)
+            .join(KnowledgeSource, KnowledgeChunk.source_id == KnowledgeSource.id)
+            .where(KnowledgeChunk.reference_id.in_(list(references)))
+            .order_by(KnowledgeChunk.reference_id, KnowledgeChunk.chunk_index)
+            .limit(k)
+        )
+        if source_types:
+            stmt = stmt.where(KnowledgeSource.source_type.in_(list(source_types)))
+        try:
+            async with get_async_session() as session:
+                rows = (await session.execute(stmt)).all()
+        except Exception as e:
+            logger.warning(f"Citation lookup failed: {e}")
+            return []
+        # Keep the order in which the citations were requested
+        order = {reference: i for i, reference in enumerate(references)}
+        rows = sorted(rows, key=lambda row: order.get(row.reference_id, len(order)))
+        return [_to_chunk(row, similarity=1.0) for row in rows]
+
+    async def lexical(
+        self,
+        query: str,
+        k: int,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """Full-text matches ranked by ``ts_rank_cd``."""
+        terms = lexical_query(query)
+        if not terms:
+            return []
+        tsquery = func.to_tsquery(FTS_CONFIG, terms)
+        vector = chunk_search_vector()
+        rank = func.ts_rank_cd(vector, tsquery).label("rank")
+        stmt = (
+            select(*_COLUMNS, rank)
+            .join(KnowledgeSource, KnowledgeChunk.source_id == KnowledgeSource.id)
+            .where(vector.op("@@")(tsquery))
+            .order_by(rank.desc())
+            .limit(k)
+        )
+        if source_types:
+            stmt = stmt.where(KnowledgeSource.source_type.in_(list(source_types)))
+        try:
+            async with get_async_session() as session:
+                rows = (await session.execute(stmt)).all()
+        except Exception as e:
+            logger.warning(f"Lexical search failed: {e}")
+            return []
+        return [_to_chunk(row) for row in rows]
+
+    async def vector(
+        self,
+        query: str,
+        k: int,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """Nearest neighbours of the query embedding."""
+        return await get_knowledge_retriever().retrieve(query, k, source_types)
+
+    async def search(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """
+        Search knowledge chunks for a query.
+
+        Args:
+            query: Citation, keywords or a passage of document text
+            k: Number of chunks to return (defaults to settings.rag_top_k)
+            source_types: Only return chunks from sources of these types
+
+        Returns:
+            Exact citation matches first, then fused lexical/vector results
+        """
+        k = k or settings.rag_top_k
+        key = (query, k, tuple(sorted(source_types or ())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        started = time.perf_counter()
+        references = citation_references(query)
+        citation_query = is_citation_query(query)
+
+        if citation_query:
+            exact = await self.exact(references, k, source_types)
+            if exact:
+                self.fast_path_hits += 1
+                return self._finish(key, exact[:k], started)
+            lexical, vector = await asyncio.gather(
+                self.lexical(query, self.candidates, source_types),
+                self.vector(query, self.candidates, source_types)
+            )
+        else:
+            exact, lexical, vector = await asyncio.gather(
+                self.exact(references, max(k // 2, 1), source_types),
+                self.lexical(query, self.candidates, source_types),
+                self.vector(query, self.candidates, source_types)
+            )
+
+        results = list(exact)
+        seen = {chunk.id for chunk in exact}
+        for chunk in reciprocal_rank_fusion([lexical, vector], self.rrf_k):
+            if len(results) >= k:
+                break
+            if chunk.id not in seen:
+                results.append(chunk)
+                seen.add(chunk.id)
+        return self._finish(key, results, started)
+
+    def _finish(self, key: Tuple, results: List[RetrievedChunk], started: float) -> List[RetrievedChunk]:
+        self._latencies_ms.append((time.perf_counter() - started) * 1000.0)
+        self._cache[key] = results
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    async def context_for_document(
+        self,
+        document_text: str,
+        source_types: Optional[Sequence[str]] = None
+    ) -> str:
+        """Regulatory context for a document, formatted for a prompt."""
+        if not settings.rag_enabled:
+            return ""
+        chunks = await self.search(document_text[:settings.rag_query_chars], settings.rag_top_k, source_types)
+        return format_context(chunks, settings.rag_context_max_chars)
+
+    def invalidate(self) -> None:
+        """Drop cached results, including the vector retriever's."""
+        self._cache.clear()
+        get_knowledge_retriever().invalidate()
+
+    def get_status(self) -> dict:
+        """Latency and cache statistics for health reporting."""
+        latencies = sorted(self._latencies_ms)
+        status = {
+            "cached_queries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "fast_path_hits": self.fast_path_hits,
+            "searches": len(latencies)
+        }
+        if latencies:
+            status["p50_ms"] = round(latencies[len(latencies) // 2], 2)
+            status["p95_ms"] = round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 2)
+        return status
+
+
+# Global searcher instance
+_hybrid_searcher: Optional[HybridSearcher] = None
+
+
+def get_hybrid_searcher() -> HybridSearcher:
+    """Get the global hybrid searcher instance."""
+    global _hybrid_searcher
+    if _hybrid_searcher is None:
+        _hybrid_searcher = HybridSearcher()
+    return _hybrid_searcher
@@ -8,82 +8,239 @@ Implements Part III of the Citizen's Guide (doc1.md):
 - Incumbent Discovery via USAspending.gov
 - "Price to Beat" pricing analysis
 - Teaming Partner Discovery via SBA DSBS (Placeholder)
+
+USAspending responses are cached in memory for
+``settings.usaspending_cache_ttl_seconds``. Request payloads are normalized
+(strings stripped, keys and lists sorted) before they are sent, and the
+normalized payload is the cache key, so requests that share an entry also
+send the same payload upstream. Multi-page searches fetch the match count and the first page
+together and then fan out over the remaining pages concurrently, and award
+details are fetched in concurrent batches. All requests share one
+concurrency limit and token-bucket rate cap. ``usaspending_standin.py``
+serves recorded or synthetic responses for offline tests and benchmarks.
 """
 
-import logging
-import httpx
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import math
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from config import get_settings
+from logging_config import get_logger
+from rate_limiter import TokenBucket
+from ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Contracts: A=R&D, B=Other Service, C=Supplies, D=Equipment
+CONTRACT_AWARD_TYPES = ["A", "B", "C", "D"]
+
+INCUMBENT_FIELDS = [
+    "Award ID",
+    "Recipient Name",
+    "Start Date",
+    "End Date",
+    "Award Amount",
+    "Description",
+    "Awarding Agency",
+    "generated_internal_id"
+]
+
+_RETRY_STATUS = {429, 502, 503, 504}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _normalize(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        # USAspending treats filter and field lists as sets
+        items = [_normalize(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def normalize_payload(payload: Optional[Dict[str, Any]]) -> str:
+    """Canonical form of a request payload, independent of key and list order."""
+    return json.dumps(_normalize(payload or {}), sort_keys=True, separators=(",", ":"))
+
+
+@dataclass
+class FusionStats:
+    """Counters for USAspending traffic."""
+    requests: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    pages: int = 0
 
-logger = logging.getLogger(__name__)
 
 class IntelligenceFusion:
     """Service for fusing federal data sources into competitive intelligence."""
-    
-    USASPENDING_API_BASE = "https://api.usaspending.gov/api/v2"
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        page_size: Optional[int] = None,
+        cache: Optional[TTLCache] = None
+    ):
+        self.base_url = (base_url or settings.usaspending_api_url).rstrip("/")
+        self.page_size = page_size or settings.usaspending_page_size
         self.client = httpx.AsyncClient(timeout=30.0)
+        self._semaphore = asyncio.Semaphore(concurrency or settings.usaspending_concurrency)
+        self._bucket = TokenBucket(rate_per_second or settings.usaspending_rate_per_second)
+        self.cache = cache or TTLCache(settings.usaspending_cache_ttl_seconds, settings.usaspending_cache_max_entries)
+        self.stats = FusionStats()
+
+    async def _send(self, method: str, path: str, payload: Optional[Dict[str, Any]]) -> Any:
+        url = f"{self.base_url}/{path}"
+        for attempt in range(3):
+            async with self._semaphore:
+                await self._bucket.acquire()
+                self.stats.requests += 1
+                response = await self.client.request(method, url, json=payload)
+            if response.status_code in _RETRY_STATUS and attempt < 2:
+                self.stats.retries += 1
+                retry_after = response.headers.get("retry-after", "")
+                await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        """Cached, rate-limited USAspending request."""
+        if payload is not None:
+            payload = _normalize(payload)
+        key = f"{method} {path} {normalize_payload(payload)}"
+        hits = self.cache.stats.hits
+        result = await self.cache.get_or_load(key, lambda: self._send(method, path, payload))
+        self.stats.cache_hits += self.cache.stats.hits - hits
+        return result
+
+    @staticmethod
+    def incumbent_filters(agency_name: str, naics_code: str, keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+        filters = {
+            "agencies": [{"type": "awarding", "tier": "toptier", "name": agency_name}],
+            "naics_codes": [naics_code],
+            "award_type_codes": CONTRACT_AWARD_TYPES,
+            "time_period": [
+                {"start_date": "2020-10-01", "end_date": datetime.now().strftime("%Y-%m-%d")}
+            ]
+        }
+        if keywords:
+            filters["keywords"] = keywords
+        return filters
 
-    async def find_incumbents(self, agency_name: str, naics_code: str, keywords: List[str] = None) -> List[Dict[str, Any]]:
+    async def count_awards(self, filters: Dict[str, Any]) -> int:
+        """Number of contract awards matching the filters."""
+        data = await self._request("POST", "search/spending_by_award_count/", {"filters": filters})
+        return int(data.get("results", {}).get("contracts", 0))
+
+    async def search_awards(
+        self,
+        filters: Dict[str, Any],
+        fields: List[str],
+        max_results: int = 10,
+        sort: str = "Award Amount",
+        order: str = "desc"
+    ) -> List[Dict[str, Any]]:
+        """
+        Awards matching the filters, fetching result pages concurrently.
+
+        Args:
+            filters: USAspending award search filters
+            fields: Columns to return
+            max_results: Maximum number of awards to return
+            sort: Sort column
+            order: "asc" or "desc"
+
+        Returns:
+            Up to max_results awards in sort order
+        """
+        page_size = min(self.page_size, max_results)
+
+        def page_payload(page: int) -> Dict[str, Any]:
+            return {
+                "filters": filters,
+                "fields": fields,
+                "limit": page_size,
+                "page": page,
+                "sort": sort,
+                "order": order
+            }
+
+        if max_results <= page_size:
+            first = await self._request("POST", "search/spending_by_award/", page_payload(1))
+            self.stats.pages += 1
+            return first.get("results", [])[:max_results]
+
+        # The count tells how many pages exist; fetch it alongside the first page
+        first, count = await asyncio.gather(
+            self._request("POST", "search/spending_by_award/", page_payload(1)),
+            self.count_awards(filters)
+        )
+        pages = min(math.ceil(count / page_size), math.ceil(max_results / page_size))
+        rest = await asyncio.gather(*(
+            self._request("POST", "search/spending_by_award/", page_payload(page))
+            for page in range(2, pages + 1)
+        ))
+        self.stats.pages += 1 + len(rest)
+        results = list(first.get("results", []))
+        for data in rest:
+            results.extend(data.get("results", []))
+        return results[:max_results]
+
+    async def find_incumbents(
+        self,
+        agency_name: str,
+        naics_code: str,
+        keywords: List[str] = None,
+        max_results: int = 10
+    ) -> List[Dict[str, Any]]:
         """
         Identify incumbents for a given agency and NAICS code.
         Corresponds to doc1.md Strategy for Incumbent Discovery (3.1).
         """
-        endpoint = f"{self.USASPENDING_API_BASE}/search/spending_by_award/"
-        
-        payload = {
-            "filters": {
-                "agencies": [{"type": "awarding", "tier": "toptier", "name": agency_name}],
-                "naics_codes": [naics_code],
-                "award_type_codes": ["A", "B", "C", "D"], # Contracts: A=R&D, B=Other Service, C=Supplies, D=Equipment
-                "time_period": [
-                    {"start_date": "2020-10-01", "end_date": datetime.now().strftime("%Y-%m-%d")}
-                ]
-            },
-            "fields": [
-                "Award ID", 
-                "Recipient Name", 
-                "Start Date", 
-                "End Date", 
-                "Award Amount", 
-                "Description",
-                "Awarding Agency"
-            ],
-            "limit": 10,
-            "page": 1,
-            "sort": "Award Amount",
-            "order": "desc"
-        }
-        
-        if keywords:
-            payload["filters"]["keywords"] = keywords
-
         try:
             logger.info(f"Searching USAspending for incumbents in {agency_name} (NAICS: {naics_code})...")
-            response = await self.client.post(endpoint, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = data.get("results", [])
+            results = await self.search_awards(
+                self.incumbent_filters(agency_name, naics_code, keywords),
+                INCUMBENT_FIELDS,
+                max_results=max_results
+            )
             logger.info(f"Found {len(results)} potential incumbents/contracts")
             return results
-            
+
         except Exception as e:
             logger.error(f"USAspending search failed: {e}")
             return []
 
     async def get_award_details(self, generated_internal_id: str) -> Dict[str, Any]:
         """Fetch granular details for a specific award."""
-        endpoint = f"{self.USASPENDING_API_BASE}/awards/{generated_internal_id}/"
         try:
-            response = await self.client.get(endpoint)
-            response.raise_for_status()
-            return response.json()
+            return await self._request("GET", f"awards/{generated_internal_id}/")
         except Exception as e:
             logger.error(f"Failed to fetch award details for {generated_internal_id}: {e}")
             return {}
 
+    async def get_award_details_batch(self, generated_internal_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch details for many awards concurrently.
+
+        Requests run under the shared concurrency limit and rate cap; awards
+        that fail to load map to an empty dict.
+        """
+        ids = list(dict.fromkeys(generated_internal_ids))
+        details = await asyncio.gather(*(self.get_award_details(award_id) for award_id in ids))
+        return dict(zip(ids, details))
+
     async def close(self):
         await self.client.aclose()
 
@@ -93,7 +250,7 @@ async def main():
     try:
         # Test Case: Custom Computer Programming (541511) at DHS
         incumbents = await fusion.find_incumbents(
-            agency_name="Department of Homeland Security", 
+            agency_name="Department of Homeland Security",
             naics_code="541511",
             keywords=["cybersecurity"]
         )
@@ -102,11 +259,11 @@ async def main():
             print(f"Award Amount: ${award.get('Award Amount'):,.2f}")
             print(f"End Date: {award.get('End Date')}")
             print(f"Description: {award.get('Description')[:100]}...")
-            
+
     finally:
         await fusion.close()
 
 if __name__ == "__main__":
-    import asyncio
+    import logging
     logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Structure-aware chunking and bulk insertion of knowledge base text.
+
+Regulatory text is split at section headings (EO "Sec. 2.", FAR/DFARS
+"PART 15", "Subpart 15.4", "52.204-21 Title"), then at paragraph breaks,
+and only falls back to sentence and word boundaries for paragraphs that
+exceed the token budget. Every chunk is an exact slice of the source text
+and records its character offsets and enclosing section heading.
+
+Chunks are written to ``obi_knowledge_chunks`` with multi-row INSERTs. The
+same chunker is shared by EO, FAR and DFARS ingestion.
+"""
+
+import re
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import delete, insert, select
+
+from chunk_router import CHARS_PER_TOKEN
+from config import get_settings
+from logging_config import get_logger
+from obi_models import KnowledgeChunk, KnowledgeSource
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+Span = Tuple[int, int]
+
+# EO sections start a paragraph ("Sec. 2. Policy. ..."); FAR/DFARS headings are title lines
+_HEADING = re.compile(
+    r"^[ \t]*(?:"
+    r"(?:Section|Sec\.)[ \t]+\d+[a-z]?\."
+    r"|(?:PART[ \t]+\d+[ \t]*[-–—]|Subpart[ \t]+\d+\.\d+|\d{1,3}\.\d{3,4}(?:-\d{1,4})?[ \t]+[A-Z])[^\n]{0,200}$"
+    r")",
+    re.MULTILINE
+)
+_HEADING_CHARS = 80
+# "Sec. 2. Removing Barriers to Sharing Threat Information. (a) ..." -> label up to the title
+_EO_SECTION_TITLE = re.compile(r"(?:Section|Sec\.)[ \t]+\d+[a-z]?\.[ \t]+[^.\n]{1,80}\.?")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;:])\s+(?=[A-Z(\"“])")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class TextChunk:
+    """A chunk of source text with its position in the source."""
+    index: int
+    text: str
+    char_start: int
+    char_end: int
+    section: Optional[str] = None
+
+    @property
+    def tokens(self) -> int:
+        return -(-len(self.text) // CHARS_PER_TOKEN)
+
+    def metadata(self) -> Dict[str, Any]:
+        metadata = {"char_start": self.char_start, "char_end": self.char_end, "tokens": self.tokens}
+        if self.section:
+            metadata["section"] = self.section
+        return metadata
+
+
+def _strip(text: str, start: int, end: int) -> Optional[Span]:
+    """Narrow a span to exclude surrounding whitespace; None if it is blank."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _split(text: str, span: Span, pattern: "re.Pattern") -> List[Span]:
+    """Split a span at the matches of a separator pattern."""
+    start, end = span
+    pieces = []
+    for match in pattern.finditer(text, start, end):
+        pieces.append((start, match.start()))
+        start = match.end()
+    pieces.append((start, end))
+    return [s for s in (_strip(text, a, b) for a, b in pieces) if s]
+
+
+def _hard_split(text: str, span: Span, max_chars: int) -> Iterator[Span]:
+    """Split a span into windows of at most max_chars, preferring whitespace."""
+    start, end = span
+    while end - start > max_chars:
+        cut = start + max_chars
+        space = max((m.start() for m in _WHITESPACE.finditer(text, start + max_chars // 2, cut)), default=None)
+        cut = space if space is not None else cut
+        piece = _strip(text, start, cut)
+        if piece:
+            yield piece
+        start = cut
+    piece = _strip(text, start, end)
+    if piece:
+        yield piece
+
+
+def _segments(text: str, span: Span, max_chars: int) -> Iterator[Span]:
+    """Paragraphs of a section, with oversized ones split into sentences or words."""
+    for paragraph in _split(text, span, _PARAGRAPH_BREAK):
+        if paragraph[1] - paragraph[0] <= max_chars:
+            yield paragraph
+            continue
+        for sentence in _split(text, paragraph, _SENTENCE_BREAK):
+            yield from _hard_split(text, sentence, max_chars)
+
+
+def _sections(text: str) -> List[Tuple[Optional[str], Span]]:
+    """Section spans, each starting at its heading (the preamble has none)."""
+    sections = []
+    start, heading = 0, None
+    for match in _HEADING.finditer(text):
+        if match.start() > start:
+            sections.append((heading, (start, match.start())))
+        line_end = text.find("\n", match.start())
+        line = text[match.start():line_end if line_end >= 0 else len(text)].strip()
+        title = _EO_SECTION_TITLE.match(line)
+        start, heading = match.start(), (title.group(0) if title else line)[:_HEADING_CHARS]
+    sections.append((heading, (start, len(text))))
+    return sections
+
+
+def chunk_text(text: str, max_tokens: Optional[int] = None) -> List[TextChunk]:
+    """
+    Split text into chunks along section and paragraph boundaries.
+
+    Consecutive paragraphs of a section are packed into one chunk while it
+    stays within ``max_tokens``; chunks never span two sections.
+
+    Args:
+        text: Source text
+        max_tokens: Token budget per chunk (defaults to settings.ingest_chunk_tokens)
+
+    Returns:
+        Chunks in document order
+    """
+    max_chars = (max_tokens or settings.ingest_chunk_tokens) * CHARS_PER_TOKEN
+    chunks: List[TextChunk] = []
+
+    def emit(section: Optional[str], start: int, end: int) -> None:
+        chunks.append(TextChunk(len(chunks), text[start:end], start, end, section))
+
+    for section, span in _sections(text):
+        current: Optional[Span] = None
+        for start, end in _segments(text, span, max_chars):
+            if current and end - current[0] > max_chars:
+                emit(section, *current)
+                current = None
+            current = (current[0], end) if current else (start, end)
+        if current:
+            emit(section, *current)
+    return chunks
+
+
+def chunk_rows(
+    source_id: str,
+    chunks: List[TextChunk],
+    reference_id: Union[str, Callable[[TextChunk], str]],
+    title: Optional[str] = None,
+    page_starts: Optional[Sequence[int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    ``obi_knowledge_chunks`` rows for a source's chunks.
+
+    Ids are generated here so callers can embed the chunks after the insert.
+
+    Args:
+        source_id: Knowledge source the chunks belong to
+        chunks: Chunks from chunk_text
+        reference_id: Reference for every chunk, or a function of the chunk
+        title: Document title (chunk titles default to their section heading)
+        page_starts: Character offsets at which pages 1, 2, ... of the text begin
+    """
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "source_id": source_id,
+            "content": chunk.text,
+            "reference_id": reference_id(chunk) if callable(reference_id) else reference_id,
+            "title": f"{title} (Part {chunk.index + 1})" if title else chunk.section,
+            "chunk_index": chunk.index,
+            "page_number": bisect_right(page_starts, chunk.char_start) if page_starts else None,
+            "metadata_json": chunk.metadata()
+        }
+        for chunk in chunks
+    ]
+
+
+async def delete_sources(session, *criteria) -> None:
+    """
+    Delete knowledge sources matching ``criteria`` together with their chunks.
+
+    Lets ingestion replace a previous copy of a document in the same
+    transaction, which makes re-ingesting idempotent.
+    """
+    source_ids = select(KnowledgeSource.id).where(*criteria).scalar_subquery()
+    await session.execute(delete(KnowledgeChunk).where(KnowledgeChunk.source_id.in_(source_ids)))
+    await session.execute(delete(KnowledgeSource).where(*criteria))
+
+
+async def insert_chunks(session, rows: List[Dict[str, Any]], batch_rows: Optional[int] = None) -> int:
+    """
+    Insert chunk rows with multi-row INSERT statements.
+
+    Rows are sent in batches to stay under the driver's bind parameter limit.
+
+    Returns:
+        Number of rows inserted
+    """
+    batch_rows = batch_rows or settings.ingest_insert_batch_rows
+    for i in range(0, len(rows), batch_rows):
+        await session.execute(insert(KnowledgeChunk).values(rows[i:i + batch_rows]))
+    return len(rows)
@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Vector retrieval over the OBI knowledge base for RAG context.
+
+Performs top-k cosine similarity search over
+``obi_knowledge_chunks.embedding`` (served by the HNSW index defined in
+obi_models), optionally filtered by the source type of the chunk's
+knowledge source (FAR, DFARS, EO, ...). Results are cached per query
+embedding and formatted as regulatory context for analysis prompts.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+
+from config import get_settings
+from database import get_async_session
+from embedding_pipeline import EMBEDDING_DIM, fit_dimension, get_embedder
+from logging_config import get_logger
+from obi_models import KnowledgeChunk, KnowledgeSource
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class RetrievedChunk:
+    """A knowledge chunk returned by similarity search."""
+    id: str
+    reference_id: str
+    title: Optional[str]
+    content: str
+    source_type: str
+    source_name: str
+    similarity: float
+    score: float = 0.0  # Fused rank score (hybrid search)
+
+
+async def embed_query(query_text: str) -> Optional[List[float]]:
+    """Embed a query with the same embedder used for chunks; None if unavailable."""
+    try:
+        return (await get_embedder().embed([query_text]))[0]
+    except Exception as e:
+        logger.warning(f"Query embedding unavailable: {e}")
+        return None
+
+
+def _cache_key(embedding: Sequence[float], k: int, source_types: Optional[Sequence[str]]) -> Tuple:
+    digest = hashlib.sha1(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()
+    return digest, k, tuple(sorted(source_types or ()))
+
+
+class KnowledgeRetriever:
+    """Top-k similarity search over knowledge chunks with a per-embedding cache."""
+
+    def __init__(self, cache_size: Optional[int] = None, ef_search: Optional[int] = None):
+        self.cache_size = cache_size or settings.rag_cache_size
+        self.ef_search = ef_search or settings.hnsw_ef_search
+        self._cache: "OrderedDict[Tuple, List[RetrievedChunk]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def search(
+        self,
+        embedding: Sequence[float],
+        k: int = 5,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            embedding: Query embedding (EMBEDDING_DIM floats)
+            k: Number of chunks to return
+            source_types: Only return chunks from sources of these types
+
+        Returns:
+            Chunks ordered by descending cosine similarity
+        """
+        key = _cache_key(embedding, k, source_types)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        distance = KnowledgeChunk.embedding.cosine_distance(list(embedding)).label("distance")
+        stmt = (
+            select(
+                KnowledgeChunk.id,
+                KnowledgeChunk.reference_id,
+                KnowledgeChunk.title,
+                KnowledgeChunk.content,
+                KnowledgeSource.source_type,
+                KnowledgeSource.name,
+                distance
+            )
+            .join(KnowledgeSource, KnowledgeChunk.source_id == KnowledgeSource.id)
+            .where(KnowledgeChunk.embedding.isnot(None))
+            .order_by(distance)
+            .limit(k)
+        )
+        if source_types:
+            stmt = stmt.where(KnowledgeSource.source_type.in_(list(source_types)))
+
+        async with get_async_session() as session:
+            # A larger candidate list keeps recall up when the filter discards neighbours
+            ef_search = max(self.ef_search, k * 4 if source_types else k)
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+            rows = (await session.execute(stmt)).all()
+
+        results = [
+            RetrievedChunk(
+                id=row.id,
+                reference_id=row.reference_id,
+                title=row.title,
+                content=row.content,
+                source_type=row.source_type,
+                source_name=row.name,
+                similarity=1.0 - float(row.distance)
+            )
+            for row in rows
+        ]
+        self._cache[key] = results
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    async def retrieve(
+        self,
+        query_text: str,
+        k: int = 5,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[RetrievedChunk]:
+        """Embed a text query and search; empty if embedding or search fails."""
+        embedding = await embed_query(query_text)
+        if embedding is None:
+            return []
+        try:
+            return await self.search(embedding, k, source_types)
+        except Exception as e:
+            logger.warning(f"Knowledge retrieval failed: {e}")
+            return []
+
+    async def context_for_document(
+        self,
+        document_text: str,
+        source_types: Optional[Sequence[str]] = None
+    ) -> str:
+        """Regulatory context for a document, formatted for a prompt."""
+        if not settings.rag_enabled:
+            return ""
+        chunks = await self.retrieve(document_text[:settings.rag_query_chars], settings.rag_top_k, source_types)
+        return format_context(chunks, settings.rag_context_max_chars)
+
+    def invalidate(self) -> None:
+        """Drop cached results (e.g. after new chunks are ingested)."""
+        self._cache.clear()
+
+    def get_status(self) -> dict:
+        """Cache statistics for health reporting."""
+        return {
+            "cached_queries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses
+        }
+
+
+def format_context(chunks: Sequence[RetrievedChunk], max_chars: int) -> str:
+    """Render retrieved chunks as a reference block within a size limit."""
+    sections = []
+    remaining = max_chars
+    for chunk in chunks:
+        if sections:
+            remaining -= 2  # Separator between sections
+        header = f"[{chunk.reference_id}] {chunk.title or chunk.source_name}"
+        body = chunk.content.strip()[:max(remaining - len(header) - 1, 0)]
+        if not body:
+            break
+        sections.append(f"{header}\n{body}")
+        remaining -= len(header) + len(body) + 1
+    return "\n\n".join(sections)
+
+
+# Global retriever instance
+_knowledge_retriever: Optional[KnowledgeRetriever] = None
+
+
+def get_knowledge_retriever() -> KnowledgeRetriever:
+    """Get the global knowledge retriever instance."""
+    global _knowledge_retriever
+    if _knowledge_retriever is None:
+        _knowledge_retriever = KnowledgeRetriever()
+    return _knowledge_retriever
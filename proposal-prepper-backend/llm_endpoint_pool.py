@@ -0,0 +1,264 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Load-balanced pool of local LLM (Ollama) endpoints.
+
+``settings.local_llm_urls`` lists the inference boxes (falling back to
+``settings.local_llm_url``). Each request borrows an endpoint with
+``pool.acquire(session_key)``:
+- a session that already used a healthy endpoint with a free slot goes
+  back to it, so the box's KV cache of the document is reused;
+- otherwise the healthy endpoint with the fewest outstanding requests is
+  chosen;
+- each endpoint serves at most ``local_llm_endpoint_concurrency`` requests
+  at once; when every endpoint is full, callers wait for a slot.
+
+Endpoints are probed with ``GET /api/tags`` every
+``local_llm_probe_interval_seconds`` and are also marked unhealthy after
+``local_llm_failure_threshold`` consecutive request failures; an unhealthy
+endpoint is used again once a probe succeeds.
+
+The session key for sticky routing is taken from the ``llm_session``
+context, so provider code does not need to pass it through.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Collection, Dict, Iterator, List, Optional
+
+import httpx
+
+from config import get_settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+_session_key: ContextVar[Optional[str]] = ContextVar("llm_session_key", default=None)
+
+
+@contextmanager
+def llm_session(session_key: Optional[str]) -> Iterator[None]:
+    """Route LLM requests made in this context (and tasks it starts) stickily for ``session_key``."""
+    token = _session_key.set(session_key)
+    try:
+        yield
+    finally:
+        _session_key.reset(token)
+
+
+def current_session() -> Optional[str]:
+    """The sticky routing key of the current context, if any."""
+    return _session_key.get()
+
+
+def configured_endpoints() -> List[str]:
+    """Endpoint URLs from ``settings.local_llm_urls``, or the single ``local_llm_url``."""
+    urls = [url.strip().rstrip("/") for url in (settings.local_llm_urls or "").split(",") if url.strip()]
+    return urls or [settings.local_llm_url.rstrip("/")]
+
+
+class LLMEndpoint:
+    """One inference server with its load and health."""
+
+    def __init__(self, url: str, max_concurrency: int):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_probe: Optional[float] = None
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.outstanding < self.max_concurrency
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class LLMEndpointPool:
+    """
+    Least-outstanding-requests routing over local LLM endpoints.
+
+    Args:
+        urls: Endpoint base URLs (default: ``configured_endpoints()``)
+        max_concurrency: Concurrent requests allowed per endpoint
+        probe_interval: Seconds between background health probes
+        failure_threshold: Consecutive failures that mark an endpoint unhealthy
+        max_sessions: Sticky session assignments remembered (least recently used dropped)
+    """
+
+    def __init__(
+        self,
+        urls: Optional[List[str]] = None,
+        max_concurrency: Optional[int] = None,
+        probe_interval: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        max_sessions: Optional[int] = None
+    ):
+        max_concurrency = max_concurrency or settings.local_llm_endpoint_concurrency
+        self.endpoints = [LLMEndpoint(url, max_concurrency) for url in (urls or configured_endpoints())]
+        self.probe_interval = probe_interval or settings.local_llm_probe_interval_seconds
+        self.failure_threshold = failure_threshold or settings.local_llm_failure_threshold
+        self.max_sessions = max_sessions or settings.local_llm_sticky_sessions
+        self._sessions: "OrderedDict[str, LLMEndpoint]" = OrderedDict()
+        self._condition = asyncio.Condition()
+        self._probe_task: Optional[asyncio.Task] = None
+        self.sticky_hits = 0
+        self.waits = 0
+
+    def _candidates(self, exclude: Collection[str] = ()) -> List[LLMEndpoint]:
+        endpoints = [e for e in self.endpoints if e.url not in exclude] or self.endpoints
+        # When no endpoint passed its last probe, try them all rather than fail outright
+        return [e for e in endpoints if e.healthy] or endpoints
+
+    def has_capacity(self, exclude: Collection[str] = ()) -> bool:
+        """Whether a healthy endpoint not in ``exclude`` could take a request without waiting."""
+        return any(e.healthy and e.has_capacity and e.url not in exclude for e in self.endpoints)
+
+    def _select(self, session_key: Optional[str], exclude: Collection[str] = ()) -> Optional[LLMEndpoint]:
+        """The endpoint for the next request, or None if every candidate is at its cap."""
+        if session_key is not None:
+            sticky = self._sessions.get(session_key)
+            if sticky is not None and sticky.healthy and sticky.has_capacity and sticky.url not in exclude:
+                self._sessions.move_to_end(session_key)
+                self.sticky_hits += 1
+                return sticky
+        available = [e for e in self._candidates(exclude) if e.has_capacity]
+        if not available:
+            return None
+        # Ties go to the endpoint that has served the fewest requests
+        endpoint = min(available, key=lambda e: (e.outstanding, e.requests))
+        if session_key is not None:
+            self._sessions[session_key] = endpoint
+            self._sessions.move_to_end(session_key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return endpoint
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        session_key: Optional[str] = None,
+        exclude: Collection[str] = ()
+    ) -> AsyncIterator[LLMEndpoint]:
+        """
+        Borrow an endpoint for one request, waiting while every endpoint is at its cap.
+
+        ``session_key`` defaults to the ``llm_session`` context; endpoints
+        whose URL is in ``exclude`` (e.g. the one a hedged request is
+        already running on) are not used unless no other exists. Errors
+        raised while the endpoint is in use count against its health,
+        except ValueError: a malformed model response is not the
+        endpoint's fault.
+        """
+        if session_key is None:
+            session_key = current_session()
+        async with self._condition:
+            endpoint = self._select(session_key, exclude)
+            if endpoint is None:
+                self.waits += 1
+                while endpoint is None:
+                    await self._condition.wait()
+                    endpoint = self._select(session_key, exclude)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+        try:
+            yield endpoint
+        except ValueError:
+            raise
+        except Exception:
+            self._record_failure(endpoint)
+            raise
+        else:
+            endpoint.consecutive_failures = 0
+        finally:
+            async with self._condition:
+                endpoint.outstanding -= 1
+                self._condition.notify_all()
+
+    def _record_failure(self, endpoint: LLMEndpoint) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.healthy and endpoint.consecutive_failures >= self.failure_threshold:
+            endpoint.healthy = False
+            logger.warning(f"LLM endpoint {endpoint.url} marked unhealthy after {endpoint.consecutive_failures} failures")
+
+    async def probe(self, timeout: float = 2.0) -> None:
+        """Check every endpoint with ``GET /api/tags`` and update its health."""
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            results = await asyncio.gather(
+                *(client.get(f"{endpoint.url}/api/tags") for endpoint in self.endpoints),
+                return_exceptions=True
+            )
+        async with self._condition:
+            for endpoint, result in zip(self.endpoints, results):
+                healthy = isinstance(result, httpx.Response) and result.status_code == 200
+                if healthy != endpoint.healthy:
+                    logger.info(f"LLM endpoint {endpoint.url} is now {'healthy' if healthy else 'unhealthy'}")
+                endpoint.healthy = healthy
+                endpoint.last_probe = time.time()
+                if healthy:
+                    endpoint.consecutive_failures = 0
+            # Endpoints that came back may free waiting callers
+            self._condition.notify_all()
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.warning(f"LLM endpoint probe failed: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+    def start(self) -> None:
+        """Start background health probing."""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Stop background health probing."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "endpoints": [endpoint.get_status() for endpoint in self.endpoints],
+            "healthy_endpoints": sum(endpoint.healthy for endpoint in self.endpoints),
+            "outstanding": sum(endpoint.outstanding for endpoint in self.endpoints),
+            "sticky_sessions": len(self._sessions),
+            "sticky_hits": self.sticky_hits,
+            "waits_for_capacity": self.waits
+        }
+
+
+# Global pool instance
+_pool = None
+
+
+def get_llm_endpoint_pool() -> LLMEndpointPool:
+    """Get the global local LLM endpoint pool."""
+    global _pool
+    if _pool is None:
+        _pool = LLMEndpointPool()
+    return _pool
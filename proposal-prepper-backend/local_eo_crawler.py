@@ -8,43 +8,104 @@ This module fetches Executive Orders from the National Archives (Federal Registe
 API and prepares them for ingestion into the OBI knowledge base.
 """
 
+import argparse
 import logging
 import httpx
 import asyncio
+import time
+import uuid
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
+from config import get_settings
 from database import get_async_session
-from obi_models import EOCrawlStatus, KnowledgeSource, KnowledgeChunk
-from sqlalchemy import select, update
+from obi_models import EO_DONE_STATES, EOCrawlState, EOCrawlStatus, KnowledgeSource
+from embedding_pipeline import get_embedding_pipeline
+from http_cache import DiskHTTPCache, FetchResult
+from knowledge_chunker import chunk_text, chunk_rows, delete_sources, insert_chunks
+from rate_limiter import TokenBucket
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Fields requested during discovery; enough to ingest without a per-document metadata request
+DISCOVERY_FIELDS = [
+    "document_number", "executive_order_number", "title", "signing_date",
+    "publication_date", "html_url", "raw_text_url", "body_html_url"
+]
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass
+class CrawlStats:
+    """Counters for a crawl run."""
+    pages: int = 0
+    discovered: int = 0
+    requests: int = 0
+    not_modified: int = 0
+    ingested: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
 
 class EOCrawler:
     """Crawler for National Archives Federal Register Executive Orders."""
     
-    API_BASE_URL = "https://www.federalregister.gov/api/v1/documents.json"
-    
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def discover_recent_eos(self, per_page: int = 20) -> List[Dict[str, Any]]:
-        """
-        Discover the most recent Executive Orders from the Federal Register API.
-        """
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        cache_dir: Optional[str] = None
+    ):
+        self.base_url = (base_url or settings.federal_register_api_url).rstrip("/")
+        self.documents_url = f"{self.base_url}/documents.json"
+        self.concurrency = concurrency or settings.crawler_concurrency
+        self.client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+        self.limiter = TokenBucket(rate_per_second or settings.crawler_rate_per_second)
+        cache_dir = cache_dir if cache_dir is not None else settings.crawler_cache_dir
+        self.cache = DiskHTTPCache(cache_dir) if cache_dir else None
+        self.stats = CrawlStats()
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> FetchResult:
+        """Rate-limited GET, revalidated against the disk cache when enabled."""
+        await self.limiter.acquire()
+        self.stats.requests += 1
+        if self.cache is None:
+            response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return FetchResult(str(response.url), response.status_code, response.content)
+        result = await self.cache.fetch(self.client, url, params)
+        if result.not_modified:
+            self.stats.not_modified += 1
+        return result
+
+    def _discovery_params(self, per_page: int, since: Optional[datetime] = None) -> Dict[str, Any]:
         params = {
             "conditions[type][]": "PRESDOCU",
             "conditions[presidential_document_type][]": "executive_order",
+            "fields[]": DISCOVERY_FIELDS,
             "per_page": per_page,
             "order": "newest"
         }
-        
+        if since:
+            params["conditions[publication_date][gte]"] = since.date().isoformat()
+        return params
+    
+    async def discover_recent_eos(self, per_page: int = 20) -> List[Dict[str, Any]]:
+        """
+        Discover the most recent Executive Orders from the Federal Register API.
+        """
         try:
             logger.info(f"Fetching recent EOs from Federal Register API...")
-            response = await self.client.get(self.API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = (await self._get(self.documents_url, self._discovery_params(per_page))).json()
             
             results = data.get("results", [])
             logger.info(f"Discovered {len(results)} Executive Orders")
@@ -56,56 +117,171 @@ class EOCrawler:
             logger.error(f"Failed to discover EOs: {e}")
             return []
 
+    async def discover_since(self, since: Optional[datetime] = None, max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Page through Executive Orders published on or after ``since`` (newest first).
+        
+        Args:
+            since: Earliest publication date to discover (None for the full archive)
+            max_pages: Stop after this many result pages
+            
+        Returns:
+            Discovered EO records, with their crawl status upserted
+        """
+        results: List[Dict[str, Any]] = []
+        url, params = self.documents_url, self._discovery_params(settings.crawler_page_size, since)
+        while url and (max_pages is None or self.stats.pages < max_pages):
+            data = (await self._get(url, params)).json()
+            self.stats.pages += 1
+            page = data.get("results", [])
+            if since:
+                page = [r for r in page if not r.get("publication_date") or _parse_date(r["publication_date"]).date() >= since.date()]
+            results.extend(page)
+            # next_page_url already carries the query string
+            url, params = data.get("next_page_url"), None
+            if since and len(page) < len(data.get("results", [])):
+                break
+        
+        await self._update_discovery_status(results)
+        self.stats.discovered += len(results)
+        logger.info(f"Discovered {len(results)} Executive Orders in {self.stats.pages} pages")
+        return results
+
     async def _update_discovery_status(self, eo_results: List[Dict[str, Any]]):
-        """Store newly discovered EOs in the crawl status table."""
+        """Upsert discovered EOs into the crawl status table with one statement."""
+        rows = {}
+        for eo_data in eo_results:
+            eo_number = eo_data.get("executive_order_number")
+            if not eo_number:
+                # Some presidential documents might not have an EO number in the same field
+                # depending on the specific API response structure
+                continue
+            rows[str(eo_number)] = {
+                "id": str(uuid.uuid4()),
+                "eo_number": str(eo_number),
+                "document_number": eo_data.get("document_number"),
+                "title": eo_data.get("title", "Unknown Title"),
+                "signing_date": _parse_date(eo_data.get("signing_date")),
+                "publication_date": _parse_date(eo_data.get("publication_date")),
+                "federal_register_url": eo_data.get("html_url"),
+                "raw_text_url": eo_data.get("raw_text_url"),
+                "status": EOCrawlState.DISCOVERED.value
+            }
+        if not rows:
+            return
+        
+        stmt = insert(EOCrawlStatus).values(list(rows.values()))
+        # Refresh metadata of known EOs without touching their crawl status
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EOCrawlStatus.eo_number],
+            set_={
+                "document_number": stmt.excluded.document_number,
+                "title": stmt.excluded.title,
+                "signing_date": stmt.excluded.signing_date,
+                "publication_date": stmt.excluded.publication_date,
+                "federal_register_url": stmt.excluded.federal_register_url,
+                "raw_text_url": func.coalesce(stmt.excluded.raw_text_url, EOCrawlStatus.raw_text_url),
+                "updated_at": func.now()
+            }
+        )
         async with get_async_session() as session:
-            for eo_data in eo_results:
-                eo_number = eo_data.get("executive_order_number")
-                if not eo_number:
-                    # Some presidential documents might not have an EO number in the same field
-                    # depending on the specific API response structure
-                    continue
-                
-                # Check if already exists
-                stmt = select(EOCrawlStatus).where(EOCrawlStatus.eo_number == str(eo_number))
-                existing = (await session.execute(stmt)).scalar_one_or_none()
-                
-                if not existing:
-                    new_eo = EOCrawlStatus(
-                        eo_number=str(eo_number),
-                        title=eo_data.get("title", "Unknown Title"),
-                        signing_date=datetime.fromisoformat(eo_data["signing_date"]) if eo_data.get("signing_date") else None,
-                        publication_date=datetime.fromisoformat(eo_data["publication_date"]) if eo_data.get("publication_date") else None,
-                        federal_register_url=eo_data.get("html_url"),
-                        status="discovered"
-                    )
-                    session.add(new_eo)
-            
-            await session.commit()
+            await session.execute(stmt)
+
+    async def last_seen_publication_date(self) -> Optional[datetime]:
+        """Latest publication date already in the crawl status table."""
+        async with get_async_session() as session:
+            return (await session.execute(select(func.max(EOCrawlStatus.publication_date)))).scalar()
 
-    async def fetch_eo_content(self, document_number: str) -> Optional[Dict[str, Any]]:
-        """Fetch the full text and metadata for a specific document."""
-        url = f"https://www.federalregister.gov/api/v1/documents/{document_number}.json"
+    async def _ingested_eo_numbers(self, eo_numbers: List[str]) -> set:
+        if not eo_numbers:
+            return set()
+        async with get_async_session() as session:
+            rows = await session.execute(
+                select(EOCrawlStatus.eo_number).where(
+                    EOCrawlStatus.eo_number.in_(eo_numbers),
+                    EOCrawlStatus.status.in_(EO_DONE_STATES)
+                )
+            )
+            return set(rows.scalars().all())
+
+    async def _mark_failed(self, eo_number: str, error: str) -> None:
+        async with get_async_session() as session:
+            await session.execute(
+                update(EOCrawlStatus).where(EOCrawlStatus.eo_number == eo_number).values(
+                    status=EOCrawlState.FAILED.value,
+                    error_message=error[:2000],
+                    last_crawl_attempt=datetime.utcnow()
+                )
+            )
+
+    async def fetch_eo_content(self, document_number: str, doc_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the full text and metadata for a specific document.
+        
+        The metadata request is skipped when ``doc_data`` (a discovery record)
+        already has the raw text URL.
+        """
+        url = f"{self.base_url}/documents/{document_number}.json"
         
         try:
-            logger.info(f"Fetching metadata for document {document_number}...")
-            response = await self.client.get(url)
-            response.raise_for_status()
-            doc_data = response.json()
+            if not (doc_data and doc_data.get("raw_text_url")):
+                logger.info(f"Fetching metadata for document {document_number}...")
+                doc_data = {**(doc_data or {}), **(await self._get(url)).json()}
+            else:
+                doc_data = dict(doc_data)
             
             # Fetch raw text if URL is present
             raw_text_url = doc_data.get("raw_text_url")
             if raw_text_url:
                 logger.info(f"Fetching raw text from {raw_text_url}...")
-                text_response = await self.client.get(raw_text_url)
-                text_response.raise_for_status()
-                doc_data["raw_text"] = text_response.text
+                doc_data["raw_text"] = (await self._get(raw_text_url)).text
                 
             return doc_data
         except Exception as e:
             logger.error(f"Failed to fetch content for {document_number}: {e}")
             return None
 
+    async def crawl(self, since: Optional[datetime] = None, max_pages: Optional[int] = None) -> CrawlStats:
+        """
+        Incrementally crawl and ingest Executive Orders.
+        
+        Discovers EOs published since ``since`` (default: the latest
+        publication date already crawled), then fetches and ingests the ones
+        not yet ingested with at most ``concurrency`` documents in flight.
+        
+        Returns:
+            CrawlStats for the run
+        """
+        started = time.perf_counter()
+        if since is None:
+            since = await self.last_seen_publication_date()
+        discovered = await self.discover_since(since, max_pages)
+        
+        candidates = {str(eo["executive_order_number"]): eo for eo in discovered if eo.get("executive_order_number")}
+        done = await self._ingested_eo_numbers(list(candidates))
+        pending = [eo for number, eo in candidates.items() if number not in done]
+        logger.info(f"Crawling {len(pending)} new Executive Orders ({len(done)} already ingested)")
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def process(eo: Dict[str, Any]) -> None:
+            eo_number = str(eo["executive_order_number"])
+            async with semaphore:
+                doc_data = await self.fetch_eo_content(eo["document_number"], eo)
+                try:
+                    if doc_data is None:
+                        raise RuntimeError(f"Could not fetch document {eo['document_number']}")
+                    await self.ingest_eo(doc_data)
+                    self.stats.ingested += 1
+                except Exception as e:
+                    logger.error(f"Failed to ingest EO {eo_number}: {e}")
+                    self.stats.failed += 1
+                    await self._mark_failed(eo_number, str(e))
+        
+        await asyncio.gather(*(process(eo) for eo in pending))
+        self.stats.seconds = time.perf_counter() - started
+        return self.stats
+
     async def ingest_eo(self, doc_data: Dict[str, Any]):
         """Chunk and ingest an Executive Order into the OBI knowledge base."""
         logger.info(f"Ingesting doc metadata. Keys: {list(doc_data.keys())}")
@@ -123,7 +299,12 @@ class EOCrawler:
             content = content.split("<body><pre>")[1].split("</pre></body>")[0]
         
         async with get_async_session() as session:
-            # 1. Create Knowledge Source
+            # 1. Replace any earlier ingestion of this EO, then create the Knowledge Source
+            await delete_sources(
+                session,
+                KnowledgeSource.source_type == "EO",
+                KnowledgeSource.name.startswith(f"EO {eo_number}: ", autoescape=True)
+            )
             source = KnowledgeSource(
                 name=f"EO {eo_number}: {title}",
                 source_type="EO",
@@ -136,62 +317,55 @@ class EOCrawler:
             session.add(source)
             await session.flush() # Get the source ID
 
-            # 2. Chunk the content (Simple char-based split for now)
-            chunk_size = 2000
-            overlap = 200
-            chunks = []
-            
-            for i in range(0, len(content), chunk_size - overlap):
-                chunk_text = content[i:i + chunk_size]
-                chunk_idx = len(chunks)
-                
-                new_chunk = KnowledgeChunk(
-                    source_id=source.id,
-                    content=chunk_text,
-                    reference_id=f"EO {eo_number}",
-                    title=f"{title} (Part {chunk_idx + 1})",
-                    chunk_index=chunk_idx,
-                    metadata_json={"char_start": i, "char_end": i + len(chunk_text)}
-                )
-                chunks.append(new_chunk)
-                session.add(new_chunk)
+            # 2. Chunk the content along section/paragraph boundaries and bulk insert
+            chunks = chunk_rows(source.id, chunk_text(content), reference_id=f"EO {eo_number}", title=title)
+            await insert_chunks(session, chunks)
 
-            # 3. Update Status
+            # 3. Update Status (in the same transaction, so indexing is all-or-nothing)
             stmt = update(EOCrawlStatus).where(EOCrawlStatus.eo_number == str(eo_number)).values(
-                status="ingested",
-                last_crawl_attempt=datetime.utcnow()
+                status=EOCrawlState.INDEXED.value,
+                last_crawl_attempt=datetime.utcnow(),
+                attempts=0,
+                error_message=None,
+                next_attempt_at=None,
+                lease_owner=None,
+                lease_expires_at=None
             )
             await session.execute(stmt)
             
             await session.commit()
             logger.info(f"Successfully ingested EO {eo_number} into {len(chunks)} chunks")
+        
+        # 4. Embed the new chunks (failures leave them for the backfill command)
+        try:
+            stats = await get_embedding_pipeline().embed_chunks([(c["id"], c["content"]) for c in chunks])
+            logger.info(f"Embedded {stats.chunks} chunks for EO {eo_number} ({stats.chunks_per_second:.1f} chunks/s)")
+        except Exception as e:
+            logger.warning(f"Embedding failed for EO {eo_number}, run the backfill later: {e}")
 
     async def close(self):
         await self.client.aclose()
 
-# Example usage
 async def main():
+    parser = argparse.ArgumentParser(description="Incrementally crawl Executive Orders from the Federal Register.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Earliest publication date (default: last crawled)")
+    parser.add_argument("--max-pages", type=int, help="Maximum number of discovery pages")
+    args = parser.parse_args()
+
     from database import create_database_engines
     create_database_engines()
     
     crawler = EOCrawler()
     try:
-        # Step 1: Discover
-        results = await crawler.discover_recent_eos(per_page=5)
-        
-        # Step 2: Fetch and Ingest the first one as a test
-        if results:
-            first_eo = results[0]
-            doc_num = first_eo.get("document_number")
-            if doc_num:
-                full_data = await crawler.fetch_eo_content(doc_num)
-                if full_data:
-                    await crawler.ingest_eo(full_data)
-                    
+        stats = await crawler.crawl(since=args.since, max_pages=args.max_pages)
+        print(
+            f"Discovered {stats.discovered} EOs in {stats.pages} pages; ingested {stats.ingested}, "
+            f"failed {stats.failed}; {stats.requests} requests ({stats.not_modified} not modified) "
+            f"in {stats.seconds:.1f}s"
+        )
     finally:
         await crawler.close()
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
@@ -15,7 +15,13 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from config import get_settings
+from finding_stream import emit_finding
+from llm_endpoint_pool import current_session, get_llm_endpoint_pool
+from model_warmup import get_model_warmer
+from request_hedging import get_request_hedger
 from models import ComplianceResults, ComplianceIssue, ComplianceSummary, RegulatoryReference
+from parser_utils import IncrementalIssueParser
+from structured_output import get_structured_output_metrics, ollama_format, validate_response
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -31,14 +37,16 @@ class LocalLLMClient:
         self.timeout = 120.0 # Local LLMs can be slow
     
     def is_available(self) -> bool:
-        """Check if local LLM service is reachable."""
-        try:
-            # Try to hit the tags/version endpoint for Ollama
-            response = httpx.get(f"{self.url}/api/tags", timeout=2.0)
-            return response.status_code == 200
-        except Exception as e:
-            logger.warning(f"Local LLM availability check failed: {e}")
-            return False
+        """Check if any local LLM endpoint in the pool is reachable."""
+        for endpoint in get_llm_endpoint_pool().endpoints:
+            try:
+                # Try to hit the tags/version endpoint for Ollama
+                response = httpx.get(f"{endpoint.url}/api/tags", timeout=2.0)
+                if response.status_code == 200:
+                    return True
+            except Exception as e:
+                logger.warning(f"Local LLM availability check failed for {endpoint.url}: {e}")
+        return False
     
     async def analyze_document(
         self,
@@ -49,6 +57,9 @@ class LocalLLMClient:
     ) -> ComplianceResults:
         """
         Analyze document text using a local LLM via HTTP API.
+        
+        The request goes to an endpoint from the LLM endpoint pool, sticky
+        per analysis session (or per document outside a session).
         """
         try:
             # Create the analysis prompt (using specialized personas if available)
@@ -65,34 +76,50 @@ class LocalLLMClient:
             payload = {
                 "model": self.model,
                 "prompt": prompt,
-                "stream": False,
-                "format": "json",
+                "stream": settings.llm_streaming_enabled,
+                "format": ollama_format(),
+                "keep_alive": settings.local_llm_keep_alive,
                 "options": {
                     "temperature": 0.1,
                     "num_predict": 4096
                 }
             }
             
-            logger.info(f"Sending analysis request to Local LLM ({self.model}) at {self.url} using {agent_type} agent")
+            pool = get_llm_endpoint_pool()
+            session_key = current_session() or document_id
+            used_urls: List[str] = []
             
-            # ... (rest of the content)
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.url}/api/generate",
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
+            async def attempt(index: int) -> ComplianceResults:
+                async with pool.acquire(session_key, exclude=used_urls) as endpoint:
+                    used_urls.append(endpoint.url)
+                    logger.info(f"Sending analysis request to Local LLM ({self.model}) at {endpoint.url} using {agent_type} agent")
+                    
+                    if settings.llm_streaming_enabled:
+                        parsed_data = await self._stream_generate(endpoint.url, payload, agent_type)
+                    else:
+                        async with httpx.AsyncClient() as client:
+                            response = await client.post(
+                                f"{endpoint.url}/api/generate",
+                                json=payload,
+                                timeout=self.timeout
+                            )
+                            response.raise_for_status()
+                            
+                            result = response.json()
+                            get_model_warmer().observe(result)
+                            ai_response = result.get("response", "")
                 
-                result = response.json()
-                ai_response = result.get("response", "")
-            
-            logger.info(f"Received {agent_type} analysis response from Local LLM for document {document_id}")
-            
-            # Parse the structured response
-            results = self._parse_ai_response(ai_response, document_id)
+                logger.info(f"Received {agent_type} analysis response from Local LLM for document {document_id}")
+                if settings.llm_streaming_enabled:
+                    return self._build_results(parsed_data, document_id, endpoint.url)
+                
+                # Parse the structured response
+                return self._parse_ai_response(ai_response, document_id, endpoint.url)
             
-            return results
+            # A slow request is hedged to another endpoint in the pool
+            return await get_request_hedger("ollama").run(
+                attempt, can_hedge=lambda: pool.has_capacity(exclude=used_urls)
+            )
             
         except httpx.HTTPError as e:
             logger.error(f"Local LLM HTTP error for document {document_id}: {e}")
@@ -102,6 +129,36 @@ class LocalLLMClient:
             logger.error(f"Unexpected error during local analysis for document {document_id}: {e}")
             raise Exception(f"Local Analysis failed: {str(e)}")
 
+    async def _stream_generate(self, url: str, payload: Dict[str, Any], agent_type: str) -> Dict[str, Any]:
+        """
+        Stream /api/generate and parse the response object incrementally.
+        
+        Ollama streams one JSON line per token batch; each issue is passed to
+        ``emit_finding`` as soon as its object closes. The complete object
+        is then validated against the compliance schema.
+        """
+        parser = IncrementalIssueParser()
+        async with httpx.AsyncClient() as client:
+            async with client.stream("POST", f"{url}/api/generate", json=payload, timeout=self.timeout) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event.get("error"):
+                        raise Exception(event["error"])
+                    for issue in parser.feed(event.get("response", "")):
+                        await emit_finding(issue, agent_type)
+                    if event.get("done"):
+                        get_model_warmer().observe(event)
+                        break
+        try:
+            data = parser.result()
+        except ValueError:
+            get_structured_output_metrics().record("ollama", "failed")
+            raise
+        return validate_response(data, "ollama")
+
     def _create_compliance_prompt(self, document_text: str, filename: str, persona_sop: str = "") -> str:
         """
         Create a structured prompt for compliance analysis using specialized SOPs.
@@ -142,21 +199,22 @@ Format your response EXACTLY as this JSON:
 """
         return prompt
 
-    def _parse_ai_response(self, ai_response: str, document_id: str) -> ComplianceResults:
+    def _parse_ai_response(self, ai_response: str, document_id: str, url: Optional[str] = None) -> ComplianceResults:
         """
         Parse the AI response into structured ComplianceResults.
         """
         try:
-            # Extract JSON from the response
-            json_start = ai_response.find('{')
-            json_end = ai_response.rfind('}') + 1
-            json_text = ai_response[json_start:json_end]
-            parsed_data = json.loads(json_text)
-            
-            # Use same logic as bedrock_client to convert to models
-            from bedrock_utils import convert_to_compliance_results # Hypothetical or just copy logic
-            # For now, let's just implement the mapping here to keep it self-contained
-            
+            parsed_data = validate_response(ai_response, "ollama", repair=settings.llm_json_repair)
+        except Exception as e:
+            logger.error(f"Failed to parse local AI response: {e}")
+            raise Exception("Local AI response parsing failed")
+        return self._build_results(parsed_data, document_id, url)
+
+    def _build_results(self, parsed_data: Dict[str, Any], document_id: str, url: Optional[str] = None) -> ComplianceResults:
+        """
+        Map a parsed AI response onto ComplianceResults.
+        """
+        try:
             issues = []
             for issue_data in parsed_data.get('issues', []):
                 reg_data = issue_data.get('regulation', {})
@@ -200,7 +258,7 @@ Format your response EXACTLY as this JSON:
                 metadata={
                     "ai_provider": "local_llm",
                     "model_id": self.model,
-                    "url": self.url
+                    "url": url or self.url
                 }
             )
         except Exception as e:
@@ -1,18 +1,82 @@
 # SPDX-License-Identifier: PolyForm-Strict-1.0.0
 # SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
 
+import json
 import random
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from models import ComplianceResults, ComplianceIssue, ComplianceSummary, RegulatoryReference
-from parser_utils import parse_llm_json, map_issue_data
+from agent_personas import PERSONA_TYPES
+from parser_utils import IncrementalIssueParser, map_issue_data
+from finding_stream import current_sink, emit_finding, stream_findings, suppress_findings
+from llm_endpoint_pool import get_llm_endpoint_pool, llm_session
+from request_hedging import get_request_hedger
+from model_warmup import get_model_warmer
+from prompt_prefix import PrefillTimer, PromptParts, agent_prompt, get_prefix_cache_metrics
+from structured_output import get_structured_output_metrics, litellm_response_format, validate_response
 from analysis_provider import AnalysisProvider, AnalysisRouter, ProviderType
+from chunk_router import CHARS_PER_TOKEN, get_chunk_router
 from logging_config import get_logger
 from config import get_settings
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+_OLLAMA_TIMINGS = ("load_duration", "total_duration", "prompt_eval_count", "prompt_eval_duration")
+
+# An agent whose response cannot be parsed (e.g. truncated JSON) is asked once more
+AGENT_ATTEMPTS = 2
+
+
+def _ollama_timings(response: Any, elapsed: float) -> Dict[str, Any]:
+    """
+    Ollama's timing fields for a LiteLLM response, as a final Ollama event.
+
+    LiteLLM keeps the raw Ollama response in ``_hidden_params``; where it
+    is not available the measured wall time stands in for
+    ``total_duration`` and the load time is unknown.
+    """
+    event: Dict[str, Any] = {"total_duration": int(elapsed * 1e9)}
+    raw = (getattr(response, "_hidden_params", None) or {}).get("original_response")
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            raw = None
+    if isinstance(raw, dict):
+        event.update({key: raw[key] for key in _OLLAMA_TIMINGS if raw.get(key) is not None})
+    return event
+
+
+def _prompt_eval(timings: Dict[str, Any], usage: Any, prefill_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Evaluated prompt tokens and prefill time, preferring Ollama's own counts."""
+    duration = timings.get("prompt_eval_duration")
+    return {
+        "evaluated_tokens": timings.get("prompt_eval_count", getattr(usage, "prompt_tokens", None)),
+        "prefill_seconds": duration / 1e9 if duration is not None else prefill_seconds
+    }
+
+
+def routed_agent_input(agent_type: str, document_text: str, context: str = "") -> str:
+    """
+    The document text an agent reads, within the agent context token budget.
+
+    Each agent reads only the chunks relevant to its specialty. Regulatory
+    and pre-scan context (which tells the agents which checks are already
+    settled) goes first and counts against the same budget; it may take at
+    most half of it.
+    """
+    router = get_chunk_router()
+    if not context:
+        return router.route(agent_type, document_text)
+    context = context[:router.token_budget * CHARS_PER_TOKEN // 2]
+    # Round the context up to whole tokens, separator included
+    context_tokens = -(-(len(context) + 2) // CHARS_PER_TOKEN)
+    text = router.route(agent_type, document_text, router.token_budget - context_tokens)
+    return f"{context}\n\n{text}"
+
+
 class LocalAnalysisProvider(AnalysisProvider):
     """
     Local analysis provider. 
@@ -50,7 +114,19 @@ class LocalAnalysisProvider(AnalysisProvider):
         # 2. Try Local AI Analysis (LiteLLM)
         if settings.use_local_llm:
             try:
-                return await self._run_ai_analysis(document_text, filename, document_id, session_id)
+                # Every agent call of this session goes to the same endpoint while it has capacity
+                with llm_session(session_id):
+                    results = await self._run_ai_analysis(
+                        document_text, filename, document_id, session_id,
+                        context="\n\n".join(filter(None, [
+                            kwargs.get("knowledge_context"),
+                            kwargs.get("prescan_context")
+                        ]))
+                    )
+                prompt_cache = get_prefix_cache_metrics().pop_session(session_id)
+                if prompt_cache:
+                    results.metadata["prompt_cache"] = prompt_cache
+                return results
             except Exception as e:
                 logger.warning(f"Local AI analysis failed, checking fallback: {e}")
                 if not settings.use_simulated_data:
@@ -78,7 +154,14 @@ class LocalAnalysisProvider(AnalysisProvider):
         except ImportError:
             logger.warning("psutil not found, thermal guard skipped")
 
-    async def _run_ai_analysis(self, document_text: str, filename: str, document_id: str, session_id: str) -> ComplianceResults:
+    async def _run_ai_analysis(
+        self,
+        document_text: str,
+        filename: str,
+        document_id: str,
+        session_id: str,
+        context: str = ""
+    ) -> ComplianceResults:
         """Execute real AI analysis using LiteLLM (Ollama/Llama3.2)."""
         if self._graph:
             try:
@@ -87,6 +170,7 @@ class LocalAnalysisProvider(AnalysisProvider):
                     "filename": filename,
                     "document_id": document_id,
                     "session_id": session_id,
+                    "context": context,
                     "findings": [],
                     "status": "starting"
                 }
@@ -103,22 +187,94 @@ class LocalAnalysisProvider(AnalysisProvider):
         
         # Fallback to direct single-prompt AI if graph disabled or failed
         from agent_personas import get_unified_compliance_prompt
-        prompt = get_unified_compliance_prompt(document_text=document_text[:8000], filename=filename)
+        prompt = get_unified_compliance_prompt(document_text=document_text[:8000], filename=filename, context=context)
         
         logger.info(f"Calling local LLM ({settings.local_llm_model}) via direct LiteLLM fallback...")
         
-        response = await litellm.acompletion(
+        data = await self._complete_json(prompt, "unified")
+        return self._results_from_data(data, document_id, session_id)
+
+    async def _complete_json(self, prompt: Union[str, PromptParts], source: str) -> Dict[str, Any]:
+        """
+        Run a schema-constrained completion and validate the response object.
+        
+        A ``PromptParts`` prefix is sent as the system message so the
+        backend can reuse its evaluated state across calls. Every request
+        renews the model's ``keep_alive``, and its load and total duration
+        feed the model warmer's cold/warm statistics.
+        
+        With ``settings.llm_streaming_enabled`` the response is streamed
+        through an IncrementalIssueParser and each issue is passed to
+        ``emit_finding`` as soon as it is complete. The request goes to an
+        endpoint borrowed from the LLM endpoint pool, and a slow request is
+        hedged to another endpoint.
+        """
+        parts = prompt if isinstance(prompt, PromptParts) else PromptParts("", prompt)
+        pool = get_llm_endpoint_pool()
+        used_urls: List[str] = []
+        
+        async def attempt(index: int) -> Dict[str, Any]:
+            async with pool.acquire(exclude=used_urls) as endpoint:
+                used_urls.append(endpoint.url)
+                return await self._complete_json_at(endpoint.url, parts, source)
+        
+        return await get_request_hedger("litellm").run(attempt, can_hedge=lambda: pool.has_capacity(exclude=used_urls))
+
+    async def _complete_json_at(self, api_base: str, parts: PromptParts, source: str) -> Dict[str, Any]:
+        import litellm
+        
+        messages = [{"role": "user", "content": parts.suffix}]
+        if parts.prefix:
+            messages.insert(0, {"role": "system", "content": parts.prefix})
+        request = dict(
             model=f"ollama/{settings.local_llm_model}",
-            messages=[{"role": "user", "content": prompt}],
-            api_base=settings.local_llm_url,
+            messages=messages,
+            api_base=api_base,
             temperature=0.1,
-            response_format={"type": "json_object"}
+            response_format=litellm_response_format(),
+            keep_alive=settings.local_llm_keep_alive
         )
+        metrics = get_prefix_cache_metrics()
+        started = time.monotonic()
+        if not settings.llm_streaming_enabled:
+            response = await litellm.acompletion(**request)
+            timings = _ollama_timings(response, time.monotonic() - started)
+            get_model_warmer().observe(timings)
+            metrics.record("ollama", parts, **_prompt_eval(timings, getattr(response, "usage", None)))
+            content = response.choices[0].message.content
+            logger.debug(f"Local AI {source} response: {content}")
+            return validate_response(content, source, repair=settings.llm_json_repair)
         
-        content = response.choices[0].message.content
-        logger.debug(f"Local AI direct response: {content}")
-        
-        return self._parse_local_response(content, document_id, session_id)
+        parser = IncrementalIssueParser()
+        # Time to the first token is the prefill of the tokens the backend had to evaluate
+        prefill = PrefillTimer()
+        usage = None
+        last_chunk = None
+        try:
+            stream = await litellm.acompletion(stream=True, stream_options={"include_usage": True}, **request)
+            async for chunk in stream:
+                last_chunk = chunk
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content or ""
+                if content:
+                    prefill.token()
+                for issue in parser.feed(content):
+                    await emit_finding(issue, source)
+            timings = _ollama_timings(last_chunk, time.monotonic() - started)
+            get_model_warmer().observe(timings)
+            metrics.record("ollama", parts, **_prompt_eval(timings, usage, prefill.seconds))
+            data = parser.result()
+        except Exception as e:
+            # Findings already pushed to clients are not a complete result; the
+            # caller retries or fails over and clients reset on the next attempt
+            if isinstance(e, ValueError):
+                get_structured_output_metrics().record(source, "failed")
+            if parser.issues:
+                logger.warning(f"Local AI {source} stream ended early after {len(parser.issues)} issues: {e}")
+            raise
+        return validate_response(data, source)
 
     def _process_graph_findings(self, state: Dict[str, Any], document_id: str, session_id: str) -> ComplianceResults:
         """Convert accumulated graph findings into ComplianceResults."""
@@ -171,7 +327,7 @@ class LocalAnalysisProvider(AnalysisProvider):
             processing_time=0.0,
             metadata={
                 "analysis_type": "langgraph_multi_agent",
-                "agents": ["far", "eo", "technical"],
+                "agents": list(PERSONA_TYPES),
                 "air_spec": settings.air_spec_mode
             }
         )
@@ -188,23 +344,26 @@ class LocalAnalysisProvider(AnalysisProvider):
                 filename: str
                 document_id: str
                 session_id: str
+                context: str
                 findings: Annotated[List[Dict[str, Any]], operator.add]
                 status: str
 
+            def agent_input(state: AgentState, agent_type: str) -> str:
+                return routed_agent_input(agent_type, state["document_text"], state.get("context", ""))
+
             async def far_agent_node(state: AgentState):
                 logger.info(">>> [DEBUG] Entering FAR Agent Node... <<<")
-                # In a real impl, we'd slice document_text or use RAG
-                results = await self._call_specialized_agent("far", state["document_text"], state["filename"])
+                results = await self._call_specialized_agent("far", agent_input(state, "far"), state["filename"])
                 return {"findings": results.get("issues", []), "status": "far_complete"}
 
             async def eo_agent_node(state: AgentState):
                 logger.info(">>> [DEBUG] Entering EO Agent Node... <<<")
-                results = await self._call_specialized_agent("eo", state["document_text"], state["filename"])
+                results = await self._call_specialized_agent("eo", agent_input(state, "eo"), state["filename"])
                 return {"findings": results.get("issues", []), "status": "eo_complete"}
 
             async def technical_agent_node(state: AgentState):
                 logger.info(">>> [DEBUG] Entering Technical Agent Node... <<<")
-                results = await self._call_specialized_agent("technical", state["document_text"], state["filename"])
+                results = await self._call_specialized_agent("technical", agent_input(state, "technical"), state["filename"])
                 return {"findings": results.get("issues", []), "status": "technical_complete"}
 
             workflow = StateGraph(AgentState)
@@ -224,57 +383,60 @@ class LocalAnalysisProvider(AnalysisProvider):
             return None
 
     async def _call_specialized_agent(self, agent_type: str, document_text: str, filename: str) -> Dict[str, Any]:
-        """Helper to call LiteLLM with a specific agent persona."""
-        import litellm
-        import json
-        from agent_personas import get_persona_prompt, get_unified_compliance_prompt
+        """
+        Helper to call LiteLLM with a specific agent persona.
         
-        persona_sop = get_persona_prompt(agent_type)
-        # We use a condensed version of the unified prompt for individual nodes
-        prompt = f"""{persona_sop}
+        ``document_text`` is the agent's routed input (see chunk_router), which
+        is already bounded by the agent context token budget.
         
-Analyze the following document for compliance based on your specialty.
-Document: {filename}
-Content: {document_text[:4000]}
-
-IMPORTANT: Return VALID JSON only.
-JSON Format:
-{{
-    "issues": [
-        {{
-            "severity": "critical|warning|info",
-            "title": "string",
-            "description": "string",
-            "regulation": {{"regulation": "FAR|EO|Technical", "section": "string", "title": "string"}},
-            "confidence": 0-1
-        }}
-    ]
-}}
-"""
-        try:
-            response = await litellm.acompletion(
-                model=f"ollama/{settings.local_llm_model}",
-                messages=[{"role": "user", "content": prompt}],
-                api_base=settings.local_llm_url,
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            content = response.choices[0].message.content
-            
-            data = parse_llm_json(content)
-            return data
-        except Exception as e:
-            logger.error(f"Agent {agent_type} failed: {e}")
-            return {"issues": []}
+        Raises:
+            Exception: If the backend call fails, or the response still cannot
+                be parsed after ``AGENT_ATTEMPTS`` attempts
+        """
+        import litellm  # noqa: F401 - without LiteLLM the graph fails over to simulation
+        
+        # A condensed version of the unified prompt, with the static part first so backends can cache it
+        prompt = agent_prompt(agent_type, document_text, filename)
+        parent_sink = current_sink()
+        streamed = 0
+        
+        async def counting_sink(issue: Dict[str, Any], source: str) -> None:
+            nonlocal streamed
+            streamed += 1
+            if parent_sink:
+                await parent_sink(issue, source)
+        
+        for attempt in range(1, AGENT_ATTEMPTS + 1):
+            try:
+                # Clients already have the findings of an earlier attempt
+                if streamed:
+                    with suppress_findings():
+                        return await self._complete_json(prompt, agent_type)
+                with stream_findings(counting_sink):
+                    return await self._complete_json(prompt, agent_type)
+            except ValueError as e:
+                if attempt < AGENT_ATTEMPTS:
+                    logger.warning(f"Agent {agent_type} returned an unusable response, retrying: {e}")
+                    continue
+                logger.error(f"Agent {agent_type} failed after {attempt} attempts: {e}")
+                raise
+            except Exception as e:
+                # A missing agent is a failed analysis, not a clean one; the router's breaker must see it
+                logger.error(f"Agent {agent_type} failed: {e}")
+                raise
 
     def _parse_local_response(self, content: str, document_id: str, session_id: str) -> ComplianceResults:
         """Parse structured JSON from local LLM."""
-        import json
-        from datetime import datetime
-        
         try:
-            data = parse_llm_json(content)
-            
+            data = validate_response(content, "local", repair=settings.llm_json_repair)
+        except Exception as e:
+            logger.error(f"Failed to parse local AI response: {e}")
+            raise ValueError(f"Invalid JSON from Local LLM: {str(e)}")
+        return self._results_from_data(data, document_id, session_id)
+
+    def _results_from_data(self, data: Dict[str, Any], document_id: str, session_id: str) -> ComplianceResults:
+        """Convert a parsed local LLM response into ComplianceResults."""
+        try:
             issues = []
             critical_count = 0
             warning_count = 0
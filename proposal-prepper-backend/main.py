@@ -9,14 +9,17 @@ for compliance checking against FAR/DFARS regulations.
 """
 
 import os
+import json
+import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
-from fastapi import FastAPI, HTTPException, Path, BackgroundTasks, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Path, Query, Header, Request, Response, BackgroundTasks, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 
 from analysis_provider import AnalysisRouter
@@ -31,6 +34,7 @@ from logging_config import setup_logging, get_logger
 from models import (
     AnalysisStartRequest,
     AnalysisStartResponse,
+    BatchAnalysisRequest,
     AnalysisStatusResponse,
     AnalysisResultsResponse,
     ComplianceResults,
@@ -43,6 +47,7 @@ from models import (
     UploadSessionResponse,
     SimulateUploadRequest
 )
+from pdf_processor import get_pdf_processor
 from database import init_database, check_database_health, close_database_connections
 from db_operations import (
     create_analysis_session,
@@ -54,6 +59,19 @@ from db_operations import (
     DocumentMetadataOperations
 )
 from db_models import AnalysisStatus
+from connection_manager import ConnectionManager, session_topic, proposal_topic
+from event_bus import get_event_bus, start_event_bus, stop_event_bus, publish_event
+from status_notifier import get_status_notifier, status_etag, etag_matches, is_terminal
+from embedding_pipeline import get_embedder
+from hybrid_search import get_hybrid_searcher
+from price_to_beat import get_price_to_beat_engine
+from finding_stream import FindingTimer, get_finding_stream_metrics, stream_findings
+from structured_output import get_structured_output_metrics
+from circuit_breaker import BreakerState, get_circuit_breaker
+from llm_endpoint_pool import get_llm_endpoint_pool
+from request_hedging import get_request_hedging_status
+from model_warmup import get_model_warmer
+from prompt_prefix import get_prefix_cache_metrics
 from concurrent_processor import (
     get_processor, 
     processor_lifespan,
@@ -72,30 +90,14 @@ logger = get_logger(__name__)
 
 
 # WebSocket Connection Manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket client connected. Total: {len(self.active_connections)}")
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            logger.info(f"WebSocket client disconnected. Total: {len(self.active_connections)}")
-
-    async def broadcast(self, message: Dict[str, Any]):
-        # Iterate over a copy to avoid modification during iteration issues, though simple append/remove is usually safe
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to send WebSocket message: {e}")
-
 manager = ConnectionManager()
 
+
+async def deliver_event(message: Dict[str, Any]) -> None:
+    """Deliver a progress event from the bus to WebSocket clients and status waiters."""
+    await get_status_notifier().observe(message)
+    await manager.broadcast(message)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
@@ -166,6 +168,21 @@ async def lifespan(app: FastAPI):
             # Don't fail startup - services can still work with fallback
             logger.warning("Continuing with limited functionality")
         
+        # Start the progress event bus (Redis pub/sub across replicas, in-process fallback)
+        event_bus = await start_event_bus(deliver_event)
+        logger.info(f"Progress event bus started ({event_bus.get_status()['backend']})")
+        
+        # Probe the local LLM endpoints in the background
+        if settings.use_local_llm:
+            llm_pool = get_llm_endpoint_pool()
+            llm_pool.start()
+            logger.info(f"Local LLM endpoint pool started ({len(llm_pool.endpoints)} endpoints)")
+            
+            # Load the model and prime the personas before the first analysis arrives
+            if settings.local_llm_warmup_enabled:
+                get_model_warmer().start()
+                logger.info(f"Warming up {settings.local_llm_model} (keep_alive {settings.local_llm_keep_alive})")
+        
         # Initialize concurrent processor
         try:
             async with processor_lifespan() as processor:
@@ -182,6 +199,9 @@ async def lifespan(app: FastAPI):
         # Shutdown logic
         logger.info("Shutting down Strands service...")
         try:
+            await stop_event_bus()
+            await get_model_warmer().stop()
+            await get_llm_endpoint_pool().stop()
             await close_database_connections()
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
@@ -200,9 +220,6 @@ async def process_analysis(session_id: str) -> None:
     Args:
         session_id: Unique identifier for the analysis session
     """
-    from pdf_processor import get_pdf_processor
-    from aws_bedrock import get_bedrock_client
-    from analysis_provider import AnalysisRouter
     import asyncio
     import time
     
@@ -214,6 +231,9 @@ async def process_analysis(session_id: str) -> None:
         logger.error(f"Analysis session {session_id} not found in database")
         return
     
+    # Events are also published to the proposal topic when the session belongs to one
+    proposal_id = (session_data.get("metadata") or {}).get("proposal_id")
+    
     try:
         logger.info(f"Starting analysis process for session: {session_id[:12]}...")
         
@@ -227,9 +247,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast Step 1 Progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "validating",
                 "progress": 5.0,
@@ -266,9 +287,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "extracting",
                 "progress": 15.0,
@@ -293,9 +315,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "extracting",
                 "progress": 30.0,
@@ -314,9 +337,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "analyzing",
                 "progress": 45.0,
@@ -340,9 +364,10 @@ async def process_analysis(session_id: str) -> None:
             )
             
             # Broadcast progress
-            await manager.broadcast({
+            await publish_event({
                 "type": "analysis_progress",
                 "sessionId": session_id,
+                "proposalId": proposal_id,
                 "data": {
                     "status": "analyzing",
                     "progress": 55.0,
@@ -350,97 +375,48 @@ async def process_analysis(session_id: str) -> None:
                 }
             })
 
-            results = await provider.analyze_document(
-                document_text=document_text,
-                filename=session_data["filename"],
-                document_id=session_data["document_id"],
-                session_id=session_id
-            )
-            
-            logger.info(f"Analysis completed for document {session_data['document_id'][:12]}")
-            
-        except Exception as provider_error:
-            logger.error(f"Analysis provider failed for document {session_data['document_id'][:12]}: {provider_error}")
-            raise
-        
-        # Step 5: Security Review
-        await update_analysis_progress(
-            session_id=session_id,
-            status=AnalysisStatus.VALIDATING,
-            progress=65.0,
-            current_step="Conducting security review of compliance findings"
-        )
-        
-        # Broadcast progress
-        await manager.broadcast({
-            "type": "analysis_progress",
-            "sessionId": session_id,
-            "data": {
-                "status": "validating",
-                "progress": 65.0,
-                "currentStep": "Security Review"
-            }
-        })
-
-        await asyncio.sleep(0.5)
-
-        # Step 6: Policy Check
-        await update_analysis_progress(
-            session_id=session_id,
-            status=AnalysisStatus.VALIDATING,
-            progress=80.0,
-            current_step="Cross-referencing organizational policies"
-        )
-
-        # Broadcast progress
-        await manager.broadcast({
-            "type": "analysis_progress",
-            "sessionId": session_id,
-            "data": {
-                "status": "validating",
-                "progress": 80.0,
-                "currentStep": "Policy Check"
-            }
-        })
-
-        await asyncio.sleep(0.5)
-
-        # Step 7: Generation
-        await update_analysis_progress(
-            session_id=session_id,
-            status=AnalysisStatus.COMPLETED,
-            progress=95.0,
-            current_step="Generating final compliance synthesis"
-        )
-            await update_analysis_progress(
-                session_id=session_id,
-                status=AnalysisStatus.ANALYZING,
-                progress=55.0,
-                current_step="Performing DFARS regulatory audit"
-            )
-            
-            # Broadcast progress
-            await manager.broadcast({
-                "type": "analysis_progress",
+            # Push each finding to clients as soon as the model has generated it.
+            # A failed analysis is retried from the start, so every attempt has
+            # its own id and clients drop findings streamed by earlier attempts.
+            finding_timer = FindingTimer()
+            attempt_id = uuid.uuid4().hex
+            await publish_event({
+                "type": "analysis_attempt",
                 "sessionId": session_id,
-                "data": {
-                    "status": "analyzing",
-                    "progress": 55.0,
-                    "currentStep": "DFARS Audit"
-                }
+                "proposalId": proposal_id,
+                "data": {"attemptId": attempt_id, "resetFindings": True}
             })
-
-            results = await provider.analyze_document(
-                document_text=document_text,
-                filename=session_data["filename"],
-                document_id=session_data["document_id"],
-                session_id=session_id
-            )
             
-            logger.info(f"Analysis completed for document {session_data['document_id']}")
+            async def push_finding(issue: Dict[str, Any], source: str) -> None:
+                elapsed = finding_timer.record()
+                if finding_timer.findings == 1:
+                    logger.info(f"First finding for session {session_id[:12]}... after {elapsed:.2f}s")
+                await publish_event({
+                    "type": "analysis_finding",
+                    "sessionId": session_id,
+                    "proposalId": proposal_id,
+                    "data": {
+                        "finding": issue,
+                        "source": source,
+                        "attemptId": attempt_id,
+                        "index": finding_timer.findings - 1,
+                        "elapsedMs": round(elapsed * 1000.0, 1)
+                    }
+                })
+            
+            with stream_findings(push_finding):
+                results = await router.analyze_document(
+                    document_text=document_text,
+                    filename=session_data["filename"],
+                    document_id=session_data["document_id"],
+                    session_id=session_id
+                )
+            get_finding_stream_metrics().observe(finding_timer)
+            
+            logger.info(f"Analysis completed for document {session_data['document_id'][:12]}")
             
         except Exception as provider_error:
-            logger.error(f"Analysis provider failed for document {session_data['document_id']}: {provider_error}")
+            logger.error(f"Analysis provider failed for document {session_data['document_id'][:12]}: {provider_error}")
             raise
         
         # Step 5: Security Review
@@ -452,9 +428,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "validating",
                 "progress": 65.0,
@@ -473,9 +450,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "validating",
                 "progress": 75.0,
@@ -494,9 +472,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast progress
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_progress",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "generating",
                 "progress": 90.0,
@@ -514,7 +493,9 @@ async def process_analysis(session_id: str) -> None:
         results.metadata.update({
             "pdf_metadata": pdf_metadata,
             "text_extraction_successful": True,
-            "document_text_length": len(document_text)
+            "document_text_length": len(document_text),
+            "streamed_findings": finding_timer.findings,
+            "time_to_first_finding": finding_timer.first_finding_seconds
         })
         
         # Store results in database
@@ -529,14 +510,21 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast completion
-        await manager.broadcast({
+        await publish_event({
             "type": "analysis_complete",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "status": "completed",
                 "progress": 100.0,
                 "currentStep": "Analysis completed successfully",
-                "resultsId": results.id
+                "resultsId": results.id,
+                # Authoritative totals; streamed findings were provisional
+                "totalIssues": results.summary.total_issues,
+                "timeToFirstFindingMs": (
+                    round(finding_timer.first_finding_seconds * 1000.0, 1)
+                    if finding_timer.first_finding_seconds is not None else None
+                )
             }
         })
 
@@ -556,9 +544,10 @@ async def process_analysis(session_id: str) -> None:
         )
         
         # Broadcast failure
-        await manager.broadcast({
+        await publish_event({
             "type": "error",
             "sessionId": session_id,
+            "proposalId": proposal_id,
             "data": {
                 "error": str(e),
                 "status": "failed"
@@ -652,16 +641,45 @@ app.add_middleware(
 
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates."""
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    session_id: str = Query(None, alias="sessionId"),
+    proposal_id: str = Query(None, alias="proposalId")
+):
+    """
+    WebSocket endpoint for real-time updates.
+    
+    Clients may subscribe at connect time via the ``sessionId`` and
+    ``proposalId`` query parameters, or later by sending
+    ``{"type": "subscribe", "sessionId": "..."}`` (or ``"unsubscribe"``).
+    Clients without any subscription receive all events.
+    """
+    topics = []
+    if session_id:
+        topics.append(session_topic(session_id))
+    if proposal_id:
+        topics.append(proposal_topic(proposal_id))
+    
+    await manager.connect(websocket, topics)
     try:
         while True:
-            # Keep connection open and listen for client messages
-            # In this implementation, communication is one-way (server -> client)
-            # but we need to receive to keep the connection alive/detect disconnects
-            data = await websocket.receive_text()
-            # Could handle ping/pong here if needed
+            # Communication is mostly server -> client; client messages manage subscriptions
+            # and receiving is also needed to detect disconnects
+            raw = await websocket.receive_text()
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue  # e.g. plain-text keep-alive pings
+            if not isinstance(data, dict):
+                continue
+            action = data.get("type")
+            if action not in ("subscribe", "unsubscribe"):
+                continue
+            for topic in _topics_from_client_message(data):
+                if action == "subscribe":
+                    manager.subscribe(websocket, topic)
+                else:
+                    manager.unsubscribe(websocket, topic)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
@@ -669,6 +687,16 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(websocket)
 
 
+def _topics_from_client_message(data: Dict[str, Any]) -> list:
+    """Topics named in a client subscribe/unsubscribe message."""
+    topics = []
+    if data.get("sessionId"):
+        topics.append(session_topic(str(data["sessionId"])))
+    if data.get("proposalId"):
+        topics.append(proposal_topic(str(data["proposalId"])))
+    return topics
+
+
 
 @app.get("/api/health", response_model=HealthCheckResponse)
 async def health_check() -> HealthCheckResponse:
@@ -718,6 +746,7 @@ async def health_check() -> HealthCheckResponse:
             else:
                 checks["aws_bedrock"] = "warning"
                 logger.warning("AWS Bedrock client not available")
+            checks["bedrock_throttle"] = bedrock_client.get_status()
         except Exception as e:
             logger.warning(f"AWS Bedrock health check failed: {e}")
             checks["aws_bedrock"] = "warning"
@@ -731,14 +760,17 @@ async def health_check() -> HealthCheckResponse:
         # Add local LLM check if applicable
         if settings.analysis_mode == "local" and settings.use_local_llm:
             try:
-                import httpx
-                # Quick probe to see if Ollama/LiteLLM is alive
-                async with httpx.AsyncClient() as client:
-                    resp = await client.get(f"{settings.local_llm_url}/api/tags", timeout=1.0)
-                    if resp.status_code == 200:
-                        checks["local_llm"] = "ok"
-                    else:
-                        checks["local_llm"] = "degraded"
+                # Read-only: endpoint health is kept current by the pool's background probe
+                llm_pool = get_llm_endpoint_pool()
+                pool_status = llm_pool.get_status()
+                checks["llm_endpoints"] = pool_status
+                if pool_status["healthy_endpoints"] == len(llm_pool.endpoints):
+                    checks["local_llm"] = "ok"
+                elif pool_status["healthy_endpoints"]:
+                    checks["local_llm"] = "degraded"
+                else:
+                    checks["local_llm"] = "error"
+                    logger.warning("Local LLM service not reachable")
             except Exception:
                 checks["local_llm"] = "error"
                 logger.warning("Local LLM service not reachable")
@@ -756,6 +788,32 @@ async def health_check() -> HealthCheckResponse:
             logger.warning(f"Concurrent processor health check failed: {e}")
             checks["concurrent_processor"] = "warning"
         
+        # Add real-time channel statistics
+        checks["websocket"] = manager.get_status()
+        checks["event_bus"] = get_event_bus().get_status()
+        checks["status_notifier"] = get_status_notifier().get_status()
+        embedder = get_embedder()
+        if hasattr(embedder, "get_status"):
+            checks["embedding_cache"] = embedder.get_status()
+        checks["knowledge_search"] = get_hybrid_searcher().get_status()
+        checks["finding_stream"] = get_finding_stream_metrics().get_status()
+        checks["structured_output"] = get_structured_output_metrics().get_status()
+        checks["request_hedging"] = get_request_hedging_status()
+        checks["prompt_cache"] = get_prefix_cache_metrics().get_status()
+        if settings.use_local_llm:
+            checks["model_warmup"] = get_model_warmer().get_status()
+        
+        # Provider failover chain and circuit breaker states
+        provider_chain = router.provider_chain()
+        checks["provider_chain"] = [p.value for p in provider_chain]
+        # Failover is opt-in: only providers listed in ANALYSIS_PROVIDER_CHAIN are ever used
+        checks["provider_failover"] = (
+            "enabled" if len(provider_chain) > 1 else "disabled (set ANALYSIS_PROVIDER_CHAIN to opt in)"
+        )
+        checks["circuit_breakers"] = {p.value: get_circuit_breaker(p.value).get_status() for p in provider_chain}
+        primary_state = checks["circuit_breakers"][provider_chain[0].value]["state"]
+        checks["provider_circuit"] = "ok" if primary_state == BreakerState.CLOSED.value else "warning"
+        
         # Determine overall status
         status = "healthy"
         if any(check == "warning" for check in checks.values()):
@@ -1028,22 +1086,50 @@ async def start_analysis(
         )
 
 
+def _status_response(session_id: str, session_data: Dict[str, Any]) -> AnalysisStatusResponse:
+    """Build the status response model from a stored analysis session."""
+    return AnalysisStatusResponse(
+        success=True,
+        session_id=session_id,
+        status=session_data["status"],
+        progress=session_data["progress"],
+        current_step=session_data["current_step"],
+        started_at=session_data["started_at"],
+        completed_at=session_data["completed_at"],
+        estimated_completion=session_data["estimated_completion"],
+        error_message=session_data["error_message"]
+    )
+
+
 @app.get("/api/analysis/{session_id}", response_model=AnalysisStatusResponse)
 async def get_analysis_status(
-    session_id: str = Path(..., description="Analysis session ID")
+    response: Response,
+    session_id: str = Path(..., description="Analysis session ID"),
+    wait: float = Query(0.0, ge=0.0, description="Seconds to wait for a change when If-None-Match matches"),
+    if_none_match: str = Header(None, alias="If-None-Match")
 ) -> AnalysisStatusResponse:
     """
     Get the current status of an analysis session.
     
+    Supports conditional requests: the response carries an ``ETag`` and a
+    request whose ``If-None-Match`` still matches receives ``304 Not
+    Modified``. With ``wait`` set, such a request is held open until the
+    status changes or ``wait`` seconds elapse (long-poll).
+    
     Args:
         session_id: Unique identifier for the analysis session
+        wait: Maximum long-poll duration in seconds
+        if_none_match: ETag of the status the client already has
         
     Returns:
         AnalysisStatusResponse with current status and progress
     """
     try:
-        # Get session from database
-        session_data = await get_analysis_session(session_id)
+        notifier = get_status_notifier()
+        timeout = min(wait, settings.status_long_poll_max_seconds) if if_none_match else 0.0
+        session_data = await notifier.wait_for_new_status(
+            session_id, get_analysis_session, if_none_match, timeout
+        )
         
         if not session_data:
             raise HTTPException(
@@ -1051,19 +1137,15 @@ async def get_analysis_status(
                 detail="Analysis session not found"
             )
         
+        etag = status_etag(session_data)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
         logger.info(f"Retrieved status for analysis session {session_id}")
         
-        return AnalysisStatusResponse(
-            success=True,
-            session_id=session_id,
-            status=session_data["status"],
-            progress=session_data["progress"],
-            current_step=session_data["current_step"],
-            started_at=session_data["started_at"],
-            completed_at=session_data["completed_at"],
-            estimated_completion=session_data["estimated_completion"],
-            error_message=session_data["error_message"]
-        )
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return _status_response(session_id, session_data)
         
     except HTTPException:
         raise
@@ -1075,6 +1157,66 @@ async def get_analysis_status(
         )
 
 
+@app.get("/api/analysis/{session_id}/events")
+async def stream_analysis_status(
+    request: Request,
+    session_id: str = Path(..., description="Analysis session ID"),
+    last_event_id: str = Header(None, alias="Last-Event-ID")
+) -> StreamingResponse:
+    """
+    Stream status transitions of an analysis session as Server-Sent Events.
+    
+    A ``status`` event is sent for every change (its ``id`` is the status
+    ETag, so reconnecting clients resume without a duplicate) and comment
+    heartbeats keep idle connections open. The stream ends once the
+    session completes or fails.
+    
+    Args:
+        session_id: Unique identifier for the analysis session
+        last_event_id: ID of the last event received before reconnecting
+        
+    Returns:
+        StreamingResponse of ``text/event-stream``
+    """
+    notifier = get_status_notifier()
+    loaded_marker = notifier.change_marker
+    session_data = await notifier.get_snapshot(session_id, get_analysis_session)
+    if not session_data:
+        raise HTTPException(
+            status_code=404,
+            detail="Analysis session not found"
+        )
+    
+    async def event_stream():
+        snapshot = session_data
+        marker = loaded_marker
+        sent_etag = last_event_id
+        while True:
+            etag = status_etag(snapshot)
+            if not etag_matches(sent_etag, etag):
+                payload = _status_response(session_id, snapshot).model_dump_json()
+                yield f"event: status\nid: {etag}\ndata: {payload}\n\n"
+                sent_etag = etag
+            if is_terminal(snapshot) or await request.is_disconnected():
+                return
+            
+            changed = await notifier.wait_for_change(session_id, settings.status_sse_heartbeat_seconds, since=marker)
+            if not changed:
+                yield ": heartbeat\n\n"
+            marker = notifier.change_marker
+            latest = await notifier.get_snapshot(session_id, get_analysis_session)
+            if latest is None:
+                return
+            snapshot = latest
+    
+    logger.info(f"Streaming status events for analysis session {session_id}")
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/analysis/{session_id}/results", response_model=AnalysisResultsResponse)
 async def get_analysis_results(
     session_id: str = Path(..., description="Analysis session ID")
@@ -1144,6 +1286,8 @@ async def get_processing_status_endpoint() -> Dict[str, Any]:
     """
     try:
         status = await get_processing_status()
+        if settings.use_local_llm:
+            status["model_warmup"] = get_model_warmer().get_status()
         logger.debug("Retrieved processing status")
         return {
             "success": True,
@@ -1158,6 +1302,83 @@ async def get_processing_status_endpoint() -> Dict[str, Any]:
         )
 
 
+@app.get("/api/knowledge/search")
+async def search_knowledge(
+    q: str,
+    k: int = Query(default=5, ge=1, le=50),
+    source_type: Optional[List[str]] = Query(default=None)
+) -> Dict[str, Any]:
+    """
+    Search the regulatory knowledge base.
+    
+    Exact citations (e.g. "DFARS 252.204-7012") are resolved directly;
+    other queries combine full-text and vector similarity search.
+    
+    Args:
+        q: Citation, keywords or passage to search for
+        k: Number of chunks to return
+        source_type: Restrict results to these source types (FAR, DFARS, EO, ...)
+        
+    Returns:
+        Dict containing the matching chunks
+    """
+    try:
+        started = time.perf_counter()
+        chunks = await get_hybrid_searcher().search(q, k, source_type)
+        return {
+            "success": True,
+            "query": q,
+            "results": [asdict(chunk) for chunk in chunks],
+            "count": len(chunks),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 2),
+            "timestamp": datetime.utcnow()
+        }
+    except Exception as e:
+        logger.error(f"Knowledge search failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Knowledge search failed"
+        )
+
+
+@app.get("/api/intelligence/price-to-beat")
+async def price_to_beat(
+    agency: str,
+    naics: str,
+    keywords: Optional[List[str]] = Query(default=None),
+    horizon_months: int = Query(default=24, ge=1, le=120),
+    refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    "Price to Beat" analysis of an agency's award history for a NAICS code.
+    
+    Args:
+        agency: Awarding toptier agency name
+        naics: NAICS code
+        keywords: Optional award search keywords
+        horizon_months: How far ahead to look for recompetes
+        refresh: Recompute instead of using cached results
+        
+    Returns:
+        Dict containing pricing bands, incumbent share and recompete timing
+    """
+    try:
+        started = time.perf_counter()
+        analysis = await get_price_to_beat_engine().analyze(agency, naics, keywords, horizon_months, refresh)
+        return {
+            "success": True,
+            **analysis,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 2),
+            "timestamp": datetime.utcnow()
+        }
+    except Exception as e:
+        logger.error(f"Price to Beat analysis failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Price to Beat analysis failed"
+        )
+
+
 @app.post("/api/analysis/{session_id}/cancel")
 async def cancel_analysis_endpoint(
     session_id: str = Path(..., description="Analysis session ID to cancel")
@@ -1194,6 +1415,68 @@ async def cancel_analysis_endpoint(
         )
 
 
+@app.post("/api/analysis/batch")
+async def start_batch_analysis(request: BatchAnalysisRequest) -> Dict[str, Any]:
+    """
+    Re-analyze many documents through offline batch inference.
+    
+    The job runs in the background, outside the interactive analysis
+    queue; results are written to each document's new analysis session.
+    
+    Args:
+        request: Documents to re-analyze and optional executor
+        
+    Returns:
+        Dict containing the batch job status
+    """
+    try:
+        from batch_inference import BedrockBatchExecutor, LocalBatchExecutor, start_batch_job
+        executor = None
+        if request.executor == "bedrock":
+            executor = BedrockBatchExecutor()
+        elif request.executor == "local":
+            executor = LocalBatchExecutor()
+        job = start_batch_job(request.documents, executor)
+        
+        logger.info(f"Started batch job {job.job_id} for {len(request.documents)} documents")
+        return {
+            "success": True,
+            "job": job.get_status()
+        }
+    except Exception as e:
+        logger.error(f"Failed to start batch analysis: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to start batch analysis"
+        )
+
+
+@app.get("/api/analysis/batch/{job_id}")
+async def get_batch_analysis_status(
+    job_id: str = Path(..., description="Batch job ID")
+) -> Dict[str, Any]:
+    """
+    Get the progress of a batch re-analysis job.
+    
+    Args:
+        job_id: Batch job ID
+        
+    Returns:
+        Dict containing the batch job status
+    """
+    from batch_inference import get_batch_job
+    job = get_batch_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Batch job not found"
+        )
+    return {
+        "success": True,
+        "job": job.get_status()
+    }
+
+
 @app.get("/api/seed/status")
 async def get_seeding_status() -> Dict[str, Any]:
     """
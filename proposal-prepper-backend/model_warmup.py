@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Local LLM warm-up and keep-alive.
+
+Ollama loads a model on its first request and unloads it after
+``keep_alive`` of idleness, so the first analysis after a deploy or a
+quiet spell pays a multi-second load. ``ModelWarmer`` avoids that:
+
+- at startup it loads ``settings.local_llm_model`` on every endpoint in
+  the pool (a ``/api/generate`` call with an empty prompt only loads the
+  model), then sends a one-token ``/api/chat`` primer per agent persona
+  whose system message is that agent's prompt prefix (``prompt_prefix``),
+  so the first real call of each agent finds the prefix already evaluated.
+  Before each primer the prefix's token count is measured with the model's
+  own tokenizer and handed to ``PrefixCacheMetrics``, which needs it to
+  tell Ollama's cache hits from misses;
+- while the concurrent processor has queued or active analyses it
+  renews ``keep_alive`` every ``local_llm_keepalive_refresh_seconds``, so
+  gaps between requests (e.g. during PDF extraction) do not unload the
+  model. When idle the model is left to unload on its own.
+
+Every Ollama response reports its ``load_duration``; ``observe`` counts a
+request as cold when that exceeds ``local_llm_cold_load_seconds``, and
+``get_status()`` reports cold and warm latency separately.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from agent_personas import PERSONA_TYPES
+from config import get_settings
+from llm_endpoint_pool import LLMEndpointPool, get_llm_endpoint_pool
+from logging_config import get_logger
+from prompt_prefix import agent_prefix, get_prefix_cache_metrics
+from request_hedging import LatencyTracker
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+PRIMER_MESSAGE = "Reply with OK."
+
+
+class _LatencyStats:
+    """Count, mean and tail of one class of request latencies."""
+
+    def __init__(self, window: int = 200):
+        self.count = 0
+        self.total = 0.0
+        self.latencies = LatencyTracker(window)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.latencies.observe(seconds)
+
+    def get_status(self) -> Dict[str, Any]:
+        p95 = self.latencies.percentile(95)
+        return {
+            "requests": self.count,
+            "avg_ms": round(self.total / self.count * 1000.0, 1) if self.count else None,
+            "p95_ms": round(p95 * 1000.0, 1) if p95 is not None else None
+        }
+
+
+def _seconds(event: Dict[str, Any], key: str) -> Optional[float]:
+    """An Ollama duration field (nanoseconds) in seconds."""
+    value = event.get(key)
+    return value / 1e9 if value is not None else None
+
+
+class ModelWarmer:
+    """
+    Preloads the local model and keeps it loaded while there is work.
+
+    Args:
+        pool: Endpoints to warm (default: the global LLM endpoint pool)
+        model: Model to load (default: ``settings.local_llm_model``)
+        keep_alive: Ollama ``keep_alive`` duration sent with every request
+        refresh_interval: Seconds between keep-alive renewals
+        has_work: Whether analyses are queued or running (default: always)
+    """
+
+    def __init__(
+        self,
+        pool: Optional[LLMEndpointPool] = None,
+        model: Optional[str] = None,
+        keep_alive: Optional[str] = None,
+        refresh_interval: Optional[float] = None,
+        has_work: Optional[Callable[[], bool]] = None
+    ):
+        self.pool = pool or get_llm_endpoint_pool()
+        self.model = model or settings.local_llm_model
+        self.keep_alive = keep_alive or settings.local_llm_keep_alive
+        self.refresh_interval = refresh_interval or settings.local_llm_keepalive_refresh_seconds
+        self.has_work = has_work or (lambda: True)
+        self.warmed_up = False
+        self.warmup_seconds: Optional[float] = None
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.refreshes = 0
+        self.last_refresh: Optional[float] = None
+        self.cold = _LatencyStats()
+        self.warm = _LatencyStats()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _generate(self, client: httpx.AsyncClient, url: str, prompt: str, raw: bool = False) -> Dict[str, Any]:
+        response = await client.post(
+            f"{url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "raw": raw,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": 1}
+            },
+            timeout=300.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _measure_prefix(self, client: httpx.AsyncClient, url: str, persona: str) -> Optional[int]:
+        """
+        Tokens in a persona's prompt prefix, counted by the model's tokenizer.
+
+        The prefix is sent raw behind a random three-digit marker, so no
+        cached prompt shares more than its first token and the whole prefix
+        is evaluated. A different marker of the same length, sent alone,
+        gives the marker's own tokens to subtract.
+        """
+        first, second = random.sample(range(100, 1000), 2)
+        marked = await self._generate(client, url, f"{first}\n{agent_prefix(persona)}", raw=True)
+        marker = await self._generate(client, url, f"{second}\n", raw=True)
+        if marked.get("prompt_eval_count") is None or marker.get("prompt_eval_count") is None:
+            return None
+        return max(0, marked["prompt_eval_count"] - marker["prompt_eval_count"])
+
+    async def _prime(self, client: httpx.AsyncClient, url: str, persona: str) -> None:
+        response = await client.post(
+            f"{url}/api/chat",
+            json={
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": agent_prefix(persona)},
+                    {"role": "user", "content": PRIMER_MESSAGE}
+                ],
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": 1}
+            },
+            timeout=300.0
+        )
+        response.raise_for_status()
+
+    async def _warm_endpoint(self, client: httpx.AsyncClient, url: str) -> None:
+        started = time.monotonic()
+        loaded = await self._generate(client, url, "")
+        status: Dict[str, Any] = {
+            "load_seconds": round(_seconds(loaded, "load_duration") or time.monotonic() - started, 3),
+            "primers": {},
+            "prefix_tokens": {}
+        }
+        for persona in PERSONA_TYPES:
+            prefix_tokens = await self._measure_prefix(client, url, persona)
+            if prefix_tokens:
+                get_prefix_cache_metrics().set_prefix_tokens("ollama", agent_prefix(persona), prefix_tokens)
+                status["prefix_tokens"][persona] = prefix_tokens
+            primer_started = time.monotonic()
+            await self._prime(client, url, persona)
+            status["primers"][persona] = round(time.monotonic() - primer_started, 3)
+        self.endpoints[url] = status
+        logger.info(f"Warmed {self.model} at {url} (load {status['load_seconds']}s)")
+
+    async def warm_up(self) -> None:
+        """Load the model and prime every persona on each healthy endpoint."""
+        started = time.monotonic()
+        urls = [endpoint.url for endpoint in self.pool.endpoints if endpoint.healthy]
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(*(self._warm_endpoint(client, url) for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Model warm-up failed at {url}: {result}")
+                self.endpoints[url] = {"error": str(result)}
+        self.warmed_up = any("error" not in self.endpoints.get(url, {"error": ""}) for url in urls)
+        self.warmup_seconds = round(time.monotonic() - started, 3)
+        self.last_refresh = time.time()
+
+    async def refresh(self) -> bool:
+        """Renew ``keep_alive`` on every healthy endpoint if there is work; returns whether it did."""
+        if not self.has_work():
+            return False
+        urls = [endpoint.url for endpoint in self.pool.endpoints if endpoint.healthy]
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(*(self._generate(client, url, "") for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Keep-alive refresh failed at {url}: {result}")
+            elif (_seconds(result, "load_duration") or 0.0) > settings.local_llm_cold_load_seconds:
+                logger.info(f"{self.model} had been unloaded at {url}; reloaded by keep-alive refresh")
+        self.refreshes += 1
+        self.last_refresh = time.time()
+        return True
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Record the final event of an analysis request as a cold or warm latency."""
+        total = _seconds(event, "total_duration")
+        if total is None:
+            return
+        if (_seconds(event, "load_duration") or 0.0) > settings.local_llm_cold_load_seconds:
+            self.cold.observe(total)
+        else:
+            self.warm.observe(total)
+
+    async def _run(self) -> None:
+        try:
+            await self.warm_up()
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Keep-alive refresh failed: {e}")
+
+    def start(self) -> None:
+        """Warm up in the background, then keep the model loaded while there is work."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "keep_alive": self.keep_alive,
+            "warmed_up": self.warmed_up,
+            "warmup_seconds": self.warmup_seconds,
+            "endpoints": self.endpoints,
+            "keepalive_refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+            "cold": self.cold.get_status(),
+            "warm": self.warm.get_status()
+        }
+
+
+# Global warmer instance
+_warmer = None
+
+
+def _processor_has_work() -> bool:
+    from concurrent_processor import get_processor
+    processor = get_processor()
+    return processor.task_queue.qsize() > 0 or bool(processor.active_tasks)
+
+
+def get_model_warmer() -> ModelWarmer:
+    """Get the global model warmer."""
+    global _warmer
+    if _warmer is None:
+        _warmer = ModelWarmer(has_work=_processor_has_work)
+    return _warmer
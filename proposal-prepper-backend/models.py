@@ -71,6 +71,12 @@ class AnalysisStartRequest(BaseModel):
     callback_url: Optional[str] = Field(None, description="URL to notify when analysis completes")
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Request model for a bulk re-analysis through offline batch inference."""
+    documents: List[AnalysisStartRequest] = Field(..., min_length=1, description="Documents to re-analyze")
+    executor: Optional[Literal["bedrock", "local"]] = Field(None, description="Batch executor (default: BATCH_INFERENCE_EXECUTOR)")
+
+
 class AnalysisStartResponse(BaseModel):
     """Response model for analysis start request."""
     success: bool = Field(..., description="Whether the request was successful")
@@ -8,11 +8,12 @@ This module defines the schema for the Object-Based Intelligence (OBI)
 knowledge base, including vector storage for RAG capabilities.
 """
 
+import enum
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy import (
     Column, String, Integer, Float, DateTime, Text, Boolean, 
-    ForeignKey, JSON, Index, UniqueConstraint
+    ForeignKey, JSON, Index, UniqueConstraint, func, literal_column
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, UUID
@@ -21,6 +22,9 @@ import uuid
 
 from database import Base
 
+# Text search configuration of the full-text index; queries must use the same one
+FTS_CONFIG = literal_column("'english'::regconfig")
+
 class KnowledgeSource(Base):
     """
     Metadata for a regulatory or federal knowledge source.
@@ -67,16 +71,72 @@ class KnowledgeChunk(Base):
     
     __table_args__ = (
         Index('idx_obi_chunks_source_ref', 'source_id', 'reference_id'),
+        # Approximate nearest-neighbour index for cosine similarity search
+        Index(
+            'idx_obi_chunks_embedding_hnsw',
+            'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'}
+        ),
+        # Full-text index for lexical search (see chunk_search_vector)
+        Index('idx_obi_chunks_content_fts', func.to_tsvector(FTS_CONFIG, content), postgresql_using='gin'),
     )
 
+class EmbeddingCacheEntry(Base):
+    """
+    Content-addressed embedding cache.
+    Keyed on the SHA-256 of the embedded text plus the model and dimension,
+    so unchanged text is never embedded twice.
+    """
+    __tablename__ = "obi_embedding_cache"
+    
+    content_hash = Column(String(64), primary_key=True)
+    model = Column(String, primary_key=True)
+    dim = Column(Integer, primary_key=True)
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+def chunk_search_vector():
+    """``tsvector`` expression matching the full-text index on chunk content."""
+    return func.to_tsvector(FTS_CONFIG, KnowledgeChunk.content)
+
+SEARCH_INDEXES = {'idx_obi_chunks_embedding_hnsw', 'idx_obi_chunks_content_fts'}
+
+def ensure_search_indexes(connection) -> None:
+    """
+    Create the HNSW embedding and full-text indexes on an existing chunks table.
+    
+    ``create_all`` only creates indexes together with new tables, so
+    databases created before the indexes existed need them added explicitly.
+    """
+    for index in KnowledgeChunk.__table__.indexes:
+        if index.name in SEARCH_INDEXES:
+            index.create(bind=connection, checkfirst=True)
+
+class EOCrawlState(str, enum.Enum):
+    """States an Executive Order moves through in the crawl pipeline."""
+    DISCOVERED = "discovered"  # Known from the Federal Register index
+    DOWNLOADED = "downloaded"  # Raw text stored in the EO bucket
+    INDEXED = "indexed"        # Chunked into the knowledge base
+    FAILED = "failed"          # Gave up after repeated errors
+
+# Rows ingested before the state machine existed were marked "ingested"
+EO_DONE_STATES = (EOCrawlState.INDEXED.value, "ingested")
+
 class EOCrawlStatus(Base):
     """
     Tracks the state of the National Archives EO Crawler.
+    
+    Workers claim rows with a time-limited lease (lease_owner /
+    lease_expires_at) and checkpoint each state transition, so a crashed
+    worker's EOs are resumed from their last state once the lease expires.
     """
     __tablename__ = "obi_eo_crawl_status"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     eo_number = Column(String, nullable=False, unique=True)
+    document_number = Column(String, nullable=True) # Federal Register document number
     title = Column(String, nullable=False)
     signing_date = Column(DateTime, nullable=True)
     publication_date = Column(DateTime, nullable=True)
@@ -86,5 +146,17 @@ class EOCrawlStatus(Base):
     last_crawl_attempt = Column(DateTime, nullable=False, default=datetime.utcnow)
     error_message = Column(Text, nullable=True)
     
+    # Crawl worker state
+    raw_text_url = Column(String, nullable=True)
+    raw_text_key = Column(String, nullable=True) # Object key in the EO bucket
+    attempts = Column(Integer, nullable=False, default=0) # Attempts at the current state
+    next_attempt_at = Column(DateTime, nullable=True)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_obi_eo_crawl_status_claim', 'status', 'next_attempt_at'),
+    )
@@ -3,33 +3,166 @@
 
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import re
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from models import ComplianceIssue, RegulatoryReference, ComplianceResults, ComplianceSummary
 
 logger = logging.getLogger(__name__)
 
-def extract_json_from_text(text: str) -> str:
+# A "{" that can start a JSON object: followed by a key, "}" or the end of a truncated response
+_OBJECT_START = re.compile(r'\{\s*(?:"|\}|$)')
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _scan_object(text: str, start: int, repair: bool) -> Tuple[Optional[str], int, bool]:
+    """
+    Scan one JSON object starting at ``text[start] == "{"``.
+
+    A single pass over the structural characters tracks strings and nesting,
+    recording the fixes for trailing commas and raw control characters in
+    strings. With ``repair`` a truncated object is cut back to the last
+    complete member or element and closed; incomplete array elements are
+    dropped rather than closed empty.
+
+    Returns:
+        (object text or None, position after it, whether it was repaired);
+        the text is None if the brackets do not form an object or the
+        object is truncated. After a mismatched closing bracket the
+        position is past that bracket, so objects nested in the broken
+        one are not returned as roots.
     """
-    Extracts JSON content from a potentially messy string (markdown wrappers, prefix/suffix).
+    stack: List[str] = []
+    # Whether each open container is an array element, and how many such are open
+    is_element: List[bool] = []
+    open_elements = 0
+    edits: List[Tuple[int, str]] = []
+    pending_comma: Optional[int] = None
+    # Where a truncated object can be cut, and how many containers are open there
+    boundary, boundary_depth = start, 0
+    in_string = False
+    pos = start
+    while True:
+        if in_string:
+            match = _STRING_SPECIAL.search(text, pos)
+            if match is None:
+                break
+            char, index = match.group(), match.start()
+            if char == '"':
+                in_string = False
+                pos = index + 1
+            elif char == "\\":
+                pos = index + 2
+            else:
+                edits.append((index, _CONTROL_ESCAPES.get(char, f"\\u{ord(char):04x}")))
+                pos = index + 1
+            continue
+
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            break
+        char, index = match.group(), match.start()
+        pos = index + 1
+        if pending_comma is not None:
+            if char in "}]" and not text[pending_comma + 1:index].strip():
+                edits.append((pending_comma, ""))
+            pending_comma = None
+        if char == '"':
+            in_string = True
+        elif char == ",":
+            pending_comma = index
+            if open_elements == 0:
+                # The member or element before a comma is complete
+                boundary, boundary_depth = index, len(stack)
+        elif char in "{[":
+            element = bool(stack) and stack[-1] == "["
+            if open_elements == 0:
+                # Array elements are only kept once complete, so cut before them
+                boundary, boundary_depth = (index, len(stack)) if element else (pos, len(stack) + 1)
+            stack.append(char)
+            is_element.append(element)
+            open_elements += element
+        else:
+            if not stack or _CLOSERS[stack.pop()] != char:
+                return None, pos, False
+            open_elements -= is_element.pop()
+            if not stack:
+                return _apply_edits(text, start, pos, edits), pos, False
+            if open_elements == 0:
+                boundary, boundary_depth = pos, len(stack)
+
+    if not repair:
+        return None, len(text), False
+    # Containers open at the boundary can only close by moving it, so they are still the bottom of the stack
+    body = _apply_edits(text, start, boundary, [e for e in edits if e[0] < boundary]).rstrip()
+    if body.endswith(","):
+        body = body[:-1]
+    logger.warning(f"Repairing truncated JSON: dropped {len(text) - boundary} trailing characters")
+    return body + "".join(_CLOSERS[opener] for opener in reversed(stack[:boundary_depth])), len(text), True
+
+
+def _apply_edits(text: str, start: int, end: int, edits: List[Tuple[int, str]]) -> str:
+    if not edits:
+        return text[start:end]
+    parts, pos = [], start
+    for index, replacement in edits:
+        parts.append(text[pos:index])
+        parts.append(replacement)
+        pos = index + 1
+    parts.append(text[pos:end])
+    return "".join(parts)
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _iter_objects(text: str, repair: bool) -> Iterator[Tuple[str, Optional[Any], bool]]:
+    """Yield (object text, decoded value or None if not yet decoded, whether repaired) for each candidate."""
+    pos = 0
+    while True:
+        match = _OBJECT_START.search(text, pos)
+        if match is None:
+            return
+        start = match.start()
+        try:
+            # Fast path: well-formed JSON is decoded in C, ignoring whatever follows it
+            value, end = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            candidate, pos, repaired = _scan_object(text, start, repair)
+            if candidate is not None:
+                yield candidate, None, repaired
+        else:
+            pos = end
+            yield text[start:end], value, False
+
+
+def iter_json_objects(text: str, repair: bool = False) -> Iterator[str]:
+    """
+    Yield candidate top-level JSON objects in ``text``, in order.
+
+    Prose and markdown fences around the objects are skipped, including
+    prose containing braces. Trailing commas and raw newlines or tabs
+    inside strings are fixed. With ``repair``, an object cut off by the
+    end of the text is closed after its last complete element.
+    """
+    for candidate, _, _ in _iter_objects(text, repair):
+        yield candidate
+
+
+def extract_json_from_text(text: str, repair: bool = False) -> str:
+    """
+    Extracts the first JSON object from a potentially messy string (markdown wrappers, prefix/suffix).
+
+    Raises:
+        ValueError: If no complete object is found (or, with ``repair``, no object at all)
     """
     if not text:
         raise ValueError("Empty response text")
-        
-    # Handle markdown wrappers
-    if "```json" in text:
-        try:
-            return text.split("```json")[1].split("```")[0].strip()
-        except IndexError:
-            pass
-            
-    # Fallback: Find the first '{' and last '}'
-    start = text.find('{')
-    end = text.rfind('}') + 1
-    
-    if start == -1 or end == 0:
-        raise ValueError("No JSON object found in text")
-        
-    return text[start:end]
+    for candidate in iter_json_objects(text, repair):
+        return candidate
+    raise ValueError("No JSON object found in text")
 
 def map_issue_data(issue_data: Dict[str, Any], document_id: str, index: int, prefix: str = "") -> ComplianceIssue:
     """ Maps a raw dict from AI into a ComplianceIssue object. """
@@ -51,12 +184,155 @@ def map_issue_data(issue_data: Dict[str, Any], document_id: str, index: int, pre
         remediation=issue_data.get("remediation")
     )
 
-def parse_llm_json(content: str) -> Dict[str, Any]:
-    """ Extracts and parses JSON from LLM content string. """
-    json_str = extract_json_from_text(content)
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode JSON: {e}")
-        logger.debug(f"Raw JSON string: {json_str}")
-        raise ValueError(f"Invalid JSON format: {str(e)}")
+def parse_llm_json(content: str, repair: bool = False) -> Dict[str, Any]:
+    """
+    Extracts and parses the first JSON object from an LLM content string.
+
+    Args:
+        content: Raw model output
+        repair: Salvage the complete issues of a truncated object instead of failing
+
+    Raises:
+        ValueError: If no valid JSON object is found, or a truncated object
+            has no complete ``issues`` element to salvage
+    """
+    if not content:
+        raise ValueError("Empty response text")
+    error = None
+    for json_str, data, repaired in _iter_objects(content, repair):
+        if data is None:
+            try:
+                data = json.loads(json_str)
+            except json.JSONDecodeError as e:
+                error = error or e
+                logger.debug(f"Skipping invalid JSON candidate: {json_str[:200]}")
+                continue
+        if repaired and not (isinstance(data, dict) and isinstance(data.get("issues"), list) and data["issues"]):
+            # A truncated response without a complete issue is a failed analysis, not a clean one
+            raise ValueError("Truncated JSON response with no complete issues")
+        if isinstance(data, dict):
+            return data
+    if error is None:
+        raise ValueError("No JSON object found in text")
+    logger.error(f"Failed to decode JSON: {error}")
+    raise ValueError(f"Invalid JSON format: {str(error)}")
+
+
+class IncrementalIssueParser:
+    """
+    Parses a streamed LLM JSON response, yielding ``issues[]`` elements as they complete.
+
+    Feed text fragments as they arrive; each call returns the issue objects
+    whose closing brace was in that fragment. Text before the root object
+    (e.g. a markdown fence) and after it is ignored. Only the issues found
+    so far and the rest of the root object (with an empty issues array) are
+    kept, so the full response is never held in memory.
+    """
+
+    def __init__(self, key: str = "issues"):
+        self.key = key
+        self.issues: List[Dict[str, Any]] = []
+        self._skeleton: List[str] = []
+        self._element: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._done = False
+        self._string: List[str] = []
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._in_array = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a fragment; returns issues completed by it."""
+        completed = []
+        for char in text:
+            if self._done:
+                break
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+
+            if self._in_array and not (char == "]" and self._depth == 2 and not self._in_string):
+                self._array_char(char, completed)
+                continue
+
+            self._skeleton.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = "".join(self._string)
+                else:
+                    if self._depth == 1:
+                        self._string.append(char)
+            elif char == '"':
+                self._in_string = True
+                self._string = []
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._current_key == self.key:
+                    self._in_array = True
+            elif char in "}]":
+                self._depth -= 1
+                if char == "]" and self._in_array and self._depth == 1:
+                    self._in_array = False
+                elif self._depth == 0:
+                    self._done = True
+        return completed
+
+    def _array_char(self, char: str, completed: List[Dict[str, Any]]) -> None:
+        """Track one character inside the issues array, capturing its objects."""
+        if self._depth > 2:
+            self._element.append(char)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            self._in_string = True
+        elif char in "{[":
+            if self._depth == 2:
+                self._element = [char]
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 2:
+                try:
+                    element = json.loads("".join(self._element))
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping malformed streamed issue: {e}")
+                else:
+                    if isinstance(element, dict):
+                        self.issues.append(element)
+                        completed.append(element)
+                self._element = []
+
+    def result(self) -> Dict[str, Any]:
+        """
+        The complete response object with every parsed issue.
+
+        Raises:
+            ValueError: If the stream did not contain a complete JSON object
+        """
+        if not self._done:
+            raise ValueError("Incomplete JSON object in streamed response")
+        try:
+            data = json.loads("".join(self._skeleton))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON format: {str(e)}")
+        if not isinstance(data, dict):
+            raise ValueError("Streamed response is not a JSON object")
+        data[self.key] = list(self.issues)
+        return data
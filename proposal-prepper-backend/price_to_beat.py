@@ -0,0 +1,257 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+"Price to Beat" analytics over USAspending award history.
+
+For an agency and NAICS code, the award history from IntelligenceFusion is
+loaded into a pandas frame and summarized with vectorized operations:
+- pricing bands: percentiles of total and annualized award value;
+- incumbent share: obligations and award counts per recipient, with the
+  Herfindahl-Hirschman index of market concentration;
+- recompete timing: awards whose period of performance ends within the
+  horizon, bucketed by quarter.
+
+The aggregates are kept as Parquet tables under
+``settings.price_to_beat_cache_dir`` for
+``settings.price_to_beat_cache_ttl_seconds``, so repeat dashboard queries
+read a few small columnar files instead of re-querying USAspending.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import get_settings
+from intelligence_fusion import INCUMBENT_FIELDS, IntelligenceFusion, normalize_payload
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+TABLES = ("bands", "incumbents", "recompetes", "summary")
+
+_DAYS_PER_YEAR = 365.25
+_DAYS_PER_MONTH = _DAYS_PER_YEAR / 12
+
+
+def _column(raw: pd.DataFrame, name: str) -> pd.Series:
+    return raw[name] if name in raw else pd.Series([None] * len(raw), index=raw.index, dtype=object)
+
+
+def awards_frame(awards: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Typed frame of USAspending award search results.
+
+    Awards without a positive amount are dropped. ``annual_value`` is the
+    award amount divided by its period of performance in years (at least
+    one month), or NaN when the dates are missing.
+    """
+    raw = pd.DataFrame.from_records(awards)
+    frame = pd.DataFrame({
+        "award_id": _column(raw, "Award ID").astype("string"),
+        "recipient": _column(raw, "Recipient Name").fillna("UNKNOWN").astype("string").str.strip().str.upper(),
+        "amount": pd.to_numeric(_column(raw, "Award Amount"), errors="coerce"),
+        "start_date": pd.to_datetime(_column(raw, "Start Date"), errors="coerce"),
+        "end_date": pd.to_datetime(_column(raw, "End Date"), errors="coerce")
+    })
+    frame = frame[frame["amount"] > 0].reset_index(drop=True)
+    years = (frame["end_date"] - frame["start_date"]).dt.days / _DAYS_PER_YEAR
+    frame["annual_value"] = frame["amount"] / years.clip(lower=1 / 12)
+    return frame
+
+
+def pricing_bands(frame: pd.DataFrame, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> pd.DataFrame:
+    """Percentiles of total and annualized award value (one row per metric and percentile)."""
+    metrics = ["amount", "annual_value"]
+    values = frame[metrics].to_numpy(dtype=float)
+    if len(values):
+        # One pass computes every percentile for both metrics
+        bands = np.nanpercentile(values, percentiles, axis=0)
+    else:
+        bands = np.full((len(percentiles), len(metrics)), np.nan)
+    return pd.DataFrame({
+        "metric": np.repeat(metrics, len(percentiles)),
+        "percentile": np.tile(np.asarray(percentiles, dtype=float), len(metrics)),
+        "value": bands.T.ravel()
+    })
+
+
+def incumbent_share(frame: pd.DataFrame) -> pd.DataFrame:
+    """Obligations, award count and share of total obligations per recipient, largest first."""
+    shares = (
+        frame.groupby("recipient", sort=False)
+        .agg(obligated=("amount", "sum"), awards=("amount", "size"), latest_end_date=("end_date", "max"))
+        .reset_index()
+    )
+    total = shares["obligated"].sum()
+    shares["share"] = shares["obligated"] / total if total else 0.0
+    return shares.sort_values("obligated", ascending=False, ignore_index=True)
+
+
+def recompete_timeline(frame: pd.DataFrame, as_of: datetime, horizon_months: int = 24) -> pd.DataFrame:
+    """Awards ending within the horizon, soonest first, with months remaining and quarter."""
+    as_of = pd.Timestamp(as_of)
+    months = (frame["end_date"] - as_of).dt.days / _DAYS_PER_MONTH
+    upcoming = frame.loc[(months >= 0) & (months <= horizon_months)].copy()
+    upcoming["months_until_end"] = months[upcoming.index].round(1)
+    upcoming["quarter"] = upcoming["end_date"].dt.to_period("Q").astype(str)
+    columns = ["award_id", "recipient", "amount", "annual_value", "end_date", "months_until_end", "quarter"]
+    return upcoming.sort_values("end_date", ignore_index=True)[columns]
+
+
+def analyze_awards(
+    awards: List[Dict[str, Any]],
+    as_of: Optional[datetime] = None,
+    horizon_months: int = 24
+) -> Dict[str, pd.DataFrame]:
+    """Compute every Price to Beat table for an award history."""
+    as_of = as_of or datetime.utcnow()
+    frame = awards_frame(awards)
+    bands = pricing_bands(frame)
+    incumbents = incumbent_share(frame)
+    recompetes = recompete_timeline(frame, as_of, horizon_months)
+
+    annual_median = bands.loc[(bands.metric == "annual_value") & (bands.percentile == 50), "value"]
+    summary = pd.DataFrame([{
+        "award_count": len(frame),
+        "total_obligated": float(frame["amount"].sum()),
+        # The median annualized award is the price a competitive bid has to beat
+        "price_to_beat": float(annual_median.iloc[0]) if len(annual_median) else np.nan,
+        "hhi": float(((incumbents["share"] * 100) ** 2).sum()),
+        "top_incumbent": incumbents["recipient"].iloc[0] if len(incumbents) else None,
+        "recompete_value": float(recompetes["amount"].sum()),
+        "as_of": pd.Timestamp(as_of),
+        "computed_at": time.time()
+    }])
+    return {"bands": bands, "incumbents": incumbents, "recompetes": recompetes, "summary": summary}
+
+
+class ParquetResultCache:
+    """Pre-aggregated result tables stored as one Parquet file per table."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(**query: Any) -> str:
+        return hashlib.sha256(normalize_payload(query).encode("utf-8")).hexdigest()[:24]
+
+    def load(self, key: str, max_age_seconds: float) -> Optional[Dict[str, pd.DataFrame]]:
+        """Cached tables, or None when missing or older than max_age_seconds."""
+        entry = self.directory / key
+        try:
+            # The summary is written last, so its presence marks a complete entry
+            summary = pd.read_parquet(entry / "summary.parquet")
+            if time.time() - float(summary["computed_at"].iloc[0]) > max_age_seconds:
+                return None
+            tables = {name: pd.read_parquet(entry / f"{name}.parquet") for name in TABLES if name != "summary"}
+        except (OSError, ValueError, KeyError, IndexError):
+            return None
+        tables["summary"] = summary
+        return tables
+
+    def save(self, key: str, tables: Dict[str, pd.DataFrame]) -> None:
+        entry = self.directory / key
+        entry.mkdir(parents=True, exist_ok=True)
+        for name in TABLES:
+            path = entry / f"{name}.parquet"
+            tmp = path.with_suffix(".tmp")
+            tables[name].to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-friendly rows: ISO dates and None for missing values."""
+    frame = frame.copy()
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime("%Y-%m-%d")
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+
+class PriceToBeatEngine:
+    """Price to Beat analysis for an agency and NAICS code, backed by the Parquet cache."""
+
+    def __init__(
+        self,
+        fusion: Optional[IntelligenceFusion] = None,
+        cache_dir: Optional[str] = None,
+        max_age_seconds: Optional[float] = None
+    ):
+        self.fusion = fusion or IntelligenceFusion()
+        self.cache = ParquetResultCache(cache_dir or settings.price_to_beat_cache_dir)
+        self.max_age_seconds = max_age_seconds or settings.price_to_beat_cache_ttl_seconds
+
+    async def analyze(
+        self,
+        agency_name: str,
+        naics_code: str,
+        keywords: Optional[List[str]] = None,
+        horizon_months: int = 24,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Pricing bands, incumbent share and recompete timing for a market.
+
+        Args:
+            agency_name: Awarding toptier agency
+            naics_code: NAICS code of the requirement
+            keywords: Optional award search keywords
+            horizon_months: How far ahead to look for recompetes
+            refresh: Recompute even if a fresh cached result exists
+
+        Returns:
+            Dict with the summary and each table as a list of records
+        """
+        key = self.cache.key(
+            agency=agency_name, naics=naics_code, keywords=keywords or [], horizon=horizon_months
+        )
+        tables = None if refresh else await asyncio.to_thread(self.cache.load, key, self.max_age_seconds)
+        cached = tables is not None
+        if not cached:
+            awards = await self.fusion.search_awards(
+                IntelligenceFusion.incumbent_filters(agency_name, naics_code, keywords),
+                INCUMBENT_FIELDS,
+                max_results=settings.price_to_beat_max_awards
+            )
+            tables = await asyncio.to_thread(analyze_awards, awards, None, horizon_months)
+            try:
+                await asyncio.to_thread(self.cache.save, key, tables)
+            except OSError as e:
+                logger.warning(f"Could not cache Price to Beat results: {e}")
+
+        summary = _records(tables["summary"])[0]
+        return {
+            "agency": agency_name,
+            "naics_code": naics_code,
+            **summary,
+            "pricing_bands": _records(tables["bands"]),
+            "incumbents": _records(tables["incumbents"]),
+            "recompetes": _records(tables["recompetes"]),
+            "cached": cached
+        }
+
+    async def close(self):
+        await self.fusion.close()
+
+
+# Global engine instance
+_price_to_beat_engine = None
+
+
+def get_price_to_beat_engine() -> PriceToBeatEngine:
+    """Get the global Price to Beat engine instance."""
+    global _price_to_beat_engine
+    if _price_to_beat_engine is None:
+        _price_to_beat_engine = PriceToBeatEngine()
+    return _price_to_beat_engine
@@ -0,0 +1,248 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Stable prompt prefixes for backend prefix caching.
+
+Agent prompts are split into a prefix that is byte-identical across calls
+(the shared output instructions, then the agent's persona SOP) and a
+suffix carrying the call's filename, context and document slice. Backends
+that keep the evaluated state of a prompt prefix then only evaluate the
+suffix:
+
+- Ollama reuses the longest common prefix between a new prompt and the
+  prompt last evaluated in a slot; the prefix is sent as the system
+  message so the chat template keeps it first, and sticky endpoint
+  routing (``llm_endpoint_pool``) keeps a session's agents on one server.
+  The instructions shared by all agents come first, so even a slot last
+  used by another agent reuses that part.
+- Anthropic models on Bedrock cache a content block marked with
+  ``cache_control`` when ``settings.bedrock_prompt_caching`` is on and
+  the model supports prompt caching. Prefixes below the model's minimum
+  cacheable length are simply not cached.
+
+``PrefixCacheMetrics`` reports the prompt tokens each backend evaluated
+and those served from cache and, from the measured prefill rate, the
+prompt-eval time saved, overall and per analysis session.
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from agent_personas import get_persona_prompt
+from llm_endpoint_pool import current_session
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# No tokenizer in use averages more characters per token than this over a
+# passage, so a suffix of n characters is at least n / 8 tokens
+MAX_CHARS_PER_TOKEN = 8
+
+# Output contract shared by every specialized agent; keep it byte-stable
+AGENT_OUTPUT_INSTRUCTIONS = """You review federal proposal documents for compliance issues within your specialty, described below.
+
+IMPORTANT: Return VALID JSON only.
+JSON Format:
+{
+    "overall_status": "pass|fail|warning",
+    "overall_score": 0-100,
+    "issues": [
+        {
+            "severity": "critical|warning|info",
+            "title": "string",
+            "description": "string",
+            "regulation": {"regulation": "FAR|EO|Technical", "section": "string", "title": "string"},
+            "confidence": 0-1
+        }
+    ]
+}
+"""
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """A prompt as a cacheable prefix and a per-call suffix."""
+    prefix: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+def agent_prefix(agent_type: str) -> str:
+    """The cacheable prefix shared by every call of one specialized agent."""
+    return f"""{AGENT_OUTPUT_INSTRUCTIONS}
+{get_persona_prompt(agent_type)}
+
+Analyze the document in the next message for compliance based on your specialty.
+"""
+
+
+def agent_prompt(agent_type: str, document_text: str, filename: str) -> PromptParts:
+    """Prompt for one specialized agent call."""
+    suffix = f"""Document: {filename}
+Content: {document_text}
+"""
+    return PromptParts(agent_prefix(agent_type), suffix)
+
+
+class PrefixCacheMetrics:
+    """
+    Prompt tokens served from a backend prefix cache, and the time that saved.
+
+    Bedrock reports a call's cached tokens. Ollama only reports the prompt
+    tokens it evaluated (``prompt_eval_count``), so the token count of each
+    prefix is measured by the model itself (see ``model_warmup``) and set
+    with ``set_prefix_tokens``. A call's prompt is then at least that many
+    tokens plus its suffix at ``MAX_CHARS_PER_TOKEN``; its cached tokens
+    are that total minus the tokens evaluated, capped at the prefix. The
+    suffix bound holds for any text density, so the estimate under-reports
+    rather than invents cache hits, and a prefix that was never measured
+    reports none. Time saved is cached tokens times the backend's measured
+    prefill seconds per token.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.evaluated_tokens = 0
+        self.cached_tokens = 0
+        self.saved_seconds = 0.0
+        self._seconds_per_token: Dict[str, float] = {}
+        # Measured prefix token counts, per (backend, prefix)
+        self._prefix_tokens: Dict[Tuple[str, str], int] = {}
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def seconds_per_token(self, backend: str) -> Optional[float]:
+        return self._seconds_per_token.get(backend)
+
+    def _observe_rate(self, backend: str, evaluated_tokens: Optional[int], prefill_seconds: Optional[float]) -> None:
+        if not evaluated_tokens or prefill_seconds is None or prefill_seconds <= 0:
+            return
+        rate = prefill_seconds / evaluated_tokens
+        previous = self._seconds_per_token.get(backend)
+        # Exponential moving average: prefill speed drifts with load and prompt length
+        self._seconds_per_token[backend] = rate if previous is None else 0.8 * previous + 0.2 * rate
+
+    @staticmethod
+    def _key(backend: str, prefix: str) -> Tuple[str, str]:
+        return backend, hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+
+    def set_prefix_tokens(self, backend: str, prefix: str, tokens: int) -> None:
+        """Set the measured token count of a prompt prefix on a backend."""
+        self._prefix_tokens[self._key(backend, prefix)] = tokens
+
+    def prefix_tokens(self, backend: str, prefix: str) -> Optional[int]:
+        return self._prefix_tokens.get(self._key(backend, prefix))
+
+    def _cached_from_prefix(self, backend: str, parts: PromptParts, evaluated_tokens: int) -> int:
+        prefix_tokens = self.prefix_tokens(backend, parts.prefix) if parts.prefix else None
+        if not prefix_tokens or not evaluated_tokens:
+            return 0
+        prompt_tokens = prefix_tokens + math.ceil(len(parts.suffix) / MAX_CHARS_PER_TOKEN)
+        return min(max(0, prompt_tokens - evaluated_tokens), prefix_tokens)
+
+    def record(
+        self,
+        backend: str,
+        parts: PromptParts,
+        evaluated_tokens: Optional[int] = None,
+        cached_tokens: Optional[int] = None,
+        prefill_seconds: Optional[float] = None,
+        session_id: Optional[str] = None
+    ) -> None:
+        """
+        Record one call.
+
+        Args:
+            backend: "ollama" or "bedrock"
+            parts: The prompt sent
+            evaluated_tokens: Prompt tokens the backend evaluated, if reported
+            cached_tokens: Prompt tokens read from cache, if reported;
+                otherwise derived from ``evaluated_tokens``
+            prefill_seconds: Time the backend spent evaluating the prompt
+            session_id: Analysis session (default: the ``llm_session`` context)
+        """
+        evaluated_tokens = evaluated_tokens or 0
+        if cached_tokens is None:
+            cached_tokens = self._cached_from_prefix(backend, parts, evaluated_tokens)
+        prompt_tokens = evaluated_tokens + cached_tokens
+        self._observe_rate(backend, evaluated_tokens, prefill_seconds)
+        rate = self._seconds_per_token.get(backend)
+        saved = cached_tokens * rate if rate is not None else 0.0
+
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.evaluated_tokens += evaluated_tokens
+        self.cached_tokens += cached_tokens
+        self.saved_seconds += saved
+
+        session_id = session_id or current_session()
+        if session_id is None:
+            return
+        session = self._sessions.setdefault(session_id, {
+            "calls": 0, "prompt_tokens": 0, "evaluated_tokens": 0, "cached_tokens": 0, "saved_seconds": 0.0
+        })
+        self._sessions.move_to_end(session_id)
+        session["calls"] += 1
+        session["prompt_tokens"] += prompt_tokens
+        session["evaluated_tokens"] += evaluated_tokens
+        session["cached_tokens"] += cached_tokens
+        session["saved_seconds"] += saved
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def pop_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The totals of one analysis session, removing them from tracking."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        return {
+            **session,
+            "saved_seconds": round(session["saved_seconds"], 3),
+            "cache_hit_rate": round(session["cached_tokens"] / session["prompt_tokens"], 4) if session["prompt_tokens"] else None
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "evaluated_tokens": self.evaluated_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else None,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "prefill_ms_per_token": {
+                backend: round(rate * 1000.0, 3) for backend, rate in sorted(self._seconds_per_token.items())
+            }
+        }
+
+
+class PrefillTimer:
+    """Time from sending a streamed request to its first generated token."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.seconds: Optional[float] = None
+
+    def token(self) -> None:
+        if self.seconds is None:
+            self.seconds = time.monotonic() - self.started
+
+
+# Global metrics instance
+_metrics = None
+
+
+def get_prefix_cache_metrics() -> PrefixCacheMetrics:
+    """Get the global prefix cache metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = PrefixCacheMetrics()
+    return _metrics
@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Asynchronous token-bucket rate limiting.
+
+Used to keep crawlers and API clients within a polite or contractual
+request rate while still allowing short bursts. ``AdaptiveRateLimiter``
+adds per-minute request and token quotas that back off when the service
+throttles.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate`` tokens per second.
+
+    ``acquire`` waits until enough tokens are available; waiters are served
+    in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens available right now."""
+        self._refill()
+        return self._tokens
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate; tokens already accrued are kept."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self._refill()
+        self.rate = rate
+
+    def refund(self, tokens: float) -> None:
+        """Return tokens that were taken but not used."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def drain(self) -> None:
+        """Drop the accrued burst so the next requests are paced at the current rate."""
+        self._refill()
+        self._tokens = 0.0
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available without waiting."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, waiting for the bucket to refill if necessary.
+
+        Requests larger than the bucket are capped at its capacity.
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class AdaptiveRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets with AIMD backoff.
+
+    Both buckets start at the configured quota. ``on_throttle`` cuts the
+    rates multiplicatively (at most once per ``cooldown`` seconds, since
+    requests already in flight tend to be throttled together) and drops the
+    accrued burst; each ``on_success`` then recovers a fixed fraction of the
+    quota until the full rate is reached again.
+
+    Args:
+        requests_per_minute: Request quota
+        tokens_per_minute: Token quota (input plus reserved output tokens)
+        decrease_factor: Rate multiplier applied on throttling
+        recovery_step: Fraction of the quota regained per successful request
+        min_fraction: Lowest fraction of the quota the rate is cut to
+        cooldown: Seconds after a cut during which further throttles are ignored
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        decrease_factor: float = 0.5,
+        recovery_step: float = 0.05,
+        min_fraction: float = 0.05,
+        cooldown: float = 2.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.decrease_factor = decrease_factor
+        self.recovery_step = recovery_step
+        self.min_fraction = min_fraction
+        self.cooldown = cooldown
+        self._clock = clock
+        # Quotas are per minute, so up to a minute's worth may be spent at once
+        self.requests = TokenBucket(requests_per_minute / 60.0, capacity=max(1.0, requests_per_minute), clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute, clock=clock)
+        self.fraction = 1.0
+        self._last_cut: Optional[float] = None
+        self.throttles = 0
+        self.waited = 0.0
+
+    async def acquire(self, tokens: float) -> float:
+        """Wait for one request slot and ``tokens`` tokens; returns seconds waited."""
+        waited = await self.requests.acquire()
+        waited += await self.tokens.acquire(tokens)
+        self.waited += waited
+        return waited
+
+    def refund(self, tokens: float) -> None:
+        """Return reserved tokens the request did not use."""
+        if tokens > 0:
+            self.tokens.refund(tokens)
+
+    def _apply(self) -> None:
+        self.requests.set_rate(self.requests_per_minute / 60.0 * self.fraction)
+        self.tokens.set_rate(self.tokens_per_minute / 60.0 * self.fraction)
+
+    def on_success(self) -> None:
+        if self.fraction < 1.0:
+            self.fraction = min(1.0, self.fraction + self.recovery_step)
+            self._apply()
+
+    def on_throttle(self) -> None:
+        self.throttles += 1
+        now = self._clock()
+        if self._last_cut is not None and now - self._last_cut < self.cooldown:
+            return
+        self._last_cut = now
+        self.fraction = max(self.min_fraction, self.fraction * self.decrease_factor)
+        self._apply()
+        self.requests.drain()
+        self.tokens.drain()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": round(self.requests.rate * 60.0, 2),
+            "tokens_per_minute": round(self.tokens.rate * 60.0),
+            "quota_fraction": round(self.fraction, 3),
+            "throttles": self.throttles,
+            "seconds_waited": round(self.waited, 2)
+        }
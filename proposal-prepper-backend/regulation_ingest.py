@@ -0,0 +1,337 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Bulk ingestion of the FAR and DFARS corpus from object storage.
+
+Lists ``settings.s3_far_bucket`` and ``settings.s3_dfars_bucket`` and loads
+every PDF, HTML, XML or text object into the OBI knowledge base:
+- objects whose ETag matches the one recorded on their knowledge source
+  at the last run are skipped;
+- downloads run on a thread pool while text extraction and chunking run
+  in parallel on a process pool;
+- documents are chunked by regulation section, and each chunk gets the
+  reference of its section ("FAR 15.408", "DFARS 252.204-7012");
+- each document replaces its previous source and chunks in a single
+  transaction using multi-row INSERTs, then its chunks are embedded.
+
+Run ``python regulation_ingest.py`` (``--help`` for options).
+"""
+
+import argparse
+import asyncio
+import io
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from config import get_settings
+from database import get_async_session
+from eo_crawl_worker import _create_s3_client
+from knowledge_chunker import TextChunk, chunk_rows, chunk_text, delete_sources, insert_chunks
+from logging_config import get_logger
+from obi_models import KnowledgeSource
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+SUPPORTED_SUFFIXES = {".pdf", ".html", ".htm", ".xml", ".txt", ".md"}
+
+_SECTION_NUMBER = re.compile(r"^(\d{1,3}\.\d{3,4}(?:-\d{1,4})?)\b")
+_SUBPART_NUMBER = re.compile(r"^Subpart[ \t]+(\d+\.\d+)")
+_PART_NUMBER = re.compile(r"^PART[ \t]+(\d+)")
+_KEY_PART_NUMBER = re.compile(r"part[-_ ]?(\d+)", re.IGNORECASE)
+
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "li", "ul", "ol", "table", "tr", "br", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "head", "title", "subpart", "part", "hd"
+}
+
+
+@dataclass
+class RegulationDocument:
+    """An object listed in a regulation bucket."""
+    regulation: str
+    bucket: str
+    key: str
+    etag: str
+    size: int = 0
+
+    @property
+    def source_name(self) -> str:
+        return f"{self.regulation} {self.key}"
+
+
+@dataclass
+class ExtractedDocument:
+    """Section chunks of one document, produced in a worker process."""
+    document: RegulationDocument
+    title: str
+    chunks: List[TextChunk]
+    references: List[str]
+    page_starts: Optional[List[int]] = None
+
+
+@dataclass
+class IngestStats:
+    """Counters for an ingestion run."""
+    listed: int = 0
+    unchanged: int = 0
+    ingested: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of HTML/XML markup, breaking paragraphs at block elements."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(self._skip - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        text = "".join(self.parts)
+        text = re.sub(r"[ \t\r\f\v]+", " ", text)
+        text = re.sub(r" ?\n ?", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def extract_text(key: str, body: bytes) -> Tuple[str, Optional[List[int]]]:
+    """
+    Plain text of a document, with page start offsets for PDFs.
+
+    Returns:
+        (text, page_starts) where page_starts is None for unpaginated formats
+    """
+    suffix = PurePosixPath(key).suffix.lower()
+    if suffix == ".pdf":
+        import pypdf
+        reader = pypdf.PdfReader(io.BytesIO(body))
+        pages, page_starts, offset = [], [], 0
+        for page in reader.pages:
+            page_text = (page.extract_text() or "").strip()
+            page_starts.append(offset)
+            pages.append(page_text)
+            offset += len(page_text) + 2
+        return "\n\n".join(pages), page_starts
+    decoded = body.decode("utf-8", errors="replace")
+    if suffix in (".html", ".htm", ".xml"):
+        parser = _TextExtractor()
+        parser.feed(decoded)
+        parser.close()
+        return parser.text(), None
+    return decoded, None
+
+
+def section_reference(regulation: str, section: Optional[str], default: str) -> str:
+    """Reference id for a chunk from its section heading ("FAR 15.408", "FAR Subpart 4.19")."""
+    if section:
+        for pattern, prefix in ((_SECTION_NUMBER, ""), (_SUBPART_NUMBER, "Subpart "), (_PART_NUMBER, "Part ")):
+            match = pattern.match(section)
+            if match:
+                return f"{regulation} {prefix}{match.group(1)}"
+    return default
+
+
+def document_reference(document: RegulationDocument) -> str:
+    """Fallback reference for text before the first section heading."""
+    match = _KEY_PART_NUMBER.search(PurePosixPath(document.key).stem)
+    if match:
+        return f"{document.regulation} Part {int(match.group(1))}"
+    return f"{document.regulation} {PurePosixPath(document.key).stem}"
+
+
+def extract_and_chunk(document: RegulationDocument, body: bytes, max_tokens: Optional[int] = None) -> ExtractedDocument:
+    """Extract and section-chunk a document (runs in a worker process)."""
+    text, page_starts = extract_text(document.key, body)
+    text = text.replace("\x00", "")
+    chunks = chunk_text(text, max_tokens)
+    default = document_reference(document)
+    # Section headings carry over into the chunks that follow them
+    references = [section_reference(document.regulation, chunk.section, default) for chunk in chunks]
+    title = next((chunk.section for chunk in chunks if chunk.section), None) or default
+    return ExtractedDocument(document, title, chunks, references, page_starts)
+
+
+class RegulationIngestor:
+    """Loads changed FAR/DFARS objects into the knowledge base."""
+
+    def __init__(
+        self,
+        s3_client=None,
+        executor: Optional[Executor] = None,
+        download_concurrency: int = 8,
+        embed: bool = True
+    ):
+        self.s3 = s3_client if s3_client is not None else _create_s3_client()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._downloads = asyncio.Semaphore(download_concurrency)
+        self.embed = embed
+        self.buckets = {"FAR": settings.s3_far_bucket, "DFARS": settings.s3_dfars_bucket}
+
+    def _list_bucket(self, regulation: str, bucket: str) -> List[RegulationDocument]:
+        documents = []
+        for page in self.s3.get_paginator("list_objects_v2").paginate(Bucket=bucket):
+            for obj in page.get("Contents", []):
+                if PurePosixPath(obj["Key"]).suffix.lower() in SUPPORTED_SUFFIXES:
+                    documents.append(RegulationDocument(
+                        regulation=regulation,
+                        bucket=bucket,
+                        key=obj["Key"],
+                        etag=obj["ETag"].strip('"'),
+                        size=obj.get("Size", 0)
+                    ))
+        return documents
+
+    async def list_documents(self, regulations: Sequence[str]) -> List[RegulationDocument]:
+        """List supported objects in the buckets of the given regulations."""
+        listings = await asyncio.gather(*(
+            asyncio.to_thread(self._list_bucket, regulation, self.buckets[regulation])
+            for regulation in regulations
+        ))
+        return [document for listing in listings for document in listing]
+
+    async def known_etags(self, regulations: Sequence[str]) -> Dict[str, str]:
+        """ETags recorded at the last ingestion, keyed by source name."""
+        async with get_async_session() as session:
+            rows = (await session.execute(
+                select(KnowledgeSource.name, KnowledgeSource.metadata_json)
+                .where(KnowledgeSource.source_type.in_(list(regulations)))
+            )).all()
+        return {row.name: (row.metadata_json or {}).get("etag") for row in rows}
+
+    def _download(self, document: RegulationDocument) -> bytes:
+        return self.s3.get_object(Bucket=document.bucket, Key=document.key)["Body"].read()
+
+    async def _extract(self, document: RegulationDocument) -> ExtractedDocument:
+        async with self._downloads:
+            body = await asyncio.to_thread(self._download, document)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, extract_and_chunk, document, body, settings.ingest_chunk_tokens)
+
+    async def store(self, extracted: ExtractedDocument) -> List[Tuple[str, str]]:
+        """Replace the document's source and chunks; returns (chunk_id, content) pairs."""
+        document = extracted.document
+        references = iter(extracted.references)
+        async with get_async_session() as session:
+            await delete_sources(session, KnowledgeSource.name == document.source_name)
+            source = KnowledgeSource(
+                name=document.source_name,
+                source_type=document.regulation,
+                version=document.etag,
+                metadata_json={
+                    "bucket": document.bucket,
+                    "key": document.key,
+                    "etag": document.etag,
+                    "size": document.size,
+                    "title": extracted.title
+                }
+            )
+            session.add(source)
+            await session.flush()
+            rows = chunk_rows(
+                source.id,
+                extracted.chunks,
+                reference_id=lambda chunk: next(references),
+                page_starts=extracted.page_starts
+            )
+            await insert_chunks(session, rows)
+        return [(row["id"], row["content"]) for row in rows]
+
+    async def ingest(self, regulations: Sequence[str] = ("FAR", "DFARS"), force: bool = False) -> IngestStats:
+        """
+        Ingest new and changed documents from the regulation buckets.
+
+        Args:
+            regulations: Which buckets to ingest
+            force: Re-ingest objects even if their ETag is unchanged
+
+        Returns:
+            IngestStats for the run
+        """
+        started = time.perf_counter()
+        stats = IngestStats()
+        documents = await self.list_documents(regulations)
+        stats.listed = len(documents)
+        known = {} if force else await self.known_etags(regulations)
+        pending = [d for d in documents if known.get(d.source_name) != d.etag]
+        stats.unchanged = stats.listed - len(pending)
+        logger.info(f"{len(pending)} of {stats.listed} regulation documents are new or changed")
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=settings.regulation_ingest_workers)
+        pipeline = None
+        if self.embed:
+            from embedding_pipeline import get_embedding_pipeline
+            pipeline = get_embedding_pipeline()
+        try:
+            for next_done in asyncio.as_completed([self._extract(document) for document in pending]):
+                try:
+                    extracted = await next_done
+                    chunks = await self.store(extracted)
+                except Exception as e:
+                    stats.failed += 1
+                    stats.errors.append(str(e))
+                    logger.error(f"Failed to ingest regulation document: {e}")
+                    continue
+                stats.ingested += 1
+                stats.chunks += len(chunks)
+                if pipeline is not None:
+                    try:
+                        await pipeline.embed_chunks(chunks)
+                    except Exception as e:
+                        logger.warning(f"Embedding failed for {extracted.document.key}, run the backfill later: {e}")
+        finally:
+            if self._owns_executor:
+                self._executor.shutdown()
+                self._executor = None
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest the FAR/DFARS corpus from object storage.")
+    parser.add_argument("--regulation", choices=["FAR", "DFARS"], action="append", help="Only these buckets")
+    parser.add_argument("--force", action="store_true", help="Re-ingest unchanged objects")
+    parser.add_argument("--no-embed", action="store_true", help="Leave embedding to the backfill command")
+    args = parser.parse_args()
+
+    from database import create_database_engines
+    create_database_engines()
+
+    ingestor = RegulationIngestor(embed=not args.no_embed)
+    stats = await ingestor.ingest(args.regulation or ("FAR", "DFARS"), force=args.force)
+    print(
+        f"Ingested {stats.ingested} of {stats.listed} documents ({stats.unchanged} unchanged, "
+        f"{stats.failed} failed) into {stats.chunks} chunks in {stats.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,204 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Hedged LLM requests.
+
+A request that is still running once it has taken longer than the
+``settings.llm_hedge_percentile`` of recently observed latencies is sent a
+second time, to another endpoint. Whichever attempt first returns a valid
+response wins and the other is cancelled, which closes its connection so
+the server stops generating.
+
+Hedging only starts once ``llm_hedge_min_samples`` latencies have been
+observed, and only when the caller reports spare capacity elsewhere, so
+an overloaded pool is not made busier. While findings are being streamed,
+only the attempt that emits first forwards them to the sink, so clients
+never see duplicates.
+
+``get_status()`` reports the hedge rate (hedged / requests) and the win
+rate (hedges that answered first / hedges sent) for tuning the percentile
+against the extra load.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from config import get_settings
+from finding_stream import current_sink, stream_findings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of request latencies."""
+
+    def __init__(self, window: int):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))]
+
+
+class RequestHedger:
+    """
+    Runs attempts of one kind of request, hedging the slow ones.
+
+    Args:
+        name: Request kind, for logs and status
+        percentile: Latency percentile after which a hedge is sent
+        min_samples: Latencies needed before hedging starts
+        window: Latencies kept
+        min_delay: Never hedge earlier than this many seconds
+        enabled: Overrides ``settings.llm_hedging_enabled``
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        window: Optional[int] = None,
+        min_delay: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.name = name
+        self.percentile = percentile or settings.llm_hedge_percentile
+        self.min_samples = min_samples or settings.llm_hedge_min_samples
+        self.min_delay = min_delay if min_delay is not None else settings.llm_hedge_min_delay_seconds
+        self.enabled = enabled
+        self.latencies = LatencyTracker(window or settings.llm_hedge_window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, or None while hedging is off."""
+        enabled = self.enabled if self.enabled is not None else settings.llm_hedging_enabled
+        if not enabled or len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+
+    async def run(
+        self,
+        attempt: Callable[[int], Awaitable[T]],
+        can_hedge: Callable[[], bool] = lambda: True
+    ) -> T:
+        """
+        Run ``attempt(0)``, adding ``attempt(1)`` if it is slow.
+
+        Args:
+            attempt: Makes one attempt; the index is 0 for the original
+                request and 1 for the hedge. It must raise if the response
+                is not valid.
+            can_hedge: Whether a hedge may be sent right now
+
+        Returns:
+            The first valid result
+
+        Raises:
+            Exception: The original attempt's error if no attempt succeeded
+        """
+        self.requests += 1
+        delay = self.hedge_delay()
+        sink = current_sink()
+        stream_owner: List[int] = []
+
+        async def exclusive_sink(index: int, issue: Dict[str, Any], source: str) -> None:
+            if not stream_owner:
+                stream_owner.append(index)
+            if stream_owner[0] == index:
+                await sink(issue, source)
+
+        async def run_attempt(index: int) -> T:
+            attempt_started = time.monotonic()
+            try:
+                if sink is None:
+                    result = await attempt(index)
+                else:
+                    with stream_findings(lambda issue, source: exclusive_sink(index, issue, source)):
+                        result = await attempt(index)
+            except asyncio.CancelledError:
+                # A slow original still belongs in the tail: its latency was at least this long
+                if index == 0:
+                    self.latencies.observe(time.monotonic() - attempt_started)
+                raise
+            self.latencies.observe(time.monotonic() - attempt_started)
+            return result
+
+        started = time.monotonic()
+        tasks = {asyncio.create_task(run_attempt(0)): 0}
+        errors: Dict[int, BaseException] = {}
+        try:
+            while tasks:
+                timeout = None
+                if delay is not None and len(tasks) + len(errors) == 1:
+                    timeout = max(0.0, delay - (time.monotonic() - started))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if can_hedge():
+                        logger.info(f"Hedging {self.name} request after {time.monotonic() - started:.1f}s")
+                        self.hedged += 1
+                        tasks[asyncio.create_task(run_attempt(1))] = 1
+                    else:
+                        # No spare capacity: stop waiting to hedge this request
+                        delay = None
+                    continue
+                for task in done:
+                    index = tasks.pop(task)
+                    if task.exception() is None:
+                        if index == 1:
+                            self.hedge_wins += 1
+                        return task.result()
+                    # A failure is not slowness: retries are left to the caller
+                    errors[index] = task.exception()
+                    logger.warning(f"{self.name} attempt {index} failed: {errors[index]}")
+            raise errors.get(0) or errors[1]
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else None,
+            "win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else None,
+            "hedge_delay_ms": round(delay * 1000.0, 1) if delay is not None else None,
+            "latency_samples": len(self.latencies)
+        }
+
+
+# Global hedger registry, one per request kind
+_hedgers: Dict[str, RequestHedger] = {}
+
+
+def get_request_hedger(name: str) -> RequestHedger:
+    """Get the hedger for a kind of LLM request, creating it on first use."""
+    if name not in _hedgers:
+        _hedgers[name] = RequestHedger(name)
+    return _hedgers[name]
+
+
+def get_request_hedging_status() -> Dict[str, Dict[str, Any]]:
+    """Status of every hedger created so far."""
+    return {name: hedger.get_status() for name, hedger in sorted(_hedgers.items())}
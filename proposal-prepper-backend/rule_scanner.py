@@ -0,0 +1,426 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Deterministic rule-based pre-scan for FAR/DFARS compliance checks.
+
+Many compliance checks are mechanical: locating regulatory citations,
+required proposal sections and dollar amounts that cross regulatory
+thresholds. This module performs them with a single compiled regular
+expression in one pass over the extracted text and reports the results as
+ComplianceIssues with exact page and line locations (taken from the
+``--- Page N ---`` markers written by the PDF processor).
+
+The scanner is used by AnalysisRouter either on its own (fast mode) or as a
+prefilter whose findings are merged with, and narrow the scope of, the LLM
+analysis.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from logging_config import get_logger
+from models import (
+    ComplianceIssue,
+    ComplianceResults,
+    ComplianceSummary,
+    DocumentLocation,
+    RegulatoryReference
+)
+
+logger = get_logger(__name__)
+
+# Dollar thresholds (FAR 19.702(a) and FAR 15.403-4(a)(1))
+SUBCONTRACTING_PLAN_THRESHOLD = 750_000
+CERTIFIED_COST_DATA_THRESHOLD = 2_000_000
+
+# Proposal volumes expected in a complete submission
+REQUIRED_SECTIONS = {
+    "technical approach": "Technical Approach",
+    "management approach": "Management Approach",
+    "past performance": "Past Performance",
+    "cost proposal": "Cost/Price Proposal"
+}
+
+# Header spellings that satisfy a required section
+_SECTION_ALIASES = {
+    "price proposal": "cost proposal",
+    "pricing": "cost proposal",
+    "cost volume": "cost proposal",
+    "price volume": "cost proposal"
+}
+
+_HEADER_NAMES = sorted(
+    set(REQUIRED_SECTIONS) | set(_SECTION_ALIASES) | {"key personnel", "small business subcontracting plan"},
+    key=len,
+    reverse=True
+)
+
+_SCALES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9}
+
+# Severity penalties applied to the overall score for issues added by the pre-scan
+_SCORE_PENALTY = {"critical": 15.0, "warning": 8.0, "info": 2.0}
+
+_PAGE_MARKER = re.compile(r"^--- Page (\d+)")
+
+# Labels that mark an amount on the same line as the proposal's own price
+_PRICE_LABEL = re.compile(
+    r"\b(?:total[ \t]+(?:evaluated[ \t]+|proposed[ \t]+)?(?:price|cost|amount)|proposed[ \t]+(?:price|cost)"
+    r"|grand[ \t]+total|total[ \t]+contract[ \t]+value|total[ \t]*:)",
+    re.IGNORECASE
+)
+# How far before an amount its label may start
+_PRICE_LABEL_WINDOW = 80
+
+# One combined pattern; alternatives are tried in order at each position
+_PATTERN = re.compile(
+    r"(?P<header>^[ \t]*(?:(?:\d+(?:\.\d+)*|[A-Z]|[IVX]+)[.)]?[ \t]+)?"
+    r"(?P<header_name>" + "|".join(re.escape(name) for name in _HEADER_NAMES) + r")[ \t]*:?[ \t]*$)"
+    r"|(?P<citation>\b(?P<reg>(?-i:FAR|DFARS))[ \t]+(?:(?:Part|Subpart|clause)[ \t]+)?"
+    r"(?P<section>\d{1,3}(?:\.\d{1,4})?(?:-\d{1,4})?)\b)"
+    r"|(?P<money>\$[ \t]?(?P<amount>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?:[ \t]*(?P<scale>thousand|million|billion|[KMB]\b))?)"
+    r"|(?P<term>\bsubcontracting plan\b|\bNIST[ \t]+(?:SP[ \t]+)?800-171\b"
+    r"|\bcontrolled unclassified information\b|(?-i:\bCUI\b)|\bcertified cost or pricing data\b)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+@dataclass
+class Match:
+    """A single pattern hit with its resolved location."""
+    kind: str
+    value: str
+    offset: int
+    location: DocumentLocation
+    amount: float = 0.0
+
+
+@dataclass
+class PrescanResult:
+    """Output of a pre-scan pass."""
+    issues: List[ComplianceIssue] = field(default_factory=list)
+    citations: List[Dict[str, Any]] = field(default_factory=list)
+    settled_checks: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def prompt_context(self) -> str:
+        """Notes for the LLM describing what the pre-scan already checked."""
+        if not self.settled_checks:
+            return ""
+        lines = ["Deterministic pre-scan results (already verified; do not re-report these):"]
+        lines.extend(f"- {check}" for check in self.settled_checks)
+        lines.append("Focus your analysis on requirements that need judgement.")
+        return "\n".join(lines)
+
+    def to_results(self, document_id: str, session_id: str, filename: str) -> ComplianceResults:
+        """Build stand-alone ComplianceResults from the pre-scan findings."""
+        counts = _severity_counts(self.issues)
+        score = max(0.0, 100.0 - sum(_SCORE_PENALTY[i.severity] for i in self.issues))
+        return ComplianceResults(
+            id=f"prescan_{document_id}_{int(datetime.utcnow().timestamp())}",
+            session_id=session_id,
+            document_id=document_id,
+            status=_status_for(counts, score),
+            issues=self.issues,
+            summary=ComplianceSummary(total_issues=len(self.issues), overall_score=score, **counts),
+            generated_at=datetime.utcnow(),
+            ai_model="rule-prescan",
+            processing_time=self.elapsed_ms / 1000.0,
+            metadata={
+                "analysis_type": "rule_prescan",
+                "document_filename": filename,
+                "prescan": self.metadata()
+            }
+        )
+
+    def metadata(self) -> Dict[str, Any]:
+        """Summary of the pass for result metadata."""
+        return {
+            "issues": len(self.issues),
+            "citations": self.citations,
+            "elapsed_ms": round(self.elapsed_ms, 3)
+        }
+
+
+class _LineIndex:
+    """Maps character offsets to page, line-within-page and line text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts: List[int] = []
+        self.positions: List[Tuple[Optional[int], int]] = []
+        page, line_in_page, offset = None, 0, 0
+        for line in text.splitlines(keepends=True):
+            marker = _PAGE_MARKER.match(line)
+            if marker:
+                page, line_in_page = int(marker.group(1)), 0
+            else:
+                line_in_page += 1
+            self.starts.append(offset)
+            self.positions.append((page, line_in_page))
+            offset += len(line)
+
+    def locate(self, offset: int, section: Optional[str] = None) -> DocumentLocation:
+        index = max(bisect_right(self.starts, offset) - 1, 0)
+        page, line = self.positions[index] if self.positions else (None, 1)
+        start = self.starts[index] if self.starts else 0
+        end = self.text.find("\n", start)
+        context = self.text[start:end if end != -1 else len(self.text)].strip()
+        return DocumentLocation(page=page, line=line, section=section, context=context[:200])
+
+
+class RuleScanner:
+    """Single-pass FAR/DFARS rule engine."""
+
+    def scan(self, document_text: str, document_id: str = "document") -> PrescanResult:
+        """
+        Scan extracted document text.
+
+        Args:
+            document_text: Text extracted from the document (with page markers)
+            document_id: Document identifier used for issue IDs
+
+        Returns:
+            PrescanResult with issues, detected citations and settled checks
+        """
+        started = time.perf_counter()
+        index = _LineIndex(document_text)
+
+        headers: Dict[str, Match] = {}
+        citations: List[Match] = []
+        prices: List[Match] = []
+        terms: Dict[str, Match] = {}
+        section = None
+        canonical_section = None
+
+        for m in _PATTERN.finditer(document_text):
+            if m.group("header"):
+                name = m.group("header_name").lower()
+                section = m.group("header_name").strip()
+                canonical = canonical_section = _SECTION_ALIASES.get(name, name)
+                headers.setdefault(canonical, Match("header", canonical, m.start(), index.locate(m.start(), section)))
+                if "subcontracting plan" in name:
+                    terms.setdefault("subcontracting plan", headers[canonical])
+            elif m.group("citation"):
+                value = f"{m.group('reg').upper()} {m.group('section')}"
+                citations.append(Match("citation", value, m.start(), index.locate(m.start(), section)))
+            elif m.group("money"):
+                if _is_proposal_price(document_text, m.start(), canonical_section):
+                    amount = _parse_amount(m.group("amount"), m.group("scale"))
+                    prices.append(Match("money", m.group("money"), m.start(), index.locate(m.start(), section), amount))
+            elif m.group("term"):
+                term = _normalize_term(m.group("term"))
+                terms.setdefault(term, Match("term", term, m.start(), index.locate(m.start(), section)))
+
+        result = PrescanResult(citations=[
+            {"citation": c.value, "page": c.location.page, "line": c.location.line} for c in citations
+        ])
+        cited = {c.value for c in citations}
+        # Threshold checks use the proposal's own price, not amounts such as past contract values
+        price = max(prices, key=lambda a: a.amount, default=None)
+
+        self._check_subcontracting_plan(result, price, terms, document_id)
+        self._check_cui_safeguarding(result, citations, terms, document_id)
+        self._check_cost_data(result, price, cited, terms, document_id)
+        self._check_required_sections(result, headers, document_id)
+
+        result.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(
+            f"Pre-scan found {len(result.issues)} issues and {len(citations)} citations "
+            f"in {result.elapsed_ms:.1f} ms"
+        )
+        return result
+
+    def _check_subcontracting_plan(self, result, price, terms, document_id) -> None:
+        # Without an identifiable proposal price the threshold is left to the LLM
+        if price is None:
+            return
+        if price.amount < SUBCONTRACTING_PLAN_THRESHOLD:
+            result.settled_checks.append(
+                f"The proposed price does not reach the ${SUBCONTRACTING_PLAN_THRESHOLD:,} "
+                "subcontracting plan threshold (FAR 19.702)"
+            )
+            return
+        if "subcontracting plan" in terms:
+            result.settled_checks.append("A small business subcontracting plan is addressed (FAR 19.702)")
+            return
+        result.issues.append(_issue(
+            document_id, len(result.issues), "critical",
+            "Small business subcontracting plan not found",
+            f"The proposed price of {price.value} (${price.amount:,.0f}) meets the "
+            f"${SUBCONTRACTING_PLAN_THRESHOLD:,} threshold, but no subcontracting plan is referenced. "
+            "Other than small business offerors must submit a subcontracting plan above this threshold.",
+            ("FAR", "19.702", "Statutory requirements for subcontracting plans"),
+            price.location,
+            "Add a small business subcontracting plan meeting FAR 19.704, or document the applicable exemption."
+        ))
+
+    def _check_cui_safeguarding(self, result, citations, terms, document_id) -> None:
+        trigger = next((c for c in citations if c.value == "DFARS 252.204-7012"), None)
+        trigger = trigger or terms.get("controlled unclassified information") or terms.get("cui")
+        if trigger is None:
+            return
+        if "nist sp 800-171" in terms:
+            result.settled_checks.append("CUI safeguarding references NIST SP 800-171 (DFARS 252.204-7012)")
+            return
+        result.issues.append(_issue(
+            document_id, len(result.issues), "critical",
+            "NIST SP 800-171 implementation not addressed",
+            "The proposal handles controlled unclassified information or cites DFARS 252.204-7012 "
+            "but does not reference NIST SP 800-171 security requirements.",
+            ("DFARS", "252.204-7012", "Safeguarding covered defense information and cyber incident reporting"),
+            trigger.location,
+            "Describe NIST SP 800-171 implementation and the current SPRS assessment score."
+        ))
+
+    def _check_cost_data(self, result, price, cited, terms, document_id) -> None:
+        if price is None or price.amount < CERTIFIED_COST_DATA_THRESHOLD:
+            return
+        if "certified cost or pricing data" in terms or any(c.startswith("FAR 15.408") for c in cited):
+            result.settled_checks.append("Certified cost or pricing data is addressed (FAR 15.403-4)")
+            return
+        result.issues.append(_issue(
+            document_id, len(result.issues), "warning",
+            "Certified cost or pricing data not addressed",
+            f"The proposed price of {price.value} (${price.amount:,.0f}) exceeds the "
+            f"${CERTIFIED_COST_DATA_THRESHOLD:,} threshold for certified cost or pricing data, but neither "
+            "the data nor an exception is referenced.",
+            ("FAR", "15.403-4", "Requiring certified cost or pricing data"),
+            price.location,
+            "Provide certified cost or pricing data per FAR 15.408 Table 15-2 or claim an exception under FAR 15.403-1."
+        ))
+
+    def _check_required_sections(self, result, headers, document_id) -> None:
+        # Only documents structured as proposal volumes are checked
+        if not any(name in headers for name in REQUIRED_SECTIONS):
+            return
+        missing = [title for name, title in REQUIRED_SECTIONS.items() if name not in headers]
+        if not missing:
+            result.settled_checks.append("All required proposal sections are present")
+            return
+        for title in missing:
+            result.issues.append(_issue(
+                document_id, len(result.issues), "warning",
+                f"Required section missing: {title}",
+                f"No '{title}' section header was found in the proposal.",
+                ("FAR", "15.204-5", "Part IV - Representations and instructions"),
+                None,
+                f"Add a '{title}' section as required by the solicitation instructions (Section L)."
+            ))
+        result.settled_checks.append(f"Section headers were checked; missing: {', '.join(missing)}")
+
+
+def merge_prescan_results(results: ComplianceResults, prescan: PrescanResult) -> ComplianceResults:
+    """
+    Merge pre-scan findings into provider results.
+
+    Provider issues citing the same regulation section as a pre-scan issue
+    are dropped in favour of the pre-scan issue, which carries an exact
+    location.
+    """
+    if not prescan.issues:
+        return results
+
+    covered = {_section_key(i.regulation) for i in prescan.issues}
+    kept = [i for i in results.issues if _section_key(i.regulation) not in covered]
+    issues = prescan.issues + kept
+    counts = _severity_counts(issues)
+    score = max(0.0, results.summary.overall_score - sum(_SCORE_PENALTY[i.severity] for i in prescan.issues))
+
+    metadata = dict(results.metadata)
+    metadata["prescan"] = prescan.metadata()
+    return results.model_copy(update={
+        "issues": issues,
+        "summary": ComplianceSummary(
+            total_issues=len(issues),
+            overall_score=score,
+            pass_threshold=results.summary.pass_threshold,
+            **counts
+        ),
+        "status": "fail" if counts["critical_count"] else ("warning" if results.status == "pass" else results.status),
+        "metadata": metadata
+    })
+
+
+def _issue(document_id, index, severity, title, description, regulation, location, remediation) -> ComplianceIssue:
+    name, section, reg_title = regulation
+    return ComplianceIssue(
+        id=f"prescan_{document_id}_{index}",
+        severity=severity,
+        title=title,
+        description=description,
+        regulation=RegulatoryReference(
+            regulation=name,
+            section=section,
+            title=reg_title,
+            url=_regulation_url(name, section)
+        ),
+        location=location,
+        remediation=remediation,
+        confidence=0.9
+    )
+
+
+def _regulation_url(regulation: str, section: str) -> str:
+    base = "https://www.acquisition.gov/far" if regulation == "FAR" else "https://www.acquisition.gov/dfars"
+    return f"{base}/{section}"
+
+
+def _is_proposal_price(text: str, offset: int, section: Optional[str]) -> bool:
+    """Whether the amount at ``offset`` is the proposal's own price: in the cost volume, or labeled as a total/price."""
+    if section == "cost proposal":
+        return True
+    if section == "past performance":
+        return False
+    line_start = text.rfind("\n", 0, offset) + 1
+    return _PRICE_LABEL.search(text, max(line_start, offset - _PRICE_LABEL_WINDOW), offset) is not None
+
+
+def _parse_amount(amount: str, scale: Optional[str]) -> float:
+    value = float(amount.replace(",", ""))
+    return value * _SCALES.get((scale or "").lower(), 1.0)
+
+
+def _normalize_term(term: str) -> str:
+    term = " ".join(term.lower().split())
+    if term.startswith("nist"):
+        return "nist sp 800-171"
+    return term
+
+
+def _section_key(regulation: RegulatoryReference) -> Tuple[str, str]:
+    section = regulation.section.upper().replace(regulation.regulation.upper(), "").strip()
+    return regulation.regulation.upper(), section
+
+
+def _severity_counts(issues: List[ComplianceIssue]) -> Dict[str, int]:
+    return {
+        "critical_count": sum(1 for i in issues if i.severity == "critical"),
+        "warning_count": sum(1 for i in issues if i.severity == "warning"),
+        "info_count": sum(1 for i in issues if i.severity == "info")
+    }
+
+
+def _status_for(counts: Dict[str, int], score: float) -> str:
+    if counts["critical_count"] or score < 60:
+        return "fail"
+    if counts["warning_count"] or score < 80:
+        return "warning"
+    return "pass"
+
+
+# Global scanner instance
+_rule_scanner: Optional[RuleScanner] = None
+
+
+def get_rule_scanner() -> RuleScanner:
+    """Get the global rule scanner instance."""
+    global _rule_scanner
+    if _rule_scanner is None:
+        _rule_scanner = RuleScanner()
+    return _rule_scanner
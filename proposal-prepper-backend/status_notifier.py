@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+In-memory change notifier for analysis session status.
+
+Backs the conditional (``If-None-Match``), long-poll (``wait=``) and
+Server-Sent Events variants of the status API. The last status read from
+the database is cached per session and invalidated whenever the session
+is updated locally or a progress event for it arrives over the event bus,
+so clients that poll an unchanged session cost neither a database query
+nor a busy loop: they either receive ``304 Not Modified`` straight from
+the cache or sleep until the session changes.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import get_settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+SnapshotLoader = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+# Bus events that indicate a session's stored status has changed
+STATUS_EVENT_TYPES = {"analysis_progress", "analysis_complete", "error"}
+
+# Statuses after which a session no longer changes
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# Session fields that make up the client-visible status
+_STATUS_FIELDS = (
+    "status", "progress", "current_step", "started_at",
+    "completed_at", "estimated_completion", "error_message"
+)
+
+
+def status_etag(snapshot: Dict[str, Any]) -> str:
+    """Weak ETag derived from the client-visible status fields of a session."""
+    visible = {field: snapshot.get(field) for field in _STATUS_FIELDS}
+    digest = hashlib.sha1(json.dumps(visible, default=str, sort_keys=True).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header value against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_terminal(snapshot: Dict[str, Any]) -> bool:
+    """Whether the session has finished and will not change again."""
+    return snapshot.get("status") in TERMINAL_STATUSES
+
+
+class StatusNotifier:
+    """
+    Per-session status cache with change notification.
+
+    Snapshots are cached for at most ``ttl`` seconds so that a replica that
+    misses an invalidation (e.g. when the event bus runs in-process only)
+    still converges on the stored status.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else settings.status_cache_ttl_seconds
+        self.max_entries = max_entries or settings.status_cache_max_entries
+        self._snapshots: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self._invalidations = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.wakeups = 0
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop the cached status of a session and wake its waiters."""
+        self._invalidations += 1
+        self._snapshots.pop(session_id, None)
+        event = self._changed.pop(session_id, None)
+        if event is not None:
+            self.wakeups += self._waiters.get(session_id, 0)
+            event.set()
+
+    async def observe(self, message: Dict[str, Any]) -> None:
+        """Event bus handler: invalidate sessions named by progress events."""
+        if message.get("type") in STATUS_EVENT_TYPES and message.get("sessionId"):
+            self.invalidate(message["sessionId"])
+
+    async def get_snapshot(self, session_id: str, loader: SnapshotLoader) -> Optional[Dict[str, Any]]:
+        """
+        Return the session status, loading it only if it is not cached.
+
+        Args:
+            session_id: Analysis session ID
+            loader: Coroutine function reading the session from the database
+
+        Returns:
+            Session dict or None if the session does not exist
+        """
+        cached = self._snapshots.get(session_id)
+        if cached is not None and cached[0] > time.monotonic():
+            self._snapshots.move_to_end(session_id)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        invalidations = self._invalidations
+        snapshot = await loader(session_id)
+        # Only cache if nothing was invalidated while the read was in flight
+        if snapshot is not None and invalidations == self._invalidations:
+            self._snapshots[session_id] = (time.monotonic() + self.ttl, snapshot)
+            self._snapshots.move_to_end(session_id)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    @property
+    def change_marker(self) -> int:
+        """
+        Opaque marker to take before loading a snapshot and pass to
+        ``wait_for_change``, so an invalidation that lands during the load
+        is not missed.
+        """
+        return self._invalidations
+
+    async def wait_for_change(self, session_id: str, timeout: float, since: Optional[int] = None) -> bool:
+        """
+        Sleep until the session is invalidated or the timeout expires.
+
+        Args:
+            session_id: Analysis session ID
+            timeout: Maximum seconds to wait
+            since: ``change_marker`` taken before the snapshot being waited
+                on was loaded; if anything was invalidated since, return
+                immediately instead of sleeping
+
+        Returns:
+            bool: True if the session (possibly) changed, False on timeout
+        """
+        if since is not None and since != self._invalidations:
+            return True
+        event = self._changed.setdefault(session_id, asyncio.Event())
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(timeout, 0.0))
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            remaining = self._waiters[session_id] - 1
+            if remaining:
+                self._waiters[session_id] = remaining
+            else:
+                del self._waiters[session_id]
+                if self._changed.get(session_id) is event:
+                    del self._changed[session_id]
+
+    async def wait_for_new_status(
+        self,
+        session_id: str,
+        loader: SnapshotLoader,
+        etag: Optional[str],
+        timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll until the session's status no longer matches ``etag``.
+
+        Returns the current snapshot as soon as it differs from ``etag``, the
+        session reaches a terminal status, or ``timeout`` elapses.
+        """
+        deadline = time.monotonic() + timeout
+        marker = self.change_marker
+        snapshot = await self.get_snapshot(session_id, loader)
+        while snapshot is not None and etag_matches(etag, status_etag(snapshot)) and not is_terminal(snapshot):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await self.wait_for_change(session_id, remaining, since=marker)
+            marker = self.change_marker
+            snapshot = await self.get_snapshot(session_id, loader)
+        return snapshot
+
+    def get_status(self) -> Dict[str, Any]:
+        """Cache and waiter statistics for health reporting."""
+        return {
+            "cached_sessions": len(self._snapshots),
+            "waiting_clients": sum(self._waiters.values()),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "wakeups": self.wakeups
+        }
+
+
+# Global notifier instance
+_status_notifier: Optional[StatusNotifier] = None
+
+
+def get_status_notifier() -> StatusNotifier:
+    """Get the global status notifier instance."""
+    global _status_notifier
+    if _status_notifier is None:
+        _status_notifier = StatusNotifier()
+    return _status_notifier
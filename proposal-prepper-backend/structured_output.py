@@ -0,0 +1,210 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Schema-constrained structured output for compliance analysis.
+
+One JSON Schema for the model response is derived from the
+``ComplianceIssue``/``ComplianceSummary``/``ComplianceResults`` models and
+passed to every backend as a decoding constraint:
+- Ollama: ``format`` set to the schema;
+- LiteLLM: ``response_format`` of type ``json_schema``;
+- Bedrock: a single tool whose ``input_schema`` is the schema, forced with
+  ``tool_choice``.
+
+``validate_response`` parses and validates a response in one pydantic
+step. Responses that still miss the schema (a backend that ignores the
+constraint, or ``LLM_STRUCTURED_OUTPUT=false``) fall back to the lenient
+``parse_llm_json`` path, and every outcome is counted so the parse failure
+rate is visible in the health check.
+"""
+
+import copy
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import Field, ValidationError, create_model
+
+from config import get_settings
+from logging_config import get_logger
+from models import ComplianceIssue, ComplianceResults, ComplianceSummary, RegulatoryReference
+from parser_utils import parse_llm_json
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+SCHEMA_NAME = "compliance_analysis"
+BEDROCK_TOOL_NAME = "record_compliance_analysis"
+
+# Fields the model generates; ids and locations are assigned by the backend
+_ISSUE_FIELDS = ("severity", "title", "description", "regulation", "confidence", "remediation")
+_REGULATION_FIELDS = ("regulation", "section", "title", "url")
+_SUMMARY_FIELDS = ("total_issues", "critical_count", "warning_count", "info_count")
+
+OUTCOMES = ("valid", "recovered", "failed")
+
+
+def _fields(model, names) -> Dict[str, Any]:
+    return {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names}
+
+
+ResponseRegulation = create_model("ResponseRegulation", **_fields(RegulatoryReference, _REGULATION_FIELDS))
+ResponseIssue = create_model(
+    "ResponseIssue",
+    **{**_fields(ComplianceIssue, _ISSUE_FIELDS), "regulation": (
+        ResponseRegulation, Field(..., description=ComplianceIssue.model_fields["regulation"].description)
+    )}
+)
+ResponseSummary = create_model("ResponseSummary", **_fields(ComplianceSummary, _SUMMARY_FIELDS))
+ComplianceResponse = create_model(
+    "ComplianceResponse",
+    overall_status=(ComplianceResults.model_fields["status"].annotation, Field(
+        ..., description=ComplianceResults.model_fields["status"].description
+    )),
+    overall_score=(float, ComplianceSummary.model_fields["overall_score"]),
+    issues=(List[ResponseIssue], Field(..., description=ComplianceResults.model_fields["issues"].description)),
+    summary=(Optional[ResponseSummary], Field(None, description=ComplianceResults.model_fields["summary"].description))
+)
+
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    """Replace ``$ref`` pointers with their definitions; not every grammar compiler resolves them."""
+    if isinstance(node, dict):
+        if "$ref" in node:
+            return _inline_refs(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+        if len(node.get("allOf", ())) == 1:
+            # pydantic wraps a described $ref as {"allOf": [ref], "description": ...}
+            merged = {**node["allOf"][0], **{key: value for key, value in node.items() if key != "allOf"}}
+            return _inline_refs(merged, defs)
+        return {key: _inline_refs(value, defs) for key, value in node.items() if key != "$defs"}
+    if isinstance(node, list):
+        return [_inline_refs(value, defs) for value in node]
+    return node
+
+
+def _build_schema() -> Dict[str, Any]:
+    schema = ComplianceResponse.model_json_schema()
+    return _inline_refs(schema, schema.get("$defs", {}))
+
+
+COMPLIANCE_RESPONSE_SCHEMA: Dict[str, Any] = _build_schema()
+
+
+def response_schema() -> Dict[str, Any]:
+    """A copy of the compliance response JSON Schema."""
+    return copy.deepcopy(COMPLIANCE_RESPONSE_SCHEMA)
+
+
+def ollama_format() -> Union[str, Dict[str, Any]]:
+    """Value of the Ollama ``format`` option: the schema, or plain JSON mode when disabled."""
+    return response_schema() if settings.llm_structured_output else "json"
+
+
+def litellm_response_format() -> Dict[str, Any]:
+    """Value of the LiteLLM ``response_format`` argument."""
+    if not settings.llm_structured_output:
+        return {"type": "json_object"}
+    return {"type": "json_schema", "json_schema": {"name": SCHEMA_NAME, "schema": response_schema()}}
+
+
+def bedrock_tool_config() -> Dict[str, Any]:
+    """``tools``/``tool_choice`` entries for an Anthropic-on-Bedrock request, forcing the schema tool."""
+    if not settings.llm_structured_output:
+        return {}
+    return {
+        "tools": [{
+            "name": BEDROCK_TOOL_NAME,
+            "description": "Record the compliance analysis of the proposal document.",
+            "input_schema": response_schema()
+        }],
+        "tool_choice": {"type": "tool", "name": BEDROCK_TOOL_NAME}
+    }
+
+
+def bedrock_response_content(response_body: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    """The schema tool input from a Bedrock response, or its text when the model did not call the tool."""
+    blocks = response_body.get("content", [])
+    for block in blocks:
+        if block.get("type") == "tool_use" and block.get("name") == BEDROCK_TOOL_NAME:
+            return block.get("input", {})
+    return "".join(block.get("text", "") for block in blocks if block.get("type", "text") == "text")
+
+
+def validate_response(content: Union[str, Dict[str, Any]], source: str, repair: bool = False) -> Dict[str, Any]:
+    """
+    Parse and validate a model response against the compliance schema.
+
+    Args:
+        content: Raw response text, or an already decoded object (Bedrock
+            tool input, streamed response)
+        source: Backend or agent name, for metrics
+        repair: Passed to ``parse_llm_json`` on the fallback path
+
+    Returns:
+        The response as a dict; schema-valid responses are normalized
+        (unset optional fields omitted)
+
+    Raises:
+        ValueError: If the response is neither schema-valid nor parseable JSON
+    """
+    metrics = get_structured_output_metrics()
+    try:
+        if isinstance(content, str):
+            response = ComplianceResponse.model_validate_json(content)
+        else:
+            response = ComplianceResponse.model_validate(content)
+    except ValidationError as e:
+        logger.warning(f"{source} response does not match the compliance schema: {e.errors()[0]['msg']}")
+    else:
+        metrics.record(source, "valid")
+        return response.model_dump(exclude_none=True)
+
+    try:
+        data = content if isinstance(content, dict) else parse_llm_json(content, repair=repair)
+    except ValueError:
+        metrics.record(source, "failed")
+        raise
+    metrics.record(source, "recovered")
+    return data
+
+
+class StructuredOutputMetrics:
+    """Counts of schema-valid, recovered and failed model responses per source."""
+
+    def __init__(self):
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, source: str, outcome: str) -> None:
+        self._counts[source][outcome] += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        totals = sum(self._counts.values(), Counter())
+        responses = sum(totals[outcome] for outcome in OUTCOMES)
+
+        def rate(count: int) -> Optional[float]:
+            return round(count / responses, 4) if responses else None
+
+        return {
+            "enabled": settings.llm_structured_output,
+            "responses": responses,
+            **{outcome: totals[outcome] for outcome in OUTCOMES},
+            # Failed responses cost a retry; recovered ones only missed the schema
+            "parse_failure_rate": rate(totals["failed"]),
+            "schema_violation_rate": rate(totals["recovered"] + totals["failed"]),
+            "by_source": {
+                source: {outcome: counts[outcome] for outcome in OUTCOMES}
+                for source, counts in sorted(self._counts.items())
+            }
+        }
+
+
+# Global metrics instance
+_metrics = None
+
+
+def get_structured_output_metrics() -> StructuredOutputMetrics:
+    """Get the global structured output metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = StructuredOutputMetrics()
+    return _metrics
@@ -0,0 +1,170 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for offline batch inference.
+"""
+
+import io
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+import batch_inference
+from batch_inference import BatchJob, BedrockBatchExecutor, LocalBatchExecutor, run_batch_job
+from db_models import AnalysisStatus
+from models import AnalysisStartRequest
+
+RESPONSE = {"overall_status": "warning", "overall_score": 70, "issues": [{
+    "severity": "warning", "title": "Missing cost breakdown", "description": "No FAR 15.408 table.",
+    "regulation": {"regulation": "FAR", "section": "15.408", "title": "Cost or pricing data"},
+    "confidence": 0.8
+}]}
+
+
+def documents(count):
+    return [AnalysisStartRequest(document_id=f"doc-{n}", filename=f"p{n}.pdf", s3_key=f"k/{n}") for n in range(count)]
+
+
+def patched_storage(pdf_processor):
+    stored = AsyncMock(side_effect=lambda results: [r.id for r in results])
+    updated = AsyncMock(return_value=0)
+    patches = [
+        patch("batch_inference.create_analysis_sessions", AsyncMock(side_effect=lambda docs, meta: [f"s-{d.document_id}" for d in docs])),
+        patch("batch_inference.store_compliance_results_bulk", stored),
+        patch("batch_inference.update_analysis_sessions", updated),
+        patch("batch_inference.get_pdf_processor", return_value=pdf_processor),
+        patch("batch_inference.knowledge_context", AsyncMock(return_value="")),
+        patch("batch_inference.settings.prescan_mode", "off"),
+        patch("batch_inference.settings.batch_inference_write_batch", 2),
+    ]
+    return stored, updated, patches
+
+
+@pytest.mark.asyncio
+async def test_local_batch_writes_results_in_bulk():
+    async def extract(s3_key):
+        if s3_key == "k/3":
+            raise FileNotFoundError("no such key")
+        return f"text of {s3_key}", {}
+
+    async def handler(request):
+        prompt = json.loads(request.content)["prompt"]
+        # One document gets an unusable response
+        body = "not json" if "p2.pdf" in prompt else json.dumps(RESPONSE)
+        return httpx.Response(200, json={"response": body, "done": True})
+
+    stored, updated, patches = patched_storage(MagicMock(extract_text_from_s3=AsyncMock(side_effect=extract)))
+    real_client = httpx.AsyncClient
+    job = BatchJob(documents(5), LocalBatchExecutor("http://batch-box", concurrency=2))
+    with patch("batch_inference.httpx.AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))):
+        for p in patches:
+            p.start()
+        try:
+            await run_batch_job(job)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+    assert job.status == "completed"
+    assert (job.succeeded, job.failed) == (3, 2)
+    written = [r for call in stored.await_args_list for r in call.args[0]]
+    assert [len(call.args[0]) for call in stored.await_args_list] == [2, 2, 1]
+    by_session = {r.session_id: r for r in written}
+    assert set(by_session) == {f"s-doc-{n}" for n in range(5)}
+    assert by_session["s-doc-0"].issues[0].title == "Missing cost breakdown"
+    assert by_session["s-doc-0"].metadata["batch_job_id"] == job.job_id
+    assert by_session["s-doc-3"].metadata["analysis_failed"]
+    failed = {s for call in updated.await_args_list if call.args[1] == AnalysisStatus.FAILED for s in call.args[0]}
+    assert failed == {"s-doc-2", "s-doc-3"}
+
+
+@pytest.mark.asyncio
+async def test_bedrock_batch_job_round_trip():
+    output = "\n".join(json.dumps({
+        "recordId": f"s-doc-{n}",
+        "modelInput": {},
+        "modelOutput": {"content": [{"type": "tool_use", "name": "record_compliance_analysis", "input": RESPONSE}]}
+    }) for n in range(2))
+    s3 = MagicMock()
+    # Output keys span more than one listing page
+    s3.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": "batch-inference/j/output/abc/manifest.json.out"}]},
+        {"Contents": [{"Key": "batch-inference/j/output/abc/input.jsonl.out"}]}
+    ]
+    s3.get_object.return_value = {"Body": io.BytesIO(output.encode())}
+    bedrock = MagicMock()
+    bedrock.create_model_invocation_job.return_value = {"jobArn": "arn:aws:bedrock:job/abc"}
+    bedrock.get_model_invocation_job.side_effect = [{"status": "InProgress"}, {"status": "Completed"}]
+
+    executor = BedrockBatchExecutor(bucket="batch", role_arn="arn:aws:iam::1:role/batch", poll_interval=0.01, min_records=2)
+    executor._s3, executor._bedrock = s3, bedrock
+    stored, updated, patches = patched_storage(MagicMock(extract_text_from_s3=AsyncMock(return_value=("text", {}))))
+    job = BatchJob(documents(2), executor)
+    for p in patches:
+        p.start()
+    try:
+        await run_batch_job(job)
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+    assert job.status == "completed" and job.succeeded == 2
+    uploaded = s3.put_object.call_args.kwargs["Body"].decode().splitlines()
+    assert [json.loads(line)["recordId"] for line in uploaded] == ["s-doc-0", "s-doc-1"]
+    assert "tool_choice" in json.loads(uploaded[0])["modelInput"]
+    request = bedrock.create_model_invocation_job.call_args.kwargs
+    assert request["inputDataConfig"]["s3InputDataConfig"]["s3Uri"] == f"s3://batch/batch-inference/{job.job_id}/input.jsonl"
+    assert s3.get_object.call_count == 1
+    s3.get_paginator.assert_called_once_with("list_objects_v2")
+
+
+@pytest.mark.asyncio
+async def test_small_bedrock_batch_is_invoked_on_demand():
+    """Batches below the job minimum skip the model invocation job."""
+    body = {"content": [{"type": "tool_use", "name": "record_compliance_analysis", "input": RESPONSE}]}
+    runtime = MagicMock()
+    runtime.invoke_model.side_effect = [
+        {"body": io.BytesIO(json.dumps(body).encode())},
+        Exception("ThrottlingException")
+    ]
+    executor = BedrockBatchExecutor(bucket="batch", role_arn=None, min_records=100)
+    executor._s3, executor._bedrock, executor._runtime = MagicMock(), MagicMock(), runtime
+    stored, updated, patches = patched_storage(MagicMock(extract_text_from_s3=AsyncMock(return_value=("text", {}))))
+    job = BatchJob(documents(2), executor)
+    for p in patches:
+        p.start()
+    try:
+        await run_batch_job(job)
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+    assert job.status == "completed"
+    assert (job.succeeded, job.failed) == (1, 1)
+    assert runtime.invoke_model.call_count == 2
+    assert "tool_choice" in json.loads(runtime.invoke_model.call_args.kwargs["body"])
+    executor._s3.put_object.assert_not_called()
+    executor._bedrock.create_model_invocation_job.assert_not_called()
+
+
+def test_finished_jobs_are_evicted():
+    from datetime import datetime, timedelta
+
+    def job(finished_minutes_ago=None):
+        entry = BatchJob(documents(1), MagicMock())
+        if finished_minutes_ago is not None:
+            entry.completed_at = datetime.utcnow() - timedelta(minutes=finished_minutes_ago)
+        return entry
+
+    expired, old, recent, running = job(120), job(5), job(1), job()
+    jobs = {j.job_id: j for j in (expired, old, recent, running)}
+    with patch.dict(batch_inference._jobs, jobs, clear=True), \
+            patch("batch_inference.settings.batch_inference_job_ttl_seconds", 3600), \
+            patch("batch_inference.settings.batch_inference_max_jobs", 2):
+        assert batch_inference.get_batch_job(expired.job_id) is None
+        assert batch_inference.get_batch_job(old.job_id) is None
+        assert batch_inference.get_batch_job(recent.job_id) is recent
+        assert batch_inference.get_batch_job(running.job_id) is running
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for non-blocking Bedrock calls and adaptive client-side throttling.
+"""
+
+import asyncio
+import io
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from aws_bedrock import BedrockClient
+from rate_limiter import AdaptiveRateLimiter
+
+RESPONSE = {
+    "content": [{"type": "text", "text": json.dumps({"overall_status": "pass", "overall_score": 92, "issues": []})}],
+    "usage": {"input_tokens": 100, "output_tokens": 50}
+}
+
+
+def streaming_body(body):
+    data = json.dumps(body).encode()
+    return StreamingBody(io.BytesIO(data), len(data))
+
+
+def bedrock_client(boto_client):
+    client = BedrockClient()
+    client._client = boto_client
+    client.limiter = AdaptiveRateLimiter(6000, 10_000_000)
+    return client
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_throttled_call_backs_off_and_retries():
+    boto_client = boto3.client(
+        "bedrock-runtime", region_name="us-east-1",
+        aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    client = bedrock_client(boto_client)
+    with Stubber(boto_client) as stubber, \
+            patch("aws_bedrock.settings.bedrock_backoff_base_seconds", 0.01), \
+            patch("aws_bedrock.settings.llm_structured_output", False):
+        stubber.add_client_error("invoke_model", service_error_code="ThrottlingException", http_status_code=429)
+        stubber.add_response("invoke_model", {"body": streaming_body(RESPONSE), "contentType": "application/json"})
+        results = await client.analyze_document("text", "p.pdf", "doc-1", session_id="session-1")
+        stubber.assert_no_pending_responses()
+
+    assert results.status == "pass" and results.session_id == "session-1"
+    status = client.get_status()
+    assert status["throttles"] == 1
+    # Halved on the throttle, then one additive recovery step
+    assert status["quota_fraction"] == 0.55
+
+
+@pytest.mark.asyncio
+async def test_invoke_model_does_not_block_the_event_loop():
+    def slow_invoke(**kwargs):
+        time.sleep(0.3)
+        return {"body": streaming_body(RESPONSE)}
+
+    client = bedrock_client(MagicMock(invoke_model=slow_invoke))
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        with patch("aws_bedrock.settings.llm_structured_output", False):
+            results = await asyncio.gather(*(client.analyze_document("text", "p.pdf", f"doc-{n}") for n in range(2)))
+    finally:
+        task.cancel()
+
+    assert all(r.status == "pass" for r in results)
+    assert ticks >= 10
+
+
+def test_adaptive_limiter_cuts_once_per_cooldown_and_recovers():
+    clock = Clock()
+    limiter = AdaptiveRateLimiter(60, 6000, cooldown=2.0, clock=clock)
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.fraction == 0.5
+    assert limiter.requests.rate == 0.5 and limiter.tokens.rate == 50.0
+
+    clock.now = 3.0
+    limiter.on_throttle()
+    assert limiter.fraction == 0.25
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.fraction == 1.0 and limiter.requests.rate == 1.0
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for agent-specific relevance routing of document chunks.
+"""
+
+from chunk_router import ChunkRouter, BM25Index, split_page_chunks, CHARS_PER_TOKEN
+
+FILLER = "The offeror describes general corporate history and office locations. " * 12
+
+
+def build_document():
+    pages = [
+        FILLER,
+        "DFARS 252.204-7012 requires safeguarding of CUI. The offeror shall implement NIST SP 800-171 controls.",
+        FILLER,
+        "Staffing plan: each labor category lists years of experience and key personnel qualifications.",
+        FILLER,
+        "Executive Order 14028 on cybersecurity and the minimum wage executive order apply to this effort."
+    ]
+    return "".join(f"\n--- Page {i + 1} ---\n{text}\n" for i, text in enumerate(pages))
+
+
+def test_chunks_never_cross_pages():
+    """Each chunk belongs to exactly one page and respects the size limit."""
+    chunks = split_page_chunks(build_document(), max_chars=300)
+
+    assert {c.page for c in chunks} == {1, 2, 3, 4, 5, 6}
+    assert all(len(c.text) <= 300 for c in chunks)
+    assert all("--- Page" not in c.text for c in chunks)
+
+
+def test_bm25_ranks_matching_chunk_first():
+    """The chunk containing the query terms scores highest."""
+    index = BM25Index(split_page_chunks(build_document(), max_chars=2000))
+    scores = index.score(["NIST", "CUI", "DFARS"])
+
+    best = max(range(len(scores)), key=lambda i: scores[i])
+    assert index.chunks[best].page == 2
+
+
+def test_each_agent_gets_its_relevant_pages_within_budget():
+    """Agents receive different, relevant chunks from across the document."""
+    router = ChunkRouter(token_budget=100, top_k=2, max_chunk_chars=400)
+    document = build_document()
+
+    far = router.route("far", document)
+    eo = router.route("eo", document)
+    technical = router.route("technical", document)
+
+    assert "[Page 2]" in far
+    assert "[Page 6]" in eo
+    assert "[Page 4]" in technical
+    assert all(len(text) <= 100 * CHARS_PER_TOKEN + 20 for text in (far, eo, technical))
+    assert len(router._indexes) == 1
+
+
+def test_short_documents_pass_through():
+    """Documents within the budget are not chunked."""
+    router = ChunkRouter(token_budget=1000, top_k=4)
+    assert router.route("far", "Short proposal text") == "Short proposal text"
+
+
+def test_context_counts_against_the_agent_budget():
+    """Regulatory and pre-scan context leaves less room for document chunks, never more prompt."""
+    from unittest.mock import patch
+
+    from local_provider import routed_agent_input
+
+    router = ChunkRouter(token_budget=150, top_k=4, max_chunk_chars=200)
+    document = build_document()
+    with patch("local_provider.get_chunk_router", return_value=router):
+        for context in ("", "Settled: FAR 19.702 threshold not reached.", "Reference text. " * 200):
+            text = routed_agent_input("eo", document, context)
+            assert len(text) <= 150 * CHARS_PER_TOKEN
+            assert text.startswith(context[:100])
+        # The document still gets the half of the budget an oversized context leaves
+        assert "[Page" in routed_agent_input("eo", document, "Reference text. " * 200)
@@ -0,0 +1,216 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the provider circuit breakers and AnalysisRouter failover.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import circuit_breaker
+from analysis_provider import AnalysisRouter, ProviderType
+from circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
+from models import ComplianceResults, ComplianceSummary
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(clock, **kwargs):
+    options = dict(failure_rate=0.5, slow_call_seconds=10, slow_call_rate=0.75, window=4,
+                   min_calls=4, open_seconds=30, half_open_calls=1, clock=clock)
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+def test_opens_on_failure_rate_and_recovers_through_half_open():
+    clock = Clock()
+    cb = breaker(clock)
+    for failed in (False, True, False, True):
+        cb.record_failure(1) if failed else cb.record_success(1)
+    assert cb.state == BreakerState.OPEN
+    assert not cb.allow_request() and cb.retry_after == 30
+
+    clock.now = 30
+    assert cb.state == BreakerState.HALF_OPEN
+    assert cb.allow_request()
+    # Only one trial call at a time
+    assert not cb.allow_request()
+    cb.record_failure(1)
+    assert cb.state == BreakerState.OPEN and cb.times_opened == 2
+
+    clock.now = 60
+    assert cb.allow_request()
+    cb.record_success(1)
+    assert cb.state == BreakerState.CLOSED
+    assert cb.get_status()["calls_in_window"] == 0
+
+
+def test_opens_on_slow_calls():
+    clock = Clock()
+    cb = breaker(clock)
+    for duration in (12, 15, 2, 11):
+        cb.record_success(duration)
+    assert cb.state == BreakerState.OPEN
+    assert cb.get_status()["slow_call_rate"] == 0.75
+
+
+def results(provider):
+    return ComplianceResults(
+        id=f"{provider}_1", session_id="s", document_id="d", status="pass", issues=[],
+        summary=ComplianceSummary(total_issues=0, critical_count=0, warning_count=0, info_count=0, overall_score=100),
+        generated_at=datetime.utcnow(), ai_model=provider, processing_time=0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_along_the_chain():
+    aws, local = MagicMock(), MagicMock()
+    aws.analyze_document = AsyncMock(side_effect=Exception("ThrottlingException"))
+    local.analyze_document = AsyncMock(return_value=results("local"))
+    providers = {ProviderType.AWS: aws, ProviderType.LOCAL: local}
+    router = AnalysisRouter()
+
+    with patch.object(circuit_breaker, "_breakers", {}), \
+            patch.dict(AnalysisRouter._providers, {ProviderType.AWS: MagicMock, ProviderType.LOCAL: MagicMock}), \
+            patch("circuit_breaker.settings.circuit_breaker_min_calls", 2), \
+            patch("analysis_provider.settings.analysis_mode", "aws"), \
+            patch("analysis_provider.settings.analysis_provider_chain", "gcp, local,aws"), \
+            patch("analysis_provider.settings.prescan_mode", "off"), \
+            patch.object(router, "_knowledge_context", AsyncMock(return_value="")), \
+            patch.object(router, "get_provider", side_effect=providers.get):
+        assert router.provider_chain() == [ProviderType.AWS, ProviderType.LOCAL]
+
+        first = await router.analyze_document("text", "p.pdf", "d")
+        assert first.metadata["failover"]["failed"] == ["aws: ThrottlingException"]
+        await router.analyze_document("text", "p.pdf", "d")
+        # The AWS breaker is now open: it is skipped without a call
+        third = await router.analyze_document("text", "p.pdf", "d")
+        assert aws.analyze_document.await_count == 2
+        assert third.metadata["failover"]["skipped_open"] == ["aws"]
+        assert circuit_breaker.get_circuit_breaker("aws").state == BreakerState.OPEN
+
+        local.analyze_document.side_effect = Exception("connection refused")
+        with pytest.raises(Exception, match="All analysis providers failed"):
+            await router.analyze_document("text", "p.pdf", "d")
+        for _ in range(2):
+            circuit_breaker.get_circuit_breaker("local").record_failure(1)
+        assert circuit_breaker.get_circuit_breaker("local").state == BreakerState.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            await router.analyze_document("text", "p.pdf", "d")
+        assert error.value.retry_after > 0
+
+
+def test_lost_trial_slot_is_released_or_reclaimed():
+    clock = Clock()
+    cb = breaker(clock)
+    for _ in range(4):
+        cb.record_failure(1)
+    clock.now = 30
+    assert cb.allow_request()
+    # A cancelled trial records no outcome but frees its slot
+    cb.release_trial()
+    assert cb.allow_request()
+    # A trial that never reports back is reclaimed after the slow-call limit
+    assert not cb.allow_request()
+    clock.now = 41
+    assert cb.allow_request()
+
+
+def test_failover_is_opt_in():
+    from config import Settings
+
+    assert Settings.model_fields["analysis_provider_chain"].default == ""
+    with patch.dict(AnalysisRouter._providers, {ProviderType.AWS: MagicMock, ProviderType.LOCAL: MagicMock}), \
+            patch("analysis_provider.settings.analysis_mode", "local"):
+        with patch("analysis_provider.settings.analysis_provider_chain", ""):
+            assert AnalysisRouter.provider_chain() == [ProviderType.LOCAL]
+        with patch("analysis_provider.settings.analysis_provider_chain", "aws"):
+            assert AnalysisRouter.provider_chain() == [ProviderType.LOCAL, ProviderType.AWS]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_and_streamed_findings_on_failover():
+    import asyncio
+    from finding_stream import emit_finding, stream_findings
+
+    async def streams_then_fails(**kwargs):
+        await emit_finding({"title": "from aws"}, "aws")
+        raise Exception("stream reset")
+
+    async def streams_and_succeeds(**kwargs):
+        await emit_finding({"title": "from local"}, "local")
+        return results("local")
+
+    aws, local = MagicMock(), MagicMock()
+    aws.analyze_document = AsyncMock(side_effect=streams_then_fails)
+    local.analyze_document = AsyncMock(side_effect=streams_and_succeeds)
+    providers = {ProviderType.AWS: aws, ProviderType.LOCAL: local}
+    router = AnalysisRouter()
+    delivered = []
+
+    async def sink(issue, source):
+        delivered.append(issue["title"])
+
+    with patch.object(circuit_breaker, "_breakers", {}), \
+            patch.dict(AnalysisRouter._providers, {ProviderType.AWS: MagicMock, ProviderType.LOCAL: MagicMock}), \
+            patch("analysis_provider.settings.analysis_mode", "aws"), \
+            patch("analysis_provider.settings.analysis_provider_chain", "local"), \
+            patch("analysis_provider.settings.prescan_mode", "off"), \
+            patch.object(router, "_knowledge_context", AsyncMock(return_value="")), \
+            patch.object(router, "get_provider", side_effect=providers.get):
+        with stream_findings(sink):
+            served = await router.analyze_document("text", "p.pdf", "d")
+        # The failover provider does not stream a second set of findings
+        assert delivered == ["from aws"]
+        assert served.metadata["failover"]["findings_streamed_before_failover"] == 1
+
+        aws_breaker = circuit_breaker.get_circuit_breaker("aws")
+        aws_breaker._open("test")
+        aws_breaker._opened_at -= aws_breaker.open_seconds
+        async def hangs(**kwargs):
+            await asyncio.sleep(3600)
+
+        aws.analyze_document = AsyncMock(side_effect=hangs)
+        call = asyncio.ensure_future(router.analyze_document("text", "p.pdf", "d"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        # The cancelled trial did not leave the breaker stuck half-open
+        assert aws_breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_failing_local_agents_open_the_local_breaker():
+    """An analysis whose agents all fail is a provider failure, not an empty result."""
+    from local_provider import LocalAnalysisProvider
+
+    provider = LocalAnalysisProvider()
+    router = AnalysisRouter()
+
+    with patch.object(circuit_breaker, "_breakers", {}), \
+            patch("circuit_breaker.settings.circuit_breaker_min_calls", 2), \
+            patch("analysis_provider.settings.analysis_mode", "local"), \
+            patch("analysis_provider.settings.analysis_provider_chain", ""), \
+            patch("analysis_provider.settings.prescan_mode", "off"), \
+            patch("local_provider.settings.use_local_llm", True), \
+            patch("local_provider.settings.use_simulated_data", False), \
+            patch("local_provider.settings.air_spec_mode", False), \
+            patch.object(provider, "_call_specialized_agent", AsyncMock(side_effect=ConnectionError("ollama down"))), \
+            patch.object(router, "_knowledge_context", AsyncMock(return_value="")), \
+            patch.object(router, "get_provider", return_value=provider):
+        for _ in range(2):
+            with pytest.raises(Exception, match="ollama down"):
+                await router.analyze_document("text", "p.pdf", "d")
+
+        assert circuit_breaker.get_circuit_breaker("local").state == BreakerState.OPEN
+        with pytest.raises(CircuitOpenError):
+            await router.analyze_document("text", "p.pdf", "d")
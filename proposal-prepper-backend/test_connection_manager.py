@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for topic-based WebSocket fan-out with per-client send queues.
+"""
+
+import asyncio
+import pytest
+
+from connection_manager import (
+    ConnectionManager,
+    SLOW_CONSUMER_CLOSE_CODE,
+    session_topic,
+    proposal_topic
+)
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording sent messages."""
+
+    def __init__(self, send_delay: float = 0.0, block: bool = False):
+        self.sent = []
+        self.send_delay = send_delay
+        self.block = block
+        self.accepted = False
+        self.closed_with = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_json(self, message):
+        if self.block:
+            await asyncio.Event().wait()
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def progress(session_id, value, proposal_id=None):
+    return {
+        "type": "analysis_progress",
+        "sessionId": session_id,
+        "proposalId": proposal_id,
+        "data": {"progress": value}
+    }
+
+
+async def drain():
+    """Let sender tasks run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_events_only_reach_topic_subscribers():
+    """Subscribers of other sessions do not receive the event."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=1.0)
+    ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(ws_a, [session_topic("a")])
+    await manager.connect(ws_b, [session_topic("b")])
+
+    delivered = await manager.broadcast(progress("a", 10.0))
+    await drain()
+
+    assert delivered == 1
+    assert [m["sessionId"] for m in ws_a.sent] == ["a"]
+    assert ws_b.sent == []
+
+
+@pytest.mark.asyncio
+async def test_clients_without_topics_receive_everything():
+    """Unsubscribed clients keep the original firehose behaviour."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=1.0)
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+
+    await manager.broadcast(progress("a", 10.0))
+    await manager.broadcast(progress("b", 20.0))
+    await drain()
+
+    assert len(ws.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_proposal_topic_receives_session_events():
+    """Events carrying a proposal ID fan out to proposal subscribers."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=1.0)
+    ws = FakeWebSocket()
+    await manager.connect(ws, [proposal_topic("p1")])
+
+    await manager.broadcast(progress("a", 10.0, proposal_id="p1"))
+    await drain()
+
+    assert len(ws.sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_superseded_progress_is_coalesced():
+    """Only the latest pending progress event per session is sent."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=1.0)
+    ws = FakeWebSocket()
+    await manager.connect(ws, [session_topic("a")])
+
+    # Broadcast synchronously without yielding to the sender task
+    for value in (10.0, 20.0, 30.0):
+        await manager.broadcast(progress("a", value))
+    await manager.broadcast({"type": "analysis_complete", "sessionId": "a", "data": {}})
+    await drain()
+
+    assert [m["type"] for m in ws.sent] == ["analysis_progress", "analysis_complete"]
+    assert ws.sent[0]["data"]["progress"] == 30.0
+    assert manager.stats.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_evicted_without_blocking_others():
+    """A client that stops reading is dropped once its queue overflows."""
+    manager = ConnectionManager(max_queue_size=2, send_timeout=5.0)
+    slow, fast = FakeWebSocket(block=True), FakeWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    for i in range(5):
+        await manager.broadcast({"type": "analysis_complete", "sessionId": f"s{i}", "data": {}})
+        await drain()
+
+    assert slow not in manager.active_connections
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert len(fast.sent) == 5
+    assert manager.stats.evicted == 1
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_evicts_client():
+    """A single send exceeding the timeout evicts the client."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=0.01)
+    ws = FakeWebSocket(block=True)
+    await manager.connect(ws)
+
+    await manager.broadcast(progress("a", 10.0))
+    await asyncio.sleep(0.05)
+    await drain()
+
+    assert manager.active_connections == []
+    assert ws.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    # The eviction task was held until it finished
+    assert manager._evictions == set()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_narrows_wildcard_client():
+    """An explicit subscription replaces the implicit wildcard."""
+    manager = ConnectionManager(max_queue_size=10, send_timeout=1.0)
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    manager.subscribe(ws, session_topic("a"))
+
+    await manager.broadcast(progress("b", 10.0))
+    await manager.broadcast(progress("a", 10.0))
+    await drain()
+
+    assert [m["sessionId"] for m in ws.sent] == ["a"]
+
+    manager.disconnect(ws)
+    assert manager.get_status()["topics"] == 0
@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the content-addressed embedding cache.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from embedding_cache import CachedEmbedder, content_hash
+from embedding_pipeline import HashingEmbedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that records every text it embeds."""
+
+    def __init__(self):
+        super().__init__(dim=8)
+        self.embedded = []
+
+    async def embed(self, texts):
+        self.embedded.extend(texts)
+        return await super().embed(texts)
+
+
+class FakeCacheTable:
+    """In-memory stand-in for obi_embedding_cache behind get_async_session."""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = 0
+
+    def session_factory(self):
+        table = self
+
+        class Session:
+            async def execute(self, statement):
+                if statement.is_insert:
+                    table.inserts += 1
+                    for row in statement._multi_values[0]:
+                        values = {getattr(column, "key", column): value for column, value in row.items()}
+                        table.rows.setdefault(values["content_hash"], values["embedding"])
+                    return None
+                hashes = statement.whereclause.clauses[0].right.value
+                rows = [SimpleNamespace(content_hash=h, embedding=table.rows[h]) for h in hashes if h in table.rows]
+                return SimpleNamespace(all=lambda: rows)
+
+        @asynccontextmanager
+        async def factory():
+            yield Session()
+        return factory
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_is_embedded_once():
+    """Duplicate texts in a batch and across calls hit the memory cache."""
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, memory_entries=100, persist=False)
+
+    first = await embedder.embed(["alpha", "beta", "alpha"])
+    second = await embedder.embed(["beta", "gamma"])
+
+    assert inner.embedded == ["alpha", "beta", "gamma"]
+    assert first[0] == first[2]
+    assert second[0] == first[1]
+    assert embedder.stats.memory_hits == 1
+    assert embedder.stats.misses == 4
+    assert embedder.get_status()["hit_rate"] == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_database_cache_survives_restart():
+    """A new process (empty memory cache) reuses vectors persisted earlier."""
+    table = FakeCacheTable()
+
+    with patch("embedding_cache.get_async_session", table.session_factory()):
+        first = CachedEmbedder(CountingEmbedder(), memory_entries=100)
+        vectors = await first.embed(["section 1", "section 2"])
+
+        restarted_inner = CountingEmbedder()
+        restarted = CachedEmbedder(restarted_inner, memory_entries=100)
+        again = await restarted.embed(["section 1", "section 2", "section 3 (revised)"])
+
+    assert set(table.rows) == {content_hash("section 1"), content_hash("section 2"), content_hash("section 3 (revised)")}
+    assert restarted_inner.embedded == ["section 3 (revised)"]
+    assert again[:2] == vectors
+    assert restarted.stats.db_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_fall_back_to_embedding():
+    """An unavailable cache table only costs a miss."""
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, memory_entries=100)
+
+    @asynccontextmanager
+    async def broken_session():
+        raise RuntimeError("Database not initialized")
+        yield
+
+    with patch("embedding_cache.get_async_session", broken_session):
+        vectors = await embedder.embed(["text"])
+
+    assert len(vectors) == 1
+    assert inner.embedded == ["text"]
+    assert embedder.stats.errors == 2
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the batched embedding pipeline.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+import pytest
+
+from embedding_pipeline import EMBEDDING_DIM, Embedder, EmbeddingPipeline, HashingEmbedder, OllamaEmbedder
+
+
+class RecordingSession:
+    """Captures bulk UPDATE parameter sets."""
+
+    def __init__(self):
+        self.updates = []
+
+    async def execute(self, statement, params=None):
+        self.updates.append(params)
+
+
+class SlowEmbedder(Embedder):
+    """Tracks how many batches are in flight; fails batches containing 'bad'."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_name(self):
+        return "slow"
+
+    async def embed(self, texts):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if any("bad" in t for t in texts):
+                raise RuntimeError("model error")
+            return [[float(len(t))] * EMBEDDING_DIM for t in texts]
+        finally:
+            self.in_flight -= 1
+
+
+def test_hashing_embedder_is_deterministic_and_lexical():
+    """Same text, same vector; overlapping texts are closer than unrelated ones."""
+    embedder = HashingEmbedder()
+    a = np.array(embedder.embed_one("small business subcontracting plan required"))
+    b = np.array(embedder.embed_one("a subcontracting plan is required for small business"))
+    c = np.array(embedder.embed_one("minimum wage for federal contractors"))
+
+    assert a.shape == (EMBEDDING_DIM,)
+    assert np.allclose(a, embedder.embed_one("small business subcontracting plan required"))
+    assert np.linalg.norm(a) == pytest.approx(1.0, abs=1e-5)
+    assert float(a @ b) > float(a @ c)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_batches_with_bounded_concurrency():
+    """Batches run at most `concurrency` at a time and are written back in one bulk update."""
+    embedder = SlowEmbedder()
+    session = RecordingSession()
+    pipeline = EmbeddingPipeline(embedder=embedder, batch_size=2, concurrency=2)
+    chunks = [(f"id{i}", f"text {i}") for i in range(9)]
+
+    @asynccontextmanager
+    async def fake_session():
+        yield session
+
+    with patch("embedding_pipeline.get_async_session", fake_session):
+        stats = await pipeline.embed_chunks(chunks)
+
+    assert embedder.max_in_flight == 2
+    assert stats.batches == 5
+    assert stats.chunks == 9
+    assert stats.chunks_per_second > 0
+    assert len(session.updates) == 1
+    assert [row["id"] for row in session.updates[0]] == [f"id{i}" for i in range(9)]
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_skipped():
+    """A failing batch leaves its chunks for the backfill without losing the rest."""
+    session = RecordingSession()
+    pipeline = EmbeddingPipeline(embedder=SlowEmbedder(), batch_size=2, concurrency=4)
+    chunks = [("a", "good"), ("b", "good"), ("c", "bad"), ("d", "good")]
+
+    @asynccontextmanager
+    async def fake_session():
+        yield session
+
+    with patch("embedding_pipeline.get_async_session", fake_session):
+        stats = await pipeline.embed_chunks(chunks)
+
+    assert stats.failed_batches == 1
+    assert stats.chunks == 2
+    assert [row["id"] for row in session.updates[0]] == ["a", "b"]
+
+
+def ollama_transport(embed_response):
+    """Serve /api/embed with ``embed_response`` and the legacy endpoint with a fixed vector."""
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path == "/api/embed":
+            return embed_response
+        return httpx.Response(200, json={"embedding": [1.0] * EMBEDDING_DIM})
+
+    return httpx.MockTransport(handler), paths
+
+
+@pytest.mark.asyncio
+async def test_ollama_embedder_falls_back_when_batch_endpoint_is_missing():
+    transport, paths = ollama_transport(httpx.Response(404, text="404 page not found"))
+    embedder = OllamaEmbedder(base_url="http://ollama", model="nomic-embed-text")
+
+    with patch("embedding_pipeline.httpx.AsyncClient", partial(httpx.AsyncClient, transport=transport)):
+        vectors = await embedder.embed(["one", "two"])
+
+    assert len(vectors) == 2
+    assert paths == ["/api/embed", "/api/embeddings", "/api/embeddings"]
+    assert embedder._batch_endpoint is False
+
+
+@pytest.mark.asyncio
+async def test_ollama_embedder_surfaces_missing_model():
+    """A model-not-found 404 is an error, not a sign of an older server."""
+    missing = httpx.Response(404, json={"error": 'model "nomic-embed-text" not found, try pulling it first'})
+    transport, paths = ollama_transport(missing)
+    embedder = OllamaEmbedder(base_url="http://ollama", model="nomic-embed-text")
+
+    with patch("embedding_pipeline.httpx.AsyncClient", partial(httpx.AsyncClient, transport=transport)):
+        with pytest.raises(httpx.HTTPStatusError):
+            await embedder.embed(["one"])
+
+    assert paths == ["/api/embed"]
+    assert embedder._batch_endpoint is True
@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the resumable EO crawl worker.
+"""
+
+import io
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from eo_crawl_worker import CrawlClaim, EOCrawlWorker, raw_text_key
+
+
+class FakeS3:
+    """Dict-backed stand-in for the boto3 S3 client."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise Exception("404 Not Found")
+        return {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+def claim(status="discovered", attempts=1, **overrides):
+    values = dict(
+        id="row-1",
+        eo_number="14028",
+        document_number="2021-10460",
+        status=status,
+        title="Improving the Nation's Cybersecurity",
+        publication_date=datetime(2021, 5, 17),
+        federal_register_url="https://www.federalregister.gov/d/2021-10460",
+        raw_text_url="https://www.federalregister.gov/documents/full_text/text/2021/05/17/2021-10460.txt",
+        raw_text_key=None,
+        attempts=attempts
+    )
+    values.update(overrides)
+    return CrawlClaim(**values)
+
+
+def make_worker(s3, checkpoint_result=True, raw_text="Sec. 1. Policy. Text."):
+    crawler = MagicMock()
+    crawler.fetch_eo_content = AsyncMock(return_value={"raw_text": raw_text} if raw_text else None)
+    crawler.ingest_eo = AsyncMock()
+    worker = EOCrawlWorker(crawler=crawler, s3_client=s3, worker_id="worker-a", max_attempts=3)
+    worker._checkpoint = AsyncMock(return_value=checkpoint_result)
+    return worker
+
+
+def test_claim_skips_locked_rows_and_leases_them():
+    """Claiming is a single UPDATE over a SKIP LOCKED subquery returning the leased rows."""
+    worker = EOCrawlWorker(crawler=MagicMock(), s3_client=FakeS3(), worker_id="worker-a")
+    sql = str(worker.claim_statement(5).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE obi_eo_crawl_status SET")
+    assert "lease_owner=%(lease_owner)s" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "lease_expires_at < now()" in sql
+    assert "RETURNING obi_eo_crawl_status.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_discovered_eo_is_downloaded_then_indexed():
+    s3 = FakeS3()
+    worker = make_worker(s3)
+
+    await worker.process(claim())
+
+    key = (worker.bucket, raw_text_key("2021-10460"))
+    assert s3.objects[key] == b"Sec. 1. Policy. Text."
+    first_checkpoint = worker._checkpoint.call_args_list[0].kwargs
+    assert first_checkpoint["status"] == "downloaded"
+    assert first_checkpoint["raw_text_key"] == key[1]
+    doc_data = worker.crawler.ingest_eo.call_args.args[0]
+    assert doc_data["executive_order_number"] == "14028"
+    assert doc_data["raw_text"] == "Sec. 1. Policy. Text."
+    assert (worker.stats.downloaded, worker.stats.indexed) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_resume_uses_stored_text_without_refetching():
+    """Downloaded EOs, and texts uploaded before a crash, are not fetched again."""
+    key = raw_text_key("2021-10460")
+    s3 = FakeS3({("obi-one-executive-orders", key): b"Sec. 1. Stored text."})
+
+    worker = make_worker(s3)
+    worker.bucket = "obi-one-executive-orders"
+    await worker.process(claim(status="downloaded", raw_text_key=key))
+    await worker.process(claim(status="discovered"))
+
+    worker.crawler.fetch_eo_content.assert_not_called()
+    assert worker.crawler.ingest_eo.await_count == 2
+    assert worker.crawler.ingest_eo.call_args.args[0]["raw_text"] == "Sec. 1. Stored text."
+
+
+@pytest.mark.asyncio
+async def test_errors_back_off_then_fail():
+    """Failures keep the checkpoint and retry later until max_attempts is reached."""
+    worker = make_worker(FakeS3(), raw_text=None)
+
+    await worker.process(claim(attempts=1))
+    retry = worker._checkpoint.call_args.kwargs
+    assert "status" not in retry
+    assert retry["lease_owner"] is None
+    assert "next_attempt_at" in retry
+    assert "No raw text" in retry["error_message"]
+
+    await worker.process(claim(attempts=3))
+    assert worker._checkpoint.call_args.kwargs["status"] == "failed"
+    assert (worker.stats.retried, worker.stats.failed) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_stops_processing():
+    """A worker whose lease was taken over does not index the EO."""
+    worker = make_worker(FakeS3(), checkpoint_result=False)
+
+    await worker.process(claim())
+
+    worker.crawler.ingest_eo.assert_not_called()
+    assert worker.stats.downloaded == 0
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_is_fenced_by_lease_owner():
+    """Checkpoints only match rows still leased by this worker."""
+    statements = []
+
+    class Session:
+        async def execute(self, statement):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return MagicMock(rowcount=0)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield Session()
+
+    worker = EOCrawlWorker(crawler=MagicMock(), s3_client=FakeS3(), worker_id="worker-a")
+    with patch("eo_crawl_worker.get_async_session", session_factory):
+        assert not await worker._checkpoint(claim(), status="downloaded")
+
+    assert "obi_eo_crawl_status.lease_owner = %(lease_owner_1)s" in statements[0]
+    assert worker.stats.lost_leases == 1
@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the incremental Federal Register crawl against a local fixture server.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from local_eo_crawler import EOCrawler
+from rate_limiter import TokenBucket
+
+# Newest first, as the Federal Register API returns them
+DOCUMENTS = [
+    {
+        "document_number": f"2024-{n:05d}",
+        "executive_order_number": 14100 + n,
+        "title": f"Executive Order {14100 + n}",
+        "signing_date": f"2024-0{1 + n // 3}-1{n % 3}",
+        "publication_date": f"2024-0{1 + n // 3}-2{n % 3}",
+        "html_url": f"https://example.invalid/eo/{n}"
+    }
+    for n in range(8, 0, -1)
+]
+
+
+class FederalRegisterFixture(BaseHTTPRequestHandler):
+    """Minimal stand-in for the documents.json, document and raw text endpoints."""
+
+    page_size = 3
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests = []
+    not_modified = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, etag: str):
+        if self.headers.get("If-None-Match") == etag:
+            type(self).not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            self._route()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _route(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base = f"http://{self.headers['Host']}/api/v1"
+        if url.path == "/api/v1/documents.json":
+            since = query.get("conditions[publication_date][gte]", [None])[0]
+            documents = [d for d in DOCUMENTS if not since or d["publication_date"] >= since]
+            page = int(query.get("page", ["1"])[0])
+            start = (page - 1) * self.page_size
+            results = [
+                {**d, "raw_text_url": f"{base}/raw/{d['document_number']}.txt"}
+                for d in documents[start:start + self.page_size]
+            ]
+            payload = {"count": len(documents), "results": results}
+            if start + self.page_size < len(documents):
+                payload["next_page_url"] = f"{base}/documents.json?{url.query.replace(f'&page={page}', '')}&page={page + 1}"
+            self._send(json.dumps(payload).encode(), "application/json", f'"list-{since}-{page}"')
+        elif url.path.startswith("/api/v1/raw/"):
+            number = url.path.rsplit("/", 1)[1][:-len(".txt")]
+            time.sleep(0.05)
+            self._send(f"Sec. 1. Policy. Text of {number}.".encode(), "text/plain", f'"raw-{number}"')
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+@pytest.fixture
+def fixture_server():
+    FederalRegisterFixture.requests = []
+    FederalRegisterFixture.in_flight = FederalRegisterFixture.max_in_flight = 0
+    FederalRegisterFixture.not_modified = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FederalRegisterFixture)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    server.shutdown()
+    server.server_close()
+
+
+class FakeSession:
+    """Records executed statements; nothing has been ingested before."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalar=lambda: None, scalars=lambda: SimpleNamespace(all=lambda: []))
+
+
+def fake_session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_incremental_crawl_paginates_and_fetches_concurrently(fixture_server, tmp_path):
+    """Discovery follows next_page_url down to the since date; documents are fetched in parallel."""
+    session = FakeSession()
+    crawler = EOCrawler(base_url=fixture_server, concurrency=3, rate_per_second=1000, cache_dir=str(tmp_path))
+    ingest = AsyncMock()
+
+    try:
+        with patch("local_eo_crawler.get_async_session", fake_session_factory(session)), \
+                patch.object(crawler, "ingest_eo", ingest):
+            stats = await crawler.crawl(since=datetime(2024, 2, 20))
+    finally:
+        await crawler.close()
+
+    # EOs 14103-14108 were published on or after 2024-02-20
+    ingested = sorted(call.args[0]["executive_order_number"] for call in ingest.call_args_list)
+    assert ingested == list(range(14103, 14109))
+    assert all(call.args[0]["raw_text"].startswith("Sec. 1.") for call in ingest.call_args_list)
+    assert stats.pages == 2 and stats.discovered == 6 and stats.ingested == 6
+    # Discovery records carry raw_text_url, so no per-document metadata requests are made
+    assert not any("/documents/2024-" in path for path in FederalRegisterFixture.requests)
+    assert 1 < FederalRegisterFixture.max_in_flight <= 3
+
+    upserts = [s for s in session.statements if getattr(s, "is_insert", False)]
+    assert len(upserts) == 1
+    sql = str(upserts[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (eo_number) DO UPDATE" in sql
+    assert "status = " not in sql.split("DO UPDATE")[1]
+
+
+@pytest.mark.asyncio
+async def test_recrawl_revalidates_with_etags(fixture_server, tmp_path):
+    """A second crawl sends If-None-Match and is served from the disk cache."""
+    for _ in range(2):
+        crawler = EOCrawler(base_url=fixture_server, concurrency=2, rate_per_second=1000, cache_dir=str(tmp_path))
+        try:
+            with patch("local_eo_crawler.get_async_session", fake_session_factory(FakeSession())), \
+                    patch.object(crawler, "ingest_eo", AsyncMock()):
+                stats = await crawler.crawl(since=datetime(2024, 3, 1), max_pages=1)
+        finally:
+            await crawler.close()
+
+    # One discovery page and three raw texts, all unchanged
+    assert stats.requests == 4
+    assert stats.not_modified == 4
+    assert FederalRegisterFixture.not_modified == 4
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """After the burst is spent, acquisitions are spaced at the refill rate."""
+    bucket = TokenBucket(rate=50.0, capacity=2)
+    started = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(7)))
+    elapsed = time.monotonic() - started
+
+    assert elapsed == pytest.approx(5 / 50.0, abs=0.05)
+    assert not bucket.try_acquire()
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the cross-replica progress event bus.
+
+A small in-memory stand-in for Redis pub/sub is used so the tests run
+without a Redis server.
+"""
+
+import asyncio
+import pytest
+
+from event_bus import (
+    InProcessEventBus,
+    RedisEventBus,
+    encode_batch,
+    decode_batch
+)
+
+
+class FakePubSub:
+    """Stand-in for redis.asyncio.client.PubSub."""
+
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+        self.channels = set()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self.server.subscribers.append(self)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def aclose(self):
+        self.server.subscribers.remove(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeRedis:
+    """Stand-in for a shared Redis server exposing publish/pubsub."""
+
+    def __init__(self):
+        self.subscribers = []
+        self.published = []
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def publish(self, channel, data):
+        self.published.append(data)
+        for subscriber in self.subscribers:
+            if channel in subscriber.channels:
+                subscriber.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(self.subscribers)
+
+
+def progress(session_id, value):
+    return {"type": "analysis_progress", "sessionId": session_id, "data": {"progress": value}}
+
+
+async def start_replica(server, received, **kwargs):
+    bus = RedisEventBus(redis_client=server, channel="test", batch_interval=0.01, **kwargs)
+
+    async def deliver(message):
+        received.append(message)
+
+    await bus.start(deliver)
+    return bus
+
+
+def test_batch_round_trip_with_compression():
+    """Large batches are compressed and decode to the original events."""
+    events = [progress("s1", float(i)) for i in range(200)]
+    payload = encode_batch("origin-1", events, compress_min_bytes=256)
+
+    assert payload[:1] == b"z"
+    assert decode_batch(payload) == {"origin": "origin-1", "events": events}
+    assert encode_batch("o", [progress("s1", 1.0)], compress_min_bytes=10_000)[:1] == b"j"
+
+
+@pytest.mark.asyncio
+async def test_in_process_bus_delivers_locally():
+    """The fallback bus hands events straight to the local handler."""
+    received = []
+    bus = InProcessEventBus()
+
+    async def deliver(message):
+        received.append(message)
+
+    await bus.start(deliver)
+    await bus.publish(progress("s1", 10.0))
+
+    assert received == [progress("s1", 10.0)]
+
+
+@pytest.mark.asyncio
+async def test_events_reach_other_replicas_once():
+    """Events published on one replica are delivered once on every replica."""
+    server = FakeRedis()
+    received_a, received_b = [], []
+    bus_a = await start_replica(server, received_a)
+    bus_b = await start_replica(server, received_b)
+
+    try:
+        await bus_a.publish({"type": "analysis_complete", "sessionId": "s1", "data": {}})
+        await asyncio.sleep(0.1)
+
+        assert len(received_a) == 1
+        assert len(received_b) == 1
+        assert received_b[0]["sessionId"] == "s1"
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_progress_is_batched_and_coalesced_on_the_wire():
+    """Superseded progress events within a batch window are not sent to Redis."""
+    server = FakeRedis()
+    received_a, received_b = [], []
+    bus_a = await start_replica(server, received_a)
+    bus_b = await start_replica(server, received_b)
+
+    try:
+        for value in (10.0, 20.0, 30.0):
+            await bus_a.publish(progress("s1", value))
+        await bus_a.publish({"type": "analysis_complete", "sessionId": "s1", "data": {}})
+        await asyncio.sleep(0.1)
+
+        # The local replica sees every event, remote replicas see the coalesced batch
+        assert len(received_a) == 4
+        assert [m["type"] for m in received_b] == ["analysis_progress", "analysis_complete"]
+        assert received_b[0]["data"]["progress"] == 30.0
+        assert bus_a.batches_sent == 1
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_immediately():
+    """Reaching max_batch triggers a flush without waiting for the interval."""
+    server = FakeRedis()
+    bus = RedisEventBus(redis_client=server, channel="test", batch_interval=10.0, max_batch=3)
+
+    async def deliver(message):
+        pass
+
+    await bus.start(deliver)
+    try:
+        for i in range(3):
+            await bus.publish({"type": "analysis_complete", "sessionId": f"s{i}", "data": {}})
+        await asyncio.sleep(0.05)
+
+        assert len(server.published) == 1
+        assert len(decode_batch(server.published[0])["events"]) == 3
+    finally:
+        await bus.stop()
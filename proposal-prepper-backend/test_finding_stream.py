@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for streamed LLM responses and incremental issue parsing.
+"""
+
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from finding_stream import emit_finding, stream_findings
+from parser_utils import IncrementalIssueParser
+from prompt_prefix import PromptParts
+
+ISSUES = [
+    {"severity": "critical", "title": "Missing {SB} plan", "description": "Quote \" and ] inside",
+     "regulation": {"regulation": "FAR", "section": "19.702", "title": "Subcontracting"}, "confidence": 0.9},
+    {"severity": "warning", "title": "Cost breakdown", "description": "FAR 15.408 [Table 15-2]",
+     "regulation": {"regulation": "FAR", "section": "15.408", "title": "Pricing"}, "confidence": 0.7}
+]
+RESPONSE = "```json\n" + json.dumps({
+    "overall_status": "fail",
+    "overall_score": 42,
+    "issues": ISSUES,
+    "summary": {"total_issues": 2, "critical_count": 1}
+}, indent=2) + "\n```"
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, len(RESPONSE)])
+def test_parser_emits_issues_as_they_complete(size):
+    parser = IncrementalIssueParser()
+    emitted = []
+    for start in range(0, len(RESPONSE), size):
+        fragment = RESPONSE[start:start + size]
+        emitted.extend((start + size, issue) for issue in parser.feed(fragment))
+
+    assert [issue for _, issue in emitted] == ISSUES
+    if size == 1:
+        # The first issue is available before the second one has started
+        assert emitted[0][0] < RESPONSE.index('"severity": "warning"')
+    data = parser.result()
+    assert data["issues"] == ISSUES
+    assert data["overall_score"] == 42 and data["summary"]["critical_count"] == 1
+
+
+def test_parser_rejects_truncated_response():
+    parser = IncrementalIssueParser()
+    assert parser.feed(RESPONSE[:RESPONSE.index("Cost breakdown")]) == ISSUES[:1]
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+@pytest.mark.asyncio
+async def test_local_provider_streams_findings_before_completion():
+    from local_provider import LocalAnalysisProvider
+
+    finished = asyncio.Event()
+
+    async def stream():
+        for start in range(0, len(RESPONSE), 16):
+            await asyncio.sleep(0)
+            yield chunk(RESPONSE[start:start + 16])
+        finished.set()
+
+    async def acompletion(**kwargs):
+        assert kwargs["stream"] is True
+        return stream()
+
+    received = []
+
+    async def sink(issue, source):
+        received.append((issue["title"], source, finished.is_set()))
+
+    provider = LocalAnalysisProvider()
+    with patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}), stream_findings(sink):
+        data = await provider._call_specialized_agent("far", "text", "proposal.pdf")
+
+    assert [title for title, _, _ in received] == ["Missing {SB} plan", "Cost breakdown"]
+    assert all(source == "far" and not done for _, source, done in received)
+    assert data["issues"] == ISSUES
+
+
+@pytest.mark.asyncio
+async def test_interrupted_stream_is_not_a_complete_result():
+    """Findings streamed before a connection drop are sent, but the call still fails."""
+    from local_provider import LocalAnalysisProvider
+
+    cut = RESPONSE.index("Cost breakdown")
+
+    async def stream():
+        yield chunk(RESPONSE[:cut])
+        raise ConnectionError("connection reset")
+
+    async def acompletion(**kwargs):
+        return stream()
+
+    received = []
+
+    async def sink(issue, source):
+        received.append(issue["title"])
+
+    provider = LocalAnalysisProvider()
+    with patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}), stream_findings(sink):
+        with pytest.raises(ConnectionError):
+            await provider._complete_json(PromptParts("", "text"), "far")
+
+    assert received == ["Missing {SB} plan"]
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_streams_ndjson():
+    from local_llm import LocalLLMClient
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        lines = [json.dumps({"response": RESPONSE[i:i + 10], "done": False}) for i in range(0, len(RESPONSE), 10)]
+        lines.append(json.dumps({"response": "", "done": True}))
+        return httpx.Response(200, content="\n".join(lines).encode())
+
+    real_client = httpx.AsyncClient
+    received = []
+
+    async def sink(issue, source):
+        received.append(issue["title"])
+
+    with patch("local_llm.httpx.AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))), \
+            stream_findings(sink):
+        results = await LocalLLMClient().analyze_document("text", "proposal.pdf", "doc-1")
+
+    assert received == ["Missing {SB} plan", "Cost breakdown"]
+    assert results.summary.total_issues == 2 and results.status == "fail"
+
+
+@pytest.mark.asyncio
+async def test_sinks_are_isolated_per_task():
+    seen = {"a": [], "b": []}
+
+    async def analysis(name):
+        async def sink(issue, source):
+            seen[name].append(issue["title"])
+
+        with stream_findings(sink):
+            for n in range(3):
+                await asyncio.sleep(0)
+                await emit_finding({"title": f"{name}{n}"}, "far")
+
+    await asyncio.gather(analysis("a"), analysis("b"))
+    # Outside any analysis, findings go nowhere
+    await emit_finding({"title": "orphan"}, "far")
+
+    assert seen == {"a": ["a0", "a1", "a2"], "b": ["b0", "b1", "b2"]}
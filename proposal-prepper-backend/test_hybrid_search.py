@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for hybrid citation, full-text and vector search.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from hybrid_search import (
+    HybridSearcher,
+    citation_references,
+    is_citation_query,
+    lexical_query,
+    reciprocal_rank_fusion
+)
+from knowledge_retrieval import RetrievedChunk
+
+
+def chunk(chunk_id, reference_id=None):
+    return RetrievedChunk(
+        id=chunk_id,
+        reference_id=reference_id or chunk_id,
+        title=None,
+        content=f"Text of {chunk_id}",
+        source_type="FAR",
+        source_name="FAR 2024",
+        similarity=0.0
+    )
+
+
+class FakeSession:
+    """Records executed statements and returns canned rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def fake_session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+    return factory
+
+
+def row(reference_id):
+    return SimpleNamespace(
+        id=f"chunk-{reference_id}",
+        reference_id=reference_id,
+        title="Title",
+        content=f"Text of {reference_id}",
+        source_type="DFARS",
+        name="DFARS 2024"
+    )
+
+
+def test_citation_references():
+    """Prefixed, EO and bare citations map to reference ids; prose numbers do not."""
+    text = "Per DFARS 252.204-7012 and clause 52.219-9, see Executive Order 14028. Costs rose 3.5 percent."
+
+    assert citation_references(text) == [
+        "DFARS 252.204-7012", "FAR 52.219-9", "52.219-9", "EO 14028"
+    ]
+    assert is_citation_query(" FAR 15.408 ")
+    # Typed citations are often lowercase; they still map to the canonical reference id
+    assert is_citation_query("far 52.219-9")
+    assert citation_references("far 52.219-9") == ["FAR 52.219-9"]
+    assert not is_citation_query("FAR 15.408 cost data")
+
+
+def test_lexical_query_is_safe_or_expression():
+    """tsquery operators in user input never reach to_tsquery."""
+    assert lexical_query("CUI & (safeguarding) | !252.204-7012") == "cui | safeguarding | 252.204-7012"
+    assert lexical_query("a !") == ""
+
+
+def test_reciprocal_rank_fusion():
+    """Chunks ranked well by both lists come first, without mutating the inputs."""
+    lexical = [chunk("a"), chunk("b"), chunk("c")]
+    vector = [chunk("c"), chunk("d"), chunk("a")]
+
+    fused = reciprocal_rank_fusion([lexical, vector], k=60)
+
+    assert [c.id for c in fused] == ["a", "c", "b", "d"]
+    assert fused[0].score == pytest.approx(1 / 61 + 1 / 63)
+    assert lexical[0].score == 0.0
+
+
+@pytest.mark.asyncio
+async def test_citation_query_uses_reference_index_only():
+    """A bare citation is answered from the reference_id lookup and cached."""
+    session = FakeSession([row("DFARS 252.204-7012")])
+    searcher = HybridSearcher(candidates=10, rrf_k=60, cache_size=4)
+    vector = AsyncMock(return_value=[])
+
+    with patch("hybrid_search.get_async_session", fake_session_factory(session)), \
+            patch.object(searcher, "vector", vector):
+        first = await searcher.search("DFARS 252.204-7012", k=3)
+        second = await searcher.search("DFARS 252.204-7012", k=3)
+
+    assert first is second
+    assert [c.reference_id for c in first] == ["DFARS 252.204-7012"]
+    assert first[0].similarity == 1.0
+    vector.assert_not_called()
+    assert len(session.statements) == 1
+    assert "reference_id IN" in session.statements[0]
+    assert searcher.get_status()["fast_path_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lexical_statement_uses_fulltext_index_expression():
+    """The lexical query matches the GIN index expression and ranks by ts_rank_cd."""
+    session = FakeSession([])
+    searcher = HybridSearcher(candidates=10, rrf_k=60, cache_size=4)
+
+    with patch("hybrid_search.get_async_session", fake_session_factory(session)):
+        await searcher.lexical("safeguarding covered defense information", 10, ["DFARS"])
+
+    statement = session.statements[0]
+    assert "to_tsvector('english'::regconfig, obi_knowledge_chunks.content) @@ to_tsquery('english'::regconfig" in statement
+    assert "ts_rank_cd" in statement
+    assert "source_type IN" in statement
+
+
+@pytest.mark.asyncio
+async def test_document_search_prepends_cited_chunks_to_fused_results():
+    """Chunks for cited regulations come first, then the fused lexical/vector ranking."""
+    searcher = HybridSearcher(candidates=10, rrf_k=60, cache_size=4)
+    exact = AsyncMock(return_value=[chunk("x", "DFARS 252.204-7012")])
+    lexical = AsyncMock(return_value=[chunk("a"), chunk("x"), chunk("b")])
+    vector = AsyncMock(return_value=[chunk("b"), chunk("c")])
+
+    with patch.object(searcher, "exact", exact), \
+            patch.object(searcher, "lexical", lexical), \
+            patch.object(searcher, "vector", vector):
+        results = await searcher.search("We protect CUI per DFARS 252.204-7012 on all systems.", k=4)
+
+    assert [c.id for c in results] == ["x", "b", "a", "c"]
+    assert exact.call_args.args[0] == ["DFARS 252.204-7012"]
+    assert lexical.call_args.args[1] == 10
@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for cached, concurrent USAspending queries against the offline stand-in.
+"""
+
+import asyncio
+
+import pytest
+
+from intelligence_fusion import IntelligenceFusion, normalize_payload
+from ttl_cache import TTLCache
+from usaspending_standin import USASpendingStandIn
+
+
+@pytest.fixture
+def standin():
+    with USASpendingStandIn(synthetic=250, latency=0.05) as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_multi_page_search_fans_out_and_is_cached(standin):
+    fusion = IntelligenceFusion(base_url=standin.url, concurrency=3, rate_per_second=1000, page_size=100)
+    try:
+        awards = await fusion.find_incumbents("Department of Homeland Security", "541511", max_results=240)
+        requests = standin.state.requests
+        again = await fusion.find_incumbents("Department of Homeland Security", " 541511", max_results=240)
+    finally:
+        await fusion.close()
+
+    assert len(awards) == 240
+    amounts = [a["Award Amount"] for a in awards]
+    assert amounts == sorted(amounts, reverse=True)
+    # Count and page 1 together, then pages 2 and 3 together
+    assert requests == 4 and fusion.stats.pages == 6
+    assert standin.state.max_in_flight == 2
+    # The repeat (with a differently formatted NAICS code) is served from the cache
+    assert again == awards
+    assert standin.state.requests == requests
+    assert fusion.stats.cache_hits == 4
+
+
+@pytest.mark.asyncio
+async def test_award_details_batch_is_concurrent_and_bounded(standin):
+    fusion = IntelligenceFusion(base_url=standin.url, concurrency=3, rate_per_second=1000)
+    ids = [f"CONT_AWD_STANDIN{n:05d}" for n in range(8)] + ["CONT_AWD_STANDIN00000", "MISSING"]
+    try:
+        details = await fusion.get_award_details_batch(ids)
+    finally:
+        await fusion.close()
+
+    assert len(details) == 9
+    assert details["CONT_AWD_STANDIN00003"]["piid"] == "70SBUR00003"
+    assert details["MISSING"] == {}
+    assert standin.state.requests == 9
+    assert standin.state.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_offline(standin, tmp_path):
+    """Responses recorded through the stand-in are replayed without the upstream."""
+    recordings = tmp_path / "usaspending.json"
+    with USASpendingStandIn(recordings_path=str(recordings), upstream=standin.url.rsplit("/api/v2", 1)[0]) as recorder:
+        fusion = IntelligenceFusion(base_url=recorder.url, rate_per_second=1000)
+        try:
+            recorded = await fusion.find_incumbents("DHS", "541511", max_results=5)
+        finally:
+            await fusion.close()
+
+    with USASpendingStandIn(recordings_path=str(recordings)) as replay:
+        fusion = IntelligenceFusion(base_url=replay.url, rate_per_second=1000)
+        try:
+            replayed = await fusion.find_incumbents("DHS", "541511", max_results=5)
+        finally:
+            await fusion.close()
+
+    assert len(recorded) == 5
+    assert replayed == recorded
+
+
+def test_payload_normalization():
+    a = {"filters": {"naics_codes": ["541512", "541511"], "keywords": [" cyber"]}, "page": 1}
+    b = {"page": 1, "filters": {"keywords": ["cyber"], "naics_codes": ["541511", "541512"]}}
+    assert normalize_payload(a) == normalize_payload(b)
+    assert normalize_payload(a) != normalize_payload({**b, "page": 2})
+
+
+@pytest.mark.asyncio
+async def test_normalized_payload_is_sent_upstream():
+    sent = []
+    fusion = IntelligenceFusion(base_url="http://usaspending", rate_per_second=1000)
+
+    async def send(method, path, payload):
+        sent.append(payload)
+        return {"results": {"contracts": 3}}
+
+    fusion._send = send
+    try:
+        assert await fusion.count_awards({"keywords": [" cyber "]}) == 3
+        assert await fusion.count_awards({"keywords": ["cyber"]}) == 3
+    finally:
+        await fusion.close()
+
+    # Both requests share one cache entry, and what was sent matches its key
+    assert sent == [{"filters": {"keywords": ["cyber"]}}]
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_expires_and_coalesces():
+    now = [0.0]
+    cache = TTLCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    assert await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(5))) == [1] * 5
+    assert cache.stats.coalesced == 4
+    now[0] = 11.0
+    assert await cache.get_or_load("k", load) == 2
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("k") is None and cache.stats.evictions == 1
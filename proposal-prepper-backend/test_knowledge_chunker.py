@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for structure-aware knowledge chunking and bulk insertion.
+"""
+
+import pytest
+
+from knowledge_chunker import chunk_rows, chunk_text, insert_chunks
+
+EXECUTIVE_ORDER = (
+    "Executive Order 14028 of May 12, 2021\n\n"
+    "By the authority vested in me as President by the Constitution.\n\n"
+    "Section 1. Policy. The United States faces persistent and increasingly sophisticated "
+    "malicious cyber campaigns. " + "Incremental improvements will not give us the security we need. " * 30 + "\n\n"
+    "Sec. 2. Removing Barriers to Sharing Threat Information. (a) Service providers share data.\n\n"
+    "(b) Contract language must be updated.\n"
+)
+
+FAR_TEXT = (
+    "Subpart 4.19—Basic Safeguarding of Covered Contractor Information Systems\n\n"
+    "4.1903 Contract clause.\n\n"
+    "The contracting officer shall insert the clause at 52.204-21.\n\n"
+    "52.204-21 Basic Safeguarding of Covered Contractor Information Systems.\n\n"
+    "(a) Definitions. As used in this clause—\n\n"
+    "(b) Safeguarding requirements and procedures.\n"
+)
+
+
+def test_chunks_are_exact_slices_within_budget():
+    """Offsets locate every chunk in the source and no chunk exceeds the budget."""
+    chunks = chunk_text(EXECUTIVE_ORDER, max_tokens=100)
+
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    for chunk in chunks:
+        assert EXECUTIVE_ORDER[chunk.char_start:chunk.char_end] == chunk.text
+        assert len(chunk.text) <= 400
+        assert chunk.text == chunk.text.strip()
+    # Long paragraphs split at sentence ends, never mid-word
+    assert all(c.text.endswith(".") for c in chunks)
+
+
+def test_chunks_never_cross_sections():
+    """Section headings start new chunks and label the chunks under them."""
+    chunks = chunk_text(EXECUTIVE_ORDER, max_tokens=1000)
+
+    assert [c.section for c in chunks] == [
+        None, "Section 1. Policy.", "Sec. 2. Removing Barriers to Sharing Threat Information."
+    ]
+    # Both paragraphs of section 2 fit the budget, so they are packed together
+    assert chunks[2].text.endswith("Contract language must be updated.")
+
+    far = chunk_text(FAR_TEXT, max_tokens=1000)
+    assert [c.section.split()[0] for c in far] == ["Subpart", "4.1903", "52.204-21"]
+    assert "clause at 52.204-21" in far[1].text
+
+
+def test_chunk_rows_carry_offsets():
+    chunks = chunk_text(FAR_TEXT, max_tokens=1000)
+    rows = chunk_rows("src-1", chunks, reference_id="FAR 4.19", title="FAR Subpart 4.19")
+
+    assert len({row["id"] for row in rows}) == len(rows)
+    assert rows[2]["title"] == "FAR Subpart 4.19 (Part 3)"
+    assert rows[2]["metadata_json"]["section"].startswith("52.204-21")
+    assert rows[2]["metadata_json"]["char_end"] == len(FAR_TEXT.rstrip())
+
+
+@pytest.mark.asyncio
+async def test_insert_chunks_uses_multi_row_statements():
+    """Rows are written with one INSERT per batch rather than one per chunk."""
+    class Session:
+        def __init__(self):
+            self.statements = []
+
+        async def execute(self, statement):
+            self.statements.append(statement)
+
+    rows = chunk_rows("src-1", chunk_text(EXECUTIVE_ORDER, max_tokens=50), reference_id="EO 14028")
+    session = Session()
+
+    assert await insert_chunks(session, rows, batch_rows=4) == len(rows)
+    assert len(session.statements) == -(-len(rows) // 4)
+    assert all(s.is_insert and s._multi_values for s in session.statements)
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for vector retrieval over knowledge chunks.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from knowledge_retrieval import (
+    EMBEDDING_DIM,
+    KnowledgeRetriever,
+    RetrievedChunk,
+    fit_dimension,
+    format_context
+)
+
+
+class FakeSession:
+    """Records executed statements and returns canned rows for the search."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def fake_session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+    return factory
+
+
+def row(reference_id, distance):
+    return SimpleNamespace(
+        id=f"chunk-{reference_id}",
+        reference_id=reference_id,
+        title="Title",
+        content=f"Text of {reference_id}",
+        source_type="FAR",
+        name="FAR 2024",
+        distance=distance
+    )
+
+
+def test_fit_dimension_pads_and_truncates():
+    """Embeddings of any model size fit the column dimension."""
+    assert len(fit_dimension([1.0] * 768)) == EMBEDDING_DIM
+    assert fit_dimension([1.0] * 768)[-1] == 0.0
+    assert len(fit_dimension([1.0] * 4096)) == EMBEDDING_DIM
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_source_type_and_caches():
+    """The query uses cosine distance with a source filter; repeats hit the cache."""
+    session = FakeSession([row("FAR 15.408", 0.1), row("FAR 52.219-9", 0.3)])
+    retriever = KnowledgeRetriever(cache_size=4, ef_search=40)
+    embedding = [0.1] * EMBEDDING_DIM
+
+    with patch("knowledge_retrieval.get_async_session", fake_session_factory(session)):
+        first = await retriever.search(embedding, k=2, source_types=["FAR", "DFARS"])
+        second = await retriever.search(embedding, k=2, source_types=["DFARS", "FAR"])
+
+    assert first is second
+    assert retriever.cache_hits == 1
+    assert [c.reference_id for c in first] == ["FAR 15.408", "FAR 52.219-9"]
+    assert first[0].similarity == pytest.approx(0.9)
+
+    set_ef, query = session.statements
+    assert "hnsw.ef_search = 40" in set_ef
+    assert "<=>" in query
+    assert "obi_knowledge_sources.source_type IN" in query
+    assert "LIMIT" in query
+
+
+def test_format_context_respects_limit():
+    """Context is labelled by reference and bounded in size."""
+    chunks = [
+        RetrievedChunk("1", "FAR 15.408", "Proposal adequacy", "A" * 500, "FAR", "FAR", 0.9),
+        RetrievedChunk("2", "FAR 19.702", None, "B" * 500, "FAR", "FAR 2024", 0.8)
+    ]
+
+    context = format_context(chunks, max_chars=600)
+
+    assert context.startswith("[FAR 15.408] Proposal adequacy")
+    assert "[FAR 19.702] FAR 2024" in context
+    assert len(context) <= 600
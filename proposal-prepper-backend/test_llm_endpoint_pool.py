@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the load-balanced local LLM endpoint pool, against stub Ollama servers.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from llm_endpoint_pool import LLMEndpointPool, llm_session
+from local_llm import LocalLLMClient
+
+RESPONSE = json.dumps({"overall_status": "pass", "overall_score": 95, "issues": []})
+
+
+class StubOllama:
+    """Minimal /api/tags and /api/generate server that tracks its concurrency."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body):
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply({"models": [{"name": "llama3.2"}]})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                time.sleep(stub.latency)
+                with stub._lock:
+                    stub.active -= 1
+                self._reply({"response": RESPONSE, "done": True})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama() for _ in range(3)]
+    yield servers
+    for server in servers:
+        try:
+            server.stop()
+        except OSError:
+            pass
+
+
+async def analyze(pool, count, document_id="doc"):
+    client = LocalLLMClient()
+    with patch("local_llm.get_llm_endpoint_pool", return_value=pool), \
+            patch("local_llm.settings.llm_streaming_enabled", False):
+        return await asyncio.gather(*(client.analyze_document("text", "p.pdf", f"{document_id}-{n}") for n in range(count)))
+
+
+@pytest.mark.asyncio
+async def test_least_outstanding_routing_respects_caps(stubs):
+    pool = LLMEndpointPool([s.url for s in stubs], max_concurrency=1)
+    results = await analyze(pool, 9)
+
+    assert all(r.status == "pass" for r in results)
+    assert [s.requests for s in stubs] == [3, 3, 3]
+    assert max(s.peak for s in stubs) == 1
+    assert pool.waits > 0 and pool.get_status()["outstanding"] == 0
+    assert {r.metadata["url"] for r in results} == {s.url for s in stubs}
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_endpoints_are_skipped(stubs):
+    stubs[1].stop()
+    pool = LLMEndpointPool([s.url for s in stubs], max_concurrency=2, failure_threshold=1)
+    await pool.probe()
+    assert [e.healthy for e in pool.endpoints] == [True, False, True]
+
+    await analyze(pool, 4)
+    assert (stubs[0].requests, stubs[2].requests) == (2, 2)
+
+    # Passive detection: a failed request marks the endpoint unhealthy until the next probe
+    stubs[0].stop()
+    with pytest.raises(Exception):
+        await analyze(pool, 1)
+    assert [e.healthy for e in pool.endpoints] == [False, False, True]
+    await analyze(pool, 2)
+    assert stubs[2].requests == 4
+
+
+@pytest.mark.asyncio
+async def test_sessions_stick_to_one_endpoint(stubs):
+    pool = LLMEndpointPool([s.url for s in stubs], max_concurrency=2)
+    client = LocalLLMClient()
+    with patch("local_llm.get_llm_endpoint_pool", return_value=pool), \
+            patch("local_llm.settings.llm_streaming_enabled", False):
+        for agent in ("far", "eo", "technical"):
+            with llm_session("session-a"):
+                await client.analyze_document("text", "p.pdf", "doc-a", agent_type=agent)
+            with llm_session("session-b"):
+                await client.analyze_document("text", "p.pdf", "doc-b", agent_type=agent)
+
+    assert sorted(s.requests for s in stubs) == [0, 3, 3]
+    assert pool.sticky_hits == 4
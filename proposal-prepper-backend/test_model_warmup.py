@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for local model warm-up, keep-alive refresh and cold/warm latency.
+"""
+
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from agent_personas import PERSONA_TYPES
+from llm_endpoint_pool import LLMEndpointPool
+from local_llm import LocalLLMClient
+from model_warmup import ModelWarmer
+from prompt_prefix import PrefixCacheMetrics, agent_prefix
+
+RESPONSE = json.dumps({"overall_status": "pass", "overall_score": 90, "issues": []})
+
+
+def mock_ollama(requests, load_seconds=0.0):
+    real_client = httpx.AsyncClient
+
+    async def handler(request):
+        body = json.loads(request.content)
+        requests.append((request.url.host, body, request.url.path))
+        return httpx.Response(200, json={
+            "response": RESPONSE, "done": True,
+            # A stand-in tokenizer: one token per four characters
+            "prompt_eval_count": len(body.get("prompt", "")) // 4,
+            "load_duration": int(load_seconds * 1e9), "total_duration": int((load_seconds + 0.5) * 1e9)
+        })
+
+    return lambda: real_client(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_model_and_primes_personas_on_healthy_endpoints():
+    pool = LLMEndpointPool(["http://a", "http://b"])
+    pool.endpoints[1].healthy = False
+    warmer = ModelWarmer(pool, model="llama3.2", keep_alive="30m")
+    requests = []
+    metrics = PrefixCacheMetrics()
+    with patch("model_warmup.httpx.AsyncClient", mock_ollama(requests, load_seconds=4.0)), \
+            patch("model_warmup.get_prefix_cache_metrics", return_value=metrics):
+        await warmer.warm_up()
+
+    assert {host for host, _, _ in requests} == {"a"}
+    assert requests[0][1]["prompt"] == "" and requests[0][2] == "/api/generate"
+    assert all(body["keep_alive"] == "30m" and body["options"]["num_predict"] == 1 for _, body, _ in requests)
+    # Primers seed each agent's prompt prefix the way the analysis calls send it
+    primed = [body["messages"][0] for _, body, path in requests if path == "/api/chat"]
+    assert primed == [{"role": "system", "content": agent_prefix(p)} for p in PERSONA_TYPES]
+    # Each prefix is measured raw, behind a marker whose own tokens are subtracted
+    measured = [body for _, body, path in requests[1:] if path == "/api/generate"]
+    assert len(measured) == 2 * len(PERSONA_TYPES) and all(body["raw"] for body in measured)
+    prefix = agent_prefix("far")
+    assert metrics.prefix_tokens("ollama", prefix) == (len(prefix) + 4) // 4 - 1
+    status = warmer.get_status()
+    assert status["warmed_up"] and status["endpoints"]["http://a"]["load_seconds"] == 4.0
+    assert status["endpoints"]["http://a"]["prefix_tokens"]["far"] == metrics.prefix_tokens("ollama", prefix)
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_refreshed_only_while_there_is_work():
+    work = []
+    warmer = ModelWarmer(LLMEndpointPool(["http://a"]), has_work=lambda: bool(work))
+    requests = []
+    with patch("model_warmup.httpx.AsyncClient", mock_ollama(requests)):
+        assert not await warmer.refresh()
+        work.append("session")
+        assert await warmer.refresh()
+    assert len(requests) == 1 and requests[0][1]["prompt"] == ""
+    assert warmer.get_status()["keepalive_refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analysis_requests_are_classified_cold_or_warm():
+    warmer = ModelWarmer(LLMEndpointPool(["http://a"]))
+    pool = LLMEndpointPool(["http://a"])
+    client = LocalLLMClient()
+    requests = []
+    with patch("local_llm.get_llm_endpoint_pool", return_value=pool), \
+            patch("local_llm.get_model_warmer", return_value=warmer), \
+            patch("local_llm.settings.llm_streaming_enabled", False):
+        with patch("local_llm.httpx.AsyncClient", mock_ollama(requests, load_seconds=5.0)):
+            await client.analyze_document("text", "p.pdf", "doc-1")
+        with patch("local_llm.httpx.AsyncClient", mock_ollama(requests)):
+            await client.analyze_document("text", "p.pdf", "doc-2")
+
+    assert requests[0][1]["keep_alive"] == warmer.keep_alive
+    status = warmer.get_status()
+    assert (status["cold"]["requests"], status["warm"]["requests"]) == (1, 1)
+    assert status["cold"]["avg_ms"] == 5500.0 and status["warm"]["avg_ms"] == 500.0
+
+
+@pytest.mark.asyncio
+async def test_litellm_analysis_path_keeps_model_loaded_and_reports_load_time():
+    import sys
+    from types import SimpleNamespace
+
+    from local_provider import LocalAnalysisProvider
+
+    requests = []
+
+    async def acompletion(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=RESPONSE))],
+            _hidden_params={"original_response": json.dumps({"load_duration": int(6e9), "total_duration": int(7e9)})}
+        )
+
+    warmer = ModelWarmer(LLMEndpointPool(["http://a"]))
+    with patch("local_provider.get_model_warmer", return_value=warmer), \
+            patch("local_provider.settings.llm_streaming_enabled", False), \
+            patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}):
+        await LocalAnalysisProvider()._call_specialized_agent("far", "text", "p.pdf")
+
+    assert requests[0]["keep_alive"] == warmer.keep_alive
+    status = warmer.get_status()
+    assert status["cold"]["requests"] == 1 and status["cold"]["avg_ms"] == 7000.0
@@ -3,10 +3,11 @@
 
 import pytest
 import json
+import random
 from local_provider import LocalAnalysisProvider
 from models import ComplianceResults
 
-from parser_utils import extract_json_from_text, map_issue_data, parse_llm_json
+from parser_utils import IncrementalIssueParser, extract_json_from_text, map_issue_data, parse_llm_json
 
 class TestParserRobustness:
     """Tests the robustness of LLM response parsing logic."""
@@ -43,5 +44,80 @@ class TestParserRobustness:
         assert issue.confidence == 0.5
         assert issue.id == "doc123_0"
 
+    def test_prose_with_braces_around_json(self):
+        """Braces in surrounding prose do not widen or break the extraction."""
+        content = 'Checked {3} sections. {"issues": [], "note": "a } in a string"} See {appendix} for details.'
+        assert parse_llm_json(content) == {"issues": [], "note": "a } in a string"}
+
+    def test_first_of_multiple_objects(self):
+        """Only the first complete top-level object is returned."""
+        content = '{"issues": [{"title": "A"}]}\n\nRevised:\n{"issues": []}'
+        assert extract_json_from_text(content) == '{"issues": [{"title": "A"}]}'
+
+    def test_common_llm_defects_are_fixed(self):
+        """Trailing commas and raw newlines inside strings are tolerated."""
+        content = '{"issues": [{"title": "A", "description": "line one\nline two\ttabbed",},],}'
+        data = parse_llm_json(content)
+        assert data["issues"] == [{"title": "A", "description": "line one\nline two\ttabbed"}]
+
+    def test_repair_salvages_complete_issues(self):
+        """Repair mode keeps complete issues from truncated output and drops the partial one."""
+        content = '```json\n{"overall_status": "fail", "issues": [{"title": "A", "regulation": {"section": "1"}}, {"title": "B", "desc'
+        with pytest.raises(ValueError):
+            parse_llm_json(content)
+        data = parse_llm_json(content, repair=True)
+        assert data == {"overall_status": "fail", "issues": [{"title": "A", "regulation": {"section": "1"}}]}
+
+    @pytest.mark.parametrize("content", ['{', '{"overall', '{"issues": [', '{"overall_status": "pass", "issues": [{"tit'])
+    def test_repair_without_complete_issue_raises(self, content):
+        """A truncated response with nothing salvaged is an error, not an analysis with zero findings."""
+        with pytest.raises(ValueError):
+            parse_llm_json(content, repair=True)
+
+    def test_mismatched_bracket_does_not_promote_nested_object(self):
+        """An inner issue of a malformed object is not returned as the root."""
+        with pytest.raises(ValueError):
+            parse_llm_json('{"issues": [{"t": 1}] ] }', repair=True)
+
+    def test_repair_keeps_complete_scalar_elements(self):
+        """Complete scalar members and array elements survive truncation; the possibly cut one is dropped."""
+        data = parse_llm_json('{"issues": [{"t": 1}], "overall_score": 40, "pages": [1,2', repair=True)
+        assert data == {"issues": [{"t": 1}], "overall_score": 40, "pages": [1]}
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_fuzz_corpus(self, seed):
+        """Randomly wrapped, defective and truncated responses parse to (a prefix of) the original."""
+        rng = random.Random(seed)
+        issues = [
+            {
+                "severity": rng.choice(["critical", "warning", "info"]),
+                "title": rng.choice(['Missing {plan}', 'Clause [52.204-21]', 'Quote " inside', 'Back\\slash']),
+                "regulation": {"regulation": "FAR", "section": f"{rng.randint(1, 52)}.{rng.randint(100, 999)}"},
+                "confidence": round(rng.random(), 2)
+            }
+            for _ in range(rng.randint(0, 6))
+        ]
+        original = {"overall_status": "warning", "overall_score": rng.randint(0, 100), "issues": issues}
+        text = json.dumps(original, indent=rng.choice([None, 2]))
+        if rng.random() < 0.5:
+            # Trailing comma defect
+            text = text.replace("}]", "},]", 1)
+        prose = rng.choice(["", "Here is the analysis {as requested}:\n", "```json\n"])
+        trailer = rng.choice(["", "\n```", "\nLet me know if {anything} else is needed."])
+        response = prose + text + trailer
+
+        assert parse_llm_json(response) == original
+
+        cut = rng.randint(len(prose) + 1, len(prose) + len(text) - 1)
+        complete = IncrementalIssueParser().feed(text[:cut - len(prose)])
+        if not complete:
+            with pytest.raises(ValueError):
+                parse_llm_json(response[:cut], repair=True)
+            return
+        salvaged = parse_llm_json(response[:cut], repair=True)
+        kept = salvaged["issues"]
+        assert kept == complete
+        assert all(salvaged[key] == original[key] for key in salvaged if key != "issues")
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the vectorized Price to Beat analytics and its Parquet cache.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from intelligence_fusion import IntelligenceFusion
+from price_to_beat import PriceToBeatEngine, analyze_awards, awards_frame
+from usaspending_standin import USASpendingStandIn
+
+AWARDS = [
+    {"Award ID": "A1", "Recipient Name": "Acme Corp", "Award Amount": 4_000_000,
+     "Start Date": "2021-01-01", "End Date": "2025-01-01"},
+    {"Award ID": "A2", "Recipient Name": " acme corp", "Award Amount": 1_000_000,
+     "Start Date": "2024-01-01", "End Date": "2025-01-01"},
+    {"Award ID": "B1", "Recipient Name": "Beta LLC", "Award Amount": 3_000_000,
+     "Start Date": "2023-07-01", "End Date": "2026-07-01"},
+    {"Award ID": "C1", "Recipient Name": "Gamma Inc", "Award Amount": 2_000_000,
+     "Start Date": None, "End Date": "2030-01-01"},
+    {"Award ID": "X", "Recipient Name": "Deobligated", "Award Amount": -5_000}
+]
+
+
+def test_award_tables():
+    tables = analyze_awards(AWARDS, as_of=datetime(2024, 10, 1), horizon_months=12)
+
+    frame = awards_frame(AWARDS)
+    assert len(frame) == 4
+    # Annualized over the period of performance; unknown without a start date
+    assert frame["annual_value"].iloc[:3].tolist() == pytest.approx([1_000_000] * 3, rel=0.01)
+    assert np.isnan(frame["annual_value"].iloc[3])
+
+    bands = tables["bands"].set_index(["metric", "percentile"])["value"]
+    assert bands[("amount", 50.0)] == pytest.approx(2_500_000)
+    assert bands[("annual_value", 50.0)] == pytest.approx(1_000_000, rel=0.01)
+
+    incumbents = tables["incumbents"]
+    assert incumbents["recipient"].tolist() == ["ACME CORP", "BETA LLC", "GAMMA INC"]
+    assert incumbents["awards"].tolist() == [2, 1, 1]
+    assert incumbents["share"].sum() == pytest.approx(1.0)
+
+    recompetes = tables["recompetes"]
+    assert recompetes["award_id"].tolist() == ["A1", "A2"]
+    assert recompetes["quarter"].tolist() == ["2025Q1", "2025Q1"]
+
+    summary = tables["summary"].iloc[0]
+    assert summary["top_incumbent"] == "ACME CORP"
+    assert summary["hhi"] == pytest.approx(50 ** 2 + 30 ** 2 + 20 ** 2)
+
+
+def test_empty_history():
+    tables = analyze_awards([])
+    assert tables["summary"].iloc[0]["award_count"] == 0
+    assert tables["bands"]["value"].isna().all()
+
+
+@pytest.mark.asyncio
+async def test_engine_serves_repeat_queries_from_parquet(tmp_path):
+    with USASpendingStandIn(synthetic=150) as standin:
+        fusion = IntelligenceFusion(base_url=standin.url, rate_per_second=1000, page_size=100)
+        engine = PriceToBeatEngine(fusion=fusion, cache_dir=str(tmp_path))
+        try:
+            first = await engine.analyze("Department of Homeland Security", "541511")
+            requests = standin.state.requests
+            # A new engine (e.g. after a restart) reads the same cache
+            fusion.cache.clear()
+            second = await PriceToBeatEngine(fusion=fusion, cache_dir=str(tmp_path)).analyze(
+                "Department of Homeland Security", "541511"
+            )
+        finally:
+            await engine.close()
+
+    assert not first["cached"] and second["cached"]
+    assert standin.state.requests == requests
+    assert first["award_count"] == second["award_count"] == 150
+    assert {k: v for k, v in first.items() if k != "cached"} == {k: v for k, v in second.items() if k != "cached"}
+    json.dumps(second)
+    assert sorted(p.name for p in next(tmp_path.iterdir()).iterdir()) == [
+        "bands.parquet", "incumbents.parquet", "recompetes.parquet", "summary.parquet"
+    ]
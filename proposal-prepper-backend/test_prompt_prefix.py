@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for stable prompt prefixes and prefix cache accounting.
+"""
+
+import json
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+import prompt_prefix
+from llm_endpoint_pool import llm_session
+from prompt_prefix import AGENT_OUTPUT_INSTRUCTIONS, PrefixCacheMetrics, PromptParts, agent_prompt
+
+RESPONSE = {"overall_status": "pass", "overall_score": 95, "issues": []}
+
+
+@pytest.fixture
+def metrics():
+    with patch.object(prompt_prefix, "_metrics", PrefixCacheMetrics()):
+        yield prompt_prefix.get_prefix_cache_metrics()
+
+
+def test_agent_prefix_is_stable_across_documents():
+    first = agent_prompt("far", "chunk one", "a.pdf")
+    second = agent_prompt("far", "another chunk", "b.pdf")
+    other_agent = agent_prompt("eo", "chunk one", "a.pdf")
+
+    assert first.prefix == second.prefix
+    assert "chunk one" not in first.prefix and "a.pdf" not in first.prefix
+    assert first.text.endswith("Content: chunk one\n")
+    # Instructions shared by every agent come first, so agents share that part of the prefix
+    assert first.prefix.startswith(AGENT_OUTPUT_INSTRUCTIONS)
+    assert other_agent.prefix.startswith(AGENT_OUTPUT_INSTRUCTIONS) and other_agent.prefix != first.prefix
+
+
+def test_output_instructions_cover_the_required_schema_fields():
+    from structured_output import COMPLIANCE_RESPONSE_SCHEMA
+
+    for field in COMPLIANCE_RESPONSE_SCHEMA["required"]:
+        assert f'"{field}"' in AGENT_OUTPUT_INSTRUCTIONS
+    for field in COMPLIANCE_RESPONSE_SCHEMA["properties"]["issues"]["items"]["required"]:
+        assert f'"{field}"' in AGENT_OUTPUT_INSTRUCTIONS
+
+
+def test_metrics_estimate_cached_tokens_and_time_saved():
+    metrics = PrefixCacheMetrics()
+    parts = PromptParts("p" * 4000, "s" * 400)
+    metrics.set_prefix_tokens("ollama", parts.prefix, 1000)
+    # Cold call: the whole prompt is evaluated, which sets the prefill rate
+    metrics.record("ollama", parts, evaluated_tokens=1100, prefill_seconds=1.1, session_id="s1")
+    # Warm call: only the suffix is evaluated. The suffix counts as at least
+    # 400 / MAX_CHARS_PER_TOKEN = 50 tokens, so 950 of the prefix are reported cached
+    metrics.record("ollama", parts, evaluated_tokens=100, session_id="s1")
+
+    session = metrics.pop_session("s1")
+    assert session["calls"] == 2 and session["cached_tokens"] == 950
+    assert session["saved_seconds"] == 0.95
+    assert metrics.pop_session("s1") is None
+    status = metrics.get_status()
+    assert status["cache_hit_rate"] == round(950 / 2150, 4)
+    assert status["prefill_ms_per_token"] == {"ollama": 1.0}
+
+
+def test_mixed_token_densities_do_not_invent_cache_hits():
+    """A dense call followed by prose misses reports no hits; a prose hit still counts."""
+    metrics = PrefixCacheMetrics()
+    prefix = "p" * 4000
+    metrics.set_prefix_tokens("ollama", prefix, 1000)
+    # Misses: 0.4 tokens per character of tables and citations, then 0.25 of prose
+    metrics.record("ollama", PromptParts(prefix, "7" * 1500), evaluated_tokens=1000 + 600, session_id="s1")
+    metrics.record("ollama", PromptParts(prefix, "a" * 2400), evaluated_tokens=1000 + 600, session_id="s1")
+    assert metrics.pop_session("s1")["cached_tokens"] == 0
+
+    metrics.record("ollama", PromptParts(prefix, "a" * 2400), evaluated_tokens=600, session_id="s2")
+    assert 0 < metrics.pop_session("s2")["cached_tokens"] <= 1000
+
+
+def test_unmeasured_prefix_reports_no_cache_hits():
+    metrics = PrefixCacheMetrics()
+    metrics.record("ollama", PromptParts("p" * 4000, "s" * 400), evaluated_tokens=100, session_id="s1")
+    assert metrics.pop_session("s1")["cached_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_local_agent_sends_prefix_as_system_message(metrics):
+    from local_provider import LocalAnalysisProvider
+
+    requests = []
+
+    async def acompletion(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(RESPONSE)))],
+            usage=SimpleNamespace(prompt_tokens=300 if len(requests) == 1 else 20)
+        )
+
+    provider = LocalAnalysisProvider()
+    parts = agent_prompt("far", "first chunk", "p.pdf")
+    metrics.set_prefix_tokens("ollama", parts.prefix, 250)
+    with patch("local_provider.settings.llm_streaming_enabled", False), \
+            patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}), \
+            llm_session("session-1"):
+        await provider._call_specialized_agent("far", "first chunk", "p.pdf")
+        await provider._call_specialized_agent("far", "second chunk", "p.pdf")
+
+    assert requests[0]["messages"] == [
+        {"role": "system", "content": parts.prefix},
+        {"role": "user", "content": parts.suffix}
+    ]
+    assert requests[0]["messages"][0] == requests[1]["messages"][0]
+    session = metrics.pop_session("session-1")
+    assert session["calls"] == 2 and session["evaluated_tokens"] == 320
+    # The first call evaluated the whole prompt; the second only its suffix
+    assert 0 < session["cached_tokens"] <= 250
+
+
+@pytest.mark.asyncio
+async def test_bedrock_marks_prefix_for_caching(metrics):
+    from aws_bedrock import BedrockClient
+
+    body = {
+        "content": [{"type": "text", "text": json.dumps(RESPONSE)}],
+        "usage": {"input_tokens": 300, "cache_read_input_tokens": 700, "output_tokens": 50}
+    }
+    bedrock = Mock()
+    bedrock.invoke_model.return_value = {"body": SimpleNamespace(read=lambda: json.dumps(body).encode())}
+    client = BedrockClient()
+    client._client = bedrock
+    with patch("aws_bedrock.settings.bedrock_prompt_caching", True), \
+            patch("aws_bedrock.settings.llm_structured_output", False):
+        results = await client.analyze_document("proposal text", "p.pdf", "doc-1", session_id="session-1")
+
+    request = json.loads(bedrock.invoke_model.call_args.kwargs["body"])
+    prefix, suffix = request["messages"][0]["content"]
+    assert prefix["cache_control"] == {"type": "ephemeral"} and "cache_control" not in suffix
+    assert "proposal text" in suffix["text"] and "proposal text" not in prefix["text"]
+    assert results.metadata["prompt_cache"]["cached_tokens"] == 700
+    assert metrics.get_status()["cached_tokens"] == 700
+
+    # Disabled, the prompt is sent as a single string
+    uncached = client.build_request_body("proposal text", "p.pdf", cache_prefix=False)
+    assert uncached["messages"][0]["content"] == prefix["text"] + suffix["text"]
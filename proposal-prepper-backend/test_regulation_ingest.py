@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for FAR/DFARS ingestion from object storage.
+"""
+
+import io
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from knowledge_chunker import chunk_rows
+from regulation_ingest import RegulationDocument, RegulationIngestor, extract_and_chunk
+
+FAR_PART_15 = b"""<html><body>
+<h1>PART 15 - Contracting by Negotiation</h1>
+<p>This part prescribes policies and procedures governing competitive and noncompetitive negotiated acquisitions.</p>
+<h2>Subpart 15.4 - Contract Pricing</h2>
+<h3>15.408 Solicitation provisions and contract clauses.</h3>
+<p>(a) <i>Changes or Additions to Make-or-Buy Program.</i> The contracting officer shall insert the clause.</p>
+<h3>15.408-1 Reserved.</h3>
+<p>Text of the reserved section.</p>
+</body></html>"""
+
+DFARS_CLAUSE = b"""252.204-7012 Safeguarding Covered Defense Information and Cyber Incident Reporting.
+
+(a) Definitions. As used in this clause, adequate security means protective measures.
+"""
+
+
+def test_html_chunks_reference_their_sections():
+    document = RegulationDocument("FAR", "far", "html/part-15.html", "e1")
+    extracted = extract_and_chunk(document, FAR_PART_15, max_tokens=1000)
+
+    assert extracted.references == ["FAR Part 15", "FAR Subpart 15.4", "FAR 15.408", "FAR 15.408-1"]
+    assert extracted.title.startswith("PART 15")
+    assert "<p>" not in "".join(c.text for c in extracted.chunks)
+    assert "insert the clause" in extracted.chunks[2].text
+
+    preamble = extract_and_chunk(RegulationDocument("DFARS", "dfars", "252_part_252.txt", "e2"), b"Preface.\n\n" + DFARS_CLAUSE)
+    assert preamble.references == ["DFARS Part 252", "DFARS 252.204-7012"]
+
+
+def test_chunk_rows_map_offsets_to_pages():
+    extracted = extract_and_chunk(RegulationDocument("FAR", "far", "part-15.html", "e1"), FAR_PART_15, max_tokens=1000)
+    # Pretend page 2 starts at the 15.408 heading
+    page_two = extracted.chunks[2].char_start
+    rows = chunk_rows("src", extracted.chunks, reference_id=lambda c: f"ref-{c.index}", page_starts=[0, page_two])
+
+    assert [r["page_number"] for r in rows] == [1, 1, 2, 2]
+    assert [r["reference_id"] for r in rows] == ["ref-0", "ref-1", "ref-2", "ref-3"]
+
+
+class FakeS3:
+    """list_objects_v2 paginator and get_object over in-memory buckets."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.downloads = []
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        buckets = self.buckets
+
+        class Paginator:
+            def paginate(self, Bucket):
+                objects = [{"Key": key, "ETag": f'"{etag}"', "Size": len(body)} for key, (etag, body) in buckets[Bucket].items()]
+                # One object per page to exercise pagination
+                for obj in objects:
+                    yield {"Contents": [obj]}
+
+        return Paginator()
+
+    def get_object(self, Bucket, Key):
+        self.downloads.append(Key)
+        return {"Body": io.BytesIO(self.buckets[Bucket][Key][1])}
+
+
+class FakeSession:
+    """Returns previously recorded ETags and records writes."""
+
+    def __init__(self, known):
+        self.known = known
+        self.statements = []
+        self.added = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        rows = [SimpleNamespace(name=name, metadata_json={"etag": etag}) for name, etag in self.known.items()]
+        return SimpleNamespace(all=lambda: rows)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        for obj in self.added:
+            obj.id = obj.id or str(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_unchanged_objects_and_bulk_inserts():
+    s3 = FakeS3({
+        "obi-one-far-docs": {
+            "part-15.html": ("new", FAR_PART_15),
+            "part-1.txt": ("same", b"1.101 Purpose.\n\nThe FAR is established."),
+            "cover.png": ("img", b"\x89PNG")
+        },
+        "obi-one-dfars-supp": {"part-252.txt": ("v2", DFARS_CLAUSE)}
+    })
+    session = FakeSession({"FAR part-1.txt": "same", "DFARS part-252.txt": "v1"})
+
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    with ProcessPoolExecutor(max_workers=2) as executor, \
+            patch("regulation_ingest.get_async_session", factory):
+        ingestor = RegulationIngestor(s3_client=s3, executor=executor, embed=False)
+        stats = await ingestor.ingest()
+
+    assert (stats.listed, stats.unchanged, stats.ingested, stats.failed) == (3, 1, 2, 0)
+    assert sorted(s3.downloads) == ["part-15.html", "part-252.txt"]
+
+    sources = {source.name: source for source in session.added}
+    assert set(sources) == {"FAR part-15.html", "DFARS part-252.txt"}
+    assert sources["DFARS part-252.txt"].metadata_json["etag"] == "v2"
+
+    inserts = [s for s in session.statements if getattr(s, "is_insert", False)]
+    assert len(inserts) == 2
+    assert stats.chunks == 5
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for hedged LLM requests.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from finding_stream import emit_finding, stream_findings
+from llm_endpoint_pool import LLMEndpointPool
+from local_llm import LocalLLMClient
+from request_hedging import RequestHedger
+
+
+def primed_hedger(latency=0.05, **kwargs):
+    hedger = RequestHedger("test", percentile=95, min_samples=5, min_delay=0.0, enabled=True, **kwargs)
+    for _ in range(5):
+        hedger.latencies.observe(latency)
+    return hedger
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    hedger = primed_hedger()
+    cancelled = []
+
+    async def attempt(index):
+        try:
+            await asyncio.sleep(5 if index == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return index
+
+    started = time.monotonic()
+    assert await hedger.run(attempt) == 1
+    assert time.monotonic() - started < 1
+    assert cancelled == [0]
+    # The cancelled original still counts toward the latency tail
+    assert max(hedger.latencies._samples) >= 0.05
+    status = hedger.get_status()
+    assert (status["hedge_rate"], status["win_rate"]) == (1.0, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_fast_disabled_or_without_capacity():
+    calls = []
+
+    async def attempt(index):
+        calls.append(index)
+        await asyncio.sleep(0.1)
+        return index
+
+    assert await primed_hedger(latency=1.0).run(attempt) == 0
+    assert await RequestHedger("off", min_samples=1, enabled=False).run(attempt) == 0
+    assert await primed_hedger().run(attempt, can_hedge=lambda: False) == 0
+    assert calls == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_failed_original_waits_for_hedge_and_streams_once():
+    hedger = primed_hedger()
+    received = []
+
+    async def attempt(index):
+        if index == 0:
+            await emit_finding({"title": "from original"}, "far")
+            await asyncio.sleep(0.2)
+            raise RuntimeError("endpoint dropped the connection")
+        await emit_finding({"title": "from hedge"}, "far")
+        await asyncio.sleep(0.3)
+        return "hedge"
+
+    async def sink(issue, source):
+        received.append(issue["title"])
+
+    with stream_findings(sink):
+        assert await hedger.run(attempt) == "hedge"
+    assert received == ["from original"]
+    assert hedger.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_hedges_to_another_endpoint():
+    response = json.dumps({"overall_status": "pass", "overall_score": 90, "issues": []})
+
+    async def handler(request):
+        if request.url.host == "slow":
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"response": response, "done": True})
+
+    pool = LLMEndpointPool(["http://slow", "http://fast"], max_concurrency=1)
+    real_client = httpx.AsyncClient
+    with patch("local_llm.get_llm_endpoint_pool", return_value=pool), \
+            patch("local_llm.get_request_hedger", return_value=primed_hedger()), \
+            patch("local_llm.settings.llm_streaming_enabled", False), \
+            patch("local_llm.httpx.AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))):
+        started = time.monotonic()
+        results = await LocalLLMClient().analyze_document("text", "p.pdf", "doc-1")
+
+    assert time.monotonic() - started < 2
+    assert results.metadata["url"] == "http://fast"
+    assert [e.requests for e in pool.endpoints] == [1, 1]
+    assert pool.get_status()["outstanding"] == 0
@@ -0,0 +1,157 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the deterministic FAR/DFARS pre-scan.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from analysis_provider import AnalysisRouter
+from models import ComplianceIssue, ComplianceResults, ComplianceSummary, RegulatoryReference
+from rule_scanner import RuleScanner, merge_prescan_results
+
+PROPOSAL = """
+--- Page 1 ---
+1. Technical Approach
+Our solution follows FAR 15.408 and DFARS 252.204-7012 for CUI handling.
+2. Management Approach
+--- Page 2 ---
+3. Past Performance
+4. Cost Proposal
+The total evaluated price is $1,250,000.
+"""
+
+
+def provider_results(issues):
+    return ComplianceResults(
+        id="res_1",
+        session_id="sess_1",
+        document_id="doc_1",
+        status="warning",
+        issues=issues,
+        summary=ComplianceSummary(
+            total_issues=len(issues),
+            critical_count=0,
+            warning_count=len(issues),
+            info_count=0,
+            overall_score=90.0
+        ),
+        generated_at=datetime.utcnow(),
+        ai_model="test",
+        processing_time=0.0
+    )
+
+
+def llm_issue(section, title):
+    return ComplianceIssue(
+        id=f"llm_{section}",
+        severity="warning",
+        title=title,
+        description="From the LLM",
+        regulation=RegulatoryReference(regulation="FAR", section=section, title="T"),
+        confidence=0.5
+    )
+
+
+def test_threshold_issue_has_exact_location():
+    """The subcontracting plan finding points at the amount that triggered it."""
+    result = RuleScanner().scan(PROPOSAL, "doc_1")
+
+    issue = next(i for i in result.issues if i.regulation.section == "19.702")
+    assert issue.severity == "critical"
+    assert issue.location.page == 2
+    assert issue.location.line == 3
+    assert issue.location.section == "Cost Proposal"
+    assert "$1,250,000" in issue.location.context
+
+
+def test_citations_and_cui_checks():
+    """Citations are collected and CUI without NIST SP 800-171 is flagged."""
+    result = RuleScanner().scan(PROPOSAL, "doc_1")
+
+    assert [c["citation"] for c in result.citations] == ["FAR 15.408", "DFARS 252.204-7012"]
+    assert result.citations[0]["page"] == 1
+    assert any(i.regulation.section == "252.204-7012" for i in result.issues)
+
+    compliant = PROPOSAL.replace("CUI handling.", "CUI handling per NIST SP 800-171.")
+    assert not any(i.regulation.section == "252.204-7012" for i in RuleScanner().scan(compliant).issues)
+
+
+def test_below_threshold_documents_are_settled():
+    """Checks that pass become prompt notes instead of issues."""
+    result = RuleScanner().scan("Technical Approach\nA small effort with a total price of $50K.\n")
+
+    assert not any(i.regulation.section == "19.702" for i in result.issues)
+    assert "19.702" in result.prompt_context()
+
+
+def test_thresholds_use_the_proposed_price_not_past_contract_values():
+    """A small task order that mentions a large prior program is not held to the large-contract rules."""
+    text = (
+        "Technical Approach\n"
+        "We previously delivered a $12,000,000 modernization program for the agency.\n"
+        "Our proposed price for this task order is $90,000.\n"
+        "Past Performance\n"
+        "Contract HSHQDC-17-C-0001, total contract value $12,000,000.\n"
+    )
+    result = RuleScanner().scan(text)
+    assert not any(i.regulation.section in ("19.702", "15.403-4") for i in result.issues)
+    assert "proposed price does not reach" in result.prompt_context()
+
+    # Without an identifiable proposal price the threshold checks are skipped, not settled
+    unpriced = RuleScanner().scan("We delivered a $12,000,000 program.\n")
+    assert unpriced.issues == [] and "19.702" not in unpriced.prompt_context()
+
+
+def test_prose_is_not_mistaken_for_citations():
+    """Lower-case words and amounts without a dollar sign are ignored."""
+    result = RuleScanner().scan("As far 15 miles away, 2,000,000 widgets were counted.")
+
+    assert result.citations == []
+    assert result.issues == []
+
+
+def test_merge_prefers_prescan_issue_for_same_section():
+    """LLM duplicates of a pre-scan finding are dropped and counts recomputed."""
+    prescan = RuleScanner().scan(PROPOSAL, "doc_1")
+    results = provider_results([
+        llm_issue("FAR 19.702", "Missing subcontracting plan"),
+        llm_issue("52.219-9", "Clause not incorporated")
+    ])
+
+    merged = merge_prescan_results(results, prescan)
+
+    sections = [i.regulation.section for i in merged.issues]
+    assert sections.count("19.702") == 1
+    assert "52.219-9" in sections
+    assert merged.status == "fail"
+    assert merged.summary.total_issues == len(merged.issues)
+    assert merged.summary.critical_count == 2
+    assert merged.metadata["prescan"]["issues"] == len(prescan.issues)
+
+
+@pytest.mark.asyncio
+async def test_router_modes():
+    """'only' skips the provider; 'prefilter' passes notes and merges findings."""
+    router = AnalysisRouter()
+    provider = MagicMock()
+    provider.analyze_document = AsyncMock(return_value=provider_results([]))
+
+    with patch.object(router, "get_provider", return_value=provider), \
+            patch("analysis_provider.settings.prescan_mode", "only"):
+        results = await router.analyze_document(PROPOSAL, "p.pdf", "doc_1", session_id="sess_1")
+        assert results.ai_model == "rule-prescan"
+        provider.analyze_document.assert_not_called()
+
+    with patch.object(router, "get_provider", return_value=provider), \
+            patch.object(router, "_knowledge_context", AsyncMock(return_value="")), \
+            patch("analysis_provider.settings.prescan_mode", "prefilter"):
+        results = await router.analyze_document(PROPOSAL, "p.pdf", "doc_1", session_id="sess_1")
+        kwargs = provider.analyze_document.call_args.kwargs
+        assert "pre-scan" in kwargs["prescan_context"]
+        assert kwargs["session_id"] == "sess_1"
+        assert any(i.id.startswith("prescan_") for i in results.issues)
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for conditional, long-poll and SSE status delivery.
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from status_notifier import StatusNotifier, status_etag, etag_matches
+
+
+def session(status="analyzing", progress=40.0):
+    return {
+        "session_id": "s1",
+        "status": status,
+        "progress": progress,
+        "current_step": "Analyzing",
+        "started_at": datetime(2025, 1, 1),
+        "completed_at": None,
+        "estimated_completion": None,
+        "error_message": None,
+        "updated_at": datetime.utcnow()
+    }
+
+
+class CountingLoader:
+    """Session loader recording how often the database would be queried."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.calls = 0
+
+    async def __call__(self, session_id):
+        self.calls += 1
+        return dict(self.snapshot)
+
+
+def test_etag_ignores_fields_clients_do_not_see():
+    """Bookkeeping columns do not change the ETag."""
+    first, second = session(), session()
+    second["updated_at"] = datetime(2030, 1, 1)
+
+    assert status_etag(first) == status_etag(second)
+    assert status_etag(first) != status_etag(session(progress=50.0))
+    assert etag_matches(status_etag(first), status_etag(second))
+    assert etag_matches("*", status_etag(first))
+    assert not etag_matches(None, status_etag(first))
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_are_served_from_cache():
+    """Only the first read of an unchanged session hits the loader."""
+    notifier = StatusNotifier(ttl=60.0)
+    loader = CountingLoader(session())
+
+    for _ in range(5):
+        await notifier.get_snapshot("s1", loader)
+
+    assert loader.calls == 1
+
+    notifier.invalidate("s1")
+    await notifier.get_snapshot("s1", loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_when_session_changes():
+    """A waiting client is woken by an invalidation and sees the new status."""
+    notifier = StatusNotifier(ttl=60.0)
+    loader = CountingLoader(session(progress=40.0))
+    etag = status_etag(await notifier.get_snapshot("s1", loader))
+
+    async def update_later():
+        await asyncio.sleep(0.05)
+        loader.snapshot = session(progress=60.0)
+        await notifier.observe({"type": "analysis_progress", "sessionId": "s1"})
+
+    updater = asyncio.create_task(update_later())
+    snapshot = await notifier.wait_for_new_status("s1", loader, etag, timeout=5.0)
+    await updater
+
+    assert snapshot["progress"] == 60.0
+    assert loader.calls == 2
+    assert notifier.get_status()["waiting_clients"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_missed():
+    """A change that lands while the snapshot is loading ends the wait immediately."""
+    notifier = StatusNotifier(ttl=60.0)
+    stale = session(progress=40.0)
+    etag = status_etag(stale)
+    calls = []
+
+    async def loader(session_id):
+        calls.append(session_id)
+        if len(calls) == 1:
+            # The read returns the old row, then the update's invalidation arrives
+            notifier.invalidate(session_id)
+            return dict(stale)
+        return session(progress=60.0)
+
+    snapshot = await asyncio.wait_for(notifier.wait_for_new_status("s1", loader, etag, timeout=30.0), timeout=1.0)
+    assert snapshot["progress"] == 60.0
+
+
+@pytest.mark.asyncio
+async def test_long_poll_times_out_without_querying():
+    """An idle long-poll waits out its timeout without reloading the session."""
+    notifier = StatusNotifier(ttl=60.0)
+    loader = CountingLoader(session())
+    etag = status_etag(await notifier.get_snapshot("s1", loader))
+
+    snapshot = await notifier.wait_for_new_status("s1", loader, etag, timeout=0.05)
+
+    assert status_etag(snapshot) == etag
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_terminal_session_does_not_wait():
+    """Completed sessions never change, so long-polls return immediately."""
+    notifier = StatusNotifier(ttl=60.0)
+    loader = CountingLoader(session(status="completed", progress=100.0))
+    etag = status_etag(await notifier.get_snapshot("s1", loader))
+
+    snapshot = await asyncio.wait_for(
+        notifier.wait_for_new_status("s1", loader, etag, timeout=30.0),
+        timeout=1.0
+    )
+    assert snapshot["status"] == "completed"
+
+
+def test_status_endpoint_conditional_get_and_sse():
+    """The status endpoint honours If-None-Match and SSE streams until completion."""
+    import main
+
+    snapshots = {"s1": session(status="completed", progress=100.0)}
+
+    async def fake_get_session(session_id):
+        return snapshots.get(session_id)
+
+    with patch("main.get_analysis_session", new=AsyncMock(side_effect=fake_get_session)), \
+            patch("main.get_status_notifier", return_value=StatusNotifier(ttl=60.0)):
+        client = TestClient(main.app)
+
+        first = client.get("/api/analysis/s1")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        second = client.get("/api/analysis/s1", headers={"If-None-Match": etag}, params={"wait": 1})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+
+        assert client.get("/api/analysis/missing").status_code == 404
+
+        events = client.get("/api/analysis/s1/events")
+        assert events.headers["content-type"].startswith("text/event-stream")
+        assert f"id: {etag}" in events.text
+        assert '"status":"completed"' in events.text
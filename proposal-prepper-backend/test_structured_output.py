@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Tests for the schema-constrained structured output of the LLM backends.
+"""
+
+import io
+import json
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+import structured_output
+from structured_output import (
+    BEDROCK_TOOL_NAME,
+    COMPLIANCE_RESPONSE_SCHEMA,
+    StructuredOutputMetrics,
+    validate_response
+)
+
+RESPONSE = {
+    "overall_status": "fail",
+    "overall_score": 40,
+    "issues": [{
+        "severity": "critical",
+        "title": "Missing subcontracting plan",
+        "description": "No small business subcontracting plan is included.",
+        "regulation": {"regulation": "FAR", "section": "19.702", "title": "Subcontracting"},
+        "confidence": 0.9
+    }]
+}
+
+
+@pytest.fixture
+def metrics():
+    with patch.object(structured_output, "_metrics", StructuredOutputMetrics()):
+        yield structured_output.get_structured_output_metrics()
+
+
+def test_schema_follows_the_models():
+    issue = COMPLIANCE_RESPONSE_SCHEMA["properties"]["issues"]["items"]
+    assert "$ref" not in json.dumps(COMPLIANCE_RESPONSE_SCHEMA)
+    assert issue["properties"]["severity"]["enum"] == ["critical", "warning", "info"]
+    assert issue["properties"]["confidence"]["maximum"] == 1.0
+    assert set(issue["required"]) == {"severity", "title", "description", "regulation", "confidence"}
+    assert issue["properties"]["regulation"]["required"] == ["regulation", "section", "title"]
+    assert COMPLIANCE_RESPONSE_SCHEMA["properties"]["overall_status"]["enum"] == ["pass", "fail", "warning"]
+
+
+def test_validate_response_outcomes(metrics):
+    assert validate_response(json.dumps(RESPONSE), "far") == RESPONSE
+    # Off-schema but parseable output is recovered through the lenient parser
+    fenced = "```json\n" + json.dumps({**RESPONSE, "overall_status": "unknown"}) + "\n```"
+    assert validate_response(fenced, "far")["overall_status"] == "unknown"
+    with pytest.raises(ValueError):
+        validate_response('{"issues": [', "eo")
+
+    status = metrics.get_status()
+    assert (status["valid"], status["recovered"], status["failed"]) == (1, 1, 1)
+    assert status["parse_failure_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert status["by_source"]["eo"] == {"valid": 0, "recovered": 0, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_ollama_request_carries_schema(metrics):
+    from local_llm import LocalLLMClient
+
+    def handler(request):
+        assert json.loads(request.content)["format"] == COMPLIANCE_RESPONSE_SCHEMA
+        return httpx.Response(200, json={"response": json.dumps(RESPONSE), "done": True})
+
+    real_client = httpx.AsyncClient
+    with patch("local_llm.settings.llm_streaming_enabled", False), \
+            patch("local_llm.httpx.AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))):
+        results = await LocalLLMClient().analyze_document("text", "proposal.pdf", "doc-1")
+
+    assert results.issues[0].regulation.section == "19.702"
+    assert metrics.get_status()["by_source"] == {"ollama": {"valid": 1, "recovered": 0, "failed": 0}}
+
+
+@pytest.mark.asyncio
+async def test_litellm_request_uses_json_schema(metrics):
+    from local_provider import LocalAnalysisProvider
+
+    requests = []
+
+    async def acompletion(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(RESPONSE)))])
+
+    with patch("local_provider.settings.llm_streaming_enabled", False), \
+            patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}):
+        data = await LocalAnalysisProvider()._call_specialized_agent("far", "text", "proposal.pdf")
+
+    assert data == RESPONSE
+    response_format = requests[0]["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["schema"] == COMPLIANCE_RESPONSE_SCHEMA
+
+
+@pytest.mark.asyncio
+async def test_truncated_agent_response_is_retried(metrics):
+    from local_provider import LocalAnalysisProvider
+
+    contents = ['{"overall_status": "fail", "issues": [', json.dumps(RESPONSE)]
+
+    async def acompletion(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=contents.pop(0)))])
+
+    with patch("local_provider.settings.llm_streaming_enabled", False), \
+            patch.dict(sys.modules, {"litellm": SimpleNamespace(acompletion=acompletion)}):
+        data = await LocalAnalysisProvider()._call_specialized_agent("far", "text", "proposal.pdf")
+
+    assert data == RESPONSE and contents == []
+    assert metrics.get_status()["by_source"]["far"]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bedrock_forces_schema_tool(metrics):
+    from aws_bedrock import BedrockClient
+
+    body = {"content": [{"type": "tool_use", "id": "t1", "name": BEDROCK_TOOL_NAME, "input": RESPONSE}]}
+    bedrock = Mock()
+    bedrock.invoke_model.return_value = {"body": io.BytesIO(json.dumps(body).encode())}
+    client = BedrockClient()
+    client._client = bedrock
+
+    results = await client.analyze_document("text", "proposal.pdf", "doc-1")
+
+    request = json.loads(bedrock.invoke_model.call_args.kwargs["body"])
+    assert request["tool_choice"] == {"type": "tool", "name": BEDROCK_TOOL_NAME}
+    assert request["tools"][0]["input_schema"] == COMPLIANCE_RESPONSE_SCHEMA
+    assert results.status == "fail" and results.issues[0].severity == "critical"
+    assert metrics.get_status()["valid"] == 1
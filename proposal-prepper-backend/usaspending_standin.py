@@ -0,0 +1,224 @@
+# SPDX-License-Identifier: PolyForm-Strict-1.0.0
+# SPDX-FileCopyrightText: 2025 Seventeen Sierra LLC
+
+"""
+Offline stand-in for the USAspending endpoints used by IntelligenceFusion.
+
+Serves ``search/spending_by_award/``, ``search/spending_by_award_count/``
+and ``awards/{id}/`` from, in order of preference:
+- a recordings file of earlier responses, keyed on method, path and the
+  normalized request payload;
+- the real API (``--upstream``), recording each new response;
+- a deterministic synthetic award set (``--synthetic N``).
+
+An optional per-request latency makes concurrency gains measurable.
+
+Usage:
+    python usaspending_standin.py --recordings usaspending.json --upstream https://api.usaspending.gov
+    python usaspending_standin.py --synthetic 500 --latency 0.2 --port 8765
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from intelligence_fusion import normalize_payload
+
+API_PREFIX = "/api/v2/"
+
+
+def synthetic_awards(count: int) -> List[Dict[str, Any]]:
+    """Deterministic contract awards, largest first."""
+    awards = []
+    for n in range(count):
+        awards.append({
+            "internal_id": n + 1,
+            "generated_internal_id": f"CONT_AWD_STANDIN{n:05d}",
+            "Award ID": f"70SBUR{n:05d}",
+            "Recipient Name": f"Contractor {n % 37:02d} LLC",
+            "Start Date": f"202{n % 4}-10-01",
+            "End Date": f"202{4 + n % 4}-09-30",
+            "Award Amount": round(50_000_000 / (n + 1), 2),
+            "Description": f"Cybersecurity support services task order {n}",
+            "Awarding Agency": "Department of Homeland Security"
+        })
+    return awards
+
+
+class StandInState:
+    """Responses, recordings and traffic counters shared by the handler threads."""
+
+    def __init__(
+        self,
+        recordings_path: Optional[str] = None,
+        upstream: Optional[str] = None,
+        synthetic: int = 0,
+        latency: float = 0.0
+    ):
+        self.recordings_path = Path(recordings_path) if recordings_path else None
+        self.recordings: Dict[str, Any] = {}
+        if self.recordings_path and self.recordings_path.exists():
+            self.recordings = json.loads(self.recordings_path.read_text())
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.awards = synthetic_awards(synthetic)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def respond(self, method: str, path: str, payload: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        key = f"{method} {path} {normalize_payload(payload)}"
+        with self.lock:
+            recorded = self.recordings.get(key)
+        if recorded is not None:
+            return 200, recorded
+        if self.upstream:
+            response = httpx.request(method, f"{self.upstream}{API_PREFIX}{path}", json=payload, timeout=60.0)
+            if response.status_code == 200:
+                self.record(key, response.json())
+            return response.status_code, response.json()
+        if self.awards:
+            return self.synthetic(path, payload or {})
+        return 404, {"detail": f"No recorded response for {method} {path}"}
+
+    def record(self, key: str, body: Any) -> None:
+        with self.lock:
+            self.recordings[key] = body
+            if self.recordings_path:
+                tmp = self.recordings_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self.recordings, indent=1, sort_keys=True))
+                tmp.replace(self.recordings_path)
+
+    def synthetic(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        if path == "search/spending_by_award_count/":
+            return 200, {"results": {"contracts": len(self.awards), "idvs": 0, "grants": 0, "loans": 0}}
+        if path == "search/spending_by_award/":
+            limit, page = int(payload.get("limit", 10)), int(payload.get("page", 1))
+            start = (page - 1) * limit
+            fields = payload.get("fields") or list(self.awards[0])
+            results = [
+                {field: award.get(field) for field in ["internal_id", "generated_internal_id", *fields]}
+                for award in self.awards[start:start + limit]
+            ]
+            return 200, {
+                "limit": limit,
+                "results": results,
+                "page_metadata": {"page": page, "hasNext": start + limit < len(self.awards)}
+            }
+        if path.startswith("awards/"):
+            award_id = path.split("/")[1]
+            award = next((a for a in self.awards if a["generated_internal_id"] == award_id), None)
+            if award is None:
+                return 404, {"detail": "Award not found"}
+            return 200, {
+                "generated_unique_award_id": award_id,
+                "piid": award["Award ID"],
+                "description": award["Description"],
+                "total_obligation": award["Award Amount"],
+                "recipient": {"recipient_name": award["Recipient Name"]},
+                "period_of_performance": {"start_date": award["Start Date"], "end_date": award["End Date"]}
+            }
+        return 404, {"detail": f"Unsupported endpoint {path}"}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    state: StandInState
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self, method: str):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            if not self.path.startswith(API_PREFIX):
+                status, body = 404, {"detail": "Not found"}
+            else:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length)) if length else None
+                if state.latency:
+                    time.sleep(state.latency)
+                status, body = state.respond(method, self.path[len(API_PREFIX):], payload)
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class USASpendingStandIn:
+    """Runs the stand-in on a background thread; use as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **state_options):
+        self.state = StandInState(**state_options)
+        handler = type("BoundStandInHandler", (StandInHandler,), {"state": self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to IntelligenceFusion."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX.rstrip('/')}"
+
+    def start(self) -> "USASpendingStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "USASpendingStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic USAspending responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", help="JSON file of recorded responses")
+    parser.add_argument("--upstream", help="Record unseen requests from this API (e.g. https://api.usaspending.gov)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Serve N synthetic awards for unrecorded requests")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+
+    standin = USASpendingStandIn(
+        args.host, args.port,
+        recordings_path=args.recordings, upstream=args.upstream, synthetic=args.synthetic, latency=args.latency
+    )
+    print(f"Serving USAspending stand-in at {standin.url} (set USASPENDING_API_URL)")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
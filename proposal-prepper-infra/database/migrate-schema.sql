@@ -167,10 +167,24 @@ CREATE TABLE IF NOT EXISTS obi_knowledge_chunks (
 CREATE INDEX IF NOT EXISTS idx_obi_chunks_source_id ON obi_knowledge_chunks(source_id);
 CREATE INDEX IF NOT EXISTS idx_obi_chunks_reference_id ON obi_knowledge_chunks(reference_id);
 CREATE INDEX IF NOT EXISTS idx_obi_chunks_source_ref ON obi_knowledge_chunks(source_id, reference_id);
+CREATE INDEX IF NOT EXISTS idx_obi_chunks_embedding_hnsw ON obi_knowledge_chunks
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX IF NOT EXISTS idx_obi_chunks_content_fts ON obi_knowledge_chunks
+    USING gin (to_tsvector('english'::regconfig, content));
+
+CREATE TABLE IF NOT EXISTS obi_embedding_cache (
+    content_hash VARCHAR(64) NOT NULL,
+    model VARCHAR(255) NOT NULL,
+    dim INTEGER NOT NULL,
+    embedding vector NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (content_hash, model, dim)
+);
 
 CREATE TABLE IF NOT EXISTS obi_eo_crawl_status (
     id VARCHAR(255) PRIMARY KEY DEFAULT gen_random_uuid()::text,
     eo_number VARCHAR(100) NOT NULL UNIQUE,
+    document_number VARCHAR(100),
     title VARCHAR(500) NOT NULL,
     signing_date TIMESTAMP WITH TIME ZONE,
     publication_date TIMESTAMP WITH TIME ZONE,
@@ -182,6 +196,17 @@ CREATE TABLE IF NOT EXISTS obi_eo_crawl_status (
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
 );
 
+ALTER TABLE obi_eo_crawl_status
+ADD COLUMN IF NOT EXISTS document_number VARCHAR(100),
+ADD COLUMN IF NOT EXISTS raw_text_url VARCHAR(500),
+ADD COLUMN IF NOT EXISTS raw_text_key VARCHAR(500),
+ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP WITH TIME ZONE,
+ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(255),
+ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_obi_eo_crawl_status_claim ON obi_eo_crawl_status(status, next_attempt_at);
+
 -- Create triggers for updated_at columns
 DROP TRIGGER IF EXISTS update_analysis_sessions_updated_at ON analysis_sessions;
 CREATE TRIGGER update_analysis_sessions_updated_at 